@@ -1,32 +1,48 @@
 import os
-import uuid
+import json
+import asyncio
+import hashlib
 import logging
-from typing import Any, List, Dict, Optional
-from fastapi import FastAPI, HTTPException, Response
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from dotenv import load_dotenv
 
-# Load env variables
-load_dotenv()
-
-# Import LangGraph and state
+# Import LangGraph and state (src.config loads .env)
 from src.state import make_initial_state
-from src.graph.graph_builder import compile_graph
+from src.graph.graph_builder import GraphSet, preload_nodes
 from src.graph.checkpointer import get_checkpointer
+from src.graph.retention import start_retention
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 
-# Import direct specialist nodes
-from src.agents.resume.node import resume_builder_node
-from src.agents.salary.node import salary_negotiator_node
-from src.agents.interview.eval_node import evaluation_node
+# Direct specialist nodes are imported by their endpoints, on first use
+
+from src.core.llm import llms, reload_llms
 from src.core.metrics import registry
+from src.core.multiproc import scrape_registry, start_segment_writer
+from src.core.search import reload_search_backends
+from src.core.openmetrics import CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE, render as render_openmetrics
+from src.core.profiling import profile_turn
+from src.core.streaming import TokenStreamHandler
+from src.core.transport import close_async_clients, close_session
+from src.config import NODE_ROUTER, STARTUP
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("career-api")
 
-app = FastAPI(title="career.ai API", version="1.0.0")
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    yield
+    # Release pooled upstream connections on shutdown
+    await close_async_clients()
+    close_session()
+
+
+app = FastAPI(title="career.ai API", version="1.0.0", lifespan=_lifespan)
 
 # Setup CORS for React dev server (typically port 5173 or 3000)
 app.add_middleware(
@@ -37,27 +53,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Central compiled graph
+# Per-worker metrics segment (no-op unless METRICS_MULTIPROC_DIR is set)
+start_segment_writer(registry)
+
+# Central compiled graph, one per persistence mode (see GraphSet)
 try:
     checkpointer = get_checkpointer()
-    graph = compile_graph(checkpointer)
+    graphs = GraphSet(checkpointer)
+    graph = graphs.persistent
+    if STARTUP["preload_agents"]:
+        preload_nodes()
     logger.info("LangGraph compiled successfully.")
 except Exception as e:
     logger.error(f"Error compiling LangGraph: {e}")
     graph = None
 
-# Helper to invoke the graph
-def run_agent_graph(
+# Every role's LLM client, built once (rebuilt by /api/settings on a key change)
+llms.warm()
+
+# Background checkpoint compaction (None when disabled or the graph failed)
+retention = start_retention(checkpointer) if graph is not None else None
+
+# Helpers to invoke the graph
+def _build_graph_input(
     user_text: str,
-    extra_task: Optional[Dict[str, Any]] = None,
-    thread_id: str = "default-thread",
-    user_profile: Optional[Dict[str, str]] = None,
-    interview_history: Optional[List[Dict[str, str]]] = None,
-    interview_mode: str = "prep"
+    extra_task: Optional[Dict[str, Any]],
+    user_profile: Optional[Dict[str, str]],
+    interview_history: Optional[List[Dict[str, str]]],
+    interview_mode: str,
+    replay_history: bool = True,
+    resume_interview: bool = False,
 ) -> Dict[str, Any]:
-    if not graph:
-        raise HTTPException(status_code=500, detail="LangGraph is not initialized.")
-    
     # Formulate initial state
     state = make_initial_state()
     state["user_profile"] = user_profile or {
@@ -66,8 +92,10 @@ def run_agent_graph(
     
     # Build list of LangChain messages
     messages = []
-    # If we have history, we can populate it (e.g. for chat or mock interview tracking)
-    if interview_history:
+    # If we have history, we can populate it (e.g. for chat or mock interview tracking).
+    # A thread that already has checkpointed messages keeps its own (bounded)
+    # copy — replaying the client's history would append it again every turn.
+    if interview_history and replay_history:
         for msg in interview_history:
             role = msg.get("role", "")
             content = msg.get("content", "")
@@ -88,12 +116,24 @@ def run_agent_graph(
     
     state["interview_history"] = interview_history or []
     state["interview_mode"] = interview_mode
-    
-    config = {"configurable": {"thread_id": thread_id}}
-    
-    # Invoke Graph
-    result = graph.invoke(state, config)
-    
+    if resume_interview:
+        # Server-authoritative mock session: keep the checkpointed transcript
+        del state["interview_history"]
+    return state
+
+
+def _is_new_thread(run_graph: Any, config: Dict[str, Any]) -> bool:
+    """True unless `run_graph` already holds a checkpoint for this thread."""
+    saver = run_graph.checkpointer
+    return not saver or saver.get_tuple(config) is None
+
+
+async def _ais_new_thread(run_graph: Any, config: Dict[str, Any]) -> bool:
+    saver = run_graph.checkpointer
+    return not saver or await saver.aget_tuple(config) is None
+
+
+def _format_graph_result(result: Dict[str, Any]) -> Dict[str, Any]:
     # Format message objects to serializable dicts
     serializable_history = []
     for msg in result.get("messages", []):
@@ -117,6 +157,246 @@ def run_agent_graph(
         "interview_mode": result.get("interview_mode", "prep")
     }
 
+
+def run_agent_graph(
+    user_text: str,
+    extra_task: Optional[Dict[str, Any]] = None,
+    thread_id: str = "default-thread",
+    user_profile: Optional[Dict[str, str]] = None,
+    interview_history: Optional[List[Dict[str, str]]] = None,
+    interview_mode: str = "prep",
+    persistence: str = "persistent",
+    resume_interview: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run one graph turn. `persistence` is "persistent" (SQLite checkpoints,
+    for conversations resumed by thread_id), "memory" or "none" (one-shot
+    calls that never read their thread back — no checkpoint disk writes).
+    With `resume_interview`, the thread's checkpointed `interview_history`
+    is used instead of `interview_history`.
+    """
+    if not graph:
+        raise HTTPException(status_code=500, detail="LangGraph is not initialized.")
+    
+    run_graph, config = graphs.resolve(persistence, thread_id)
+    state = _build_graph_input(user_text, extra_task, user_profile, interview_history, interview_mode,
+                               replay_history=_is_new_thread(run_graph, config),
+                               resume_interview=resume_interview)
+    
+    # Invoke Graph
+    try:
+        with profile_turn("run"):
+            result = run_graph.invoke(state, config)
+    finally:
+        graphs.release(persistence, config)
+    return _format_graph_result(result)
+
+
+async def arun_agent_graph(
+    user_text: str,
+    extra_task: Optional[Dict[str, Any]] = None,
+    thread_id: str = "default-thread",
+    user_profile: Optional[Dict[str, str]] = None,
+    interview_history: Optional[List[Dict[str, str]]] = None,
+    interview_mode: str = "prep",
+    persistence: str = "persistent",
+    resume_interview: bool = False,
+) -> Dict[str, Any]:
+    """Async twin of `run_agent_graph` — used by the `async def` endpoints."""
+    if not graph:
+        raise HTTPException(status_code=500, detail="LangGraph is not initialized.")
+
+    run_graph, config = graphs.resolve(persistence, thread_id)
+    state = _build_graph_input(user_text, extra_task, user_profile, interview_history, interview_mode,
+                               replay_history=await _ais_new_thread(run_graph, config),
+                               resume_interview=resume_interview)
+
+    # Invoke Graph without pinning a threadpool worker for the LLM calls
+    try:
+        with profile_turn("arun"):
+            result = await run_graph.ainvoke(state, config)
+    finally:
+        graphs.release(persistence, config)
+    return _format_graph_result(result)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def astream_agent_graph(
+    user_text: str,
+    extra_task: Optional[Dict[str, Any]] = None,
+    thread_id: str = "default-thread",
+    user_profile: Optional[Dict[str, str]] = None,
+    interview_history: Optional[List[Dict[str, str]]] = None,
+    interview_mode: str = "prep",
+    persistence: str = "persistent",
+    resume_interview: bool = False,
+) -> AsyncIterator[str]:
+    """
+    Streaming twin of `arun_agent_graph` — yields Server-Sent Events:
+
+      event: node   {"node": ...}                    a graph node finished
+      event: token  {"node": ..., "delta": ...}      LLM output as it arrives
+      event: done   {<same body as arun_agent_graph>}
+      event: error  {"detail": ...}
+
+    Tokens are raw model output; `done.agent_output` is the final,
+    guardrail-validated answer and is what should be persisted client-side.
+    """
+    if not graph:
+        yield _sse("error", {"detail": "LangGraph is not initialized."})
+        return
+
+    run_graph, config = graphs.resolve(persistence, thread_id)
+    state = _build_graph_input(user_text, extra_task, user_profile, interview_history, interview_mode,
+                               replay_history=await _ais_new_thread(run_graph, config),
+                               resume_interview=resume_interview)
+    # Router output is a JSON routing decision, not something to show the user
+    handler = TokenStreamHandler(exclude_nodes={NODE_ROUTER})
+    config["callbacks"] = [handler]
+
+    async def _run() -> Dict[str, Any]:
+        final = state
+        with profile_turn("stream"):
+            async for mode, chunk in run_graph.astream(state, config, stream_mode=["updates", "values"]):
+                if mode == "updates":
+                    for node in chunk:
+                        handler.push("node", {"node": node})
+                else:
+                    final = chunk
+        return final
+
+    task = asyncio.create_task(_run())
+    try:
+        async for event, data in handler.events(task):
+            yield _sse(event, data)
+        yield _sse("done", _format_graph_result(task.result()))
+    except Exception as e:
+        logger.exception("Error in streamed graph run")
+        yield _sse("error", {"detail": str(e)})
+    finally:
+        # Client went away mid-stream — stop generating
+        if not task.done():
+            task.cancel()
+        graphs.release(persistence, config)
+
+
+def _event_stream(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ── Mock interview sessions ──────────────────────────────────────────────────
+# The checkpointed `interview_history` of thread "mock:<thread_id>" is the
+# authoritative transcript: clients send only the new answer and get back
+# the interviewer's reply, the turn counter (transcript length) and an ETag.
+# A `turn` / If-Match that no longer matches the session means the client
+# missed a turn (another tab, a retried request) and gets 409 instead of a
+# forked transcript. Turns of one session are serialised in-process, and
+# across API workers each turn is claimed in the checkpoint database
+# (`claim_turn`, a compare-and-set on the transcript length the worker
+# read) before the graph runs, so two workers cannot both append turn N.
+# Sessions started before the "mock:" namespace are read from the bare
+# thread and copied over by their next answer.
+
+_mock_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# A claim older than this belongs to a crashed worker and may be taken over
+_MOCK_TURN_LEASE_S = 300.0
+
+
+def _mock_thread(thread_id: str) -> str:
+    # Own namespace: chat turns on the same thread_id must not overwrite the transcript
+    return f"mock:{thread_id}"
+
+
+def _mock_lock(thread_id: str) -> asyncio.Lock:
+    lock = _mock_locks.get(thread_id)
+    if lock is None:
+        lock = _mock_locks[thread_id] = asyncio.Lock()
+    return lock
+
+
+def _session_etag(history: List[Dict[str, str]]) -> str:
+    last = json.dumps(history[-1:], sort_keys=True).encode()
+    return f'"{len(history)}-{hashlib.blake2b(last, digest_size=6).hexdigest()}"'
+
+
+async def _mock_session_state(thread_id: str) -> Tuple[List[Dict[str, str]], bool]:
+    """(transcript, legacy) — legacy when it still lives on the bare thread."""
+    if not graph:
+        raise HTTPException(status_code=500, detail="LangGraph is not initialized.")
+    snapshot = await graph.aget_state({"configurable": {"thread_id": _mock_thread(thread_id)}})
+    history = (snapshot.values or {}).get("interview_history")
+    if history:
+        return list(history), False
+    legacy = (await graph.aget_state({"configurable": {"thread_id": thread_id}})).values or {}
+    if legacy.get("interview_mode") == "mock" and legacy.get("interview_history"):
+        return list(legacy["interview_history"]), True
+    return [], False
+
+
+async def _mock_session(thread_id: str) -> List[Dict[str, str]]:
+    """The session's checkpointed transcript ([] when there is none)."""
+    return (await _mock_session_state(thread_id))[0]
+
+
+def _claim_mock_turn(thread_id: str, turn: int) -> bool:
+    claim = getattr(checkpointer, "claim_turn", None)
+    return claim is None or claim(_mock_thread(thread_id), turn, _MOCK_TURN_LEASE_S)
+
+
+def _release_mock_turn(thread_id: str, turn: Optional[int] = None) -> None:
+    release = getattr(checkpointer, "release_turn", None)
+    if release is not None:
+        release(_mock_thread(thread_id), turn)
+
+
+def _session_headers(response: Response, history: List[Dict[str, str]]) -> int:
+    response.headers["ETag"] = _session_etag(history)
+    return len(history)
+
+
+async def _mock_session_turn(
+    thread_id: str,
+    answer: str,
+    extra_task: Dict[str, Any],
+    turn: Optional[int],
+    if_match: Optional[str],
+) -> Dict[str, Any]:
+    """One answer of a server-held mock interview (404 without a session, 409 on divergence)."""
+    async with _mock_lock(thread_id):
+        history, legacy = await _mock_session_state(thread_id)
+        if not history:
+            raise HTTPException(status_code=404, detail="No mock interview in progress for this thread — start one first.")
+        etag = _session_etag(history)
+        moved_on = (turn is not None and turn != len(history)) or (if_match and if_match not in ("*", etag))
+        # Another worker may have read the same transcript: only one claims it
+        if moved_on or not await asyncio.to_thread(_claim_mock_turn, thread_id, len(history)):
+            raise HTTPException(status_code=409, detail={
+                "message": "The interview has moved on since this answer was written.",
+                "turn": len(history),
+                "etag": etag,
+            })
+        try:
+            return await arun_agent_graph(
+                user_text=answer,
+                extra_task={**extra_task, "force_agent": "mock_interview"},
+                thread_id=_mock_thread(thread_id),
+                interview_mode="mock",
+                # A legacy session is replayed into its "mock:" thread once
+                interview_history=history if legacy else None,
+                resume_interview=not legacy,
+            )
+        except BaseException:
+            await asyncio.to_thread(_release_mock_turn, thread_id, len(history))
+            raise
+
+
 # ── REQUEST MODELS ───────────────────────────────────────────────────────────
 
 class ChatRequest(BaseModel):
@@ -163,14 +443,19 @@ class MockAnswerRequest(BaseModel):
     job_title: str
     user_experience: Optional[str] = ""
     user_name: Optional[str] = "Candidate"
-    history: List[Dict[str, str]]
+    # Omit `history` to continue the server-held session; `turn` (or an
+    # If-Match header with the last ETag) rejects the answer with 409 when
+    # the session has moved on since the client last saw it
+    history: Optional[List[Dict[str, str]]] = None
+    turn: Optional[int] = None
     thread_id: str
 
 class MockEvaluateRequest(BaseModel):
     job_title: str
     user_experience: Optional[str] = ""
     user_name: Optional[str] = "Candidate"
-    history: List[Dict[str, str]]
+    history: Optional[List[Dict[str, str]]] = None   # None → the session of `thread_id`
+    thread_id: Optional[str] = None
 
 class TranscriptEvaluateRequest(BaseModel):
     job_title: str
@@ -204,7 +489,34 @@ def health_check():
 
 @app.get("/api/metrics")
 def get_metrics():
-    return registry.snapshot()
+    merged = scrape_registry(registry)
+    if merged is registry:
+        return registry.snapshot()
+    # Node metrics from every worker; collectors are this worker's own
+    return {**merged.snapshot(), **registry.collect()}
+
+@app.get("/metrics")
+def get_openmetrics():
+    """Prometheus / OpenMetrics scrape target."""
+    merged = scrape_registry(registry)
+    # Collectors are this worker's own: label them so counters stay per-process
+    worker = None if merged is registry else str(os.getpid())
+    body = render_openmetrics(merged, registry.collect(), registry.collector_counters(), worker=worker)
+    return Response(content=body, media_type=OPENMETRICS_CONTENT_TYPE)
+
+@app.get("/api/admin/checkpoints")
+def checkpoint_report(top: int = 20):
+    """Checkpoint DB size and the threads holding the most rows."""
+    if retention is None:
+        raise HTTPException(status_code=503, detail="Checkpoint retention is disabled")
+    return retention.report(top=top)
+
+@app.post("/api/admin/checkpoints/compact")
+def compact_checkpoints():
+    """Run a retention pass now instead of waiting for the next interval."""
+    if retention is None:
+        raise HTTPException(status_code=503, detail="Checkpoint retention is disabled")
+    return retention.compact()
 
 # ── UNIFIED ADAPTERS (used by the new React UI) ──────────────────────────────
 
@@ -236,6 +548,8 @@ class UnifiedMockInterviewRequest(BaseModel):
     job_title: str
     experience_level: Optional[str] = ""
     interview_history: Optional[List[Dict[str, str]]] = None
+    answer: Optional[str] = None    # without interview_history: continue the server-held session
+    turn: Optional[int] = None
     thread_id: Optional[str] = "mock-thread"
 
 class UnifiedEvaluateRequest(BaseModel):
@@ -250,14 +564,14 @@ class UnifiedTutorialRequest(BaseModel):
 
 class UnifiedSalaryRequest(BaseModel):
     message: str
-    thread_id: Optional[str] = "salary-thread"
+    thread_id: Optional[str] = None     # persist only when the client names a thread
 
 
 @app.post("/api/resume")
-def unified_generate_resume(req: UnifiedResumeRequest):
+async def unified_generate_resume(req: UnifiedResumeRequest):
     """New UI endpoint: generate a resume."""
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=f"Generate a LaTeX resume for: {req.job_description[:100]}",
             extra_task={
                 "job_description": req.job_description,
@@ -265,7 +579,8 @@ def unified_generate_resume(req: UnifiedResumeRequest):
                 "previous_resume": "",
                 "force_agent": "resume_builder"
             },
-            thread_id=req.thread_id or str(uuid.uuid4())
+            thread_id=req.thread_id or "resume-thread",
+            persistence="persistent" if req.thread_id else "none"
         )
         output = res.get("agent_output", "")
         return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", [])}
@@ -275,10 +590,10 @@ def unified_generate_resume(req: UnifiedResumeRequest):
 
 
 @app.post("/api/resume/refine")
-def unified_refine_resume(req: UnifiedRefineRequest):
+async def unified_refine_resume(req: UnifiedRefineRequest):
     """New UI endpoint: refine an existing resume."""
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=req.refinement_request,
             extra_task={
                 "previous_resume": req.previous_resume,
@@ -286,7 +601,8 @@ def unified_refine_resume(req: UnifiedRefineRequest):
                 "user_request": req.refinement_request,
                 "force_agent": "resume_builder"
             },
-            thread_id=req.thread_id or str(uuid.uuid4())
+            thread_id=req.thread_id or "resume-thread",
+            persistence="persistent" if req.thread_id else "none"
         )
         output = res.get("agent_output", "")
         return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", [])}
@@ -296,13 +612,13 @@ def unified_refine_resume(req: UnifiedRefineRequest):
 
 
 @app.post("/api/job_search")
-def unified_job_search(req: UnifiedJobSearchRequest):
+async def unified_job_search(req: UnifiedJobSearchRequest):
     """New UI endpoint: search for jobs."""
     try:
         query = f"Find {req.job_type} {req.job_title} jobs in {req.location or 'any location'}"
         if req.additional_context:
             query += f". Requirements: {req.additional_context}"
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=query,
             extra_task={
                 "job_title": req.job_title,
@@ -311,7 +627,8 @@ def unified_job_search(req: UnifiedJobSearchRequest):
                 "user_context": req.additional_context,
                 "force_agent": "job_search"
             },
-            thread_id=req.thread_id
+            thread_id=req.thread_id,
+            persistence="none"
         )
         output = res.get("agent_output", "")
         return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", [])}
@@ -321,10 +638,10 @@ def unified_job_search(req: UnifiedJobSearchRequest):
 
 
 @app.post("/api/interview_prep")
-def unified_interview_prep(req: UnifiedInterviewPrepRequest):
+async def unified_interview_prep(req: UnifiedInterviewPrepRequest):
     """New UI endpoint: get interview prep guide."""
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=req.focus_areas or f"Comprehensive interview preparation guide for {req.job_title}",
             extra_task={
                 "job_title": req.job_title,
@@ -332,7 +649,8 @@ def unified_interview_prep(req: UnifiedInterviewPrepRequest):
                 "user_request": req.focus_areas,
                 "force_agent": "interview_prep"
             },
-            thread_id=req.thread_id
+            thread_id=req.thread_id,
+            persistence="none"
         )
         output = res.get("agent_output", "")
         return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", [])}
@@ -341,32 +659,63 @@ def unified_interview_prep(req: UnifiedInterviewPrepRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/interview_prep/stream")
+async def stream_interview_prep(req: UnifiedInterviewPrepRequest):
+    """SSE variant of /api/interview_prep."""
+    return _event_stream(astream_agent_graph(
+        user_text=req.focus_areas or f"Comprehensive interview preparation guide for {req.job_title}",
+        extra_task={
+            "job_title": req.job_title,
+            "user_experience": req.experience_level,
+            "user_request": req.focus_areas,
+            "force_agent": "interview_prep"
+        },
+        thread_id=req.thread_id,
+        persistence="none"
+    ))
+
+
 @app.post("/api/mock_interview")
-def unified_mock_interview(req: UnifiedMockInterviewRequest):
-    """New UI endpoint: conduct mock interview turn."""
+async def unified_mock_interview(
+    req: UnifiedMockInterviewRequest,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+):
+    """
+    New UI endpoint: conduct mock interview turn.
+
+    With `answer` and no `interview_history` the turn continues the
+    server-held session (see `_mock_session_turn`); otherwise the client's
+    history is used and, when empty, a new session is started.
+    """
+    task = {"job_title": req.job_title, "user_experience": req.experience_level}
     try:
-        history = req.interview_history or []
-        user_text = "Start the mock interview" if not history else history[-1].get("content", "")
-        res = run_agent_graph(
-            user_text=user_text,
-            extra_task={
-                "job_title": req.job_title,
-                "user_experience": req.experience_level,
-                "force_agent": "mock_interview"
-            },
-            thread_id=req.thread_id,
-            interview_history=history,
-            interview_mode="mock"
-        )
+        if req.interview_history is None and req.answer:
+            res = await _mock_session_turn(req.thread_id, req.answer, task, req.turn, if_match)
+        else:
+            history = req.interview_history or []
+            user_text = "Start the mock interview" if not history else history[-1].get("content", "")
+            # The client's transcript replaces the session's: its turn claims no longer apply
+            await asyncio.to_thread(_release_mock_turn, req.thread_id)
+            res = await arun_agent_graph(
+                user_text=user_text,
+                extra_task={**task, "force_agent": "mock_interview"},
+                thread_id=_mock_thread(req.thread_id),
+                interview_history=history,
+                interview_mode="mock"
+            )
         output = res.get("agent_output", "")
-        return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", [])}
+        turn = _session_headers(response, res.get("interview_history", []))
+        return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", []), "turn": turn}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error in mock interview")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/evaluate")
-def unified_evaluate(req: UnifiedEvaluateRequest):
+async def unified_evaluate(req: UnifiedEvaluateRequest):
     """New UI endpoint: evaluate an interview transcript."""
     try:
         eval_state = make_initial_state()
@@ -374,8 +723,8 @@ def unified_evaluate(req: UnifiedEvaluateRequest):
             "job_title": req.job_title,
             "interview_transcript": req.transcript
         }
-        from src.agents.interview.eval_node import evaluation_node
-        res = evaluation_node(eval_state)
+        from src.agents.interview.eval_node import aevaluation_node
+        res = await aevaluation_node(eval_state)
         output = res.get("agent_output", "No evaluation available.")
         return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", [])}
     except Exception as e:
@@ -384,17 +733,18 @@ def unified_evaluate(req: UnifiedEvaluateRequest):
 
 
 @app.post("/api/tutorials")
-def unified_tutorials(req: UnifiedTutorialRequest):
+async def unified_tutorials(req: UnifiedTutorialRequest):
     """New UI endpoint: generate a tutorial."""
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=req.tutorial_query,
             extra_task={
                 "tutorial_query": req.tutorial_query,
                 "user_context": req.user_context,
                 "force_agent": "tutorials"
             },
-            thread_id=req.thread_id
+            thread_id=req.thread_id,
+            persistence="none"
         )
         output = res.get("agent_output", "")
         return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", [])}
@@ -403,17 +753,33 @@ def unified_tutorials(req: UnifiedTutorialRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/tutorials/stream")
+async def stream_tutorials(req: UnifiedTutorialRequest):
+    """SSE variant of /api/tutorials."""
+    return _event_stream(astream_agent_graph(
+        user_text=req.tutorial_query,
+        extra_task={
+            "tutorial_query": req.tutorial_query,
+            "user_context": req.user_context,
+            "force_agent": "tutorials"
+        },
+        thread_id=req.thread_id,
+        persistence="none"
+    ))
+
+
 @app.post("/api/salary")
-def unified_salary(req: UnifiedSalaryRequest):
+async def unified_salary(req: UnifiedSalaryRequest):
     """New UI endpoint: get salary negotiation advice."""
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=req.message,
             extra_task={
                 "user_message": req.message,
                 "force_agent": "salary_negotiator"
             },
-            thread_id=req.thread_id
+            thread_id=req.thread_id or "salary-thread",
+            persistence="persistent" if req.thread_id else "none"
         )
         output = res.get("agent_output", "")
         return {"response": output, "agent_output": output, "graph_trace": res.get("graph_trace", [])}
@@ -425,9 +791,9 @@ def unified_salary(req: UnifiedSalaryRequest):
 
 
 @app.post("/api/chat")
-def chat_turn(req: ChatRequest):
+async def chat_turn(req: ChatRequest):
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=req.message,
             thread_id=req.thread_id,
             user_profile=req.user_profile,
@@ -442,11 +808,23 @@ def chat_turn(req: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/chat/stream")
+async def stream_chat_turn(req: ChatRequest):
+    """SSE variant of /api/chat."""
+    return _event_stream(astream_agent_graph(
+        user_text=req.message,
+        thread_id=req.thread_id,
+        user_profile=req.user_profile,
+        interview_history=req.interview_history,
+        interview_mode=req.interview_mode
+    ))
+
+
 @app.post("/api/resume/generate")
-def generate_resume(req: GenerateResumeRequest):
+async def generate_resume(req: GenerateResumeRequest):
     try:
         # Run graph turn specifically requesting resume building
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=f"Generate a LaTeX resume for: {req.job_description[:100]}",
             extra_task={
                 "job_description": req.job_description,
@@ -454,7 +832,7 @@ def generate_resume(req: GenerateResumeRequest):
                 "previous_resume": "",
                 "force_agent": "resume_builder"
             },
-            thread_id=str(uuid.uuid4())
+            persistence="none"
         )
         # Extract the resulting LaTeX content
         latex = res.get("task_input", {}).get("generated_resume", "") or \
@@ -465,9 +843,9 @@ def generate_resume(req: GenerateResumeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/resume/refine")
-def refine_resume(req: RefineResumeRequest):
+async def refine_resume(req: RefineResumeRequest):
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=req.refinement_request,
             extra_task={
                 "previous_resume": req.previous_resume,
@@ -475,7 +853,7 @@ def refine_resume(req: RefineResumeRequest):
                 "user_request": req.refinement_request,
                 "force_agent": "resume_builder"
             },
-            thread_id=str(uuid.uuid4())
+            persistence="none"
         )
         latex = res.get("task_input", {}).get("generated_resume", "") or \
                 res.get("user_profile", {}).get("resume_content", req.previous_resume)
@@ -515,9 +893,9 @@ def compile_resume_pdf(req: CompileRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/job/search")
-def find_jobs(req: JobSearchRequest):
+async def find_jobs(req: JobSearchRequest):
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=f"Find {req.job_type} {req.job_title} jobs in {req.location}",
             extra_task={
                 "job_title": req.job_title,
@@ -526,7 +904,8 @@ def find_jobs(req: JobSearchRequest):
                 "user_context": req.user_context,
                 "force_agent": "job_search"
             },
-            thread_id=req.thread_id
+            thread_id=req.thread_id,
+            persistence="none"
         )
         return {"output": res.get("agent_output"), "graph_trace": res.get("graph_trace")}
     except Exception as e:
@@ -534,9 +913,9 @@ def find_jobs(req: JobSearchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/interview/prep")
-def build_prep_guide(req: PrepGuideRequest):
+async def build_prep_guide(req: PrepGuideRequest):
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=req.focus_area or f"Comprehensive interview preparation guide for {req.job_title}",
             extra_task={
                 "job_title": req.job_title,
@@ -545,7 +924,8 @@ def build_prep_guide(req: PrepGuideRequest):
                 "user_request": req.focus_area,
                 "force_agent": "interview_prep"
             },
-            thread_id=req.thread_id
+            thread_id=req.thread_id,
+            persistence="none"
         )
         return {"output": res.get("agent_output"), "graph_trace": res.get("graph_trace")}
     except Exception as e:
@@ -553,9 +933,11 @@ def build_prep_guide(req: PrepGuideRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/interview/mock/start")
-def start_mock(req: MockStartRequest):
+async def start_mock(req: MockStartRequest, response: Response):
+    """Start (or restart) the thread's mock interview session."""
     try:
-        res = run_agent_graph(
+        await asyncio.to_thread(_release_mock_turn, req.thread_id)
+        res = await arun_agent_graph(
             user_text="Start the mock interview",
             extra_task={
                 "job_title": req.job_title,
@@ -563,37 +945,69 @@ def start_mock(req: MockStartRequest):
                 "user_name": req.user_name,
                 "force_agent": "mock_interview"
             },
-            thread_id=req.thread_id,
+            thread_id=_mock_thread(req.thread_id),
             interview_mode="mock"
         )
-        return {"question": res.get("agent_output"), "history": res.get("interview_history")}
+        history = res.get("interview_history")
+        turn = _session_headers(response, history or [])
+        return {"question": res.get("agent_output"), "history": history, "turn": turn}
     except Exception as e:
         logger.exception("Error starting mock interview")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/interview/mock/{thread_id}")
+async def get_mock_session(thread_id: str, response: Response):
+    """The server-held transcript — what a client re-syncs from after a 409."""
+    history = await _mock_session(thread_id)
+    if not history:
+        raise HTTPException(status_code=404, detail="No mock interview in progress for this thread.")
+    turn = _session_headers(response, history)
+    return {"history": history, "turn": turn}
+
 @app.post("/api/interview/mock/answer")
-def send_answer(req: MockAnswerRequest):
+async def send_answer(req: MockAnswerRequest, response: Response, if_match: Optional[str] = Header(None)):
+    """
+    Answer the current question. Without `history` only the answer travels
+    and the reply carries just the follow-up and the new `turn`; with
+    `history` (legacy clients) the client's transcript is used and returned.
+    """
+    task = {
+        "job_title": req.job_title,
+        "user_experience": req.user_experience,
+        "user_name": req.user_name,
+    }
     try:
-        res = run_agent_graph(
+        if req.history is None:
+            res = await _mock_session_turn(req.thread_id, req.answer, task, req.turn, if_match)
+            turn = _session_headers(response, res.get("interview_history", []))
+            return {"follow_up": res.get("agent_output"), "turn": turn}
+
+        await asyncio.to_thread(_release_mock_turn, req.thread_id)
+        res = await arun_agent_graph(
             user_text=req.answer,
-            extra_task={
-                "job_title": req.job_title,
-                "user_experience": req.user_experience,
-                "user_name": req.user_name,
-                "force_agent": "mock_interview"
-            },
-            thread_id=req.thread_id,
+            extra_task={**task, "force_agent": "mock_interview"},
+            thread_id=_mock_thread(req.thread_id),
             interview_history=req.history,
             interview_mode="mock"
         )
-        return {"follow_up": res.get("agent_output"), "history": res.get("interview_history")}
+        history = res.get("interview_history")
+        turn = _session_headers(response, history or [])
+        return {"follow_up": res.get("agent_output"), "history": history, "turn": turn}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error answering mock interview question")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/interview/mock/evaluate")
-def evaluate_mock_session(req: MockEvaluateRequest):
+async def evaluate_mock_session(req: MockEvaluateRequest):
     try:
+        history = req.history
+        if history is None:
+            if not req.thread_id:
+                raise HTTPException(status_code=400, detail="Send either `history` or the session's `thread_id`.")
+            history = await _mock_session(req.thread_id)
+
         # Construct evaluator state directly
         eval_state = make_initial_state()
         eval_state["task_input"] = {
@@ -601,17 +1015,20 @@ def evaluate_mock_session(req: MockEvaluateRequest):
             "user_experience": req.user_experience,
             "user_name": req.user_name,
         }
-        eval_state["interview_history"] = req.history
+        eval_state["interview_history"] = history
         
         # Invoke mock evaluator node
-        res = evaluation_node(eval_state)
+        from src.agents.interview.eval_node import aevaluation_node
+        res = await aevaluation_node(eval_state)
         return {"evaluation": res.get("agent_output", "No evaluation available.")}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error evaluating mock interview")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/interview/evaluate_transcript")
-def evaluate_custom_transcript(req: TranscriptEvaluateRequest):
+async def evaluate_custom_transcript(req: TranscriptEvaluateRequest):
     try:
         eval_state = make_initial_state()
         eval_state["task_input"] = {
@@ -620,23 +1037,25 @@ def evaluate_custom_transcript(req: TranscriptEvaluateRequest):
             "user_name": req.user_name,
             "interview_transcript": req.transcript
         }
-        res = evaluation_node(eval_state)
+        from src.agents.interview.eval_node import aevaluation_node
+        res = await aevaluation_node(eval_state)
         return {"evaluation": res.get("agent_output", "No evaluation available.")}
     except Exception as e:
         logger.exception("Error evaluating custom transcript")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/tutorials")
-def learn_topic(req: TutorialRequest):
+async def learn_topic(req: TutorialRequest):
     try:
-        res = run_agent_graph(
+        res = await arun_agent_graph(
             user_text=req.topic,
             extra_task={
                 "user_message": req.topic,
                 "user_context": req.user_background,
                 "force_agent": "tutorials"
             },
-            thread_id=req.thread_id
+            thread_id=req.thread_id,
+            persistence="none"
         )
         return {"output": res.get("agent_output"), "graph_trace": res.get("graph_trace")}
     except Exception as e:
@@ -644,7 +1063,7 @@ def learn_topic(req: TutorialRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/salary/playbook")
-def CounterOfferPlaybook(req: SalaryRequest):
+async def CounterOfferPlaybook(req: SalaryRequest):
     try:
         eval_state = make_initial_state()
         eval_state["task_input"] = {
@@ -657,7 +1076,8 @@ def CounterOfferPlaybook(req: SalaryRequest):
         }
         
         # Invoke salary specialist directly
-        res = salary_negotiator_node(eval_state)
+        from src.agents.salary.node import asalary_negotiator_node
+        res = await asalary_negotiator_node(eval_state)
         return {"output": res.get("agent_output", "Failed to build playbook.")}
     except Exception as e:
         logger.exception("Error constructing salary counter playbook")
@@ -703,6 +1123,10 @@ def save_settings(settings: SettingsUpdate):
             os.environ["GOOGLE_CSE_ID"] = settings.google_cse_id
             current_env["GOOGLE_CSE_ID"] = settings.google_cse_id
 
+        reload_search_backends()
+        if reload_llms():
+            llms.warm()
+
         # Write fresh configurations to .env
         with open(dotenv_path, "w", encoding="utf-8") as f:
             for k, v in current_env.items():
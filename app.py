@@ -13,11 +13,10 @@ import time
 from typing import Any
 
 import streamlit as st
-from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 
 # ── Environment ───────────────────────────────────────────────────────────────
-load_dotenv()
+import src.config  # noqa: F401 — loads .env (the one place it is loaded)
 
 # ── Page config (MUST be first Streamlit call) ─────────────────────────────
 st.set_page_config(
@@ -582,6 +581,8 @@ def _sidebar_nav():
                     if "GOOGLE_CSE_ID" in os.environ:
                         del os.environ["GOOGLE_CSE_ID"]
                     st.info("Reset to DuckDuckGo search fallback.")
+                from src.core.search import reload_search_backends
+                reload_search_backends()
                 st.rerun()
 
 
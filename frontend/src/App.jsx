@@ -187,6 +187,7 @@ export default function App() {
   // Mock Interview State
   const [mockStarted, setMockStarted] = useState(false);
   const [mockHistory, setMockHistory] = useState([]);
+  const [mockTurn, setMockTurn] = useState(0);
   const [mockAnswer, setMockAnswer] = useState('');
   const [mockEvaluation, setMockEvaluation] = useState('');
   
@@ -440,6 +441,7 @@ export default function App() {
       });
       const data = await res.json();
       setMockHistory(data.history || []);
+      setMockTurn(data.turn || 0);
       setMockStarted(true);
     } catch (err) {
       alert('Failed to start mock: ' + err.message);
@@ -460,6 +462,8 @@ export default function App() {
     setIvLoading(true);
 
     try {
+      // The server holds the transcript: send only the new answer and the
+      // turn we last saw (409 → another tab moved on; re-sync from the server)
       const res = await fetch(`${API_BASE}/api/interview/mock/answer`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
@@ -468,12 +472,20 @@ export default function App() {
           job_title: ivJobTitle,
           user_experience: ivExperience || userProfile.experience,
           user_name: userProfile.name || 'Candidate',
-          history: updatedHistory,
+          turn: mockTurn,
           thread_id: threadId,
         }),
       });
+      if (res.status === 409) {
+        const session = await (await fetch(`${API_BASE}/api/interview/mock/${encodeURIComponent(threadId)}`)).json();
+        setMockHistory(session.history || []);
+        setMockTurn(session.turn || 0);
+        alert('This interview continued elsewhere — the transcript has been refreshed.');
+        return;
+      }
       const data = await res.json();
-      setMockHistory(data.history || []);
+      setMockHistory([...updatedHistory, { role: 'assistant', content: data.follow_up }]);
+      setMockTurn(data.turn);
     } catch (err) {
       alert('Interviewer response failed: ' + err.message);
     } finally {
@@ -492,7 +504,7 @@ export default function App() {
           job_title: ivJobTitle,
           user_experience: ivExperience || userProfile.experience,
           user_name: userProfile.name || 'Candidate',
-          history: mockHistory,
+          thread_id: threadId,
         }),
       });
       const data = await res.json();
@@ -1,3 +1,3 @@
 """src/agents/general/__init__.py"""
-from .node import general_qa_node, clarifier_node
-__all__ = ["general_qa_node", "clarifier_node"]
+from .node import general_qa_node, clarifier_node, ageneral_qa_node, aclarifier_node
+__all__ = ["general_qa_node", "clarifier_node", "ageneral_qa_node", "aclarifier_node"]
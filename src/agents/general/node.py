@@ -11,13 +11,13 @@ Prompts in prompts.py | LLM from core.llm.
 
 from __future__ import annotations
 
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import AIMessage, HumanMessage
 
 from src.state import AgentState
-from src.config import NODE_GENERAL_QA, NODE_CLARIFIER
-from src.core.llm import get_llm
+from src.config import NODE_GENERAL_QA, NODE_CLARIFIER, MEMORY
+from src.core.history import fit_prompt, message_entries
+from src.core.llm import get_chain
 from src.middleware.guardrails import guarded_node
 from .prompts import GENERAL_QA_TEMPLATE, CLARIFIER_TEMPLATE
 
@@ -49,52 +49,98 @@ def _get_user_message(state: AgentState) -> str:
     return ""
 
 
-def _build_chat_history(state: AgentState) -> str:
-    """Build a short readable history string for context."""
-    recent = state.get("messages", [])[-6:]
-    return "\n".join(
-        f"{'User' if isinstance(m, HumanMessage) else 'Assistant'}: {m.content}"
-        for m in recent
-        if hasattr(m, "content")
+def _qa_inputs(state: AgentState) -> dict:
+    """
+    Prompt inputs with as much recent history (plus the rolling summary) as
+    fits in MEMORY["prompt_tokens"]["general_qa"].
+    """
+    user_message = _get_user_message(state)
+    messages     = list(state.get("messages", []))
+    # The question itself is the prompt's last line — don't repeat it
+    if messages and isinstance(messages[-1], HumanMessage) and messages[-1].content == user_message:
+        messages = messages[:-1]
+    return fit_prompt(
+        GENERAL_QA_TEMPLATE,
+        {"user_message": user_message},
+        budget=MEMORY["prompt_tokens"]["general_qa"],
+        history_key="chat_history",
+        entries=message_entries(messages),
+        summary=state.get("conversation_summary", ""),
     )
 
 
+# ── Result builders (shared by sync + async nodes) ─────────────────────────
+
+def _qa_success(output: str) -> dict:
+    return {
+        "agent_output": output,
+        "graph_trace":  [NODE_GENERAL_QA],
+        "messages":     [AIMessage(content=output)],
+        "error":        None,
+    }
+
+
+def _qa_failure(exc: Exception) -> dict:
+    error_msg = f"QA error: {exc}"
+    print(f"[general_qa] {error_msg}")
+    return {
+        "agent_output": f"❌ {error_msg}",
+        "graph_trace":  [NODE_GENERAL_QA],
+        "messages":     [AIMessage(content=error_msg)],
+        "error":        error_msg,
+    }
+
+
+_CLARIFIER_FALLBACK = (
+    "I'm not sure what you need help with. Could you clarify? "
+    "I can help with resumes, job search, interview prep, "
+    "mock interviews, tutorials, or salary negotiation."
+)
+
+
+def _clarifier_result(question: str) -> dict:
+    return {
+        "agent_output":           question,
+        "needs_clarification":    True,
+        "clarification_question": question,
+        "graph_trace":            [NODE_CLARIFIER],
+        "messages":               [AIMessage(content=question)],
+        "error":                  None,
+    }
+
+
 # ── Node functions ─────────────────────────────────────────────────────────
 
 @guarded_node("general_qa", output_validator="any")
 def general_qa_node(state: AgentState) -> dict:
     """
     Friendly general-purpose career Q&A fallback.
-    Includes recent conversation context for natural continuity.
+    Includes recent conversation context (and the rolling summary of older
+    turns) for natural continuity, within the node's prompt budget.
     """
-    user_message = _get_user_message(state)
-    chat_history = _build_chat_history(state)
+    inputs = _qa_inputs(state)
+
+    try:
+        chain  = get_chain("general_qa", _qa_prompt)
+        result = chain.invoke(inputs)
+        return _qa_success(result.get("text", "").strip())
+
+    except Exception as exc:
+        return _qa_failure(exc)
+
+
+@guarded_node("general_qa", output_validator="any")
+async def ageneral_qa_node(state: AgentState) -> dict:
+    """Async variant of `general_qa_node` for `graph.ainvoke`."""
+    inputs = _qa_inputs(state)
 
     try:
-        llm   = get_llm("general_qa")
-        chain = LLMChain(llm=llm, prompt=_qa_prompt)
-        result = chain.invoke({
-            "chat_history": chat_history,
-            "user_message": user_message,
-        })
-        output = result.get("text", "").strip()
-
-        return {
-            "agent_output": output,
-            "graph_trace":  [NODE_GENERAL_QA],
-            "messages":     [AIMessage(content=output)],
-            "error":        None,
-        }
+        chain  = get_chain("general_qa", _qa_prompt)
+        result = await chain.ainvoke(inputs)
+        return _qa_success(result.get("text", "").strip())
 
     except Exception as exc:
-        error_msg = f"QA error: {exc}"
-        print(f"[general_qa] {error_msg}")
-        return {
-            "agent_output": f"❌ {error_msg}",
-            "graph_trace":  [NODE_GENERAL_QA],
-            "messages":     [AIMessage(content=error_msg)],
-            "error":        error_msg,
-        }
+        return _qa_failure(exc)
 
 
 @guarded_node("clarifier", output_validator="any")
@@ -112,22 +158,29 @@ def clarifier_node(state: AgentState) -> dict:
         question = preset_question
     else:
         try:
-            llm   = get_llm("clarifier")
-            chain = LLMChain(llm=llm, prompt=_clarifier_prompt)
+            chain  = get_chain("clarifier", _clarifier_prompt)
             result = chain.invoke({"user_message": user_message})
             question = result.get("text", "").strip()
         except Exception:
-            question = (
-                "I'm not sure what you need help with. Could you clarify? "
-                "I can help with resumes, job search, interview prep, "
-                "mock interviews, tutorials, or salary negotiation."
-            )
+            question = _CLARIFIER_FALLBACK
 
-    return {
-        "agent_output":           question,
-        "needs_clarification":    True,
-        "clarification_question": question,
-        "graph_trace":            [NODE_CLARIFIER],
-        "messages":               [AIMessage(content=question)],
-        "error":                  None,
-    }
+    return _clarifier_result(question)
+
+
+@guarded_node("clarifier", output_validator="any")
+async def aclarifier_node(state: AgentState) -> dict:
+    """Async variant of `clarifier_node` for `graph.ainvoke`."""
+    user_message     = _get_user_message(state)
+    preset_question  = state.get("clarification_question", "")
+
+    if preset_question:
+        question = preset_question
+    else:
+        try:
+            chain  = get_chain("clarifier", _clarifier_prompt)
+            result = await chain.ainvoke({"user_message": user_message})
+            question = result.get("text", "").strip()
+        except Exception:
+            question = _CLARIFIER_FALLBACK
+
+    return _clarifier_result(question)
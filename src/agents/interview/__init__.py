@@ -1,6 +1,9 @@
 """src/agents/interview/__init__.py"""
-from .prep_node import interview_prep_node
-from .mock_node import mock_interview_node
-from .eval_node import evaluation_node
+from .prep_node import interview_prep_node, ainterview_prep_node
+from .mock_node import mock_interview_node, amock_interview_node
+from .eval_node import evaluation_node, aevaluation_node
 
-__all__ = ["interview_prep_node", "mock_interview_node", "evaluation_node"]
+__all__ = [
+    "interview_prep_node", "mock_interview_node", "evaluation_node",
+    "ainterview_prep_node", "amock_interview_node", "aevaluation_node",
+]
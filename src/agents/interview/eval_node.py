@@ -6,13 +6,12 @@ Prompts in prompts.py | LLM from core.llm.
 
 from __future__ import annotations
 
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import AIMessage
 
 from src.state import AgentState
 from src.config import NODE_EVALUATION
-from src.core.llm import get_llm
+from src.core.llm import get_chain
 from src.middleware.guardrails import guarded_node
 from .prompts import EVALUATION_TEMPLATE
 
@@ -36,17 +35,8 @@ def _format_history(history: list[dict]) -> str:
     return "\n\n".join(lines)
 
 
-@guarded_node("evaluation", output_validator="markdown")
-def evaluation_node(state: AgentState) -> dict:
-    """
-    Reads:
-      interview_history                — session to evaluate
-      task_input.interview_transcript  — raw pasted transcript (optional)
-      task_input.{job_title, user_experience, user_name}
-
-    Writes:
-      agent_output                     — Markdown scorecard
-    """
+def _prepare(state: AgentState) -> tuple[dict | None, dict]:
+    """Return (no_transcript_result, {}) or (None, chain inputs)."""
     task    = state.get("task_input", {})
     profile = state.get("user_profile", {})
     history = state.get("interview_history", [])
@@ -64,33 +54,71 @@ def evaluation_node(state: AgentState) -> dict:
             "graph_trace":  [NODE_EVALUATION],
             "messages":     [AIMessage(content="No transcript to evaluate.")],
             "error":        "No transcript",
-        }
+        }, {}
+
+    return None, {
+        "job_title":       job_title or "Not specified",
+        "user_experience": user_experience or "Not specified",
+        "user_name":       user_name,
+        "history":         formatted,
+    }
+
+
+def _success(output: str) -> dict:
+    return {
+        "agent_output": output,
+        "graph_trace":  [NODE_EVALUATION],
+        "messages":     [AIMessage(content=output)],
+        "error":        None,
+    }
+
+
+def _failure(exc: Exception) -> dict:
+    error_msg = f"Evaluation error: {exc}"
+    print(f"[evaluation] {error_msg}")
+    return {
+        "agent_output": f"❌ {error_msg}",
+        "graph_trace":  [NODE_EVALUATION],
+        "messages":     [AIMessage(content=error_msg)],
+        "error":        error_msg,
+    }
+
+
+@guarded_node("evaluation", output_validator="markdown")
+def evaluation_node(state: AgentState) -> dict:
+    """
+    Reads:
+      interview_history                — session to evaluate
+      task_input.interview_transcript  — raw pasted transcript (optional)
+      task_input.{job_title, user_experience, user_name}
+
+    Writes:
+      agent_output                     — Markdown scorecard
+    """
+    result, inputs = _prepare(state)
+    if result is not None:
+        return result
 
     try:
-        llm   = get_llm("evaluation")
-        chain = LLMChain(llm=llm, prompt=_prompt)
-        result = chain.invoke({
-            "job_title":       job_title or "Not specified",
-            "user_experience": user_experience or "Not specified",
-            "user_name":       user_name,
-            "history":         formatted,
-        })
+        chain  = get_chain("evaluation", _prompt)
+        output = chain.invoke(inputs)
+        return _success(output.get("text", "").strip())
 
-        output = result.get("text", "").strip()
+    except Exception as exc:
+        return _failure(exc)
 
-        return {
-            "agent_output": output,
-            "graph_trace":  [NODE_EVALUATION],
-            "messages":     [AIMessage(content=output)],
-            "error":        None,
-        }
+
+@guarded_node("evaluation", output_validator="markdown")
+async def aevaluation_node(state: AgentState) -> dict:
+    """Async variant of `evaluation_node` for `graph.ainvoke` and async endpoints."""
+    result, inputs = _prepare(state)
+    if result is not None:
+        return result
+
+    try:
+        chain  = get_chain("evaluation", _prompt)
+        output = await chain.ainvoke(inputs)
+        return _success(output.get("text", "").strip())
 
     except Exception as exc:
-        error_msg = f"Evaluation error: {exc}"
-        print(f"[evaluation] {error_msg}")
-        return {
-            "agent_output": f"❌ {error_msg}",
-            "graph_trace":  [NODE_EVALUATION],
-            "messages":     [AIMessage(content=error_msg)],
-            "error":        error_msg,
-        }
+        return _failure(exc)
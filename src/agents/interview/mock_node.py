@@ -8,13 +8,13 @@ from __future__ import annotations
 
 import re
 
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import AIMessage
 
 from src.state import AgentState
-from src.config import NODE_MOCK_INTERVIEW
-from src.core.llm import get_llm
+from src.config import NODE_MOCK_INTERVIEW, MEMORY
+from src.core.history import fit_prompt
+from src.core.llm import get_chain
 from src.middleware.guardrails import guarded_node
 from .prompts import MOCK_TEMPLATE
 
@@ -27,17 +27,13 @@ _prompt = PromptTemplate(
 
 # ── Helpers ────────────────────────────────────────────────────────────────
 
-def _format_history(history: list[dict]) -> str:
-    """Convert interview history list to readable string for prompt."""
-    lines = []
-    for msg in history:
-        role    = msg.get("role", "")
-        content = msg.get("content", "")
-        if role == "system":
-            continue
-        label = "Candidate" if role == "user" else "Interviewer"
-        lines.append(f"{label}: {content}")
-    return "\n\n".join(lines)
+def _history_entries(history: list[dict]) -> list[tuple[str, str]]:
+    """(speaker, text) pairs of the interview history, system turns skipped."""
+    return [
+        ("Candidate" if msg.get("role", "") == "user" else "Interviewer", msg.get("content", ""))
+        for msg in history
+        if msg.get("role", "") != "system"
+    ]
 
 
 def _enforce_single_question(text: str) -> str:
@@ -71,19 +67,8 @@ def _enforce_single_question(text: str) -> str:
     return text.strip()
 
 
-# ── Node function ──────────────────────────────────────────────────────────
-
-@guarded_node("mock_interview", output_validator="any")
-def mock_interview_node(state: AgentState) -> dict:
-    """
-    Reads:
-      interview_history           — full conversation so far
-      task_input.{job_title, user_experience, user_name, user_message}
-
-    Writes:
-      agent_output                — interviewer's next turn
-      interview_history           — updated with new interviewer message
-    """
+def _prepare(state: AgentState) -> tuple[dict | None, dict, list[dict]]:
+    """Return (clarification_result, {}, []) or (None, chain inputs, history)."""
     task    = state.get("task_input", {})
     profile = state.get("user_profile", {})
     history = list(state.get("interview_history", []))
@@ -103,35 +88,90 @@ def mock_interview_node(state: AgentState) -> dict:
             "clarification_question": "What job title is this mock interview for?",
             "current_agent": "clarifier",
             "graph_trace":  [NODE_MOCK_INTERVIEW],
-        }
+        }, {}, []
 
-    try:
-        llm   = get_llm("mock_interview")
-        chain = LLMChain(llm=llm, prompt=_prompt)
-        result = chain.invoke({
+    # Newest turns (plus the rolling summary) within the node's prompt budget,
+    # so prompt size stays flat however long the interview runs
+    return None, fit_prompt(
+        MOCK_TEMPLATE,
+        {
             "job_title":       job_title,
             "user_experience": user_experience or "Not specified",
             "user_name":       user_name,
-            "history":         _format_history(history),
-        })
+        },
+        budget=MEMORY["prompt_tokens"]["mock_interview"],
+        history_key="history",
+        entries=_history_entries(history),
+        summary=state.get("conversation_summary", ""),
+        sep="\n\n",
+    ), history
 
-        ai_reply        = _enforce_single_question(result.get("text", "").strip())
-        updated_history = history + [{"role": "assistant", "content": ai_reply}]
 
-        return {
-            "agent_output":      ai_reply,
-            "interview_history": updated_history,
-            "graph_trace":       [NODE_MOCK_INTERVIEW],
-            "messages":          [AIMessage(content=ai_reply)],
-            "error":             None,
-        }
+def _success(raw_text: str, history: list[dict]) -> dict:
+    ai_reply        = _enforce_single_question(raw_text.strip())
+    updated_history = history + [{"role": "assistant", "content": ai_reply}]
+
+    return {
+        "agent_output":      ai_reply,
+        "interview_history": updated_history,
+        "graph_trace":       [NODE_MOCK_INTERVIEW],
+        "messages":          [AIMessage(content=ai_reply)],
+        "error":             None,
+    }
+
+
+def _failure(exc: Exception) -> dict:
+    error_msg = f"Mock interview error: {exc}"
+    print(f"[mock_interview] {error_msg}")
+    return {
+        "agent_output": f"❌ {error_msg}",
+        "graph_trace":  [NODE_MOCK_INTERVIEW],
+        "messages":     [AIMessage(content=error_msg)],
+        "error":        error_msg,
+    }
+
+
+# ── Node functions ─────────────────────────────────────────────────────────
+
+@guarded_node("mock_interview", output_validator="any")
+def mock_interview_node(state: AgentState) -> dict:
+    """
+    Reads:
+      interview_history           — full conversation so far (the prompt
+                                    gets the newest turns that fit its budget;
+                                    the stored transcript is kept whole, see
+                                    src/graph/memory.py)
+      conversation_summary        — rolling summary of older turns
+      task_input.{job_title, user_experience, user_name, user_message}
+
+    Writes:
+      agent_output                — interviewer's next turn
+      interview_history           — updated with new interviewer message
+    """
+    result, inputs, history = _prepare(state)
+    if result is not None:
+        return result
+
+    try:
+        chain  = get_chain("mock_interview", _prompt)
+        output = chain.invoke(inputs)
+        return _success(output.get("text", ""), history)
 
     except Exception as exc:
-        error_msg = f"Mock interview error: {exc}"
-        print(f"[mock_interview] {error_msg}")
-        return {
-            "agent_output": f"❌ {error_msg}",
-            "graph_trace":  [NODE_MOCK_INTERVIEW],
-            "messages":     [AIMessage(content=error_msg)],
-            "error":        error_msg,
-        }
+        return _failure(exc)
+
+
+@guarded_node("mock_interview", output_validator="any")
+async def amock_interview_node(state: AgentState) -> dict:
+    """Async variant of `mock_interview_node` for `graph.ainvoke`."""
+    result, inputs, history = _prepare(state)
+    if result is not None:
+        return result
+
+    try:
+        chain  = get_chain("mock_interview", _prompt)
+        output = await chain.ainvoke(inputs)
+        return _success(output.get("text", ""), history)
+
+    except Exception as exc:
+        return _failure(exc)
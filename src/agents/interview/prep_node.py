@@ -6,13 +6,15 @@ Prompts in prompts.py | LLM from core.llm | Search from core.search.
 
 from __future__ import annotations
 
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import AIMessage
 
 from src.state import AgentState
 from src.config import NODE_INTERVIEW_PREP
 from src.core.llm import get_llm
-from src.core.search import get_search_tool
+from src.core.fanout import afan_out, fan_out
+from src.core.metrics import registry
+from src.core.search_results import SearchHit, render_hits
 from src.middleware.guardrails import guarded_node
 from .prompts import PREP_TEMPLATE
 
@@ -23,12 +25,10 @@ _prompt = PromptTemplate(
 )
 
 
-@guarded_node("interview_prep", output_validator="markdown")
-def interview_prep_node(state: AgentState) -> dict:
-    """
-    Reads: task_input.{job_title, user_experience, user_name, user_request}
-    Writes: agent_output — structured Markdown prep guide
-    """
+# ── Helpers (shared by sync + async nodes) ────────────────────────────────
+
+def _prepare(state: AgentState) -> tuple[dict | None, dict]:
+    """Return (clarification_result, {}) or (None, prompt fields)."""
     task    = state.get("task_input", {})
     profile = state.get("user_profile", {})
 
@@ -43,38 +43,99 @@ def interview_prep_node(state: AgentState) -> dict:
             "clarification_question": "What job title are you interviewing for?",
             "current_agent": "clarifier",
             "graph_trace":  [NODE_INTERVIEW_PREP],
-        }
+        }, {}
+
+    return None, {
+        "search_query":    f"{job_title} interview questions trends 2026",
+        "job_title":       job_title,
+        "user_name":       user_name,
+        "user_experience": user_experience or "Not specified",
+        "user_request":    user_request or f"Comprehensive interview prep for {job_title}",
+    }
+
+
+def _queries(fields: dict) -> list[str]:
+    """Primary query first, then variants by source and seniority."""
+    title      = fields["job_title"]
+    experience = "" if fields["user_experience"] == "Not specified" else fields["user_experience"]
+    return [
+        fields["search_query"],
+        f"{title} interview process rounds glassdoor",
+        f"{title} {experience} technical interview questions answers",
+    ]
+
+
+def _search(queries: list[str]) -> list[SearchHit]:
+    return fan_out(queries, node=NODE_INTERVIEW_PREP).hits
+
+
+async def _asearch(queries: list[str]) -> list[SearchHit]:
+    return (await afan_out(queries, node=NODE_INTERVIEW_PREP)).hits
+
+
+def _format(fields: dict, hits: list[SearchHit]) -> str:
+    prompt_fields = {k: v for k, v in fields.items() if k != "search_query"}
+    return _prompt.format(search_results=render_hits(hits), **prompt_fields)
+
+
+def _success(output: str) -> dict:
+    return {
+        "agent_output": output,
+        "graph_trace":  [NODE_INTERVIEW_PREP],
+        "messages":     [AIMessage(content=output)],
+        "error":        None,
+    }
+
+
+def _failure(exc: Exception) -> dict:
+    error_msg = f"Interview prep error: {exc}"
+    print(f"[interview_prep] {error_msg}")
+    return {
+        "agent_output": f"❌ {error_msg}",
+        "graph_trace":  [NODE_INTERVIEW_PREP],
+        "messages":     [AIMessage(content=error_msg)],
+        "error":        error_msg,
+    }
+
+
+# ── Node functions ────────────────────────────────────────────────────────
+
+@guarded_node("interview_prep", output_validator="markdown")
+def interview_prep_node(state: AgentState) -> dict:
+    """
+    Reads: task_input.{job_title, user_experience, user_name, user_request}
+    Writes: agent_output — structured Markdown prep guide
+    """
+    result, fields = _prepare(state)
+    if result is not None:
+        return result
+
+    hits = _search(_queries(fields))
 
-    search_query = f"{job_title} interview questions trends 2026"
     try:
-        tool           = get_search_tool()
-        search_results = tool.func(search_query)
+        llm    = get_llm("interview_prep")
+        with registry.timed(f"{NODE_INTERVIEW_PREP}.llm"):
+            output = llm.invoke(_format(fields, hits))
+        return _success(output)
+
     except Exception as exc:
-        search_results = f"Search unavailable: {exc}"
+        return _failure(exc)
+
+
+@guarded_node("interview_prep", output_validator="markdown")
+async def ainterview_prep_node(state: AgentState) -> dict:
+    """Async variant of `interview_prep_node` for `graph.ainvoke`."""
+    result, fields = _prepare(state)
+    if result is not None:
+        return result
+
+    hits = await _asearch(_queries(fields))
 
     try:
         llm    = get_llm("interview_prep")
-        output = llm.invoke(_prompt.format(
-            job_title=job_title,
-            user_name=user_name,
-            user_experience=user_experience or "Not specified",
-            user_request=user_request or f"Comprehensive interview prep for {job_title}",
-            search_results=search_results,
-        ))
-
-        return {
-            "agent_output": output,
-            "graph_trace":  [NODE_INTERVIEW_PREP],
-            "messages":     [AIMessage(content=output)],
-            "error":        None,
-        }
+        with registry.timed(f"{NODE_INTERVIEW_PREP}.llm"):
+            output = await llm.ainvoke(_format(fields, hits))
+        return _success(output)
 
     except Exception as exc:
-        error_msg = f"Interview prep error: {exc}"
-        print(f"[interview_prep] {error_msg}")
-        return {
-            "agent_output": f"❌ {error_msg}",
-            "graph_trace":  [NODE_INTERVIEW_PREP],
-            "messages":     [AIMessage(content=error_msg)],
-            "error":        error_msg,
-        }
+        return _failure(exc)
@@ -1,3 +1,3 @@
 """src/agents/job_search/__init__.py"""
-from .node import job_search_node
-__all__ = ["job_search_node"]
+from .node import job_search_node, ajob_search_node
+__all__ = ["job_search_node", "ajob_search_node"]
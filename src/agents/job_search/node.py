@@ -3,19 +3,22 @@ src/agents/job_search/node.py
 ─────────────────────────────────────────────────────────────────────────────
 Job Search Node — finds live job postings and formats actionable listings.
 
-Flow: search tool → LLM formatting → structured Markdown response.
+Flow: parallel search fan-out (location / seniority / source variants)
+      → LLM formatting → structured Markdown response.
 Prompts in prompts.py | LLM from core.llm | Search from core.search.
 """
 
 from __future__ import annotations
 
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import AIMessage
 
 from src.state import AgentState
 from src.config import NODE_JOB_SEARCH
 from src.core.llm import get_llm
-from src.core.search import get_search_tool
+from src.core.fanout import afan_out, fan_out
+from src.core.metrics import registry
+from src.core.search_results import SearchHit, render_hits, select_hits
 from src.middleware.guardrails import guarded_node
 from .prompts import JOB_SEARCH_TEMPLATE
 
@@ -26,18 +29,10 @@ _prompt = PromptTemplate(
 )
 
 
-@guarded_node("job_search", output_validator="markdown")
-def job_search_node(state: AgentState) -> dict:
-    """
-    Reads:
-      task_input.job_title      — role to search for
-      task_input.location       — city / remote / any
-      task_input.job_type       — Full-time, Part-time, Remote, etc.
-      task_input.user_context   — skills / requirements
+# ── Helpers (shared by sync + async nodes) ────────────────────────────────
 
-    Writes:
-      agent_output              — formatted Markdown job listings
-    """
+def _prepare(state: AgentState) -> tuple[dict | None, dict]:
+    """Return (clarification_result, {}) or (None, prompt fields)."""
     task    = state.get("task_input", {})
     profile = state.get("user_profile", {})
 
@@ -52,41 +47,115 @@ def job_search_node(state: AgentState) -> dict:
             "clarification_question": "What job title are you looking for, and in which location?",
             "current_agent": "clarifier",
             "graph_trace":  [NODE_JOB_SEARCH],
-        }
+        }, {}
+
+    return None, {
+        "query":        f"{job_title} jobs {location} {job_type} 2026",
+        "job_title":    job_title,
+        "location":     location or "Remote / Any",
+        "job_type":     job_type,
+        "user_context": user_context or "Not specified",
+        # Chat turns carry the whole message as `job_title`; only score hits
+        # against a title the client actually sent
+        "relevance_terms": task.get("job_title", ""),
+    }
+
+
+def _queries(fields: dict) -> list[str]:
+    """Primary query first, then variants by source, location and seniority."""
+    title, location = fields["job_title"], fields["location"]
+    place = "remote" if location == "Remote / Any" else location
+    return [
+        fields["query"],
+        f"{title} openings {place} linkedin indeed glassdoor",
+        f"{title} hiring now {place} careers page",
+        f"senior OR junior {title} {fields['job_type']} {place}",
+    ]
+
+
+def _search(queries: list[str]) -> list[SearchHit]:
+    return fan_out(queries, node=NODE_JOB_SEARCH).hits
+
+
+async def _asearch(queries: list[str]) -> list[SearchHit]:
+    return (await afan_out(queries, node=NODE_JOB_SEARCH)).hits
+
+
+def _format(fields: dict, hits: list[SearchHit]) -> str:
+    # Off-title and duplicate postings are dropped before they cost input tokens
+    prompt_fields = {k: v for k, v in fields.items() if k != "relevance_terms"}
+    relevant = select_hits(hits, terms=fields["relevance_terms"])
+    return _prompt.format(search_results=render_hits(relevant), **prompt_fields)
+
+
+def _success(output: str) -> dict:
+    return {
+        "agent_output": output,
+        "graph_trace":  [NODE_JOB_SEARCH],
+        "messages":     [AIMessage(content=output)],
+        "error":        None,
+    }
+
+
+def _failure(exc: Exception) -> dict:
+    error_msg = f"Job search error: {exc}"
+    print(f"[job_search] {error_msg}")
+    return {
+        "agent_output": f"❌ {error_msg}",
+        "graph_trace":  [NODE_JOB_SEARCH],
+        "messages":     [AIMessage(content=error_msg)],
+        "error":        error_msg,
+    }
+
+
+# ── Node functions ────────────────────────────────────────────────────────
+
+@guarded_node("job_search", output_validator="markdown")
+def job_search_node(state: AgentState) -> dict:
+    """
+    Reads:
+      task_input.job_title      — role to search for
+      task_input.location       — city / remote / any
+      task_input.job_type       — Full-time, Part-time, Remote, etc.
+      task_input.user_context   — skills / requirements
+
+    Writes:
+      agent_output              — formatted Markdown job listings
+    """
+    result, fields = _prepare(state)
+    if result is not None:
+        return result
 
-    # ── Live search ───────────────────────────────────────────────────────
-    search_query = f"{job_title} jobs {location} {job_type} 2026"
     try:
-        tool           = get_search_tool()
-        search_results = tool.func(search_query)
+        # ── Live search ───────────────────────────────────────────────────
+        hits = _search(_queries(fields))
+
+        # ── LLM formatting ────────────────────────────────────────────────
+        llm    = get_llm("job_search")
+        with registry.timed(f"{NODE_JOB_SEARCH}.llm"):
+            output = llm.invoke(_format(fields, hits))
+        return _success(output)
+
     except Exception as exc:
-        search_results = f"Search unavailable: {exc}"
+        return _failure(exc)
+
+
+@guarded_node("job_search", output_validator="markdown")
+async def ajob_search_node(state: AgentState) -> dict:
+    """Async variant of `job_search_node` for `graph.ainvoke`."""
+    result, fields = _prepare(state)
+    if result is not None:
+        return result
 
-    # ── LLM formatting ────────────────────────────────────────────────────
     try:
-        llm    = get_llm("job_search")
-        output = llm.invoke(_prompt.format(
-            query=search_query,
-            search_results=search_results,
-            job_title=job_title,
-            location=location or "Remote / Any",
-            job_type=job_type,
-            user_context=user_context or "Not specified",
-        ))
+        # ── Live search (fan-out on the shared search pool) ───────────────
+        hits = await _asearch(_queries(fields))
 
-        return {
-            "agent_output": output,
-            "graph_trace":  [NODE_JOB_SEARCH],
-            "messages":     [AIMessage(content=output)],
-            "error":        None,
-        }
+        # ── LLM formatting ────────────────────────────────────────────────
+        llm    = get_llm("job_search")
+        with registry.timed(f"{NODE_JOB_SEARCH}.llm"):
+            output = await llm.ainvoke(_format(fields, hits))
+        return _success(output)
 
     except Exception as exc:
-        error_msg = f"Job search error: {exc}"
-        print(f"[job_search] {error_msg}")
-        return {
-            "agent_output": f"❌ {error_msg}",
-            "graph_trace":  [NODE_JOB_SEARCH],
-            "messages":     [AIMessage(content=error_msg)],
-            "error":        error_msg,
-        }
+        return _failure(exc)
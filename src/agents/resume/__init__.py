@@ -1,3 +1,3 @@
 """src/agents/resume/__init__.py"""
-from .node import resume_builder_node
-__all__ = ["resume_builder_node"]
+from .node import resume_builder_node, aresume_builder_node
+__all__ = ["resume_builder_node", "aresume_builder_node"]
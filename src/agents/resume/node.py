@@ -13,13 +13,12 @@ LLM obtained from src.core.llm.
 
 from __future__ import annotations
 
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import AIMessage
 
 from src.state import AgentState
 from src.config import NODE_RESUME
-from src.core.llm import get_llm
+from src.core.llm import get_chain
 from src.middleware.guardrails import guarded_node
 from .prompts import GENERATION_TEMPLATE, REFINEMENT_TEMPLATE
 
@@ -48,7 +47,60 @@ def _strip_fences(code: str) -> str:
     return code
 
 
-# ── Node function ──────────────────────────────────────────────────────────
+def _prepare(state: AgentState) -> tuple[PromptTemplate, dict, str]:
+    """Pick generation vs refinement; return (prompt, chain inputs, message)."""
+    task    = state.get("task_input", {})
+    profile = state.get("user_profile", {})
+
+    job_description = task.get("job_description", "")
+    user_details    = task.get("user_details", "") or task.get("resume_user_details", "")
+    user_request    = task.get("user_request", "") or task.get("user_message", "")
+    existing_resume = task.get("previous_resume", "") or profile.get("resume_content", "")
+
+    if existing_resume:
+        # ── Refinement ─────────────────────────────────────────────────────
+        return _refine_prompt, {
+            "previous_resume": existing_resume,
+            "job_description": job_description,
+            "user_request":    user_request,
+        }, "✅ Resume updated — here's the refined LaTeX."
+
+    # ── Fresh generation ───────────────────────────────────────────────────
+    return _gen_prompt, {
+        "job_description": job_description,
+        "user_details":    user_details,
+    }, "✅ Resume generated — copy the LaTeX into Overleaf to compile your PDF."
+
+
+def _success(state: AgentState, raw_text: str, message: str) -> dict:
+    task       = state.get("task_input", {})
+    profile    = state.get("user_profile", {})
+    latex_code = _strip_fences(raw_text.strip())
+
+    updated_profile = {**profile, "resume_content": latex_code}
+
+    return {
+        "agent_output": f"{message}\n\n```latex\n{latex_code}\n```",
+        "user_profile": updated_profile,
+        "graph_trace":  [NODE_RESUME],
+        "messages":     [AIMessage(content=message)],
+        "error":        None,
+        "task_input":   {**task, "generated_resume": latex_code},
+    }
+
+
+def _failure(exc: Exception) -> dict:
+    error_msg = f"Resume builder error: {exc}"
+    print(f"[resume_builder] {error_msg}")
+    return {
+        "agent_output": f"❌ {error_msg}",
+        "graph_trace":  [NODE_RESUME],
+        "messages":     [AIMessage(content=error_msg)],
+        "error":        error_msg,
+    }
+
+
+# ── Node functions ─────────────────────────────────────────────────────────
 
 @guarded_node("resume_builder", output_validator="latex")
 def resume_builder_node(state: AgentState) -> dict:
@@ -64,54 +116,26 @@ def resume_builder_node(state: AgentState) -> dict:
       user_profile.resume_content   — saved for future refinement turns
       task_input.generated_resume   — raw LaTeX for API callers
     """
-    task    = state.get("task_input", {})
-    profile = state.get("user_profile", {})
+    prompt, inputs, message = _prepare(state)
 
-    job_description = task.get("job_description", "")
-    user_details    = task.get("user_details", "") or task.get("resume_user_details", "")
-    user_request    = task.get("user_request", "") or task.get("user_message", "")
-    existing_resume = task.get("previous_resume", "") or profile.get("resume_content", "")
+    try:
+        chain  = get_chain("resume_builder", prompt)
+        result = chain.invoke(inputs)
+        return _success(state, result.get("text", ""), message)
 
-    llm = get_llm("resume_builder")
+    except Exception as exc:
+        return _failure(exc)
+
+
+@guarded_node("resume_builder", output_validator="latex")
+async def aresume_builder_node(state: AgentState) -> dict:
+    """Async variant of `resume_builder_node` for `graph.ainvoke`."""
+    prompt, inputs, message = _prepare(state)
 
     try:
-        if existing_resume:
-            # ── Refinement ─────────────────────────────────────────────────
-            chain  = LLMChain(llm=llm, prompt=_refine_prompt)
-            result = chain.invoke({
-                "previous_resume": existing_resume,
-                "job_description": job_description,
-                "user_request":    user_request,
-            })
-            latex_code = _strip_fences(result.get("text", "").strip())
-            message    = "✅ Resume updated — here's the refined LaTeX."
-        else:
-            # ── Fresh generation ───────────────────────────────────────────
-            chain  = LLMChain(llm=llm, prompt=_gen_prompt)
-            result = chain.invoke({
-                "job_description": job_description,
-                "user_details":    user_details,
-            })
-            latex_code = _strip_fences(result.get("text", "").strip())
-            message    = "✅ Resume generated — copy the LaTeX into Overleaf to compile your PDF."
-
-        updated_profile = {**profile, "resume_content": latex_code}
-
-        return {
-            "agent_output": f"{message}\n\n```latex\n{latex_code}\n```",
-            "user_profile": updated_profile,
-            "graph_trace":  [NODE_RESUME],
-            "messages":     [AIMessage(content=message)],
-            "error":        None,
-            "task_input":   {**task, "generated_resume": latex_code},
-        }
+        chain  = get_chain("resume_builder", prompt)
+        result = await chain.ainvoke(inputs)
+        return _success(state, result.get("text", ""), message)
 
     except Exception as exc:
-        error_msg = f"Resume builder error: {exc}"
-        print(f"[resume_builder] {error_msg}")
-        return {
-            "agent_output": f"❌ {error_msg}",
-            "graph_trace":  [NODE_RESUME],
-            "messages":     [AIMessage(content=error_msg)],
-            "error":        error_msg,
-        }
+        return _failure(exc)
@@ -1,3 +1,3 @@
 """src/agents/router/__init__.py"""
-from .node import router_node
-__all__ = ["router_node"]
+from .node import router_node, arouter_node
+__all__ = ["router_node", "arouter_node"]
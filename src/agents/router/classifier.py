@@ -0,0 +1,299 @@
+"""
+src/agents/router/classifier.py
+─────────────────────────────────────────────────────────────────────────────
+Zero-LLM fast path for the router — decides the obvious cases locally.
+
+Two signals, both deterministic and sub-millisecond:
+  1. Keyword automaton — the rules from ROUTING_TEMPLATE compiled into one
+     regex with a named group per route; every hit votes for its route
+  2. Hashed n-gram logistic regression — word unigrams/bigrams and char
+     trigrams hashed into 2^14 buckets, multinomial LR weights shipped as
+     `classifier_weights.npz` next to this file
+
+When a keyword fires, the model's distribution is blended 50/50 with the
+keyword vote, so a keyword alone can never clear the threshold against a
+model that strongly disagrees. Anything below `ROUTER_FAST_PATH["threshold"]`
+falls back to the LLM router.
+
+Retrain after editing data/train.jsonl:
+    python -m src.agents.router.classifier
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.core.metrics import registry
+
+_HERE = os.path.dirname(__file__)
+WEIGHTS_PATH = os.path.join(_HERE, "classifier_weights.npz")
+TRAIN_PATH = os.path.join(_HERE, "data", "train.jsonl")
+
+# Route labels as emitted by the LLM router (keys of node._ROUTE_MAP)
+ROUTES = (
+    "resume_builder", "job_search", "interview_prep", "mock_interview",
+    "tutorials", "salary_negotiator", "general_qa",
+)
+
+
+# ── Keyword automaton ─────────────────────────────────────────────────────────
+
+_KEYWORD_RULES: Dict[str, str] = {
+    "resume_builder":    r"resumes?|résumé|cvs?|curriculum vitae|portfolio",
+    "job_search":        r"jobs?|internships?|hiring|apply|applying|openings?|vacanc(?:y|ies)|job listings?",
+    "mock_interview":    r"mock|practice interview|simulat\w*|role[- ]?play\w*|interviewer|rehears\w*",
+    "interview_prep":    r"interview tips|prepare|preparation|prep|common questions|interview questions",
+    "tutorials":         r"tutorials?|learn\w*|how do i|guide|explain|teach",
+    "salary_negotiator": r"salary|salaries|negotiat\w*|offers?|counter-?offers?|compensation|raise|pay",
+    "general_qa":        r"hi|hello|hey|thanks|thank you|good (?:morning|evening|night)|bye",
+}
+
+# One pass over the message; `lastgroup` names the route that matched
+_KEYWORDS = re.compile(
+    "|".join(rf"(?P<{route}>\b(?:{pattern})\b)" for route, pattern in _KEYWORD_RULES.items()),
+    re.IGNORECASE,
+)
+
+
+def keyword_route(text: str) -> Optional[str]:
+    """Route with the most keyword hits (ties → ROUTES order), or None."""
+    votes: Dict[str, int] = {}
+    for m in _KEYWORDS.finditer(text):
+        votes[m.lastgroup] = votes.get(m.lastgroup, 0) + 1
+    if not votes:
+        return None
+    return max(votes, key=lambda r: (votes[r], -ROUTES.index(r)))
+
+
+# ── Hashed n-gram logistic regression ─────────────────────────────────────────
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+
+def _features(text: str) -> List[str]:
+    tokens = _TOKEN.findall(text.lower())
+    feats = [f"w:{t}" for t in tokens]
+    feats += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for t in tokens:
+        padded = f"<{t}>"
+        feats += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return feats
+
+
+class HashedNgramClassifier:
+    """Multinomial logistic regression over hashed sparse n-gram features."""
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, labels: Iterable[str]):
+        self.weights = weights.astype(np.float32)      # (n_features, n_labels)
+        self.bias = bias.astype(np.float32)            # (n_labels,)
+        self.labels = list(labels)
+        self.n_features = weights.shape[0]
+
+    def _indices(self, text: str) -> np.ndarray:
+        mask = self.n_features - 1
+        return np.fromiter(
+            (zlib.crc32(f.encode("utf-8")) & mask for f in _features(text)), dtype=np.int64
+        )
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        idx = self._indices(text)
+        logits = self.bias.copy()
+        if idx.size:
+            logits += self.weights[idx].sum(axis=0) / math.sqrt(idx.size)
+        logits -= logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    # ── Persistence / training ────────────────────────────────────────────
+
+    @classmethod
+    def load(cls, path: str = WEIGHTS_PATH) -> "HashedNgramClassifier":
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], [str(l) for l in data["labels"]])
+
+    def save(self, path: str = WEIGHTS_PATH) -> None:
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+            labels=np.array(self.labels),
+        )
+
+    @classmethod
+    def fit(
+        cls,
+        texts: List[str],
+        labels: List[str],
+        n_features: int = 1 << 14,
+        epochs: int = 1000,
+        lr: float = 4.0,
+        l2: float = 1e-4,
+    ) -> "HashedNgramClassifier":
+        """Full-batch gradient descent on softmax cross-entropy."""
+        model = cls(np.zeros((n_features, len(ROUTES))), np.zeros(len(ROUTES)), ROUTES)
+        X = np.zeros((len(texts), n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            idx = model._indices(text)
+            if idx.size:
+                np.add.at(X[row], idx, 1.0 / math.sqrt(idx.size))
+        Y = np.zeros((len(texts), len(ROUTES)), dtype=np.float32)
+        Y[np.arange(len(texts)), [ROUTES.index(l) for l in labels]] = 1.0
+
+        W, b = model.weights, model.bias
+        for _ in range(epochs):
+            logits = X @ W + b
+            logits -= logits.max(axis=1, keepdims=True)
+            P = np.exp(logits)
+            P /= P.sum(axis=1, keepdims=True)
+            grad = (P - Y) / len(texts)
+            W -= lr * (X.T @ grad + l2 * W)
+            b -= lr * grad.sum(axis=0)
+        return model
+
+
+# ── Fast-path decision + stats ────────────────────────────────────────────────
+
+@dataclass
+class RouteDecision:
+    route: str                    # best guess (one of ROUTES)
+    confidence: float             # blended probability of `route`
+    fast_path: bool               # True → skip the LLM
+    keyword: Optional[str] = None
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+class _FastPathStats:
+    """Thread-safe counters for the fast-path stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.decisions = 0
+            self.fast_path = 0
+            self.total_ms = 0.0
+            self.routes: Dict[str, List[float]] = {}   # route → [fast_path, count, confidence_sum]
+
+    def record(self, decision: RouteDecision, elapsed_ms: float):
+        with self._lock:
+            self.decisions += 1
+            self.total_ms += elapsed_ms
+            entry = self.routes.setdefault(decision.route, [0, 0, 0.0])
+            entry[1] += 1
+            entry[2] += decision.confidence
+            if decision.fast_path:
+                self.fast_path += 1
+                entry[0] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self.decisions
+            return {
+                "decisions": n,
+                "fast_path_hits": self.fast_path,
+                "llm_fallbacks": n - self.fast_path,
+                "hit_rate": round(self.fast_path / n, 4) if n else 0,
+                "avg_classify_ms": round(self.total_ms / n, 3) if n else 0,
+                "routes": {
+                    route: {
+                        "fast_path": int(fast),
+                        "decisions": int(count),
+                        "avg_confidence": round(conf / count, 4),
+                    }
+                    for route, (fast, count, conf) in sorted(self.routes.items())
+                },
+            }
+
+
+stats = _FastPathStats()
+
+_model: Optional[HashedNgramClassifier] = None
+_model_lock = threading.Lock()
+
+
+def get_classifier() -> Optional[HashedNgramClassifier]:
+    """Load the shipped weights once; None if the file is missing or corrupt."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                try:
+                    _model = HashedNgramClassifier.load()
+                except (OSError, KeyError, ValueError) as exc:
+                    print(f"[router] fast-path classifier unavailable: {exc}")
+                    return None
+    return _model
+
+
+def classify(text: str, threshold: Optional[float] = None) -> Optional[RouteDecision]:
+    """
+    Score `text` locally. Returns None when the fast path is disabled or the
+    model is unavailable; otherwise a decision whose `fast_path` flag says
+    whether it cleared the confidence threshold.
+    """
+    from src.config import ROUTER_FAST_PATH
+
+    if not ROUTER_FAST_PATH["enabled"]:
+        return None
+    model = get_classifier()
+    if model is None:
+        return None
+    if threshold is None:
+        threshold = ROUTER_FAST_PATH["threshold"]
+
+    t0 = time.perf_counter()
+    probs = model.predict_proba(text)
+    keyword = keyword_route(text)
+    if keyword is not None:
+        onehot = np.zeros_like(probs)
+        onehot[model.labels.index(keyword)] = 1.0
+        probs = 0.5 * probs + 0.5 * onehot
+
+    best = int(probs.argmax())
+    decision = RouteDecision(
+        route=model.labels[best],
+        confidence=float(probs[best]),
+        fast_path=float(probs[best]) >= threshold,
+        keyword=keyword,
+        scores={label: round(float(p), 4) for label, p in zip(model.labels, probs)},
+    )
+    stats.record(decision, (time.perf_counter() - t0) * 1000)
+    return decision
+
+
+registry.register_collector("router_fast_path", stats.to_dict, counters=("decisions", "fast_path_hits", "llm_fallbacks"))
+
+
+# ── Training entry point ──────────────────────────────────────────────────────
+
+def _load_jsonl(path: str) -> tuple[List[str], List[str]]:
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                texts.append(row["text"])
+                labels.append(row["label"])
+    return texts, labels
+
+
+if __name__ == "__main__":
+    texts, labels = _load_jsonl(TRAIN_PATH)
+    model = HashedNgramClassifier.fit(texts, labels)
+    model.save()
+    train_acc = np.mean([
+        model.labels[int(model.predict_proba(t).argmax())] == l for t, l in zip(texts, labels)
+    ])
+    print(f"trained on {len(texts)} examples — train accuracy {train_acc:.3f} → {WEIGHTS_PATH}")
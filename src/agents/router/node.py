@@ -6,22 +6,27 @@ Router Node — classifies user intent and sets `current_agent` in state.
 Imports prompts from prompts.py.
 Imports LLM from src.core.llm.
 Contains only routing logic — zero prompt strings, zero HTTP code.
+
+Confidently-classified messages are routed by the local fast-path
+classifier (classifier.py); only the rest pay for an LLM round-trip, with
+a prompt capped at MEMORY["prompt_tokens"]["router"].
 """
 
 from __future__ import annotations
 
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage
 
 from src.state import AgentState
 from src.config import (
     NODE_RESUME, NODE_JOB_SEARCH, NODE_INTERVIEW_PREP,
     NODE_MOCK_INTERVIEW, NODE_TUTORIALS, NODE_GENERAL_QA,
-    NODE_CLARIFIER, NODE_SALARY,
+    NODE_CLARIFIER, NODE_SALARY, MEMORY,
 )
-from src.core.llm import get_llm
+from src.core.llm import get_chain
+from src.core.history import fit_prompt, message_entries
 from src.middleware.guardrails import guarded_node
+from .classifier import classify
 from .prompts import ROUTING_TEMPLATE
 
 
@@ -44,16 +49,15 @@ _routing_prompt = PromptTemplate(
 )
 
 
-# ── Node function ──────────────────────────────────────────────────────────────
+# ── Helpers (shared by sync + async nodes) ────────────────────────────────────
 
-@guarded_node("router", output_validator="any")
-def router_node(state: AgentState) -> dict:
+def _prepare(state: AgentState) -> tuple[dict | None, dict, str]:
     """
-    1. Check for `force_agent` override — skip LLM if set.
-    2. Extract the latest human message.
-    3. Run the routing prompt through a fast, zero-temperature LLM.
-    4. Map the output to a valid node name.
-    5. Return `current_agent` + graph trace.
+    Resolve everything that does not need the LLM.
+
+    Returns:
+        (result, {}, user_message)       — routing decided without the LLM
+        (None, inputs, user_message)     — `inputs` for the routing prompt
     """
     task   = state.get("task_input", {}) or {}
     forced = task.get("force_agent")
@@ -66,7 +70,7 @@ def router_node(state: AgentState) -> dict:
             "graph_trace":      ["router"],
             "needs_clarification": False,
             "task_input":       task,
-        }
+        }, {}, ""
 
     # ── Extract last human message ────────────────────────────────────────
     user_message = ""
@@ -80,25 +84,31 @@ def router_node(state: AgentState) -> dict:
             "current_agent":    NODE_GENERAL_QA,
             "graph_trace":      ["router"],
             "needs_clarification": False,
-        }
-
-    # ── Build short conversation context ──────────────────────────────────
-    recent_msgs = state.get("messages", [])[-4:]
-    recent_str  = "\n".join(
-        f"{'User' if isinstance(m, HumanMessage) else 'Assistant'}: {m.content}"
-        for m in recent_msgs
+        }, {}, ""
+
+    # ── Zero-LLM fast path ────────────────────────────────────────────────
+    decision = classify(user_message)
+    if decision is not None and decision.fast_path:
+        print(f"[router] fast-path {decision.route} ({decision.confidence:.2f})")
+        return _route(state, user_message, decision.route), {}, user_message
+
+    # ── Short conversation context, capped at the router's prompt budget ──
+    # The LaTeX resume in the profile says nothing about intent
+    profile = {k: v for k, v in (state.get("user_profile", {}) or {}).items() if k != "resume_content"}
+    inputs = fit_prompt(
+        ROUTING_TEMPLATE,
+        {"user_message": user_message, "user_profile": str(profile)},
+        budget=MEMORY["prompt_tokens"]["router"],
+        history_key="recent_conversation",
+        entries=message_entries(state.get("messages", [])[-4:]),
     )
+    return None, inputs, user_message
 
-    # ── LLM classification ────────────────────────────────────────────────
-    llm    = get_llm("router")
-    chain  = LLMChain(llm=llm, prompt=_routing_prompt)
-    result = chain.invoke({
-        "user_message":       user_message,
-        "user_profile":       str(state.get("user_profile", {})),
-        "recent_conversation": recent_str,
-    })
-
-    raw         = result.get("text", "UNCLEAR").strip().lower().replace(".", "").replace('"', "")
+
+def _route(state: AgentState, user_message: str, raw_text: str) -> dict:
+    """Map the classifier's raw output to a valid node name."""
+    task        = state.get("task_input", {}) or {}
+    raw         = raw_text.strip().lower().replace(".", "").replace('"', "")
     destination = _ROUTE_MAP.get(raw, NODE_CLARIFIER)
 
     print(f"[router] '{user_message[:60]}…' → {destination}")
@@ -112,3 +122,40 @@ def router_node(state: AgentState) -> dict:
             "user_message": user_message,
         },
     }
+
+
+# ── Node function ──────────────────────────────────────────────────────────────
+
+@guarded_node("router", output_validator="any")
+def router_node(state: AgentState) -> dict:
+    """
+    1. Check for `force_agent` override — skip LLM if set.
+    2. Extract the latest human message.
+    3. Try the local fast-path classifier — skip LLM if confident.
+    4. Otherwise run the routing prompt through a fast, zero-temperature LLM.
+    5. Map the output to a valid node name.
+    6. Return `current_agent` + graph trace.
+    """
+    result, inputs, user_message = _prepare(state)
+    if result is not None:
+        return result
+
+    # ── LLM classification ────────────────────────────────────────────────
+    chain  = get_chain("router", _routing_prompt)
+    output = chain.invoke(inputs)
+
+    return _route(state, user_message, output.get("text", "UNCLEAR"))
+
+
+@guarded_node("router", output_validator="any")
+async def arouter_node(state: AgentState) -> dict:
+    """Async variant of `router_node` for `graph.ainvoke`."""
+    result, inputs, user_message = _prepare(state)
+    if result is not None:
+        return result
+
+    # ── LLM classification ────────────────────────────────────────────────
+    chain  = get_chain("router", _routing_prompt)
+    output = await chain.ainvoke(inputs)
+
+    return _route(state, user_message, output.get("text", "UNCLEAR"))
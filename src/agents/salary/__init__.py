@@ -1,3 +1,3 @@
 """src/agents/salary/__init__.py"""
-from .node import salary_negotiator_node
-__all__ = ["salary_negotiator_node"]
+from .node import salary_negotiator_node, asalary_negotiator_node
+__all__ = ["salary_negotiator_node", "asalary_negotiator_node"]
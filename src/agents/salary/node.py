@@ -3,19 +3,22 @@ src/agents/salary/node.py
 ─────────────────────────────────────────────────────────────────────────────
 Salary Negotiator Node — provides personalised, data-driven negotiation coaching.
 
-Flow: search tool (salary benchmarks) → LLM formatting → Markdown playbook.
+Flow: parallel search fan-out (salary benchmarks by source / seniority)
+      → LLM formatting → Markdown playbook.
 Prompts in prompts.py | LLM from core.llm | Search from core.search.
 """
 
 from __future__ import annotations
 
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import AIMessage
 
 from src.state import AgentState
 from src.config import NODE_SALARY
 from src.core.llm import get_llm
-from src.core.search import get_search_tool
+from src.core.fanout import afan_out, fan_out
+from src.core.metrics import registry
+from src.core.search_results import SearchHit, render_hits, select_hits
 from src.middleware.guardrails import guarded_node
 from .prompts import SALARY_TEMPLATE
 
@@ -30,16 +33,10 @@ _prompt = PromptTemplate(
 )
 
 
-@guarded_node("salary_negotiator", output_validator="markdown")
-def salary_negotiator_node(state: AgentState) -> dict:
-    """
-    Reads:
-      task_input.{job_title, location, experience,
-                  current_offer, current_salary, skills}
+# ── Helpers (shared by sync + async nodes) ────────────────────────────────
 
-    Writes:
-      agent_output — structured Markdown negotiation playbook
-    """
+def _prepare(state: AgentState) -> tuple[dict | None, dict]:
+    """Return (clarification_result, {}) or (None, prompt fields)."""
     task    = state.get("task_input", {})
     profile = state.get("user_profile", {})
 
@@ -62,42 +59,116 @@ def salary_negotiator_node(state: AgentState) -> dict:
             ),
             "current_agent": "clarifier",
             "graph_trace":  [NODE_SALARY],
-        }
+        }, {}
+
+    return None, {
+        "search_query":   f"{job_title} salary range {location} levels.fyi glassdoor 2026",
+        "job_title":      job_title,
+        "location":       location or "Remote / Not specified",
+        "experience":     experience or "Not specified",
+        "current_offer":  current_offer,
+        "current_salary": current_salary,
+        "skills":         skills or "Not specified",
+        # Chat turns carry the whole message as `job_title`; only score hits
+        # against a title the client actually sent
+        "relevance_terms": task.get("job_title", ""),
+    }
+
+
+def _queries(fields: dict) -> list[str]:
+    """Primary benchmark query first, then variants by seniority and source."""
+    title      = fields["job_title"]
+    location   = "" if fields["location"].startswith("Remote") else fields["location"]
+    experience = "" if fields["experience"] == "Not specified" else fields["experience"]
+    return [
+        fields["search_query"],
+        (f"{title} salary {experience} years experience {location}" if experience
+         else f"{title} entry level vs senior salary {location}"),
+        f"{title} average salary {location} payscale ambitionbox indeed",
+    ]
+
+
+def _search(queries: list[str]) -> list[SearchHit]:
+    return fan_out(queries, node=NODE_SALARY).hits
+
+
+async def _asearch(queries: list[str]) -> list[SearchHit]:
+    return (await afan_out(queries, node=NODE_SALARY)).hits
+
+
+def _format(fields: dict, hits: list[SearchHit]) -> str:
+    prompt_fields = {k: v for k, v in fields.items() if k not in ("search_query", "relevance_terms")}
+    # Benchmarks for other roles and repeated aggregator pages are dropped
+    relevant = select_hits(hits, terms=fields["relevance_terms"])
+    return _prompt.format(search_results=render_hits(relevant), **prompt_fields)
+
+
+def _success(output: str) -> dict:
+    return {
+        "agent_output": output,
+        "graph_trace":  [NODE_SALARY],
+        "messages":     [AIMessage(content=output)],
+        "error":        None,
+    }
+
+
+def _failure(exc: Exception) -> dict:
+    error_msg = f"Salary negotiator error: {exc}"
+    print(f"[salary_negotiator] {error_msg}")
+    return {
+        "agent_output": f"❌ {error_msg}",
+        "graph_trace":  [NODE_SALARY],
+        "messages":     [AIMessage(content=error_msg)],
+        "error":        error_msg,
+    }
+
+
+# ── Node functions ────────────────────────────────────────────────────────
+
+@guarded_node("salary_negotiator", output_validator="markdown")
+def salary_negotiator_node(state: AgentState) -> dict:
+    """
+    Reads:
+      task_input.{job_title, location, experience,
+                  current_offer, current_salary, skills}
+
+    Writes:
+      agent_output — structured Markdown negotiation playbook
+    """
+    result, fields = _prepare(state)
+    if result is not None:
+        return result
 
-    # ── Live salary benchmarks ────────────────────────────────────────────
-    search_query = f"{job_title} salary range {location} levels.fyi glassdoor 2026"
     try:
-        tool           = get_search_tool()
-        search_results = tool.func(search_query)
+        # ── Live salary benchmarks ────────────────────────────────────────
+        hits = _search(_queries(fields))
+
+        # ── LLM formatting ────────────────────────────────────────────────
+        llm    = get_llm("salary_negotiator")
+        with registry.timed(f"{NODE_SALARY}.llm"):
+            output = llm.invoke(_format(fields, hits))
+        return _success(output)
+
     except Exception as exc:
-        search_results = f"Search unavailable: {exc}"
+        return _failure(exc)
+
+
+@guarded_node("salary_negotiator", output_validator="markdown")
+async def asalary_negotiator_node(state: AgentState) -> dict:
+    """Async variant of `salary_negotiator_node` for `graph.ainvoke`."""
+    result, fields = _prepare(state)
+    if result is not None:
+        return result
 
-    # ── LLM formatting ────────────────────────────────────────────────────
     try:
-        llm    = get_llm("salary_negotiator")
-        output = llm.invoke(_prompt.format(
-            job_title=job_title,
-            location=location or "Remote / Not specified",
-            experience=experience or "Not specified",
-            current_offer=current_offer,
-            current_salary=current_salary,
-            skills=skills or "Not specified",
-            search_results=search_results,
-        ))
+        # ── Live salary benchmarks (fan-out on the shared search pool) ────
+        hits = await _asearch(_queries(fields))
 
-        return {
-            "agent_output": output,
-            "graph_trace":  [NODE_SALARY],
-            "messages":     [AIMessage(content=output)],
-            "error":        None,
-        }
+        # ── LLM formatting ────────────────────────────────────────────────
+        llm    = get_llm("salary_negotiator")
+        with registry.timed(f"{NODE_SALARY}.llm"):
+            output = await llm.ainvoke(_format(fields, hits))
+        return _success(output)
 
     except Exception as exc:
-        error_msg = f"Salary negotiator error: {exc}"
-        print(f"[salary_negotiator] {error_msg}")
-        return {
-            "agent_output": f"❌ {error_msg}",
-            "graph_trace":  [NODE_SALARY],
-            "messages":     [AIMessage(content=error_msg)],
-            "error":        error_msg,
-        }
+        return _failure(exc)
@@ -1,3 +1,3 @@
 """src/agents/tutorials/__init__.py"""
-from .node import tutorials_node
-__all__ = ["tutorials_node"]
+from .node import tutorials_node, atutorials_node
+__all__ = ["tutorials_node", "atutorials_node"]
@@ -13,13 +13,15 @@ Prompts in prompts.py | LLM from core.llm | Search from core.search.
 
 from __future__ import annotations
 
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import AIMessage
 
 from src.state import AgentState
 from src.config import NODE_TUTORIALS
 from src.core.llm import get_llm
-from src.core.search import get_search_tool
+from src.core.fanout import afan_out, fan_out
+from src.core.metrics import registry
+from src.core.search_results import SearchHit, render_hits
 from src.middleware.guardrails import guarded_node
 from .prompts import TUTORIAL_TEMPLATE
 
@@ -30,17 +32,10 @@ _prompt = PromptTemplate(
 )
 
 
-@guarded_node("tutorials", output_validator="markdown")
-def tutorials_node(state: AgentState) -> dict:
-    """
-    Reads (ONLY these keys — no resume bleed):
-      task_input.tutorial_query    — topic to explain
-      task_input.user_context      — background level
-      task_input.background        — alias for user_context
+# ── Helpers (shared by sync + async nodes) ────────────────────────────────
 
-    Writes:
-      agent_output                 — full Markdown tutorial
-    """
+def _prepare(state: AgentState) -> tuple[dict | None, dict]:
+    """Return (clarification_result, {}) or (None, prompt fields)."""
     task = state.get("task_input", {})
 
     # ── Strict key access — no fallback to user_profile ───────────────────
@@ -60,42 +55,112 @@ def tutorials_node(state: AgentState) -> dict:
             "clarification_question": "What topic would you like a tutorial on?",
             "current_agent": "clarifier",
             "graph_trace":  [NODE_TUTORIALS],
-        }
+        }, {}
+
+    return None, {
+        "search_query": f"{topic} tutorial guide beginner 2026",
+        "topic":        topic,
+        "user_context": user_context or "Beginner",
+    }
+
+
+def _queries(fields: dict) -> list[str]:
+    """Primary query first, then documentation and project-based variants."""
+    topic = fields["topic"]
+    return [
+        fields["search_query"],
+        f"{topic} official documentation getting started",
+        f"{topic} hands-on project example step by step",
+    ]
+
+
+def _search(queries: list[str]) -> list[SearchHit]:
+    return fan_out(queries, node=NODE_TUTORIALS).hits
+
+
+async def _asearch(queries: list[str]) -> list[SearchHit]:
+    return (await afan_out(queries, node=NODE_TUTORIALS)).hits
+
+
+def _format(fields: dict, hits: list[SearchHit]) -> str:
+    return _prompt.format(
+        topic=fields["topic"],
+        user_context=fields["user_context"],
+        search_results=render_hits(hits),
+    )
+
+
+def _success(output: str) -> dict:
+    # Strip ReAct-format leakage if present
+    if "Final Answer:" in output:
+        output = output.split("Final Answer:", 1)[-1].strip()
+
+    return {
+        "agent_output": output,
+        "graph_trace":  [NODE_TUTORIALS],
+        "messages":     [AIMessage(content=output)],
+        "error":        None,
+    }
+
+
+def _failure(exc: Exception) -> dict:
+    error_msg = f"Tutorials error: {exc}"
+    print(f"[tutorials] {error_msg}")
+    return {
+        "agent_output": f"❌ {error_msg}",
+        "graph_trace":  [NODE_TUTORIALS],
+        "messages":     [AIMessage(content=error_msg)],
+        "error":        error_msg,
+    }
+
+
+# ── Node functions ────────────────────────────────────────────────────────
+
+@guarded_node("tutorials", output_validator="markdown")
+def tutorials_node(state: AgentState) -> dict:
+    """
+    Reads (ONLY these keys — no resume bleed):
+      task_input.tutorial_query    — topic to explain
+      task_input.user_context      — background level
+      task_input.background        — alias for user_context
+
+    Writes:
+      agent_output                 — full Markdown tutorial
+    """
+    result, fields = _prepare(state)
+    if result is not None:
+        return result
 
     # ── Live search for up-to-date best practices ─────────────────────────
-    search_query = f"{topic} tutorial guide beginner 2026"
-    try:
-        tool           = get_search_tool()
-        search_results = tool.func(search_query)
-    except Exception as exc:
-        search_results = f"Search unavailable: {exc}"
+    hits = _search(_queries(fields))
 
     # ── LLM generation ────────────────────────────────────────────────────
     try:
         llm    = get_llm("tutorials")
-        output = llm.invoke(_prompt.format(
-            topic=topic,
-            user_context=user_context or "Beginner",
-            search_results=search_results,
-        ))
+        with registry.timed(f"{NODE_TUTORIALS}.llm"):
+            output = llm.invoke(_format(fields, hits))
+        return _success(output)
 
-        # Strip ReAct-format leakage if present
-        if "Final Answer:" in output:
-            output = output.split("Final Answer:", 1)[-1].strip()
+    except Exception as exc:
+        return _failure(exc)
 
-        return {
-            "agent_output": output,
-            "graph_trace":  [NODE_TUTORIALS],
-            "messages":     [AIMessage(content=output)],
-            "error":        None,
-        }
+
+@guarded_node("tutorials", output_validator="markdown")
+async def atutorials_node(state: AgentState) -> dict:
+    """Async variant of `tutorials_node` for `graph.ainvoke`."""
+    result, fields = _prepare(state)
+    if result is not None:
+        return result
+
+    # ── Live search (fan-out on the shared search pool) ───────────────────
+    hits = await _asearch(_queries(fields))
+
+    # ── LLM generation ────────────────────────────────────────────────────
+    try:
+        llm    = get_llm("tutorials")
+        with registry.timed(f"{NODE_TUTORIALS}.llm"):
+            output = await llm.ainvoke(_format(fields, hits))
+        return _success(output)
 
     except Exception as exc:
-        error_msg = f"Tutorials error: {exc}"
-        print(f"[tutorials] {error_msg}")
-        return {
-            "agent_output": f"❌ {error_msg}",
-            "graph_trace":  [NODE_TUTORIALS],
-            "messages":     [AIMessage(content=error_msg)],
-            "error":        error_msg,
-        }
+        return _failure(exc)
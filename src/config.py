@@ -48,20 +48,188 @@ LLM_MODELS = {
 
     # Salary Negotiator — market research + negotiation coaching
     "salary_negotiator": _QUALITY_MODEL,
+
+    # Conversation memory — rolling summary of trimmed turns (background)
+    "summarizer": _FAST_MODEL,
 }
 
 # ─── LLM Defaults ───────────────────────────────────────────────────────────
+# `cache`: serve exact-repeat prompts from LLM_CACHE. Defaults to on only at
+# temperature 0.0; set True to opt a sampling role in (same prompt → same
+# answer is acceptable there), or False to force it off.
 LLM_DEFAULTS = {
     "router":          {"temperature": 0.0, "max_tokens": 50},
     "resume_builder":  {"temperature": 0.2, "max_tokens": 4096},
     "job_search":      {"temperature": 0.5, "max_tokens": 4096},
     "interview_prep":  {"temperature": 0.6, "max_tokens": 4096},
     "mock_interview":  {"temperature": 0.7, "max_tokens": 2048},
-    "evaluation":      {"temperature": 0.3, "max_tokens": 3000},
-    "tutorials":       {"temperature": 0.5, "max_tokens": 4096},
+    "evaluation":      {"temperature": 0.3, "max_tokens": 3000, "cache": True},
+    "tutorials":       {"temperature": 0.5, "max_tokens": 4096, "cache": True},
     "general_qa":         {"temperature": 0.7, "max_tokens": 2048},
     "clarifier":          {"temperature": 0.3, "max_tokens": 256},
     "salary_negotiator":  {"temperature": 0.4, "max_tokens": 4096},
+    "summarizer":         {"temperature": 0.2, "max_tokens": 400},
+}
+
+# ─── HTTP Transport ──────────────────────────────────────────────────────────
+# Shared keep-alive connection pool used for every outbound API call.
+# `max_connections` is per host; `keepalive_expiry` (seconds) closes sockets
+# that sat idle longer than the provider's keep-alive window.
+HTTP_POOL = {
+    "max_connections":  int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "32")),
+    "max_hosts":        int(os.getenv("HTTP_POOL_MAX_HOSTS", "8")),
+    "keepalive_expiry": float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "60")),
+    "pool_timeout":     float(os.getenv("HTTP_POOL_TIMEOUT", "30")),
+}
+
+# ─── LLM Rate Limiting ───────────────────────────────────────────────────────
+# One adaptive token bucket per model, shared by every thread and coroutine
+# in the process (src/core/ratelimit.py). Calls start at `rps` with up to
+# `burst` sent at once; each success adds `increase` req/s up to `max_rps`,
+# each 429 multiplies the rate by `decrease` (at most once per
+# `decrease_cooldown_s`) down to `min_rps` and pauses the queue for the
+# provider's Retry-After, or an exponential backoff from `backoff_base_s`
+# capped at `backoff_cap_s`, spread by ±`jitter`. Callers that would queue
+# longer than `max_wait_s` get the "Rate limit exceeded" reply instead.
+RATE_LIMIT = {
+    "enabled":             os.getenv("RATE_LIMIT_ENABLED", "1") not in ("0", "false", "False"),
+    "rps":                 float(os.getenv("RATE_LIMIT_RPS", "10")),
+    "burst":               int(os.getenv("RATE_LIMIT_BURST", "20")),
+    "min_rps":             float(os.getenv("RATE_LIMIT_MIN_RPS", "0.2")),
+    "max_rps":             float(os.getenv("RATE_LIMIT_MAX_RPS", "60")),
+    "increase":            float(os.getenv("RATE_LIMIT_INCREASE", "0.5")),
+    "decrease":            float(os.getenv("RATE_LIMIT_DECREASE", "0.5")),
+    "decrease_cooldown_s": float(os.getenv("RATE_LIMIT_DECREASE_COOLDOWN_S", "1.0")),
+    "max_wait_s":          float(os.getenv("RATE_LIMIT_MAX_WAIT_S", "30")),
+    "backoff_base_s":      float(os.getenv("RATE_LIMIT_BACKOFF_BASE_S", "1.0")),
+    "backoff_cap_s":       float(os.getenv("RATE_LIMIT_BACKOFF_CAP_S", "20")),
+    "jitter":              float(os.getenv("RATE_LIMIT_JITTER", "0.25")),
+}
+
+# ─── Request Coalescing ──────────────────────────────────────────────────────
+# Concurrent identical calls share one upstream request (src/core/singleflight.py):
+# LLM completions with the same (model, messages, temperature, max_tokens,
+# stop), and search queries that normalise to the same cache key.
+COALESCE = {
+    "llm":    os.getenv("COALESCE_LLM", "1") not in ("0", "false", "False"),
+    "search": os.getenv("COALESCE_SEARCH", "1") not in ("0", "false", "False"),
+}
+
+# ─── LLM Response Cache ─────────────────────────────────────────────────────
+# On-disk cache of completions keyed on (model, messages, temperature,
+# max_tokens, stop). Entries expire after `ttl_s`; least-recently-used rows
+# are evicted once the stored text exceeds `max_mb`.
+LLM_CACHE = {
+    "enabled": os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False"),
+    "path":    os.getenv("LLM_CACHE_PATH", os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "data", "llm_cache.db"
+    )),
+    "ttl_s":   float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600))),
+    "max_mb":  float(os.getenv("LLM_CACHE_MAX_MB", "256")),
+}
+
+# ─── Router Fast Path ────────────────────────────────────────────────────────
+# Local keyword + n-gram classifier in front of the LLM router. Messages it
+# scores at or above `threshold` are routed without a Together round-trip.
+ROUTER_FAST_PATH = {
+    "enabled":   os.getenv("ROUTER_FAST_PATH_ENABLED", "1") not in ("0", "false", "False"),
+    "threshold": float(os.getenv("ROUTER_FAST_PATH_THRESHOLD", "0.8")),
+}
+
+# ─── Metrics ─────────────────────────────────────────────────────────────────
+# Per-node latency percentiles come from a DDSketch: every reported quantile
+# is within `relative_accuracy` of the true value. Sliding windows (1m/5m/1h)
+# are kept as a ring of `window_slot_s`-second slots.
+# `histogram_buckets_ms` are the `le` bounds of the OpenMetrics histogram.
+# Set `multiproc_dir` when running several uvicorn workers: each worker then
+# writes its metrics to a segment file there every `flush_interval_s` and
+# /metrics + /api/metrics merge all segments (wipe the dir on deploy).
+METRICS = {
+    "relative_accuracy": float(os.getenv("METRICS_RELATIVE_ACCURACY", "0.01")),
+    "window_slot_s":     float(os.getenv("METRICS_WINDOW_SLOT_S", "10")),
+    "histogram_buckets_ms": tuple(
+        float(b) for b in os.getenv(
+            "METRICS_HISTOGRAM_BUCKETS_MS",
+            "5,10,25,50,100,250,500,1000,2500,5000,10000,30000,60000",
+        ).split(",")
+    ),
+    "multiproc_dir":     os.getenv("METRICS_MULTIPROC_DIR", ""),
+    "flush_interval_s":  float(os.getenv("METRICS_FLUSH_INTERVAL_S", "1")),
+}
+
+# ─── Search Result Rendering ─────────────────────────────────────────────────
+# Search hits are rendered into prompts under a budget of `prompt_tokens`.
+# Nodes that rank hits keep at most `max_hits`, dropping those that match
+# less than `min_relevance` of the key terms (e.g. the job title words)
+# that the best hit matches — relative, so a long query never drops them all.
+SEARCH_RESULTS = {
+    "prompt_tokens": int(os.getenv("SEARCH_RESULTS_PROMPT_TOKENS", "700")),
+    "max_hits":      int(os.getenv("SEARCH_RESULTS_MAX_HITS", "8")),
+    "min_relevance": float(os.getenv("SEARCH_RESULTS_MIN_RELEVANCE", "0.5")),
+}
+
+# ─── Search Fan-out ──────────────────────────────────────────────────────────
+# Search-backed nodes run up to `max_variants` query variants concurrently on
+# one shared pool of `max_workers` threads. The LLM starts as soon as
+# `min_hits` unique results are in or `deadline_s` has passed, whichever
+# comes first; slower variants are abandoned.
+SEARCH_FANOUT = {
+    "max_workers":  int(os.getenv("SEARCH_FANOUT_MAX_WORKERS", "8")),
+    "max_variants": int(os.getenv("SEARCH_FANOUT_MAX_VARIANTS", "4")),
+    "deadline_s":   float(os.getenv("SEARCH_FANOUT_DEADLINE_S", "4")),
+    "min_hits":     int(os.getenv("SEARCH_FANOUT_MIN_HITS", "8")),
+}
+
+# ─── Search Backends ─────────────────────────────────────────────────────────
+# Each backend has a circuit breaker: `failure_threshold` consecutive errors
+# skip it for `cooldown_s`, a quota error (HTTP 429 / rateLimitExceeded) for
+# `quota_cooldown_s`. Google is then bypassed in favour of DuckDuckGo.
+# With `hedged` on, the next backend is also started when the current one
+# has not answered within its own recent `hedge_quantile` latency (clamped to
+# [hedge_min_delay_ms, hedge_max_delay_ms]; `hedge_delay_ms` until
+# `hedge_min_samples` calls were seen). The first result set with at least
+# `hedge_min_hits` hits wins; results arriving within `merge_window_ms` of
+# the winner are merged in (0 = no merging).
+SEARCH_BACKENDS = {
+    "failure_threshold":  int(os.getenv("SEARCH_FAILURE_THRESHOLD", "3")),
+    "cooldown_s":         float(os.getenv("SEARCH_COOLDOWN_S", "30")),
+    "quota_cooldown_s":   float(os.getenv("SEARCH_QUOTA_COOLDOWN_S", "600")),
+    "timeout_s":          float(os.getenv("SEARCH_TIMEOUT_S", "10")),
+    "num_results":        int(os.getenv("SEARCH_NUM_RESULTS", "5")),
+    "hedged":             os.getenv("SEARCH_HEDGED", "1") not in ("0", "false", "False"),
+    "hedge_delay_ms":     float(os.getenv("SEARCH_HEDGE_DELAY_MS", "800")),
+    "hedge_quantile":     float(os.getenv("SEARCH_HEDGE_QUANTILE", "0.95")),
+    "hedge_min_delay_ms": float(os.getenv("SEARCH_HEDGE_MIN_DELAY_MS", "50")),
+    "hedge_max_delay_ms": float(os.getenv("SEARCH_HEDGE_MAX_DELAY_MS", "3000")),
+    "hedge_min_samples":  int(os.getenv("SEARCH_HEDGE_MIN_SAMPLES", "20")),
+    "hedge_min_hits":     int(os.getenv("SEARCH_HEDGE_MIN_HITS", "3")),
+    "merge_window_ms":    float(os.getenv("SEARCH_MERGE_WINDOW_MS", "0")),
+    "latency_window_s":   float(os.getenv("SEARCH_LATENCY_WINDOW_S", "600")),
+    "max_workers":        int(os.getenv("SEARCH_MAX_WORKERS", "16")),
+}
+
+# ─── Search Result Cache ─────────────────────────────────────────────────────
+# On-disk cache in front of every search backend, keyed on the normalised
+# query. Results stay fresh for `freshness_s[kind]` (salary benchmarks change
+# slowly, job postings quickly), capped per backend by `backend_ttl_s`. For
+# `stale_s` after that a stale result is still served while it is refreshed
+# in the background.
+SEARCH_CACHE = {
+    "enabled": os.getenv("SEARCH_CACHE_ENABLED", "1") not in ("0", "false", "False"),
+    "path":    os.getenv("SEARCH_CACHE_PATH", os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "data", "search_cache.db"
+    )),
+    "max_mb":  float(os.getenv("SEARCH_CACHE_MAX_MB", "64")),
+    "freshness_s": {
+        "jobs":    float(os.getenv("SEARCH_CACHE_JOBS_TTL_S", str(3600))),
+        "salary":  float(os.getenv("SEARCH_CACHE_SALARY_TTL_S", str(7 * 24 * 3600))),
+        "default": float(os.getenv("SEARCH_CACHE_DEFAULT_TTL_S", str(24 * 3600))),
+    },
+    "backend_ttl_s": {
+        "google_search":     float(os.getenv("SEARCH_CACHE_GOOGLE_TTL_S", str(7 * 24 * 3600))),
+        "duckduckgo_search": float(os.getenv("SEARCH_CACHE_DUCKDUCKGO_TTL_S", str(24 * 3600))),
+    },
+    "stale_s": float(os.getenv("SEARCH_CACHE_STALE_S", str(3600))),
 }
 
 # ─── Graph Node Names ────────────────────────────────────────────────────────
@@ -76,6 +244,7 @@ NODE_TUTORIALS      = "tutorials"
 NODE_GENERAL_QA     = "general_qa"
 NODE_CLARIFIER      = "clarifier"
 NODE_SALARY         = "salary_negotiator"   # NEW
+NODE_MEMORY         = "memory"
 NODE_END            = "__end__"
 
 # ─── Valid Routes ────────────────────────────────────────────────────────────
@@ -92,11 +261,92 @@ VALID_ROUTES = [
 
 # ─── Persistence ─────────────────────────────────────────────────────────────
 # SQLite database for LangGraph checkpointing
-DB_PATH = os.path.join(
+DB_PATH = os.getenv("CHECKPOINT_DB_PATH", os.path.join(
     os.path.dirname(os.path.dirname(__file__)),
     "data",
     "checkpoints.db"
-)
+))
+
+# Checkpoint store tuning. The database runs in WAL mode with one writer
+# connection and one read-only connection per thread. Concurrent checkpoint
+# writes are group-committed: up to `batch_max` queued writes share one
+# transaction (the writer waits at most `batch_wait_ms` for more to arrive).
+# `synchronous=NORMAL` is durable across application crashes; a power loss
+# can drop the last few commits. With `compact` on, strings of at least
+# `blob_min_bytes` and every message are stored once by content hash and
+# payloads of at least `compress_min_bytes` are compressed (zstd if
+# installed, else zlib); `blob_cache_mb` bounds the decompressed-blob cache.
+CHECKPOINTER = {
+    "synchronous":        os.getenv("CHECKPOINT_SYNCHRONOUS", "NORMAL"),
+    "cache_mb":           float(os.getenv("CHECKPOINT_CACHE_MB", "16")),
+    "mmap_mb":            float(os.getenv("CHECKPOINT_MMAP_MB", "128")),
+    "busy_timeout_ms":    int(os.getenv("CHECKPOINT_BUSY_TIMEOUT_MS", "5000")),
+    "batch_max":          int(os.getenv("CHECKPOINT_BATCH_MAX", "64")),
+    "batch_wait_ms":      float(os.getenv("CHECKPOINT_BATCH_WAIT_MS", "0")),
+    "compact":            os.getenv("CHECKPOINT_COMPACT", "1") not in ("0", "false", "False"),
+    "blob_min_bytes":     int(os.getenv("CHECKPOINT_BLOB_MIN_BYTES", "1024")),
+    "compress_min_bytes": int(os.getenv("CHECKPOINT_COMPRESS_MIN_BYTES", "512")),
+    "blob_cache_mb":      float(os.getenv("CHECKPOINT_BLOB_CACHE_MB", "32")),
+}
+
+# Checkpoint retention. Every `interval_s` a background pass keeps the newest
+# `max_per_thread` checkpoints of each thread, deletes threads idle for more
+# than `max_age_s`, drops writes of removed checkpoints (`delete_batch` rows
+# per transaction) and returns up to `vacuum_pages` free pages to the disk.
+# Databases created before incremental vacuum was enabled are instead rebuilt
+# with a full VACUUM whenever a quarter of the file is free (`full_vacuum`).
+CHECKPOINT_RETENTION = {
+    "enabled":        os.getenv("CHECKPOINT_RETENTION_ENABLED", "1") not in ("0", "false", "False"),
+    "max_per_thread": int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "20")),
+    "max_age_s":      float(os.getenv("CHECKPOINT_MAX_AGE_S", str(30 * 24 * 3600))),
+    "interval_s":     float(os.getenv("CHECKPOINT_COMPACT_INTERVAL_S", "600")),
+    "delete_batch":   int(os.getenv("CHECKPOINT_DELETE_BATCH", "500")),
+    "vacuum_pages":   int(os.getenv("CHECKPOINT_VACUUM_PAGES", "4096")),
+    "full_vacuum":    os.getenv("CHECKPOINT_FULL_VACUUM", "1") not in ("0", "false", "False"),
+}
+
+# ─── Conversation Memory ─────────────────────────────────────────────────────
+# The graph's `memory` stage runs before the router on every turn. Once a
+# thread's messages exceed `max_tokens` the oldest are removed from state
+# until `keep_tokens` remain (the latest user message always stays); with
+# `summarize` on, removed turns are folded into `conversation_summary` by
+# `summary_workers` background threads, ready for a later turn.
+# `prompt_tokens` caps the whole prompt of each conversational node: the
+# summary and the newest history that fit are included, older turns dropped.
+MEMORY = {
+    "max_tokens":      int(os.getenv("MEMORY_MAX_TOKENS", "3000")),
+    "keep_tokens":     int(os.getenv("MEMORY_KEEP_TOKENS", "2000")),
+    "summarize":       os.getenv("MEMORY_SUMMARIZE", "1") not in ("0", "false", "False"),
+    "summary_tokens":  int(os.getenv("MEMORY_SUMMARY_TOKENS", "300")),
+    "summary_workers": int(os.getenv("MEMORY_SUMMARY_WORKERS", "2")),
+    "prompt_tokens": {
+        "router":         int(os.getenv("MEMORY_ROUTER_PROMPT_TOKENS", "800")),
+        "general_qa":     int(os.getenv("MEMORY_GENERAL_QA_PROMPT_TOKENS", "4000")),
+        "mock_interview": int(os.getenv("MEMORY_MOCK_INTERVIEW_PROMPT_TOKENS", "3000")),
+    },
+}
+
+# ─── Turn Profiling ──────────────────────────────────────────────────────────
+# Every API graph turn is timed and split into network time (LLM responses,
+# search fan-outs) and the Python overhead around it — graph scheduling,
+# state merging, prompt building, checkpointing. Turns whose overhead
+# exceeds `log_over_ms` are logged with their split by source.
+TURN_PROFILE = {
+    "enabled":     os.getenv("TURN_PROFILE_ENABLED", "1") not in ("0", "false", "False"),
+    "log_over_ms": float(os.getenv("TURN_PROFILE_LOG_OVER_MS", "250")),
+}
+
+# ─── Startup ─────────────────────────────────────────────────────────────────
+# Agent modules are imported on their node's first call, so `import api`
+# stays within `import_budget_s` (checked on demand by
+# `python -m tests.benchmarks.bench_import_time --check`, which also gives
+# the breakdown; tests/test_startup.py guards the lazy imports). Set
+# `preload_agents` to import them all at startup instead — slower cold
+# start, no first-turn import cost.
+STARTUP = {
+    "preload_agents": os.getenv("STARTUP_PRELOAD_AGENTS", "0") not in ("0", "false", "False"),
+    "import_budget_s": float(os.getenv("STARTUP_IMPORT_BUDGET_S", "2.5")),
+}
 
 # ─── UI Settings ─────────────────────────────────────────────────────────────
 APP_TITLE       = "AI Career Assistant"
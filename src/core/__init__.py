@@ -1,8 +1,22 @@
 """
 src/core/__init__.py
 Exports the core LLM and search factories for easy import.
+
+Resolved on first access, so importing one `src.core.*` submodule does not
+pull in the LLM client and search stack with it.
 """
-from .llm import get_llm
-from .search import get_search_tool
+from importlib import import_module
+
+_EXPORTS = {
+    "get_chain": "src.core.llm",
+    "get_llm": "src.core.llm",
+    "get_search_tool": "src.core.search",
+}
+
+__all__ = ["get_chain", "get_llm", "get_search_tool"]
+
 
-__all__ = ["get_llm", "get_search_tool"]
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
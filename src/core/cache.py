@@ -0,0 +1,212 @@
+"""
+src/core/cache.py
+─────────────────────────────────────────────────────────────────────────────
+Persistent key → text cache on SQLite with TTL expiry and LRU size eviction.
+
+Design decisions:
+  - One table per database file; keys are caller-built hashes, values are
+    UTF-8 text (JSON if the caller needs structure)
+  - Every entry carries `expires_at`; expired rows are treated as misses
+    and deleted lazily on read or during the next eviction pass
+  - Size is bounded by total value bytes: when a write pushes the store
+    over `max_bytes`, least-recently-read rows are dropped until it is
+    back under 90 % of the budget
+  - WAL mode + a single connection guarded by a lock — reads are sub-ms
+    and the hot path never holds the lock across network I/O
+  - Counters live in a separate `CacheStats` so they can be registered
+    with `registry` before the database is ever opened
+
+Usage:
+    from src.core.cache import CacheStats, SqliteCache
+    stats = CacheStats()
+    cache = SqliteCache("data/llm_cache.db", ttl_s=86400, max_bytes=64 << 20, stats=stats)
+    cache.set(key, "value")
+    cache.get(key)         # → "value" (or None once expired / evicted)
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for one logical cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.writes = 0
+            self.bytes_saved = 0       # payload bytes served from cache
+            self.evictions = 0         # rows dropped to stay under max_bytes
+            self.expired = 0           # rows dropped because their TTL passed
+
+    def hit(self, nbytes: int):
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += nbytes
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+                "writes": self.writes,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+class SqliteCache:
+    """
+    On-disk TTL + LRU cache.
+
+    Args:
+        path:      SQLite file (":memory:" for tests). Parent dirs are created.
+        ttl_s:     Default time-to-live for `set()`.
+        max_bytes: Upper bound on the summed size of stored values.
+        stats:     Counters to update; a private instance is used if omitted.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key         TEXT PRIMARY KEY,
+            value       TEXT NOT NULL,
+            size        INTEGER NOT NULL,
+            expires_at  REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_s: float = 86400.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        stats: Optional[CacheStats] = None,
+    ):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.stats = stats or CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    # ── Public API ─────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.miss()
+                return None
+            value, size, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bytes -= size
+                self.stats.add(expired=1)
+                self.stats.miss()
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        self.stats.hit(size)
+        return value
+
+    def set(self, key: str, value: str, ttl_s: Optional[float] = None) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        expires_at = now + (self.ttl_s if ttl_s is None else ttl_s)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, expires_at, now),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+        self.stats.add(writes=1)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bytes -= row[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # ── Eviction ───────────────────────────────────────────────────────────
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then LRU rows, until under 90 % of max_bytes."""
+        n_expired, expired_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE expires_at <= ?", (now,)
+        ).fetchone()
+        if n_expired:
+            self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            self._bytes -= expired_bytes
+
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._bytes > target:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._bytes <= target:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bytes -= size
+                evicted += 1
+
+        self.stats.add(expired=n_expired, evictions=evicted)
@@ -0,0 +1,257 @@
+"""
+src/core/fanout.py
+─────────────────────────────────────────────────────────────────────────────
+Parallel search fan-out for search-backed nodes.
+
+A node hands over several query variants (by location, seniority, source…);
+they run concurrently on one process-wide bounded executor and the merged,
+de-duplicated `SearchHit`s come back as soon as either
+  - `min_hits` unique hits have arrived (quality threshold), or
+  - `deadline_s` has passed since the fan-out started,
+so the LLM call can start instead of waiting on the slowest query. Queries
+still in flight at that point finish in the background and are discarded.
+
+Design decisions:
+  - One shared ThreadPoolExecutor (`SEARCH_FANOUT["max_workers"]`) bounds
+    outbound search concurrency for the whole process, sync and async
+  - Hits are merged in query order (primary query first), not completion
+    order, so prompts are deterministic for a given set of results
+  - Duplicates are detected by `SearchHit.key` (normalised URL, else text)
+  - Each fan-out is recorded as its own `registry` entry ("<node>.search")
+    so search latency is visible apart from the LLM stage ("<node>.llm")
+
+Usage:
+    from src.core.fanout import fan_out
+    result = fan_out(["python jobs pune", "senior python jobs pune"], node="job_search")
+    prompt = template.format(search_results=render_hits(result.hits))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.core.metrics import registry
+from src.core.profiling import add_network_time
+from src.core.search_results import SearchHit, dedupe_hits
+
+SearchFunc = Callable[[str], List[SearchHit]]
+
+
+def _default_search(query: str) -> List[SearchHit]:
+    from src.core.search import get_search_tool
+    return get_search_tool().func(query)
+
+
+@dataclass
+class FanOutResult:
+    hits: List[SearchHit]                  # merged, de-duplicated, query order
+    completed: int                         # queries that returned in time
+    pending: int                           # queries abandoned at return time
+    duplicates: int                        # hits dropped as duplicates
+    latency_ms: float
+    reason: str                            # "all_done" | "threshold" | "deadline"
+    results: Dict[str, List[SearchHit]] = field(default_factory=dict)
+
+
+def merge_results(
+    queries: Sequence[str], results: Dict[str, List[SearchHit]]
+) -> tuple[List[SearchHit], int]:
+    """Unique hits across `results`, primary query first. Returns (hits, dropped)."""
+    return dedupe_hits(hit for query in queries for hit in results.get(query, []))
+
+
+# ── Stats ─────────────────────────────────────────────────────────────────────
+
+class _FanOutStats:
+    """Thread-safe counters for the fan-out stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.fanouts = 0
+            self.queries = 0
+            self.completed = 0
+            self.abandoned = 0         # still running when the LLM started
+            self.duplicates = 0
+            self.hits = 0
+            self.reasons: Dict[str, int] = {"all_done": 0, "threshold": 0, "deadline": 0}
+
+    def record(self, n_queries: int, result: FanOutResult):
+        with self._lock:
+            self.fanouts += 1
+            self.queries += n_queries
+            self.completed += result.completed
+            self.abandoned += result.pending
+            self.duplicates += result.duplicates
+            self.hits += len(result.hits)
+            self.reasons[result.reason] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self.fanouts
+            return {
+                "fanouts": n,
+                "queries": self.queries,
+                "completed": self.completed,
+                "abandoned": self.abandoned,
+                "duplicates_dropped": self.duplicates,
+                "avg_hits": round(self.hits / n, 2) if n else 0,
+                "early_start_threshold": self.reasons["threshold"],
+                "early_start_deadline": self.reasons["deadline"],
+            }
+
+
+stats = _FanOutStats()
+
+registry.register_collector("search_fanout", stats.to_dict, counters=(
+    "fanouts", "queries", "completed", "abandoned", "duplicates_dropped",
+))
+
+
+# ── Executor ──────────────────────────────────────────────────────────────────
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The process-wide bounded pool every fan-out query runs on."""
+    global _executor
+    if _executor is None:
+        from src.config import SEARCH_FANOUT
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=SEARCH_FANOUT["max_workers"], thread_name_prefix="search-fanout",
+                )
+    return _executor
+
+
+def _settings(deadline_s: Optional[float], min_hits: Optional[int], max_variants: Optional[int]):
+    from src.config import SEARCH_FANOUT
+    return (
+        SEARCH_FANOUT["deadline_s"] if deadline_s is None else deadline_s,
+        SEARCH_FANOUT["min_hits"] if min_hits is None else min_hits,
+        SEARCH_FANOUT["max_variants"] if max_variants is None else max_variants,
+    )
+
+
+def _dedupe_queries(queries: Sequence[str], limit: int) -> List[str]:
+    """Whitespace-collapsed queries, case-insensitive duplicates dropped, capped at `limit`."""
+    out, seen = [], set()
+    for q in queries:
+        q = " ".join(q.split())
+        if q and q.lower() not in seen:
+            seen.add(q.lower())
+            out.append(q)
+    return out[:max(1, limit)]
+
+
+def _finish(
+    node: Optional[str], queries: List[str], results: Dict[str, List[SearchHit]],
+    pending: int, reason: str, t0: float,
+) -> FanOutResult:
+    hits, dropped = merge_results(queries, results)
+    latency_ms = (time.perf_counter() - t0) * 1000
+    result = FanOutResult(
+        hits=hits, completed=len(results), pending=pending, duplicates=dropped,
+        latency_ms=latency_ms, reason=reason,
+        results={q: results[q] for q in queries if q in results},
+    )
+    stats.record(len(queries), result)
+    add_network_time(latency_ms, "search")
+    if node:
+        registry.record(f"{node}.search", latency_ms, success=bool(hits))
+    return result
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+def fan_out(
+    queries: Sequence[str],
+    node: Optional[str] = None,
+    search: Optional[SearchFunc] = None,
+    deadline_s: Optional[float] = None,
+    min_hits: Optional[int] = None,
+    max_variants: Optional[int] = None,
+) -> FanOutResult:
+    """
+    Run `queries` concurrently and return once the quality threshold or the
+    deadline is reached (or every query has finished).
+
+    Args:
+        queries:      Primary query first, then variants.
+        node:         Graph node name; records "<node>.search" latency.
+        search:       query → hits (default: `get_search_tool().func`).
+        deadline_s / min_hits / max_variants: override `SEARCH_FANOUT`.
+    """
+    deadline_s, min_hits, max_variants = _settings(deadline_s, min_hits, max_variants)
+    queries = _dedupe_queries(queries, max_variants)
+    search = search or _default_search
+
+    t0 = time.perf_counter()
+    futures: Dict[Future, str] = {get_executor().submit(search, q): q for q in queries}
+    results: Dict[str, List[SearchHit]] = {}
+    pending = set(futures)
+    reason = "all_done"
+
+    while pending:
+        remaining = deadline_s - (time.perf_counter() - t0)
+        if remaining <= 0:
+            reason = "deadline"
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for fut in done:
+            results[futures[fut]] = [] if fut.exception() else fut.result()
+        if pending and len(merge_results(queries, results)[0]) >= min_hits:
+            reason = "threshold"
+            break
+
+    for fut in pending:
+        fut.cancel()
+    return _finish(node, queries, results, len(pending), reason, t0)
+
+
+async def afan_out(
+    queries: Sequence[str],
+    node: Optional[str] = None,
+    search: Optional[SearchFunc] = None,
+    deadline_s: Optional[float] = None,
+    min_hits: Optional[int] = None,
+    max_variants: Optional[int] = None,
+) -> FanOutResult:
+    """Async twin of `fan_out` — same executor, never blocks the event loop."""
+    deadline_s, min_hits, max_variants = _settings(deadline_s, min_hits, max_variants)
+    queries = _dedupe_queries(queries, max_variants)
+    search = search or _default_search
+
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    futures = {loop.run_in_executor(get_executor(), search, q): q for q in queries}
+    results: Dict[str, List[SearchHit]] = {}
+    pending = set(futures)
+    reason = "all_done"
+
+    while pending:
+        remaining = deadline_s - (time.perf_counter() - t0)
+        if remaining <= 0:
+            reason = "deadline"
+            break
+        done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for fut in done:
+            results[futures[fut]] = [] if fut.exception() else fut.result()
+        if pending and len(merge_results(queries, results)[0]) >= min_hits:
+            reason = "threshold"
+            break
+
+    for fut in pending:
+        fut.cancel()
+    return _finish(node, queries, results, len(pending), reason, t0)
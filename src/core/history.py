@@ -0,0 +1,212 @@
+"""
+src/core/history.py
+─────────────────────────────────────────────────────────────────────────────
+Conversation history under a token budget — what goes into a prompt.
+
+`fit_prompt` fills a prompt template's history slot with the newest turns
+(and a rolling summary of older ones) that fit the node's token budget,
+clipping other oversized inputs first, so a conversational node's prompt
+no longer grows with the number of turns. The `memory` graph stage
+(src/graph/memory.py) bounds what is stored; this bounds what is sent.
+
+Design decisions:
+  - Newest turns win: history is filled from the latest turn backwards and
+    the latest turn is clipped rather than dropped when nothing else fits
+  - The summary takes at most MEMORY["summary_tokens"] and never more than
+    half of the history's room
+  - Token counts use `estimate_tokens`, the same estimate as usage accounting.
+    Stored turns are re-rendered on every turn of a thread (and by several
+    nodes per turn), so per-line estimates are memoised in `line_tokens`
+  - Zero coupling: nothing here knows about agents or graph state
+
+Usage:
+    from src.core.history import fit_prompt, message_entries
+    inputs = fit_prompt(TEMPLATE, {"user_message": text}, budget=4000,
+                        history_key="chat_history",
+                        entries=message_entries(state["messages"]),
+                        summary=state.get("conversation_summary", ""))
+"""
+
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from src.core.metrics import registry
+from src.core.usage import estimate_tokens
+
+ENTRY_OVERHEAD = 4           # speaker label + separator
+_LINE_CACHE_SIZE = 4096      # rendered history lines whose token estimate is kept
+_FIT_SLACK = 16              # history this far under its room skips the whole-prompt check
+
+
+# ── Stats ─────────────────────────────────────────────────────────────────────
+
+class _MemoryStats:
+    """Thread-safe counters for history trimming, summaries and prompt fitting."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.trims = 0
+            self.trimmed_messages = 0
+            self.trimmed_tokens = 0
+            self.summaries = 0
+            self.summary_errors = 0
+            self.summary_ms = 0.0
+            self.pending_summaries = 0
+            self.prompts = 0
+            self.prompts_fitted = 0
+            self.dropped_turns = 0
+
+    def add(self, **counts: float):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "trims": self.trims,
+                "trimmed_messages": self.trimmed_messages,
+                "trimmed_tokens": self.trimmed_tokens,
+                "summaries": self.summaries,
+                "summary_errors": self.summary_errors,
+                "avg_summary_ms": round(self.summary_ms / self.summaries, 1) if self.summaries else 0.0,
+                "pending_summaries": self.pending_summaries,
+                "prompts": self.prompts,
+                "prompts_fitted": self.prompts_fitted,
+                "dropped_turns": self.dropped_turns,
+            }
+
+
+stats = _MemoryStats()
+registry.register_collector("conversation_memory", stats.to_dict, counters=(
+    "trims", "trimmed_messages", "trimmed_tokens", "summaries", "summary_errors", "prompts", "prompts_fitted",
+    "dropped_turns",
+))
+
+
+# ── Rendering under a token budget ────────────────────────────────────────────
+
+@lru_cache(maxsize=_LINE_CACHE_SIZE)
+def line_tokens(text: str) -> int:
+    """`estimate_tokens(text)`, memoised — for history lines seen on every turn."""
+    return estimate_tokens(text)
+
+
+def message_entries(messages: Sequence[BaseMessage]) -> List[Tuple[str, str]]:
+    """(speaker, text) pairs of a message list, in the repo's "User:/Assistant:" style."""
+    return [
+        ("User" if isinstance(m, HumanMessage) else "Assistant", str(m.content))
+        for m in messages
+        if hasattr(m, "content")
+    ]
+
+
+def clip_tokens(text: str, max_tokens: int) -> str:
+    """`text` cut at a word boundary to roughly `max_tokens` tokens (with " …")."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    words = text.split(" ")
+    while len(words) > 1 and estimate_tokens(" ".join(words) + " …") > max_tokens:
+        words = words[: max(1, len(words) * 3 // 4)]
+    return " ".join(words) + " …"
+
+
+def render_history(
+    entries: Sequence[Tuple[str, str]],
+    max_tokens: int,
+    summary: str = "",
+    sep: str = "\n",
+    summary_tokens: Optional[int] = None,
+) -> str:
+    """
+    The newest `entries` that fit in `max_tokens`, oldest first, preceded by
+    `summary` (clipped to `summary_tokens`, at most half the budget). The
+    newest entry is clipped rather than dropped when nothing else fits.
+    """
+    return _render(entries, max_tokens, summary, sep, summary_tokens)[0]
+
+
+def _render(entries, max_tokens, summary, sep, summary_tokens) -> Tuple[str, int, int]:
+    """(`render_history` text, number of entries left out, its estimated tokens)."""
+    if max_tokens <= 0:
+        return "", len(entries), 0
+    head = []
+    if summary:
+        limit = max_tokens // 2 if summary_tokens is None else min(summary_tokens, max_tokens // 2)
+        head = [f"Earlier in this conversation (summary): {clip_tokens(summary, limit)}"]
+    used = sum(line_tokens(h) + 1 for h in head)
+    budget = max_tokens - used
+
+    lines: List[str] = []
+    for speaker, content in reversed(entries):
+        line = f"{speaker}: {content}"
+        cost = line_tokens(line) + 1
+        if used + cost > max_tokens:
+            if not lines and budget > ENTRY_OVERHEAD:
+                lines.append(clip_tokens(line, budget - 1))
+                used = max_tokens
+            break
+        lines.append(line)
+        used += cost
+    return sep.join(head + lines[::-1]), len(entries) - len(lines), used
+
+
+def fit_prompt(
+    template: str,
+    inputs: Dict[str, Any],
+    budget: int,
+    history_key: Optional[str] = None,
+    entries: Sequence[Tuple[str, str]] = (),
+    summary: str = "",
+    sep: str = "\n",
+) -> Dict[str, Any]:
+    """
+    Prompt inputs for `template` whose rendering stays within `budget` tokens.
+
+    `inputs[history_key]` is filled by `render_history` with whatever room
+    the other inputs leave. When the other inputs alone overflow, the
+    largest of them is clipped first (user text is already capped by the
+    input guardrail, so this only bites on pathological profiles/payloads).
+    """
+    from src.config import MEMORY
+
+    fitted = {k: str(v) for k, v in inputs.items()}
+    if history_key:
+        fitted[history_key] = ""
+    room = budget - estimate_tokens(template.format(**fitted))
+    clipped = False
+
+    while room < 0:
+        others = [k for k in fitted if k != history_key and estimate_tokens(fitted[k]) > 8]
+        if not others:
+            break
+        key = max(others, key=lambda k: len(fitted[k]))
+        fitted[key] = clip_tokens(fitted[key], max(8, estimate_tokens(fitted[key]) + room))
+        room = budget - estimate_tokens(template.format(**fitted))
+        clipped = True
+
+    dropped = 0
+    if history_key:
+        # Newline-separated line estimates add up almost exactly, so the whole
+        # prompt is only re-estimated near the budget; there, estimates are
+        # not exactly additive — shave until it fits
+        for _ in range(4):
+            fitted[history_key], dropped, used = _render(entries, room, summary, sep, MEMORY["summary_tokens"])
+            if used <= room - _FIT_SLACK:
+                break
+            over = estimate_tokens(template.format(**fitted)) - budget
+            if over <= 0:
+                break
+            room -= over
+
+    stats.add(prompts=1, prompts_fitted=int(clipped or dropped > 0), dropped_turns=dropped)
+    return fitted
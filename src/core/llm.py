@@ -4,21 +4,144 @@ src/core/llm.py
 LLM Factory — single responsibility: construct and return a configured LLM.
 
 All HTTP, retry, and model-selection logic lives here.
-Nodes import `get_llm(role)` and nothing else.
+Nodes import `get_llm(role)` / `get_chain(role, prompt)` and nothing else;
+both return shared instances from the process-wide `LLMRegistry`.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
+import threading
 import time
 import requests
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Iterator, List, Optional
 
-from langchain.callbacks.manager import CallbackManagerForLLMRun
-from langchain.llms.base import LLM
-from dotenv import load_dotenv
+from langchain_core.callbacks.manager import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+from langchain_core.tracers._streaming import _StreamingCallbackHandler
+from pydantic import ConfigDict
 
-load_dotenv()
+from src.core.cache import CacheStats, SqliteCache
+from src.core.metrics import registry
+from src.core.profiling import add_network_time
+from src.core.ratelimit import ModelLimiter, backoff_delay, get_limiter
+from src.core.singleflight import get_flights
+from src.core.transport import get_async_client, get_session
+from src.core.usage import report_usage, server_timing_ms, usage_from_response
+import src.config  # noqa: F401 — loads .env before TOGETHER_API_KEY is read
+
+TOGETHER_CHAT_URL = "https://api.together.xyz/v1/chat/completions"
+
+RATE_LIMITED = "⚠️ Rate limit exceeded. Please wait a moment and try again."
+
+
+# ── Response cache ───────────────────────────────────────────────────────────
+
+cache_stats = CacheStats()
+_cache: Optional[SqliteCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[SqliteCache]:
+    """Return the process-wide response cache, or None if disabled in config."""
+    global _cache
+    if _cache is None:
+        from src.config import LLM_CACHE
+        if not LLM_CACHE["enabled"]:
+            return None
+        with _cache_lock:
+            if _cache is None:
+                _cache = SqliteCache(
+                    LLM_CACHE["path"],
+                    ttl_s=LLM_CACHE["ttl_s"],
+                    max_bytes=int(LLM_CACHE["max_mb"] * 1024 * 1024),
+                    stats=cache_stats,
+                )
+    return _cache
+
+
+registry.register_collector("llm_cache", cache_stats.to_dict, counters=(
+    "hits", "misses", "writes", "bytes_saved", "evictions", "expired",
+))
+
+
+# ── Incremental stop-sequence enforcement ──────────────────────────────────
+
+class _StopSequenceFilter:
+    """
+    Streaming counterpart of `_TogetherLLM._enforce_stop`.
+
+    Holds back the last `len(longest stop) - 1` characters so a stop
+    sequence split across two deltas is still caught before any of it is
+    released. Leading whitespace is dropped, matching the `.strip()` the
+    non-streaming path applies.
+    """
+
+    def __init__(self, stop: Optional[List[str]]):
+        self._stop = [s for s in (stop or []) if s]
+        self._hold = max((len(s) for s in self._stop), default=1) - 1
+        self._buf = ""
+        self._started = False
+        self.stopped = False
+
+    def _release(self, text: str) -> str:
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+    def feed(self, delta: str) -> str:
+        """Add a delta; return the text that is now safe to emit."""
+        if self.stopped:
+            return ""
+        self._buf += delta
+
+        hits = [i for i in (self._buf.find(s) for s in self._stop) if i != -1]
+        if hits:
+            self.stopped = True
+            out, self._buf = self._buf[:min(hits)], ""
+            return self._release(out)
+
+        cut = len(self._buf) - self._hold
+        if cut <= 0:
+            return ""
+        out, self._buf = self._buf[:cut], self._buf[cut:]
+        return self._release(out)
+
+    def flush(self) -> str:
+        """Release whatever is still held back once the stream has ended."""
+        out, self._buf = self._buf, ""
+        return "" if self.stopped else self._release(out)
+
+
+def _parse_sse_line(line: str) -> tuple[Optional[str], Optional[dict]]:
+    """
+    Extract `(content delta, usage)` from one `data:` line of a streamed
+    completion. The delta is None for `[DONE]` and "" for anything without
+    text; usage is only present on the provider's final chunk.
+    """
+    if not line.startswith("data:"):
+        return "", None
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return None, None
+    try:
+        event = json.loads(data)
+    except ValueError:
+        return "", None
+    usage = event.get("usage") if isinstance(event, dict) else None
+    try:
+        choice = event["choices"][0]
+    except (KeyError, IndexError, TypeError):
+        return "", usage
+    return (choice.get("delta") or {}).get("content") or "", usage
 
 
 # ── Together AI Custom LLM Wrapper ──────────────────────────────────────────
@@ -30,11 +153,27 @@ class _TogetherLLM(LLM):
 
     Responsibilities:
     - Auth header injection
-    - Exponential-backoff retry (rate limits + transient errors)
-    - Stop-sequence enforcement (fallback if provider ignores them)
+    - Pooled keep-alive HTTP transport (shared across all instances)
+    - Retry loop: 429s go through the model's shared adaptive limiter
+      (`src.core.ratelimit`), transient errors get jittered backoff
+    - Native asyncio path (`_acall`) for `ainvoke` / `graph.ainvoke`
+    - Token streaming (`_stream` / `_astream`) — also used by `_call` when
+      `streaming=True` or a streaming callback handler is attached
+    - Stop-sequence enforcement (fallback if provider ignores them),
+      applied incrementally when streaming
+    - Token accounting: every upstream response reports its `usage`
+      (estimated locally if missing) via `src.core.usage.report_usage`
+    - Optional on-disk response cache (`use_cache=True`) keyed on everything
+      that shapes the completion; API error messages are never cached
+    - Request coalescing: concurrent calls with the same cache key share
+      one upstream request (`src.core.singleflight`, COALESCE["llm"])
     - System message injection when `system_prompt` is set
+
+    Instances are frozen: `get_llm` hands the same one to every caller.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     model: str
     together_api_key: str = os.environ.get("TOGETHER_API_KEY", "")
     temperature: float = 0.7
@@ -42,24 +181,32 @@ class _TogetherLLM(LLM):
     max_retries: int = 3
     initial_retry_delay: float = 1.0
     system_prompt: str = ""          # Injected by caller for context
+    streaming: bool = False          # Always request `stream: true` upstream
+    use_cache: bool = False          # Serve exact repeats from `get_llm_cache()`
 
     @property
     def _llm_type(self) -> str:
         return "together_ai"
 
-    # ── Internal HTTP call with retry ──────────────────────────────────────
+    # ── Request construction (shared by sync + async paths) ───────────────
 
-    def _call_api(self, messages: list[dict], stop: list[str] | None, retry: int = 0) -> str:
-        headers = {
+    def _headers(self) -> dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.together_api_key}",
             "Content-Type": "application/json",
         }
+
+    def _payload(
+        self, messages: list[dict], stop: list[str] | None, stream: bool = False
+    ) -> dict[str, Any]:
         payload: dict[str, Any] = {
             "model": self.model,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
             "messages": messages,
         }
+        if stream:
+            payload["stream"] = True
         if stop:
             # Expand stop list: include both raw and stripped variants
             expanded = list(stop)
@@ -68,46 +215,9 @@ class _TogetherLLM(LLM):
                 if s2 and s2 not in expanded:
                     expanded.append(s2)
             payload["stop"] = expanded
+        return payload
 
-        try:
-            resp = requests.post(
-                "https://api.together.xyz/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60,
-            )
-
-            if resp.status_code == 429:
-                if retry < self.max_retries:
-                    delay = self.initial_retry_delay * (4 ** retry)
-                    print(f"[llm] rate-limited — retrying in {delay:.1f}s (attempt {retry+1})")
-                    time.sleep(delay)
-                    return self._call_api(messages, stop, retry + 1)
-                return "⚠️ Rate limit exceeded. Please wait a moment and try again."
-
-            resp.raise_for_status()
-            return resp.json()["choices"][0]["message"]["content"]
-
-        except requests.RequestException as exc:
-            if retry < self.max_retries:
-                delay = self.initial_retry_delay * (2 ** retry)
-                print(f"[llm] request error — retrying in {delay:.1f}s: {exc}")
-                time.sleep(delay)
-                return self._call_api(messages, stop, retry + 1)
-            return f"⚠️ API unavailable after {self.max_retries} retries: {exc}"
-
-        except (KeyError, IndexError) as exc:
-            return f"⚠️ Unexpected API response format: {exc}"
-
-    # ── LangChain _call interface ──────────────────────────────────────────
-
-    def _call(
-        self,
-        prompt: str,
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> str:
+    def _messages(self, prompt: str) -> list[dict]:
         messages: list[dict] = []
 
         # Inject system prompt if provided
@@ -115,9 +225,10 @@ class _TogetherLLM(LLM):
             messages.append({"role": "system", "content": self.system_prompt})
 
         messages.append({"role": "user", "content": prompt})
+        return messages
 
-        content = self._call_api(messages, stop)
-
+    @staticmethod
+    def _enforce_stop(content: str, stop: Optional[List[str]]) -> str:
         # Fallback stop enforcement (provider might ignore them)
         if stop:
             for seq in stop:
@@ -127,28 +238,543 @@ class _TogetherLLM(LLM):
 
         return content.strip()
 
+    def _report_usage(
+        self, messages: list[dict], completion: str, usage: Optional[dict], t0: float, headers,
+    ) -> None:
+        latency_ms = (time.perf_counter() - t0) * 1000
+        add_network_time(latency_ms, "llm")
+        report_usage(usage_from_response(
+            self.model, messages, completion, usage,
+            latency_ms=latency_ms,
+            server_ms=server_timing_ms(headers),
+        ))
 
-# ── Public factory ───────────────────────────────────────────────────────────
+    # ── Internal HTTP call with retry ──────────────────────────────────────
+    # Every attempt first takes a slot from the model's shared limiter, so a
+    # 429 pauses and slows all callers together instead of each thread
+    # sleeping on its own and retrying in lock-step. Transport errors back
+    # off per caller with jitter. `retry` is the attempt to start from.
+
+    def _retry_delay(self, attempt: int, exc: Exception) -> float:
+        from src.config import RATE_LIMIT
+        delay = backoff_delay(attempt, self.initial_retry_delay,
+                              RATE_LIMIT["backoff_cap_s"], RATE_LIMIT["jitter"])
+        print(f"[llm] request error — retrying in {delay:.1f}s: {exc}")
+        return delay
+
+    def _rate_limited(self, limiter: Optional[ModelLimiter], headers, attempt: int) -> float:
+        """Record a 429; returns how long this caller must sleep before its next attempt."""
+        if limiter is not None:
+            pause = limiter.on_rate_limited(headers, attempt)
+            delay = 0.0                      # the next acquire waits out the shared pause
+        else:
+            from src.config import RATE_LIMIT
+            pause = delay = backoff_delay(attempt, self.initial_retry_delay,
+                                          RATE_LIMIT["backoff_cap_s"], RATE_LIMIT["jitter"])
+        print(f"[llm] rate-limited — retrying in {pause:.1f}s (attempt {attempt+1})")
+        return delay
 
-def get_llm(role: str, system_prompt: str = "") -> _TogetherLLM:
-    """
-    Return a configured `_TogetherLLM` for the given agent role.
+    def _call_api(self, messages: list[dict], stop: list[str] | None, retry: int = 0) -> str:
+        limiter = get_limiter(self.model)
+        for attempt in range(retry, self.max_retries + 1):
+            if limiter is not None and not limiter.acquire():
+                return RATE_LIMITED
+            t0 = time.perf_counter()
+            try:
+                resp = get_session().post(
+                    TOGETHER_CHAT_URL,
+                    headers=self._headers(),
+                    json=self._payload(messages, stop),
+                    timeout=60,
+                )
+
+                if resp.status_code == 429:
+                    if attempt < self.max_retries:
+                        time.sleep(self._rate_limited(limiter, resp.headers, attempt))
+                        continue
+                    if limiter is not None:
+                        limiter.on_rate_limited(resp.headers, attempt)
+                    return RATE_LIMITED
+
+                resp.raise_for_status()
+                if limiter is not None:
+                    limiter.on_response(resp.headers)
+                body = resp.json()
+                content = body["choices"][0]["message"]["content"]
+                self._report_usage(messages, content, body.get("usage"), t0, resp.headers)
+                return content
+
+            except requests.RequestException as exc:
+                if attempt < self.max_retries:
+                    time.sleep(self._retry_delay(attempt, exc))
+                    continue
+                return f"⚠️ API unavailable after {self.max_retries} retries: {exc}"
+
+            except (KeyError, IndexError) as exc:
+                return f"⚠️ Unexpected API response format: {exc}"
+        return RATE_LIMITED
+
+    async def _acall_api(self, messages: list[dict], stop: list[str] | None, retry: int = 0) -> str:
+        """Async twin of `_call_api` — same retry policy, but never blocks the loop."""
+        import httpx
+
+        limiter = get_limiter(self.model)
+        for attempt in range(retry, self.max_retries + 1):
+            if limiter is not None and not await limiter.aacquire():
+                return RATE_LIMITED
+            t0 = time.perf_counter()
+            try:
+                resp = await get_async_client().post(
+                    TOGETHER_CHAT_URL,
+                    headers=self._headers(),
+                    json=self._payload(messages, stop),
+                    timeout=60,
+                )
+
+                if resp.status_code == 429:
+                    if attempt < self.max_retries:
+                        await asyncio.sleep(self._rate_limited(limiter, resp.headers, attempt))
+                        continue
+                    if limiter is not None:
+                        limiter.on_rate_limited(resp.headers, attempt)
+                    return RATE_LIMITED
+
+                resp.raise_for_status()
+                if limiter is not None:
+                    limiter.on_response(resp.headers)
+                body = resp.json()
+                content = body["choices"][0]["message"]["content"]
+                self._report_usage(messages, content, body.get("usage"), t0, resp.headers)
+                return content
+
+            except httpx.HTTPError as exc:
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self._retry_delay(attempt, exc))
+                    continue
+                return f"⚠️ API unavailable after {self.max_retries} retries: {exc}"
+
+            except (KeyError, IndexError) as exc:
+                return f"⚠️ Unexpected API response format: {exc}"
+        return RATE_LIMITED
+
+    # ── Streaming HTTP calls ────────────────────────────────────────────────
+    # Retries only happen before the first delta arrives; once text has been
+    # handed to the caller a dropped connection simply ends the stream.
+
+    def _stream_api(self, messages: list[dict], stop: list[str] | None, retry: int = 0) -> Iterator[str]:
+        limiter = get_limiter(self.model)
+        for attempt in range(retry, self.max_retries + 1):
+            if limiter is not None and not limiter.acquire():
+                yield RATE_LIMITED
+                return
+            emitted = False
+            t0 = time.perf_counter()
+            try:
+                with get_session().post(
+                    TOGETHER_CHAT_URL,
+                    headers=self._headers(),
+                    json=self._payload(messages, stop, stream=True),
+                    timeout=60,
+                    stream=True,
+                ) as resp:
+                    if resp.status_code == 429:
+                        if attempt < self.max_retries:
+                            delay = self._rate_limited(limiter, resp.headers, attempt)
+                        else:
+                            if limiter is not None:
+                                limiter.on_rate_limited(resp.headers, attempt)
+                            yield RATE_LIMITED
+                            return
+                    else:
+                        resp.raise_for_status()
+                        if limiter is not None:
+                            limiter.on_response(resp.headers)
+                        pieces, usage = [], None
+                        try:
+                            for line in resp.iter_lines(decode_unicode=True):
+                                delta, chunk_usage = _parse_sse_line(line or "")
+                                usage = chunk_usage or usage
+                                if delta is None:
+                                    break
+                                if delta:
+                                    emitted = True
+                                    pieces.append(delta)
+                                    yield delta
+                        finally:
+                            # Also runs when the caller closes the stream on a stop sequence
+                            self._report_usage(messages, "".join(pieces), usage, t0, resp.headers)
+                        return
+                time.sleep(delay)
 
-    Args:
-        role:          One of the keys in `LLM_MODELS` / `LLM_DEFAULTS`.
-        system_prompt: Optional system-level context injected before every call.
+            except requests.RequestException as exc:
+                if emitted:
+                    print(f"[llm] stream interrupted: {exc}")
+                    return
+                if attempt < self.max_retries:
+                    time.sleep(self._retry_delay(attempt, exc))
+                    continue
+                yield f"⚠️ API unavailable after {self.max_retries} retries: {exc}"
+                return
+
+    async def _astream_api(
+        self, messages: list[dict], stop: list[str] | None, retry: int = 0
+    ) -> AsyncIterator[str]:
+        """Async twin of `_stream_api`."""
+        import httpx
+
+        limiter = get_limiter(self.model)
+        for attempt in range(retry, self.max_retries + 1):
+            if limiter is not None and not await limiter.aacquire():
+                yield RATE_LIMITED
+                return
+            emitted = False
+            t0 = time.perf_counter()
+            try:
+                async with get_async_client().stream(
+                    "POST",
+                    TOGETHER_CHAT_URL,
+                    headers=self._headers(),
+                    json=self._payload(messages, stop, stream=True),
+                    timeout=60,
+                ) as resp:
+                    if resp.status_code == 429:
+                        if attempt < self.max_retries:
+                            delay = self._rate_limited(limiter, resp.headers, attempt)
+                        else:
+                            if limiter is not None:
+                                limiter.on_rate_limited(resp.headers, attempt)
+                            yield RATE_LIMITED
+                            return
+                    else:
+                        resp.raise_for_status()
+                        if limiter is not None:
+                            limiter.on_response(resp.headers)
+                        pieces, usage = [], None
+                        try:
+                            async for line in resp.aiter_lines():
+                                delta, chunk_usage = _parse_sse_line(line)
+                                usage = chunk_usage or usage
+                                if delta is None:
+                                    break
+                                if delta:
+                                    emitted = True
+                                    pieces.append(delta)
+                                    yield delta
+                        finally:
+                            self._report_usage(messages, "".join(pieces), usage, t0, resp.headers)
+                        return
+                await asyncio.sleep(delay)
+
+            except httpx.HTTPError as exc:
+                if emitted:
+                    print(f"[llm] stream interrupted: {exc}")
+                    return
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self._retry_delay(attempt, exc))
+                    continue
+                yield f"⚠️ API unavailable after {self.max_retries} retries: {exc}"
+                return
+
+    # ── LangChain _stream / _astream interface ─────────────────────────────
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        stop_filter = _StopSequenceFilter(stop)
+        deltas = self._stream_api(self._messages(prompt), stop)
+        try:
+            for delta in deltas:
+                text = stop_filter.feed(delta)
+                if text:
+                    chunk = GenerationChunk(text=text)
+                    if run_manager:
+                        run_manager.on_llm_new_token(text, chunk=chunk)
+                    yield chunk
+                if stop_filter.stopped:
+                    break
+        finally:
+            # Closes the HTTP response early when a stop sequence was hit
+            deltas.close()
+
+        tail = stop_filter.flush()
+        if tail:
+            chunk = GenerationChunk(text=tail)
+            if run_manager:
+                run_manager.on_llm_new_token(tail, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[GenerationChunk]:
+        stop_filter = _StopSequenceFilter(stop)
+        deltas = self._astream_api(self._messages(prompt), stop)
+        try:
+            async for delta in deltas:
+                text = stop_filter.feed(delta)
+                if text:
+                    chunk = GenerationChunk(text=text)
+                    if run_manager:
+                        await run_manager.on_llm_new_token(text, chunk=chunk)
+                    yield chunk
+                if stop_filter.stopped:
+                    break
+        finally:
+            await deltas.aclose()
+
+        tail = stop_filter.flush()
+        if tail:
+            chunk = GenerationChunk(text=tail)
+            if run_manager:
+                await run_manager.on_llm_new_token(tail, chunk=chunk)
+            yield chunk
+
+    # ── Response cache ─────────────────────────────────────────────────────
+
+    def _cache_key(self, messages: list[dict], stop: Optional[List[str]]) -> str:
+        blob = json.dumps(
+            {
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+                "stop": stop or [],
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _cacheable(content: str) -> bool:
+        # Every failure path in `_call_api` returns a "⚠️ …" message instead of raising
+        return bool(content) and not content.startswith("⚠️")
+
+    # ── LangChain _call / _acall interface ─────────────────────────────────
+
+    def _should_stream(self, run_manager) -> bool:
+        """Stream upstream when asked to, or when someone is listening for tokens."""
+        if self.streaming:
+            return True
+        handlers = run_manager.handlers if run_manager else []
+        return any(isinstance(h, _StreamingCallbackHandler) for h in handlers)
 
-    Returns:
-        A ready-to-use LangChain-compatible LLM instance.
-    """
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        from src.config import COALESCE
+
+        messages = self._messages(prompt)
+        key = self._cache_key(messages, stop)
+        cache = get_llm_cache() if self.use_cache else None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                if run_manager and self._should_stream(run_manager):
+                    run_manager.on_llm_new_token(cached, chunk=GenerationChunk(text=cached))
+                return cached
+
+        def fetch() -> str:
+            if self._should_stream(run_manager):
+                chunks = self._stream(prompt, stop, run_manager, **kwargs)
+                content = "".join(c.text for c in chunks).strip()
+            else:
+                content = self._enforce_stop(self._call_api(messages, stop), stop)
+            if cache is not None and self._cacheable(content):
+                cache.set(key, content)
+            return content
+
+        if not COALESCE["llm"]:
+            return fetch()
+        t0 = time.perf_counter()
+        content, shared = get_flights("llm").do(key, fetch)
+        if shared:
+            # Another caller made the request; its wait is this turn's network time
+            add_network_time((time.perf_counter() - t0) * 1000, "llm")
+            if run_manager and self._should_stream(run_manager):
+                run_manager.on_llm_new_token(content, chunk=GenerationChunk(text=content))
+        return content
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        from src.config import COALESCE
+
+        messages = self._messages(prompt)
+        key = self._cache_key(messages, stop)
+        cache = get_llm_cache() if self.use_cache else None
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                if run_manager and self._should_stream(run_manager):
+                    await run_manager.on_llm_new_token(cached, chunk=GenerationChunk(text=cached))
+                return cached
+
+        async def fetch() -> str:
+            if self._should_stream(run_manager):
+                chunks = [c.text async for c in self._astream(prompt, stop, run_manager, **kwargs)]
+                content = "".join(chunks).strip()
+            else:
+                content = self._enforce_stop(await self._acall_api(messages, stop), stop)
+            if cache is not None and self._cacheable(content):
+                await asyncio.to_thread(cache.set, key, content)
+            return content
+
+        if not COALESCE["llm"]:
+            return await fetch()
+        t0 = time.perf_counter()
+        content, shared = await get_flights("llm").ado(key, fetch)
+        if shared:
+            add_network_time((time.perf_counter() - t0) * 1000, "llm")
+            if run_manager and self._should_stream(run_manager):
+                await run_manager.on_llm_new_token(content, chunk=GenerationChunk(text=content))
+        return content
+
+
+# ── Role registry ────────────────────────────────────────────────────────────
+
+def _build_llm(role: str, system_prompt: str, streaming: bool, api_key: str) -> _TogetherLLM:
     from src.config import LLM_MODELS, LLM_DEFAULTS
 
     model   = LLM_MODELS.get(role, LLM_MODELS.get("general_qa", ""))
     defaults = LLM_DEFAULTS.get(role, {"temperature": 0.7, "max_tokens": 2048})
+    temperature = defaults.get("temperature", 0.7)
 
     return _TogetherLLM(
         model=model,
-        temperature=defaults.get("temperature", 0.7),
+        together_api_key=api_key,
+        temperature=temperature,
         max_tokens=defaults.get("max_tokens", 2048),
         system_prompt=system_prompt,
+        streaming=streaming,
+        # Deterministic roles are cached automatically; sampling roles opt in
+        use_cache=defaults.get("cache", temperature == 0.0),
     )
+
+
+class LLMRegistry:
+    """
+    Process-wide store of ready-built clients and chains.
+
+    Clients are keyed on (role, system_prompt, streaming) and chains on
+    (role, prompt), so a node call is a dict lookup rather than a config
+    read, a pydantic validation and a fresh `LLMChain`. Both are shared by
+    every caller — clients are frozen, chains must be treated as read-only.
+    `reload()` drops everything built with an API key that has since
+    changed (e.g. through /api/settings); an unchanged key is a no-op.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._api_key = os.environ.get("TOGETHER_API_KEY", "")
+        self._llms: dict[tuple, _TogetherLLM] = {}
+        # (role, id(prompt)) → (prompt, chain); holding the prompt keeps its id unique
+        self._chains: dict[tuple, tuple[Any, Any]] = {}
+        self.builds = 0
+        self.reloads = 0
+
+    def llm(self, role: str, system_prompt: str = "", streaming: bool = False) -> _TogetherLLM:
+        key = (role, system_prompt, streaming)
+        llm = self._llms.get(key)
+        if llm is None:
+            with self._lock:
+                llm = self._llms.get(key)
+                if llm is None:
+                    llm = self._llms[key] = _build_llm(role, system_prompt, streaming, self._api_key)
+                    self.builds += 1
+        return llm
+
+    def chain(self, role: str, prompt: Any):
+        key = (role, id(prompt))
+        entry = self._chains.get(key)
+        if entry is None:
+            from langchain.chains import LLMChain
+            llm = self.llm(role)
+            with self._lock:
+                entry = self._chains.get(key)
+                if entry is None:
+                    entry = self._chains[key] = (prompt, LLMChain(llm=llm, prompt=prompt))
+                    self.builds += 1
+        return entry[1]
+
+    def warm(self, roles: Optional[List[str]] = None) -> None:
+        """Build the plain client of every role (all of LLM_MODELS by default)."""
+        from src.config import LLM_MODELS
+        for role in roles or list(LLM_MODELS):
+            self.llm(role)
+
+    def reload(self, force: bool = False) -> bool:
+        """Drop every client and chain if the API key changed (or `force`); True if it did."""
+        api_key = os.environ.get("TOGETHER_API_KEY", "")
+        with self._lock:
+            if api_key == self._api_key and not force:
+                return False
+            self._api_key = api_key
+            self._llms = {}
+            self._chains = {}
+            self.reloads += 1
+        return True
+
+    def to_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "clients": len(self._llms),
+                "chains": len(self._chains),
+                "builds": self.builds,
+                "reloads": self.reloads,
+            }
+
+
+llms = LLMRegistry()
+
+registry.register_collector("llm_registry", llms.to_dict, counters=("builds", "reloads"))
+
+
+# ── Public factory ───────────────────────────────────────────────────────────
+
+def get_llm(role: str, system_prompt: str = "", streaming: bool = False) -> _TogetherLLM:
+    """
+    Return the shared, configured `_TogetherLLM` for the given agent role.
+
+    Args:
+        role:          One of the keys in `LLM_MODELS` / `LLM_DEFAULTS`.
+        system_prompt: Optional system-level context injected before every call.
+        streaming:     Always request a streamed completion (`stream: true`).
+                       Not needed for graph runs — attaching a streaming
+                       callback handler switches the call over on its own.
+
+    Returns:
+        A ready-to-use LangChain-compatible LLM instance, built on first use
+        and reused until `reload_llms()` sees a new API key.
+    """
+    return llms.llm(role, system_prompt, streaming)
+
+
+def get_chain(role: str, prompt: Any):
+    """
+    Return the shared `LLMChain` of `prompt` over the role's client.
+
+    `prompt` should be a module-level PromptTemplate — chains are cached
+    per prompt object, so one built per call would never be reused.
+    """
+    return llms.chain(role, prompt)
+
+
+def reload_llms(force: bool = False) -> bool:
+    """Pick up a changed TOGETHER_API_KEY (e.g. after /api/settings)."""
+    return llms.reload(force)
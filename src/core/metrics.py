@@ -5,11 +5,15 @@ In-memory metrics registry for MLOps observability.
 
 Tracks per-agent:
   - Call count, error count, success rate
-  - Latency: total, min, max, P50, P95, P99 (via sorted insertion)
+  - Latency: total, min, max, P50, P95, P99 (via a DDSketch, ±1 % by default)
+  - The same percentiles over sliding windows (last 1 min / 5 min / 1 h)
   - Token usage: prompt + completion
 
 Design decisions:
   - Thread-safe via threading.Lock (FastAPI uses threads per request)
+  - Constant memory per agent: latencies go into log-bucket sketches
+    (src/core/sketch.py), never a list, so a long-running process does
+    not grow and `record()` is O(1); sketches merge across workers
   - Singleton `registry` instance — import and use directly
   - `.snapshot()` returns a JSON-serialisable dict for /api/metrics endpoint
   - Zero coupling: no knowledge of agents, prompts, or LLM internals
@@ -24,7 +28,19 @@ from __future__ import annotations
 
 import bisect
 import threading
-from typing import Any, Dict, List
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence
+
+from src.core.sketch import DDSketch, WindowedSketch
+
+# Sliding windows reported next to the all-time percentiles
+DEFAULT_WINDOWS: Dict[str, float] = {"1m": 60, "5m": 300, "1h": 3600}
+
+# Upper bounds (ms) of the exported latency histogram; +Inf is implicit
+DEFAULT_BUCKETS_MS: tuple = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000,
+)
 
 
 class _AgentMetrics:
@@ -32,15 +48,27 @@ class _AgentMetrics:
 
     __slots__ = (
         "calls", "errors", "total_latency_ms",
-        "total_tokens", "latencies", "lock",
+        "total_tokens", "latencies", "windows", "bucket_bounds",
+        "bucket_counts", "lock",
     )
 
-    def __init__(self):
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        windows: Optional[Dict[str, float]] = None,
+        slot_s: float = 10.0,
+        buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS,
+    ):
         self.calls: int = 0
         self.errors: int = 0
         self.total_latency_ms: float = 0.0
         self.total_tokens: int = 0
-        self.latencies: List[float] = []   # kept sorted for percentile calc
+        self.latencies = DDSketch(relative_accuracy)     # all-time
+        self.windows = WindowedSketch(
+            DEFAULT_WINDOWS if windows is None else windows, slot_s, relative_accuracy
+        )
+        self.bucket_bounds: tuple = tuple(buckets_ms)
+        self.bucket_counts: List[int] = [0] * (len(self.bucket_bounds) + 1)
         self.lock = threading.Lock()
 
     def record(self, latency_ms: float, tokens: int = 0, success: bool = True):
@@ -48,18 +76,70 @@ class _AgentMetrics:
             self.calls += 1
             self.total_latency_ms += latency_ms
             self.total_tokens += tokens
-            bisect.insort(self.latencies, latency_ms)
+            self.latencies.add(latency_ms)
+            self.windows.add(latency_ms)
+            self.bucket_counts[bisect.bisect_left(self.bucket_bounds, latency_ms)] += 1
             if not success:
                 self.errors += 1
 
+    def state(self) -> Dict[str, Any]:
+        """Full JSON-serialisable state — what a worker writes to its segment."""
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "total_latency_ms": self.total_latency_ms,
+                "total_tokens": self.total_tokens,
+                "latencies": self.latencies.to_dict(),
+                "windows": self.windows.to_dict(),
+                "bucket_bounds": list(self.bucket_bounds),
+                "bucket_counts": list(self.bucket_counts),
+            }
+
+    def merge_state(self, state: Dict[str, Any]):
+        """Fold a `state()` dict (e.g. another worker's) into these metrics."""
+        if tuple(state["bucket_bounds"]) != self.bucket_bounds:
+            raise ValueError("cannot merge metrics with different histogram buckets")
+        latencies = DDSketch.from_dict(state["latencies"])
+        windows = WindowedSketch.from_dict(state["windows"])
+        with self.lock:
+            self.calls += state["calls"]
+            self.errors += state["errors"]
+            self.total_latency_ms += state["total_latency_ms"]
+            self.total_tokens += state["total_tokens"]
+            self.latencies.merge(latencies)
+            self.windows.merge(windows)
+            for i, n in enumerate(state["bucket_counts"]):
+                self.bucket_counts[i] += n
+
+    def merge(self, other: "_AgentMetrics"):
+        """Fold another worker's metrics for the same agent into these."""
+        self.merge_state(other.state())
+
+    def histogram(self) -> tuple:
+        """(bounds, cumulative counts incl. +Inf, count, sum_ms) for exposition."""
+        with self.lock:
+            cumulative, total = [], 0
+            for n in self.bucket_counts:
+                total += n
+                cumulative.append(total)
+            return self.bucket_bounds, cumulative, self.calls, self.total_latency_ms
+
     def _percentile(self, p: float) -> float:
-        """Return the p-th percentile (0–100) from sorted latencies."""
-        n = len(self.latencies)
-        if n == 0:
-            return 0.0
-        idx = int(n * p / 100.0)
-        idx = min(idx, n - 1)
-        return self.latencies[idx]
+        """Return the p-th percentile (0–100), within the sketch's relative error."""
+        return self.latencies.quantile(p / 100.0)
+
+    def _window_dict(self) -> Dict[str, Any]:
+        out = {}
+        for name, seconds in self.windows.windows.items():
+            sketch = self.windows.window(seconds)
+            out[name] = {
+                "calls": sketch.count,
+                "p50_latency_ms": round(sketch.quantile(0.50), 2),
+                "p95_latency_ms": round(sketch.quantile(0.95), 2),
+                "p99_latency_ms": round(sketch.quantile(0.99), 2),
+            }
+        return out
 
     def to_dict(self) -> Dict[str, Any]:
         with self.lock:
@@ -72,9 +152,10 @@ class _AgentMetrics:
                 "p50_latency_ms": round(self._percentile(50), 2),
                 "p95_latency_ms": round(self._percentile(95), 2),
                 "p99_latency_ms": round(self._percentile(99), 2),
-                "min_latency_ms": round(self.latencies[0], 2) if self.latencies else 0,
-                "max_latency_ms": round(self.latencies[-1], 2) if self.latencies else 0,
+                "min_latency_ms": round(self.latencies.min, 2) if count else 0,
+                "max_latency_ms": round(self.latencies.max, 2) if count else 0,
                 "total_tokens": self.total_tokens,
+                "windows": self._window_dict(),
             }
 
 
@@ -83,27 +164,108 @@ class MetricsRegistry:
     Global, thread-safe metrics registry.
 
     Each agent has its own _AgentMetrics instance, created on first access.
+
+    Subsystems that keep their own counters (HTTP pool, caches, …) register
+    a *collector* — a zero-arg callable returning a JSON-serialisable dict —
+    which is evaluated lazily on every snapshot.
+
+    Args:
+        relative_accuracy: Percentile error bound for every agent's sketch.
+        windows:           Sliding-window name → seconds (default 1m/5m/1h).
+        slot_s:            Granularity of the sliding windows.
+        buckets_ms:        Latency histogram upper bounds for OpenMetrics.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        windows: Optional[Dict[str, float]] = None,
+        slot_s: float = 10.0,
+        buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS,
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.windows = DEFAULT_WINDOWS if windows is None else windows
+        self.slot_s = slot_s
+        self.buckets_ms = tuple(buckets_ms)
+        self.version = 0      # bumped on every record(); a cheap "dirty" flag
         self._lock = threading.Lock()
         self._agents: Dict[str, _AgentMetrics] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._counters: Dict[str, FrozenSet[str]] = {}
 
     def _get_or_create(self, agent: str) -> _AgentMetrics:
         if agent not in self._agents:
             with self._lock:
                 if agent not in self._agents:
-                    self._agents[agent] = _AgentMetrics()
+                    self._agents[agent] = _AgentMetrics(
+                        self.relative_accuracy, self.windows, self.slot_s, self.buckets_ms
+                    )
         return self._agents[agent]
 
     def record(self, agent: str, latency_ms: float, tokens: int = 0, success: bool = True):
         """Record a single invocation for the given agent."""
         self._get_or_create(agent).record(latency_ms, tokens, success)
+        self.version += 1
+
+    @contextmanager
+    def timed(self, agent: str) -> Iterator[None]:
+        """Record the wall time of the block under `agent` (an exception counts as an error)."""
+        t0 = time.perf_counter()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.record(agent, (time.perf_counter() - t0) * 1000, success=success)
+
+    def merge(self, other: "MetricsRegistry"):
+        """Fold another registry's agent metrics into this one (collectors are not merged)."""
+        self.merge_state(other.state())
+
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """Agent name → `_AgentMetrics.state()`; collectors are process-local."""
+        with self._lock:
+            agents = list(self._agents.items())
+        return {name: m.state() for name, m in agents}
+
+    def merge_state(self, state: Dict[str, Dict[str, Any]]):
+        for agent, agent_state in state.items():
+            self._get_or_create(agent).merge_state(agent_state)
+
+    def agents(self) -> Dict[str, _AgentMetrics]:
+        with self._lock:
+            return dict(self._agents)
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Evaluate every registered collector (name → stats dict)."""
+        with self._lock:
+            collectors = list(self._collectors.items())
+        return {name: collector() for name, collector in collectors}
+
+    def register_collector(
+        self,
+        name: str,
+        collector: Callable[[], Dict[str, Any]],
+        counters: Iterable[str] = (),
+    ):
+        """
+        Expose a subsystem's stats under `name` in every snapshot. `counters`
+        names the fields that only ever grow (exported as OpenMetrics counters).
+        """
+        with self._lock:
+            self._collectors[name] = collector
+            self._counters[name] = frozenset(counters)
+
+    def collector_counters(self) -> Dict[str, FrozenSet[str]]:
+        """Collector name → its monotonic counter fields."""
+        with self._lock:
+            return dict(self._counters)
 
     def snapshot(self) -> Dict[str, Any]:
         """Return a full JSON-serialisable snapshot of all agent metrics."""
-        with self._lock:
-            return {name: m.to_dict() for name, m in self._agents.items()}
+        snap = {name: m.to_dict() for name, m in self.agents().items()}
+        snap.update(self.collect())
+        return snap
 
     def reset(self):
         """Clear all metrics (useful for testing)."""
@@ -112,4 +274,13 @@ class MetricsRegistry:
 
 
 # ── Singleton ─────────────────────────────────────────────────────────────────
-registry = MetricsRegistry()
+def _from_config() -> MetricsRegistry:
+    from src.config import METRICS
+    return MetricsRegistry(
+        METRICS["relative_accuracy"],
+        slot_s=METRICS["window_slot_s"],
+        buckets_ms=METRICS["histogram_buckets_ms"],
+    )
+
+
+registry = _from_config()
@@ -0,0 +1,148 @@
+"""
+src/core/multiproc.py
+─────────────────────────────────────────────────────────────────────────────
+Multi-process metrics aggregation via file-backed segments.
+
+Under `uvicorn --workers N` every worker has its own `registry`, so a scrape
+only ever sees the worker that answered it. With `METRICS["multiproc_dir"]`
+set, each worker runs a `SegmentWriter` that periodically dumps
+`registry.state()` to `<dir>/metrics-<pid>.json`; whichever worker serves
+the scrape flushes its own segment and merges all of them (sketches and
+histogram buckets merge exactly, counters add up).
+
+Design decisions:
+  - One JSON file per pid, replaced atomically (write tmp + os.replace),
+    so readers never see a torn segment and no cross-process lock is needed
+  - Segments of exited workers are kept — their counts still belong to the
+    totals, which must stay monotonic; wipe the directory on deploy
+  - Flushes are skipped while `registry.version` is unchanged
+  - Collectors (caches, HTTP pool, …) stay process-local; the OpenMetrics
+    scrape labels them with the serving worker's pid
+
+Usage:
+    from src.core.multiproc import scrape_registry
+    merged = scrape_registry(registry)   # == registry when not multi-process
+"""
+
+from __future__ import annotations
+
+import atexit
+import glob
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.core.logging import get_logger
+from src.core.metrics import MetricsRegistry
+
+_logger = get_logger("metrics")
+
+_SEGMENT_GLOB = "metrics-*.json"
+
+
+class SegmentWriter:
+    """
+    Background flusher of one worker's registry to its segment file.
+
+    Args:
+        registry:   The process-local registry to persist.
+        directory:  Shared directory for all workers' segments.
+        interval_s: Flush period of the background thread.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str, interval_s: float = 1.0):
+        os.makedirs(directory, exist_ok=True)
+        self.registry = registry
+        self.directory = directory
+        self.interval_s = interval_s
+        self.path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+        self._flushed_version = -1
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def flush(self, force: bool = False) -> bool:
+        """Write the segment if anything was recorded since the last flush."""
+        with self._lock:
+            version = self.registry.version
+            if version == self._flushed_version and not force:
+                return False
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"pid": os.getpid(), "agents": self.registry.state()}, f)
+            os.replace(tmp, self.path)
+            self._flushed_version = version
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.flush()
+            except OSError as exc:
+                _logger.warning(f"Metrics segment flush failed: {exc}", extra={"event": "metrics_flush_error"})
+
+    def start(self) -> "SegmentWriter":
+        self._thread = threading.Thread(target=self._run, name="metrics-segment-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+
+def read_segments(directory: str) -> List[Dict[str, Any]]:
+    """Every worker's `{"pid": ..., "agents": state}` in `directory`."""
+    segments = []
+    for path in sorted(glob.glob(os.path.join(directory, _SEGMENT_GLOB))):
+        try:
+            with open(path, encoding="utf-8") as f:
+                segments.append(json.load(f))
+        except (OSError, ValueError) as exc:
+            _logger.warning(f"Skipping metrics segment {path}: {exc}", extra={"event": "metrics_segment_skipped"})
+    return segments
+
+
+def aggregate(directory: str, like: MetricsRegistry) -> MetricsRegistry:
+    """A fresh registry (configured like `like`) holding all segments merged."""
+    merged = MetricsRegistry(like.relative_accuracy, like.windows, like.slot_s, like.buckets_ms)
+    for segment in read_segments(directory):
+        merged.merge_state(segment["agents"])
+    return merged
+
+
+# ── Process-wide writer ───────────────────────────────────────────────────────
+
+_writer: Optional[SegmentWriter] = None
+_writer_lock = threading.Lock()
+
+
+def start_segment_writer(registry: MetricsRegistry) -> Optional[SegmentWriter]:
+    """Start this process's writer if `METRICS["multiproc_dir"]` is set (idempotent)."""
+    global _writer
+    from src.config import METRICS
+
+    if not METRICS["multiproc_dir"]:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = SegmentWriter(
+                registry, METRICS["multiproc_dir"], METRICS["flush_interval_s"]
+            ).start()
+    return _writer
+
+
+def scrape_registry(registry: MetricsRegistry) -> MetricsRegistry:
+    """
+    The registry a scrape should report: all workers merged in multi-process
+    mode, otherwise `registry` itself.
+    """
+    if _writer is None or _writer.registry is not registry:
+        return registry
+    _writer.flush()
+    return aggregate(_writer.directory, registry)
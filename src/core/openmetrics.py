@@ -0,0 +1,132 @@
+"""
+src/core/openmetrics.py
+─────────────────────────────────────────────────────────────────────────────
+OpenMetrics text exposition of a `MetricsRegistry` for Prometheus scrapes.
+
+Exported families (label `node` = agent/node name):
+  - career_node_latency_seconds   histogram (buckets from METRICS config)
+  - career_node_calls             counter
+  - career_node_errors            counter
+  - career_node_tokens            counter
+  - career_<collector>_<field>    counter (`_total` sample) for the fields a
+                                  collector registered as `counters`, gauge
+                                  for every other numeric top-level field
+                                  (ratios, averages, depths); labelled
+                                  `worker` (pid) in multi-process mode
+
+Design decisions:
+  - Latency is recorded in ms but exported in seconds (OpenMetrics base unit)
+  - Histogram buckets are exact counters kept next to the sketch, so `le`
+    buckets aggregate correctly across workers and in PromQL
+  - Nested collector values (per-route breakdowns, …) stay JSON-only
+  - Collectors are process-local while node metrics merge across workers,
+    so with several workers each collector sample carries the pid of the
+    worker that served the scrape — a counter is then monotonic per series
+    instead of jumping between workers (read as a reset by `rate()`)
+
+Usage:
+    from src.core.openmetrics import CONTENT_TYPE, render
+    Response(render(registry), media_type=CONTENT_TYPE)
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from src.core.metrics import MetricsRegistry
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_PREFIX = "career"
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _name(*parts: str) -> str:
+    return _INVALID_NAME.sub("_", "_".join(parts)).lower()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _num(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _node_families(registry: MetricsRegistry) -> List[str]:
+    latency = _name(_PREFIX, "node_latency_seconds")
+    lines = [
+        f"# TYPE {latency} histogram",
+        f"# UNIT {latency} seconds",
+        f"# HELP {latency} Wall-clock latency of a graph node invocation.",
+    ]
+    counters: Dict[str, List[str]] = {"calls": [], "errors": [], "tokens": []}
+
+    for node, metrics in sorted(registry.agents().items()):
+        node_label = f'node="{_label(node)}"'
+        bounds, cumulative, count, sum_ms = metrics.histogram()
+        for bound, n in zip(list(bounds) + [float("inf")], cumulative):
+            le = "+Inf" if bound == float("inf") else _num(bound / 1000.0)
+            lines.append(f'{latency}_bucket{{{node_label},le="{le}"}} {n}')
+        lines.append(f"{latency}_count{{{node_label}}} {count}")
+        lines.append(f"{latency}_sum{{{node_label}}} {_num(sum_ms / 1000.0)}")
+
+        with metrics.lock:
+            values = {"calls": metrics.calls, "errors": metrics.errors, "tokens": metrics.total_tokens}
+        for family, value in values.items():
+            counters[family].append(f"{_name(_PREFIX, 'node', family)}_total{{{node_label}}} {value}")
+
+    helps = {
+        "calls": "Graph node invocations.",
+        "errors": "Graph node invocations that returned an error.",
+        "tokens": "LLM tokens used by graph node invocations.",
+    }
+    for family, samples in counters.items():
+        name = _name(_PREFIX, "node", family)
+        lines += [f"# TYPE {name} counter", f"# HELP {name} {helps[family]}", *samples]
+    return lines
+
+
+def _collector_families(
+    collectors: Dict[str, Dict[str, Any]],
+    counters: Dict[str, FrozenSet[str]],
+    worker: Optional[str] = None,
+) -> List[str]:
+    labels = f'{{worker="{_label(worker)}"}}' if worker is not None else ""
+    lines = []
+    for collector, stats in sorted(collectors.items()):
+        monotonic = counters.get(collector, frozenset())
+        for field, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = _name(_PREFIX, collector, field)
+            if field in monotonic:
+                lines += [f"# TYPE {name} counter", f"{name}_total{labels} {_num(value)}"]
+            else:
+                lines += [f"# TYPE {name} gauge", f"{name}{labels} {_num(value)}"]
+    return lines
+
+
+def render(
+    registry: MetricsRegistry,
+    collectors: Optional[Dict[str, Dict[str, Any]]] = None,
+    counters: Optional[Dict[str, FrozenSet[str]]] = None,
+    worker: Optional[str] = None,
+) -> str:
+    """
+    OpenMetrics text for `registry`'s node metrics plus `collectors` and
+    their `counters` fields (both default to the registry's own collectors).
+    Pass `worker` when `registry` merges several processes but `collectors`
+    are one process's own.
+    """
+    if collectors is None:
+        collectors = registry.collect()
+    if counters is None:
+        counters = registry.collector_counters()
+    lines = _node_families(registry) + _collector_families(collectors, counters, worker)
+    return "\n".join(lines + ["# EOF"]) + "\n"
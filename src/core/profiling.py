@@ -0,0 +1,168 @@
+"""
+src/core/profiling.py
+─────────────────────────────────────────────────────────────────────────────
+Per-turn profiling — how much of a graph turn is Python, not network.
+
+`profile_turn()` times one graph turn and collects the network time reported
+inside it: every upstream LLM response (`_TogetherLLM`) and every search
+fan-out (`src.core.fanout`) calls `add_network_time`. What remains —
+graph scheduling, state merging, prompt building, checkpoint writes — is
+the turn's Python overhead. Each finished turn is:
+  1. recorded as "turn.overhead" / "turn.network" in the metrics registry
+     and counted by the "turn_profile" collector
+  2. passed to every hook added with `add_turn_hook` (benchmarks, tests)
+  3. logged when its overhead exceeds TURN_PROFILE["log_over_ms"]
+
+Design decisions:
+  - The scope is a ContextVar holding a mutable `TurnProfile`, like
+    `track_usage`: asyncio tasks started inside the turn add to it, and
+    work on threads that do not copy the context (the rolling summariser)
+    is not part of the turn
+  - Network time is wall time spent waiting on a response; concurrent
+    waits are each counted, so overhead is floored at zero
+  - Zero coupling: nothing here knows about graphs, agents or providers
+
+Usage:
+    from src.core.profiling import profile_turn
+    with profile_turn("chat") as turn:
+        graph.invoke(state, config)
+    print(turn.overhead_ms)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.core.logging import get_logger
+from src.core.metrics import registry
+
+_logger = get_logger("profiling")
+
+
+@dataclass
+class TurnProfile:
+    name: str
+    wall_ms: float = 0.0
+    network: Dict[str, float] = field(default_factory=dict)    # source → ms
+    calls: int = 0                                             # network waits
+
+    @property
+    def network_ms(self) -> float:
+        return sum(self.network.values())
+
+    @property
+    def overhead_ms(self) -> float:
+        return max(0.0, self.wall_ms - self.network_ms)
+
+
+# ── Stats ─────────────────────────────────────────────────────────────────────
+
+class _TurnStats:
+    """Thread-safe totals across profiled turns."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.turns = 0
+            self.wall_ms = 0.0
+            self.network_ms = 0.0
+            self.overhead_ms = 0.0
+            self.max_overhead_ms = 0.0
+
+    def add(self, turn: TurnProfile):
+        with self._lock:
+            self.turns += 1
+            self.wall_ms += turn.wall_ms
+            self.network_ms += turn.network_ms
+            self.overhead_ms += turn.overhead_ms
+            self.max_overhead_ms = max(self.max_overhead_ms, turn.overhead_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self.turns or 1
+            return {
+                "turns": self.turns,
+                "avg_wall_ms": round(self.wall_ms / n, 2),
+                "avg_network_ms": round(self.network_ms / n, 2),
+                "avg_overhead_ms": round(self.overhead_ms / n, 2),
+                "max_overhead_ms": round(self.max_overhead_ms, 2),
+                "overhead_share": round(self.overhead_ms / self.wall_ms, 4) if self.wall_ms else 0.0,
+            }
+
+
+stats = _TurnStats()
+registry.register_collector("turn_profile", stats.to_dict, counters=("turns",))
+
+
+# ── Hooks ─────────────────────────────────────────────────────────────────────
+
+_hooks: List[Callable[[TurnProfile], None]] = []
+
+
+def add_turn_hook(hook: Callable[[TurnProfile], None]) -> None:
+    """Call `hook(turn)` after every profiled turn (exceptions are logged, not raised)."""
+    _hooks.append(hook)
+
+
+def remove_turn_hook(hook: Callable[[TurnProfile], None]) -> None:
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+# ── Scopes ────────────────────────────────────────────────────────────────────
+
+_scope: ContextVar[Optional[TurnProfile]] = ContextVar("turn_profile", default=None)
+
+
+def add_network_time(ms: float, source: str = "llm") -> None:
+    """Attribute `ms` of waiting on `source` to the current `profile_turn()` scope."""
+    turn = _scope.get()
+    if turn is not None:
+        turn.network[source] = turn.network.get(source, 0.0) + ms
+        turn.calls += 1
+
+
+def _finish(turn: TurnProfile) -> None:
+    from src.config import TURN_PROFILE
+
+    stats.add(turn)
+    registry.record("turn.overhead", turn.overhead_ms)
+    registry.record("turn.network", turn.network_ms)
+    for hook in list(_hooks):
+        try:
+            hook(turn)
+        except Exception as exc:
+            _logger.warning(f"Turn hook {hook!r} failed: {exc}", extra={"event": "turn_hook_error"})
+    if turn.overhead_ms > TURN_PROFILE["log_over_ms"]:
+        _logger.info(
+            f"Turn {turn.name}: {turn.overhead_ms:.1f} ms overhead of {turn.wall_ms:.1f} ms "
+            f"({', '.join(f'{k} {v:.1f} ms' for k, v in turn.network.items()) or 'no network'})",
+            extra={"event": "turn_overhead"},
+        )
+
+
+@contextmanager
+def profile_turn(name: str = "turn") -> Iterator[TurnProfile]:
+    """Profile the block as one turn (disabled: yields an unrecorded profile)."""
+    from src.config import TURN_PROFILE
+
+    turn = TurnProfile(name)
+    if not TURN_PROFILE["enabled"]:
+        yield turn
+        return
+    token = _scope.set(turn)
+    t0 = time.perf_counter()
+    try:
+        yield turn
+    finally:
+        turn.wall_ms = (time.perf_counter() - t0) * 1000
+        _scope.reset(token)
+        _finish(turn)
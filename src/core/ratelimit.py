@@ -0,0 +1,249 @@
+"""
+src/core/ratelimit.py
+─────────────────────────────────────────────────────────────────────────────
+Process-wide adaptive rate limiting of LLM calls, one limiter per model.
+
+Every `_TogetherLLM` request first takes a slot from its model's
+`ModelLimiter`. Slots are handed out by reservation (GCRA, the virtual-time
+form of a token bucket): each caller is given the next free send time and
+sleeps until then, so callers queue in arrival order without a lock held
+while waiting, sync and async alike, and a burst of `burst` calls may go
+out at once after an idle period.
+
+The rate adapts (AIMD):
+  - every successful response adds RATE_LIMIT["increase"] req/s, up to `max_rps`
+  - a 429 multiplies it by `decrease` (at most once per `decrease_cooldown_s`,
+    so one burst of rejected in-flight calls counts once), down to `min_rps`,
+    and pauses the whole queue until the provider's `Retry-After` (or an
+    exponential backoff when there is none), plus jitter
+  - `x-ratelimit-remaining: 0` with `x-ratelimit-reset` pauses the queue
+    until the reset before a 429 is ever returned
+
+Design decisions:
+  - The retrying caller re-reserves behind the pause like everyone else,
+    so rate-limited workers resume spaced at the (lowered) rate instead of
+    all waking together after identical sleeps
+  - A caller whose slot is more than `max_wait_s` away gives up at once
+    (the call returns the usual "⚠️ Rate limit exceeded" message) rather
+    than holding a request open
+  - Limits are per process: with several API workers each adapts on its own
+  - Queue depth, waits and 429s per model are in the "llm_rate_limit"
+    collector; every wait is also recorded as "llm.rate_wait"
+
+Usage:
+    limiter = get_limiter(model)
+    if not limiter.acquire():
+        return RATE_LIMITED
+    resp = post(...)
+    if resp.status_code == 429:
+        limiter.on_rate_limited(resp.headers, attempt)
+    else:
+        limiter.on_response(resp.headers)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from src.core.metrics import registry
+
+
+def backoff_delay(attempt: int, base_s: float, cap_s: float, jitter: float) -> float:
+    """Exponential backoff for `attempt` (0-based), capped, with ±`jitter` spread."""
+    delay = min(cap_s, base_s * (2 ** attempt))
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+def _header_seconds(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(str(value).rstrip("s")))
+    except ValueError:
+        return None
+
+
+class ModelLimiter:
+    """Adaptive reservation-based token bucket for one model."""
+
+    def __init__(
+        self,
+        model: str,
+        rps: float = 10.0,
+        burst: int = 10,
+        min_rps: float = 0.2,
+        max_rps: float = 50.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        decrease_cooldown_s: float = 1.0,
+        max_wait_s: float = 30.0,
+        backoff_base_s: float = 1.0,
+        backoff_cap_s: float = 20.0,
+        jitter: float = 0.25,
+    ):
+        self.model = model
+        self.rate = rps
+        self.burst = burst
+        self.min_rps = min_rps
+        self.max_rps = max_rps
+        self.increase = increase
+        self.decrease = decrease
+        self.decrease_cooldown_s = decrease_cooldown_s
+        self.max_wait_s = max_wait_s
+        self.backoff_base_s = backoff_base_s
+        self.backoff_cap_s = backoff_cap_s
+        self.jitter = jitter
+
+        self._lock = threading.Lock()
+        self._next = 0.0              # earliest send time of the next reservation
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.queue_depth = 0
+            self.max_queue_depth = 0
+            self.acquired = 0
+            self.waited = 0
+            self.wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.rejected = 0
+            self.rate_limited = 0
+            self.header_pauses = 0
+
+    # ── Reservations ──────────────────────────────────────────────────────
+
+    def _reserve(self) -> Optional[float]:
+        """Seconds to wait for the next slot, or None if beyond `max_wait_s`."""
+        now = time.monotonic()
+        with self._lock:
+            interval = 1.0 / self.rate
+            # An idle bucket refills up to `burst` slots, never more
+            start = max(self._next, now - (self.burst - 1) * interval, self._paused_until)
+            wait = max(0.0, start - now)
+            if wait > self.max_wait_s:
+                self.rejected += 1
+                return None
+            self._next = start + interval
+            self.acquired += 1
+            if wait > 0:
+                self.waited += 1
+                self.queue_depth += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            return wait
+
+    def _waited(self, wait: float) -> None:
+        wait_ms = wait * 1000
+        with self._lock:
+            if wait > 0:
+                self.queue_depth -= 1
+            self.wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        registry.record("llm.rate_wait", wait_ms)
+
+    def acquire(self) -> bool:
+        """Block until this caller's slot; False if it is more than `max_wait_s` away."""
+        wait = self._reserve()
+        if wait is None:
+            return False
+        try:
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            self._waited(wait)
+        return True
+
+    async def aacquire(self) -> bool:
+        """Async twin of `acquire` — waits without blocking the event loop."""
+        wait = self._reserve()
+        if wait is None:
+            return False
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self._waited(wait)
+        return True
+
+    # ── Feedback ──────────────────────────────────────────────────────────
+
+    def on_response(self, headers: Mapping[str, str]) -> None:
+        """A non-429 response: additive increase, and honour an exhausted quota."""
+        remaining = _header_seconds(headers, "x-ratelimit-remaining")
+        reset = _header_seconds(headers, "x-ratelimit-reset")
+        with self._lock:
+            self.rate = min(self.max_rps, self.rate + self.increase)
+            if remaining is not None and remaining < 1 and reset:
+                self._paused_until = max(self._paused_until, time.monotonic() + reset)
+                self.header_pauses += 1
+
+    def on_rate_limited(self, headers: Mapping[str, str], attempt: int = 0) -> float:
+        """A 429: multiplicative decrease and a shared, jittered pause. Returns the pause (s)."""
+        retry_after = _header_seconds(headers, "retry-after")
+        if retry_after is None:
+            retry_after = _header_seconds(headers, "x-ratelimit-reset")
+        if retry_after is not None:
+            pause = retry_after * random.uniform(1.0, 1.0 + self.jitter)
+        else:
+            pause = backoff_delay(attempt, self.backoff_base_s, self.backoff_cap_s, self.jitter)
+        now = time.monotonic()
+        with self._lock:
+            self.rate_limited += 1
+            if now - self._last_decrease >= self.decrease_cooldown_s:
+                self.rate = max(self.min_rps, self.rate * self.decrease)
+                self._last_decrease = now
+            self._paused_until = max(self._paused_until, now + pause)
+        return pause
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate_rps": round(self.rate, 3),
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "avg_wait_ms": round(self.wait_ms / self.acquired, 2) if self.acquired else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+                "rejected": self.rejected,
+                "rate_limited": self.rate_limited,
+                "header_pauses": self.header_pauses,
+            }
+
+
+# ── Process-wide limiters ─────────────────────────────────────────────────────
+
+_limiters: Dict[str, ModelLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(model: str) -> Optional[ModelLimiter]:
+    """The model's shared limiter, created on first use; None when RATE_LIMIT is disabled."""
+    limiter = _limiters.get(model)
+    if limiter is None:
+        from src.config import RATE_LIMIT
+        if not RATE_LIMIT["enabled"]:
+            return None
+        with _limiters_lock:
+            limiter = _limiters.get(model)
+            if limiter is None:
+                settings = {k: v for k, v in RATE_LIMIT.items() if k != "enabled"}
+                limiter = _limiters[model] = ModelLimiter(model, **settings)
+    return limiter
+
+
+def reset_limiters() -> None:
+    """Forget every limiter (tests, benchmarks)."""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+registry.register_collector(
+    "llm_rate_limit", lambda: {model: lim.to_dict() for model, lim in sorted(_limiters.items())}
+)
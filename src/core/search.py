@@ -5,97 +5,613 @@ Search Tool Factory — single responsibility: build and return a search tool.
 
 Tries Google Search (MCP/API) first, falls back to DuckDuckGo automatically.
 All nodes call `get_search_tool()` — never import search libraries directly.
+Results are typed `SearchHit`s (src/core/search_results.py), rendered into
+prompt text only at prompt-build time; repeat queries are served from the
+search cache (src/core/search_cache.py).
+
+Design decisions:
+  - One long-lived `SearchBackends` registry per process; `get_search_tool()`
+    returns its tool instead of re-reading env vars on every node call
+  - Google goes through the shared pooled session (src/core/transport.py);
+    the DuckDuckGo client is built once, on first use
+  - Every backend has a circuit breaker: a quota error (HTTP 429 / 403
+    rateLimitExceeded) skips Google for `SEARCH_BACKENDS["quota_cooldown_s"]`,
+    and `failure_threshold` consecutive errors for `cooldown_s`, so requests
+    go straight to DuckDuckGo instead of paying Google's failure latency
+  - `reload_search_backends()` rebuilds the registry when the keys change
+    (called by the settings endpoints); unchanged keys are a no-op
+  - Hedged mode (`SEARCH_BACKENDS["hedged"]`): the primary backend starts at
+    once; when it has not answered within its own recent p95 (tracked per
+    backend over `latency_window_s`), the next backend is started too. The
+    first result set passing the quality check wins; backends not yet
+    started never are, and in-flight losers are abandoned (their results
+    still land in the cache). A 0 ms delay turns this into a full race.
+  - Concurrent searches for the same normalised query share one lookup
+    (`src.core.singleflight`, COALESCE["search"])
 """
 
 from __future__ import annotations
 
 import os
-from typing import Callable
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.logging import get_logger
+from src.core.metrics import registry
+from src.core.search_cache import get_search_cache, normalize_query
+from src.core.search_results import SearchHit, dedupe_hits, render_hits
+from src.core.singleflight import get_flights
+from src.core.sketch import WindowedSketch
+from src.core.transport import get_session
+import src.config  # noqa: F401 — loads .env before the Google keys are read
+
+_logger = get_logger("search")
 
-from dotenv import load_dotenv
+GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
 
-load_dotenv()
+# Google error reasons that mean "out of quota", not "broken request"
+_QUOTA_REASONS = frozenset({
+    "rateLimitExceeded", "userRateLimitExceeded", "dailyLimitExceeded", "quotaExceeded",
+})
 
 
 # ── Search result type ───────────────────────────────────────────────────────
 
 class SearchTool:
-    """Thin wrapper so nodes can call `tool.func(query)` uniformly."""
+    """Thin wrapper so nodes can call `tool.func(query)` → `List[SearchHit]` uniformly."""
 
-    def __init__(self, name: str, func: Callable[[str], str]):
+    def __init__(self, name: str, func: Callable[[str], List[SearchHit]]):
         self.name = name
         self.func = func
 
+    def text(self, query: str, max_tokens: Optional[int] = None) -> str:
+        """`func(query)` rendered for a prompt under the default token budget."""
+        return render_hits(self.func(query), max_tokens)
+
     def __repr__(self) -> str:
         return f"<SearchTool name={self.name!r}>"
 
 
-# ── Google Custom Search ─────────────────────────────────────────────────────
+class SearchQuotaError(RuntimeError):
+    """The backend refused the query because its quota / rate limit is spent."""
+
+
+# ── Health tracking ──────────────────────────────────────────────────────────
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one backend.
+
+    Closed → open after `failure_threshold` consecutive failures (for
+    `cooldown_s`) or a single quota error (for `quota_cooldown_s`). Once the
+    cooldown passes the breaker is half-open: one probe call is let through
+    and the rest are skipped until it resolves — its failure re-opens the
+    breaker immediately, its success closes it. A probe that never reports
+    back (e.g. served from the cache) is replaced after another `cooldown_s`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown_s: float = 30.0,
+        quota_cooldown_s: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.quota_cooldown_s = quota_cooldown_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0          # consecutive
+        self.open_until = 0.0
+        self.half_open = False     # tripped and not yet closed by a success
+        self.probe_until = 0.0     # lease of the probe in flight
+        self.trips = 0
+        self.skipped = 0           # calls refused while open
+
+    def available(self) -> bool:
+        """Whether `allow()` would let a call through right now (takes no probe)."""
+        with self._lock:
+            now = self._clock()
+            return not (now < self.open_until or (self.half_open and now < self.probe_until))
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            if now < self.open_until or (self.half_open and now < self.probe_until):
+                self.skipped += 1
+                return False
+            if self.half_open:
+                self.probe_until = now + self.cooldown_s
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.half_open = False
+            self.probe_until = 0.0
+
+    def record_failure(self, quota: bool = False):
+        with self._lock:
+            self.failures += 1
+            if quota or self.half_open or self.failures >= self.failure_threshold:
+                cooldown = self.quota_cooldown_s if quota else self.cooldown_s
+                self.open_until = self._clock() + cooldown
+                self.half_open = True
+                self.probe_until = 0.0
+                self.trips += 1
 
-def _google_search(query: str, num_results: int = 5) -> str:
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            remaining = self.open_until - self._clock()
+            return {
+                "state": "open" if remaining > 0 else "half_open" if self.half_open else "closed",
+                "open_for_s": round(max(remaining, 0.0), 1),
+                "consecutive_failures": self.failures,
+                "trips": self.trips,
+                "skipped": self.skipped,
+            }
+
+
+# ── Backends ─────────────────────────────────────────────────────────────────
+
+class SearchBackend:
     """
-    Call Google Custom Search API (CSE).
-    Requires GOOGLE_API_KEY and GOOGLE_CSE_ID in environment.
-    Returns formatted string of results.
+    A named `query → List[SearchHit]` function with its own health state
+    and a sliding window of its recent call latencies.
     """
-    import requests as _req
 
-    api_key = os.getenv("GOOGLE_API_KEY", "")
-    cse_id  = os.getenv("GOOGLE_CSE_ID", "")
+    name = "backend"
+
+    def __init__(self, breaker: Optional[CircuitBreaker] = None, latency_window_s: float = 600.0):
+        self.health = breaker or CircuitBreaker()
+        self.calls = 0
+        self.errors = 0
+        self.wins = 0              # hedged searches this backend answered
+        self.latency_window_s = latency_window_s
+        self._latency = WindowedSketch({"recent": latency_window_s}, slot_s=latency_window_s / 10)
+        self._latency_lock = threading.Lock()
+
+    def search(self, query: str) -> List[SearchHit]:
+        raise NotImplementedError
+
+    def run(self, query: str) -> List[SearchHit]:
+        """`search(query)` with the outcome recorded on the breaker and latency window."""
+        self.calls += 1
+        t0 = time.perf_counter()
+        try:
+            result = self.search(query)
+        except Exception as exc:
+            self.errors += 1
+            self.health.record_failure(quota=isinstance(exc, SearchQuotaError))
+            raise
+        finally:
+            with self._latency_lock:
+                self._latency.add((time.perf_counter() - t0) * 1000)
+        self.health.record_success()
+        return result
+
+    def latency_ms(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """Recent latency quantile, or None with fewer than `min_samples` calls."""
+        with self._latency_lock:
+            recent = self._latency.window(self.latency_window_s)
+        if recent.count < min_samples:
+            return None
+        return recent.quantile(q)
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50, p95 = self.latency_ms(0.5), self.latency_ms(0.95)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "wins": self.wins,
+            "p50_ms": round(p50, 1) if p50 is not None else 0,
+            "p95_ms": round(p95, 1) if p95 is not None else 0,
+            **self.health.to_dict(),
+        }
+
+
+class GoogleSearchBackend(SearchBackend):
+    """Google Custom Search API (CSE) over the shared keep-alive pool."""
+
+    name = "google_search"
+
+    def __init__(
+        self,
+        api_key: str,
+        cse_id: str,
+        num_results: int = 5,
+        timeout_s: float = 10.0,
+        breaker: Optional[CircuitBreaker] = None,
+        latency_window_s: float = 600.0,
+    ):
+        super().__init__(breaker, latency_window_s)
+        self.api_key = api_key
+        self.cse_id = cse_id
+        self.num_results = num_results
+        self.timeout_s = timeout_s
+
+    def search(self, query: str) -> List[SearchHit]:
+        resp = get_session().get(
+            GOOGLE_CSE_URL,
+            params={"key": self.api_key, "cx": self.cse_id, "q": query, "num": self.num_results},
+            timeout=self.timeout_s,
+        )
+        if resp.status_code in (403, 429) and self._is_quota_error(resp):
+            raise SearchQuotaError(f"Google search quota exhausted (HTTP {resp.status_code})")
+        resp.raise_for_status()
+
+        fetched_at = time.time()
+        return [
+            SearchHit(
+                title=item.get("title", ""),
+                url=item.get("link", ""),
+                snippet=item.get("snippet", ""),
+                source=self.name,
+                fetched_at=fetched_at,
+            )
+            for item in resp.json().get("items", [])
+        ]
+
+    @staticmethod
+    def _is_quota_error(resp) -> bool:
+        if resp.status_code == 429:
+            return True
+        try:
+            errors = resp.json().get("error", {}).get("errors", [])
+        except ValueError:
+            return False
+        return any(e.get("reason") in _QUOTA_REASONS for e in errors)
+
+
+class DuckDuckGoSearchBackend(SearchBackend):
+    """DuckDuckGo (no API key required); the client is built once, lazily."""
+
+    name = "duckduckgo_search"
+
+    def __init__(
+        self,
+        num_results: int = 5,
+        breaker: Optional[CircuitBreaker] = None,
+        latency_window_s: float = 600.0,
+    ):
+        super().__init__(breaker, latency_window_s)
+        self.num_results = num_results
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+                    self._client = DuckDuckGoSearchAPIWrapper()
+        return self._client
+
+    def search(self, query: str) -> List[SearchHit]:
+        fetched_at = time.time()
+        return [
+            SearchHit(
+                title=item.get("title", ""),
+                url=item.get("link", ""),
+                snippet=item.get("snippet", ""),
+                source=self.name,
+                fetched_at=fetched_at,
+            )
+            for item in self._get_client().results(query, self.num_results)
+            if "link" in item or "snippet" in item
+        ]
+
+
+# ── Hedging ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class HedgePolicy:
+    """When to start the next backend, and what counts as a good-enough answer."""
 
-    if not api_key or not cse_id:
-        raise EnvironmentError("GOOGLE_API_KEY or GOOGLE_CSE_ID not set")
+    enabled: bool = True
+    delay_ms: float = 800.0            # used until a backend has `min_samples` calls
+    quantile: float = 0.95
+    min_delay_ms: float = 50.0
+    max_delay_ms: float = 3000.0
+    min_samples: int = 20
+    min_hits: int = 3
+    merge_window_ms: float = 0.0
 
-    resp = _req.get(
-        "https://www.googleapis.com/customsearch/v1",
-        params={"key": api_key, "cx": cse_id, "q": query, "num": num_results},
-        timeout=10,
+    @classmethod
+    def from_config(cls) -> "HedgePolicy":
+        from src.config import SEARCH_BACKENDS as cfg
+        return cls(
+            enabled=cfg["hedged"],
+            delay_ms=cfg["hedge_delay_ms"],
+            quantile=cfg["hedge_quantile"],
+            min_delay_ms=cfg["hedge_min_delay_ms"],
+            max_delay_ms=cfg["hedge_max_delay_ms"],
+            min_samples=cfg["hedge_min_samples"],
+            min_hits=cfg["hedge_min_hits"],
+            merge_window_ms=cfg["merge_window_ms"],
+        )
+
+    def delay_for(self, backend: SearchBackend) -> float:
+        """Seconds to wait on `backend` before hedging with the next one."""
+        observed = backend.latency_ms(self.quantile, self.min_samples)
+        if observed is None:
+            observed = self.delay_ms
+        return min(max(observed, self.min_delay_ms), self.max_delay_ms) / 1000
+
+    def good_enough(self, hits: List[SearchHit]) -> bool:
+        return sum(1 for h in hits if h.url and h.snippet) >= self.min_hits
+
+
+class _HedgeStats:
+    """Thread-safe counters for hedged searches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.searches = 0
+            self.hedged = 0            # a second (or later) backend was started
+            self.avoided = 0           # primary answered before the hedge delay
+            self.merged = 0            # results of several backends merged
+            self.below_quality = 0     # no backend passed the check; best effort returned
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "searches": self.searches,
+                "hedged": self.hedged,
+                "avoided": self.avoided,
+                "merged": self.merged,
+                "below_quality": self.below_quality,
+            }
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool for hedged backend calls — separate from the fan-out pool that calls us."""
+    global _executor
+    if _executor is None:
+        from src.config import SEARCH_BACKENDS
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=SEARCH_BACKENDS["max_workers"], thread_name_prefix="search-hedge",
+                )
+    return _executor
+
+
+# ── Registry ─────────────────────────────────────────────────────────────────
+
+def _breaker() -> CircuitBreaker:
+    from src.config import SEARCH_BACKENDS
+    return CircuitBreaker(
+        failure_threshold=SEARCH_BACKENDS["failure_threshold"],
+        cooldown_s=SEARCH_BACKENDS["cooldown_s"],
+        quota_cooldown_s=SEARCH_BACKENDS["quota_cooldown_s"],
     )
-    resp.raise_for_status()
-    data = resp.json()
 
-    items = data.get("items", [])
-    if not items:
-        return f"No Google results found for: {query}"
 
-    lines = []
-    for item in items:
-        title   = item.get("title", "")
-        link    = item.get("link", "")
-        snippet = item.get("snippet", "")
-        lines.append(f"**{title}**\n{snippet}\n{link}")
+def _google_keys() -> Tuple[str, str]:
+    return os.getenv("GOOGLE_API_KEY", "").strip(), os.getenv("GOOGLE_CSE_ID", "").strip()
+
+
+class SearchBackends:
+    """
+    Long-lived, ordered set of search backends (Google first when keyed).
+
+    `search(query)` uses every backend whose breaker is closed, through the
+    search cache — hedged (see `HedgePolicy`) or one after another — and
+    returns the first good hit list; if every backend fails, comes back
+    empty or is cooling down it returns []. Identical concurrent queries
+    are coalesced into one lookup.
+    """
 
-    return "\n\n".join(lines)
+    def __init__(self, fallback: Optional[SearchBackend] = None, hedge: Optional[HedgePolicy] = None):
+        from src.config import SEARCH_BACKENDS
+        self._lock = threading.Lock()
+        self._keys: Optional[Tuple[str, str]] = None
+        if fallback is None:
+            fallback = DuckDuckGoSearchBackend(
+                SEARCH_BACKENDS["num_results"],
+                breaker=_breaker(),
+                latency_window_s=SEARCH_BACKENDS["latency_window_s"],
+            )
+        self._fallback = fallback
+        self.hedge = hedge or HedgePolicy.from_config()
+        self.hedge_stats = _HedgeStats()
+        self.backends: List[SearchBackend] = [self._fallback]
+        self.tool = SearchTool(name=self._fallback.name, func=self.search)
 
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild from the current env keys. Returns False if nothing changed."""
+        keys = _google_keys()
+        with self._lock:
+            if keys == self._keys and not force:
+                return False
+            backends: List[SearchBackend] = []
+            if all(keys):
+                from src.config import SEARCH_BACKENDS
+                backends.append(GoogleSearchBackend(
+                    *keys,
+                    num_results=SEARCH_BACKENDS["num_results"],
+                    timeout_s=SEARCH_BACKENDS["timeout_s"],
+                    breaker=_breaker(),
+                    latency_window_s=SEARCH_BACKENDS["latency_window_s"],
+                ))
+            backends.append(self._fallback)          # keeps its lazily built client
+            self.backends = backends
+            self._keys = keys
+            self.tool = SearchTool(name=backends[0].name, func=self.search)
+        if all(keys):
+            _logger.info("Search backends: Google Custom Search API, DuckDuckGo fallback",
+                         extra={"event": "search_backends_loaded"})
+        else:
+            _logger.info("Search backends: Google keys not set — using DuckDuckGo",
+                         extra={"event": "search_backends_loaded"})
+        return True
 
-# ── DuckDuckGo fallback ──────────────────────────────────────────────────────
+    def search(self, query: str) -> List[SearchHit]:
+        from src.config import COALESCE
+        if not COALESCE["search"]:
+            return self._search(query)
+        hits, shared = get_flights("search").do(normalize_query(query), lambda: self._search(query))
+        return list(hits) if shared else hits
 
-def _duckduckgo_search(query: str) -> str:
-    """Fallback search using DuckDuckGo (no API key required)."""
-    try:
-        from langchain_community.tools import DuckDuckGoSearchRun
-        ddg = DuckDuckGoSearchRun()
-        return ddg.run(query)
-    except Exception as exc:
-        return f"Search unavailable: {exc}"
+    def _search(self, query: str) -> List[SearchHit]:
+        # allow() is only called right before a backend is tried, so a half-open
+        # backend's probe is not taken by a search that never reaches it
+        available = [b for b in self.backends if b.health.available()]
+        if self.hedge.enabled and len(available) > 1:
+            return self._hedged(query, available)
+        for backend in (b for b in available if b.health.allow()):
+            hits = self._fetch(backend, query)
+            if hits:
+                return hits
+        return []
+
+    def _fetch(self, backend: SearchBackend, query: str) -> List[SearchHit]:
+        """One backend through the cache; failures are logged and yield []."""
+        cache = get_search_cache()
+        try:
+            return cache.get(backend.name, query, backend.run) if cache is not None else backend.run(query)
+        except Exception as exc:
+            _logger.warning(f"{backend.name} failed: {exc}", extra={"event": "search_backend_error"})
+            return []
+
+    def _hedged(self, query: str, backends: List[SearchBackend]) -> List[SearchHit]:
+        pool = _get_executor()
+        queue = list(backends)
+        running: Dict[Future, SearchBackend] = {}
+        results: List[Tuple[SearchBackend, List[SearchHit]]] = []
+        winner: Optional[Tuple[SearchBackend, List[SearchHit]]] = None
+        launched = 0
+
+        def launch() -> Optional[float]:
+            """Start the next backend its breaker admits; its hedge deadline, or None."""
+            nonlocal launched
+            while queue:
+                backend = queue.pop(0)
+                if backend.health.allow():
+                    running[pool.submit(self._fetch, backend, query)] = backend
+                    launched += 1
+                    return time.perf_counter() + self.hedge.delay_for(backend)
+            return None
+
+        hedge_at = launch()
+        while running or queue:
+            if not running:                           # everything so far failed fast
+                hedge_at = launch()
+                if hedge_at is not None:
+                    self.hedge_stats.add(hedged=1)
+                continue
+            timeout = max(0.0, hedge_at - time.perf_counter()) if queue else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:                              # hedge delay passed, no answer yet
+                hedge_at = launch()
+                if hedge_at is not None:
+                    self.hedge_stats.add(hedged=1)
+                continue
+            for fut in done:
+                backend = running.pop(fut)
+                hits = fut.result()
+                results.append((backend, hits))
+                if winner is None and self.hedge.good_enough(hits):
+                    winner = (backend, hits)
+            if winner is not None:
+                break
+
+        hits = self._settle(winner, results, running)
+        for fut in running:
+            fut.cancel()                              # running calls are abandoned
+        self.hedge_stats.add(searches=1, avoided=int(launched == 1))
+        return hits
+
+    def _settle(
+        self,
+        winner: Optional[Tuple[SearchBackend, List[SearchHit]]],
+        results: List[Tuple[SearchBackend, List[SearchHit]]],
+        running: Dict[Future, SearchBackend],
+    ) -> List[SearchHit]:
+        """The winner's hits, merged with late arrivals inside the merge window."""
+        if winner is None:
+            # Nobody passed the quality check: best effort, priority order breaks ties
+            best = max((hits for _, hits in results), key=len, default=[])
+            if best:
+                self.hedge_stats.add(below_quality=1)
+            return best
+
+        backend, hits = winner
+        backend.wins += 1
+        if self.hedge.merge_window_ms <= 0:
+            return hits
+
+        if running:
+            done, _ = wait(running, timeout=self.hedge.merge_window_ms / 1000)
+            for fut in done:
+                results.append((running.pop(fut), fut.result()))
+        extra = [h for b, other in results if b is not backend for h in other]
+        if not extra:
+            return hits
+        merged, _ = dedupe_hits([*hits, *extra])
+        if len(merged) > len(hits):
+            self.hedge_stats.add(merged=1)
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {b.name: b.to_dict() for b in self.backends}
+        out["hedge"] = self.hedge_stats.to_dict()
+        return out
+
+
+_backends: Optional[SearchBackends] = None
+_backends_lock = threading.Lock()
+
+
+def get_search_backends() -> SearchBackends:
+    """Return the process-wide backend registry, building it on first use."""
+    global _backends
+    if _backends is None:
+        with _backends_lock:
+            if _backends is None:
+                backends = SearchBackends()
+                backends.reload()
+                _backends = backends
+    return _backends
+
+
+def reload_search_backends() -> bool:
+    """Pick up changed GOOGLE_API_KEY / GOOGLE_CSE_ID (e.g. after /api/settings)."""
+    return get_search_backends().reload()
+
+
+registry.register_collector(
+    "search_backends", lambda: _backends.to_dict() if _backends is not None else {}
+)
 
 
 # ── Public factory ───────────────────────────────────────────────────────────
 
 def get_search_tool() -> SearchTool:
     """
-    Return a `SearchTool` using the best available search backend.
+    Return the process-wide `SearchTool` using the best available backend.
 
     Priority:
     1. Google Custom Search API (if GOOGLE_API_KEY + GOOGLE_CSE_ID are set)
-    2. DuckDuckGo (always available, no key needed)
+    2. DuckDuckGo (always available, no key needed) — also used while
+       Google's circuit breaker is open
     """
-    google_key = os.getenv("GOOGLE_API_KEY", "").strip()
-    google_cse = os.getenv("GOOGLE_CSE_ID", "").strip()
-
-    if google_key and google_cse:
-        print("[search] Using Google Custom Search API")
-        return SearchTool(name="google_search", func=_google_search)
-
-    print("[search] Google keys not set — using DuckDuckGo fallback")
-    return SearchTool(name="duckduckgo_search", func=_duckduckgo_search)
+    return get_search_backends().tool
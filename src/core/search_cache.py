@@ -0,0 +1,261 @@
+"""
+src/core/search_cache.py
+─────────────────────────────────────────────────────────────────────────────
+Persistent search-result cache under `SearchTool`.
+
+Dozens of users asking for "Data Scientist jobs Bangalore Full-time 2026"
+in the same hour should cost one backend call, not dozens. `SearchCache`
+wraps a backend function (`query → List[SearchHit]`) and serves repeats
+from a `SqliteCache`:
+
+  - Queries are normalised before keying: case, whitespace and surrounding
+    punctuation are folded, and tokens are sorted when the query has no
+    quoted phrases or search operators (order is then irrelevant to the
+    backends' ranking)
+  - Freshness depends on the query kind — salary benchmarks move slowly,
+    job postings quickly (`SEARCH_CACHE["freshness_s"]`) — capped by a
+    per-backend TTL (`SEARCH_CACHE["backend_ttl_s"]`)
+  - Stale-while-revalidate: for `stale_s` after an entry goes stale it is
+    still returned immediately while one background refresh replaces it
+  - Empty result lists are never cached
+
+Design decisions:
+  - Entries are the hit list as JSON; each hit keeps its original
+    `fetched_at`, so prompts can tell how old a cached result is
+  - Freshness lives in the stored JSON (`fresh_until`); the SQLite TTL is
+    fresh + stale window, so SqliteCache's own expiry/LRU still bounds disk
+  - At most one refresh per key is in flight; refreshes run on daemon
+    threads and never block the caller
+  - Every cached entry remembers how long the backend took to produce it,
+    so hits report the latency they saved
+
+Usage:
+    from src.core.search_cache import get_search_cache
+    result = get_search_cache().get("google_search", query, backend.run)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.cache import SqliteCache
+from src.core.logging import get_logger
+from src.core.metrics import registry
+from src.core.search_results import SearchHit
+
+_logger = get_logger("search")
+
+SearchFunc = Callable[[str], List[SearchHit]]
+
+# Quoted phrases and operators make token order (and case, for OR/AND) significant
+_ORDER_SENSITIVE = re.compile(r'["\']|\b(?:OR|AND|NOT)\b|(?:^|\s)[-+]\w|\w:\S')
+_EDGE_PUNCT = re.compile(r"^[^\w#+]+|[^\w#+]+$")
+
+_SALARY_WORDS = frozenset({
+    "salary", "salaries", "compensation", "pay", "ctc", "payscale", "levels.fyi", "lpa",
+})
+_JOB_WORDS = frozenset({"jobs", "job", "hiring", "openings", "vacancies", "careers"})
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical cache form of `query`.
+
+    "Data Scientist  jobs, Bangalore" and "bangalore data scientist jobs"
+    normalise alike; "\"data scientist\" site:naukri.com" keeps its order.
+    """
+    if _ORDER_SENSITIVE.search(query):
+        return " ".join(query.split())
+    tokens = [_EDGE_PUNCT.sub("", t) for t in query.lower().split()]
+    return " ".join(sorted(t for t in tokens if t))
+
+
+def query_kind(query: str) -> str:
+    """"salary", "jobs" or "default" — selects the freshness window."""
+    tokens = set(query.lower().split())
+    if tokens & _SALARY_WORDS:
+        return "salary"
+    if tokens & _JOB_WORDS:
+        return "jobs"
+    return "default"
+
+
+# ── Stats ─────────────────────────────────────────────────────────────────────
+
+class SearchCacheStats:
+    """Thread-safe counters for the search cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.stale_hits = 0        # served stale, refreshed in background
+            self.misses = 0
+            self.refreshes = 0
+            self.refresh_errors = 0
+            self.saved_ms = 0.0        # backend latency avoided by hits
+            self.backend_ms = 0.0      # latency actually spent on misses
+
+    def add(self, **counts: float):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            served = self.hits + self.stale_hits
+            lookups = served + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round(served / lookups, 4) if lookups else 0,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "saved_ms": round(self.saved_ms, 1),
+                "backend_ms": round(self.backend_ms, 1),
+            }
+
+
+search_cache_stats = SearchCacheStats()
+
+registry.register_collector("search_cache", search_cache_stats.to_dict, counters=(
+    "hits", "stale_hits", "misses", "refreshes", "refresh_errors", "saved_ms", "backend_ms",
+))
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+class SearchCache:
+    """
+    Stale-while-revalidate cache of search results.
+
+    Args:
+        store:         Backing SqliteCache (shared by all backends).
+        freshness_s:   Query kind ("salary" / "jobs" / "default") → seconds fresh.
+        backend_ttl_s: Backend name → upper bound on freshness.
+        stale_s:       Grace period during which stale entries are still served.
+        stats:         Counters to update (default: the registered singleton).
+    """
+
+    def __init__(
+        self,
+        store: SqliteCache,
+        freshness_s: Dict[str, float],
+        backend_ttl_s: Optional[Dict[str, float]] = None,
+        stale_s: float = 0.0,
+        stats: Optional[SearchCacheStats] = None,
+    ):
+        self.store = store
+        self.freshness_s = freshness_s
+        self.backend_ttl_s = backend_ttl_s or {}
+        self.stale_s = stale_s
+        self.stats = stats or search_cache_stats
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    def fresh_for(self, backend: str, query: str) -> float:
+        fresh = self.freshness_s.get(query_kind(query), self.freshness_s.get("default", 0))
+        return min(fresh, self.backend_ttl_s.get(backend, fresh))
+
+    @staticmethod
+    def key(backend: str, query: str) -> str:
+        return hashlib.sha256(f"{backend}\0{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, backend: str, query: str, fetch: SearchFunc) -> List[SearchHit]:
+        """Result for `query`, from cache when possible, else via `fetch`."""
+        key = self.key(backend, query)
+        raw = self.store.get(key)
+        if raw is not None:
+            entry = json.loads(raw)
+            hits = [SearchHit.from_dict(h) for h in entry["hits"]]
+            if entry["fresh_until"] > time.time():
+                self.stats.add(hits=1, saved_ms=entry["ms"])
+                return hits
+            self.stats.add(stale_hits=1, saved_ms=entry["ms"])
+            self._refresh_in_background(key, backend, query, fetch)
+            return hits
+
+        self.stats.add(misses=1)
+        return self._fetch_and_store(key, backend, query, fetch)
+
+    def wrap(self, backend: str, fetch: SearchFunc) -> SearchFunc:
+        """`fetch` with this cache in front of it (the shape `SearchTool.func` expects)."""
+        def cached(query: str) -> List[SearchHit]:
+            return self.get(backend, query, fetch)
+        cached.__name__ = getattr(fetch, "__name__", "cached_search")
+        cached.__wrapped__ = fetch
+        return cached
+
+    # ── Internals ──────────────────────────────────────────────────────────
+
+    def _fetch_and_store(self, key: str, backend: str, query: str, fetch: SearchFunc) -> List[SearchHit]:
+        t0 = time.perf_counter()
+        hits = fetch(query)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        self.stats.add(backend_ms=elapsed_ms)
+        if hits:
+            fresh = self.fresh_for(backend, query)
+            entry = {
+                "hits": [h.to_dict() for h in hits],
+                "fresh_until": time.time() + fresh,
+                "ms": round(elapsed_ms, 1),
+            }
+            self.store.set(key, json.dumps(entry), ttl_s=fresh + self.stale_s)
+        return hits
+
+    def _refresh_in_background(self, key: str, backend: str, query: str, fetch: SearchFunc):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._fetch_and_store(key, backend, query, fetch)
+                self.stats.add(refreshes=1)
+            except Exception as exc:
+                self.stats.add(refresh_errors=1)
+                _logger.warning(f"Search cache refresh failed: {exc}", extra={"event": "search_cache_refresh_error"})
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="search-cache-refresh", daemon=True).start()
+
+
+# ── Process-wide cache ────────────────────────────────────────────────────────
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Return the process-wide search cache, or None if disabled in config."""
+    global _cache
+    if _cache is None:
+        from src.config import SEARCH_CACHE
+        if not SEARCH_CACHE["enabled"]:
+            return None
+        with _cache_lock:
+            if _cache is None:
+                store = SqliteCache(
+                    SEARCH_CACHE["path"],
+                    ttl_s=SEARCH_CACHE["freshness_s"]["default"],
+                    max_bytes=int(SEARCH_CACHE["max_mb"] * 1024 * 1024),
+                )
+                _cache = SearchCache(
+                    store,
+                    freshness_s=SEARCH_CACHE["freshness_s"],
+                    backend_ttl_s=SEARCH_CACHE["backend_ttl_s"],
+                    stale_s=SEARCH_CACHE["stale_s"],
+                )
+    return _cache
@@ -0,0 +1,228 @@
+"""
+src/core/search_results.py
+─────────────────────────────────────────────────────────────────────────────
+Typed search hits and the prompt-time rendering step.
+
+Backends return `SearchHit`s (title, url, snippet, source, fetched_at)
+instead of one pre-rendered Markdown string, so hits can be de-duplicated,
+ranked, trimmed and cached individually. Text is produced only when a node
+builds its prompt, by `render_hits(hits, max_tokens)`, which stops adding
+hits once the token budget is spent.
+
+Design decisions:
+  - Hit identity is the normalised URL: scheme, "www.", host case, trailing
+    slash, fragment and tracking parameters (utm_*, gclid, …) are dropped,
+    the remaining query parameters are kept in sorted order — job boards
+    tell postings apart by them (Indeed `jk`, LinkedIn `currentJobId`).
+    Hits without a URL fall back to their normalised title + snippet
+  - Relevance is the share of the caller's key terms (e.g. the job title)
+    that appear in a hit's title or snippet — cheap, deterministic, and good
+    enough to drop the off-topic hits search engines pad results with
+  - Budgets are measured with `src.core.usage.estimate_tokens`, the same
+    estimator used for token accounting
+  - The "search_results" collector shows what selection and budgeting saved
+
+Usage:
+    from src.core.search_results import render_hits, select_hits
+    hits = select_hits(hits, terms="Data Engineer")
+    prompt = template.format(search_results=render_hits(hits, max_tokens=600))
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from src.core.metrics import registry
+from src.core.usage import estimate_tokens
+
+NO_RESULTS = "No live search results available."
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "of", "for", "in", "on", "at", "to", "with", "or",
+    "jobs", "job", "2025", "2026", "remote", "any", "not", "specified",
+})
+# Query parameters that only track the click, never select the page
+_TRACKING_PARAMS = frozenset({
+    "gclid", "fbclid", "msclkid", "dclid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_hsenc", "_hsmi", "trk", "trackingid", "refid", "ref_src",
+})
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param.startswith("utm_") or param in _TRACKING_PARAMS
+
+
+@dataclass
+class SearchHit:
+    title: str
+    url: str
+    snippet: str
+    source: str                                   # backend name
+    fetched_at: float = field(default_factory=time.time)
+
+    @property
+    def key(self) -> str:
+        """Identity used for de-duplication across queries and backends."""
+        if self.url:
+            parts = urlsplit(self.url.strip())
+            host = parts.netloc.lower()
+            host = host[4:] if host.startswith("www.") else host
+            query = urlencode(sorted(
+                (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)
+            ))
+            return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else "")
+        return " ".join(_WORD.findall(f"{self.title} {self.snippet}".lower()))[:160]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchHit":
+        return cls(**{k: data[k] for k in ("title", "url", "snippet", "source", "fetched_at") if k in data})
+
+    def render(self) -> str:
+        return f"**{self.title}** ({self.source})\n{self.snippet}\n{self.url}".rstrip()
+
+
+def dedupe_hits(hits: Iterable[SearchHit]) -> tuple[List[SearchHit], int]:
+    """First occurrence of every hit (by `SearchHit.key`). Returns (hits, dropped)."""
+    out, seen, dropped = [], set(), 0
+    for hit in hits:
+        key = hit.key
+        if key in seen:
+            dropped += 1
+            continue
+        seen.add(key)
+        out.append(hit)
+    return out, dropped
+
+
+def key_terms(text: str) -> List[str]:
+    return [w for w in dict.fromkeys(_WORD.findall(text.lower())) if w not in _STOPWORDS]
+
+
+def relevance(hit: SearchHit, terms: Sequence[str]) -> float:
+    """Share of `terms` found in the hit's title or snippet (1.0 when no terms)."""
+    if not terms:
+        return 1.0
+    words = set(_WORD.findall(f"{hit.title} {hit.snippet}".lower()))
+    return sum(t in words for t in terms) / len(terms)
+
+
+# ── Stats ─────────────────────────────────────────────────────────────────────
+
+class _ResultStats:
+    """Thread-safe counters for hit selection and prompt rendering."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.selected = 0
+            self.dropped_duplicates = 0
+            self.dropped_irrelevant = 0
+            self.rendered_hits = 0
+            self.trimmed_hits = 0          # cut by the token budget
+            self.prompt_tokens = 0
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "selected": self.selected,
+                "dropped_duplicates": self.dropped_duplicates,
+                "dropped_irrelevant": self.dropped_irrelevant,
+                "rendered_hits": self.rendered_hits,
+                "trimmed_hits": self.trimmed_hits,
+                "prompt_tokens": self.prompt_tokens,
+            }
+
+
+stats = _ResultStats()
+
+registry.register_collector("search_results", stats.to_dict, counters=(
+    "selected", "dropped_duplicates", "dropped_irrelevant", "rendered_hits", "trimmed_hits", "prompt_tokens",
+))
+
+
+# ── Selection + rendering ─────────────────────────────────────────────────────
+
+def select_hits(
+    hits: Iterable[SearchHit],
+    terms: str = "",
+    min_relevance: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> List[SearchHit]:
+    """
+    De-duplicate `hits`, drop those below `min_relevance` for `terms`, and
+    return the rest best-first (backend rank breaks ties).
+
+    The threshold is relative: `min_relevance` of the best hit's score.
+    A precise title (best ≈ 1.0) filters as usual; a chat sentence, whose
+    many words no hit fully matches, keeps the hits closest to it. Unique
+    hits never select to [].
+    """
+    from src.config import SEARCH_RESULTS
+
+    min_relevance = SEARCH_RESULTS["min_relevance"] if min_relevance is None else min_relevance
+    limit = SEARCH_RESULTS["max_hits"] if limit is None else limit
+
+    unique, duplicates = dedupe_hits(hits)
+    wanted = key_terms(terms)
+    scored = [(relevance(h, wanted), i, h) for i, h in enumerate(unique)]
+    threshold = min_relevance * max((s for s, _, _ in scored), default=0.0)
+    kept = [(s, i, h) for s, i, h in scored if s >= threshold]
+    kept.sort(key=lambda t: (-t[0], t[1]))
+    selected = [h for _, _, h in kept[:limit]]
+
+    stats.add(
+        selected=len(selected),
+        dropped_duplicates=duplicates,
+        dropped_irrelevant=len(scored) - len(kept),
+    )
+    return selected
+
+
+def render_hits(hits: Sequence[SearchHit], max_tokens: Optional[int] = None) -> str:
+    """Prompt text for `hits`, stopping before the block would exceed `max_tokens`."""
+    from src.config import SEARCH_RESULTS
+
+    if not hits:
+        return NO_RESULTS
+    budget = SEARCH_RESULTS["prompt_tokens"] if max_tokens is None else max_tokens
+
+    blocks, used = [], 0
+    for hit in hits:
+        block = hit.render()
+        cost = estimate_tokens(block) + 1
+        if used + cost > budget:
+            if not blocks:                       # always show the best hit, clipped
+                block = _clip(block, budget)
+                blocks.append(block)
+                used = estimate_tokens(block)
+            break
+        blocks.append(block)
+        used += cost
+
+    stats.add(rendered_hits=len(blocks), trimmed_hits=len(hits) - len(blocks), prompt_tokens=used)
+    return "\n\n".join(blocks)
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    words = text.split(" ")
+    while len(words) > 1 and estimate_tokens(" ".join(words)) > max_tokens:
+        words = words[: max(1, len(words) * 3 // 4)]
+    return " ".join(words) + " …"
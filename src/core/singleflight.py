@@ -0,0 +1,139 @@
+"""
+src/core/singleflight.py
+─────────────────────────────────────────────────────────────────────────────
+Request coalescing: concurrent calls with the same key share one execution.
+
+A popular tutorial topic or a repeated router classification arriving from
+several users at once would otherwise cost one identical upstream call
+each. `SingleFlight.do(key, fn)` runs `fn` for the first caller (the
+leader); callers that arrive with the same key while it is in flight wait
+for it and receive the same result — or the same exception.
+
+Design decisions:
+  - Only in-flight work is shared; once the leader finishes the key is
+    forgotten, so this never serves stale results (that is the caches' job)
+  - Threads and coroutines have separate tables: `do` coalesces threads,
+    `ado` coalesces coroutines on the same event loop. The async work runs
+    as its own task and every caller awaits it shielded, so a cancelled
+    leader does not cancel the call its followers are waiting on
+  - Both return `(result, shared)`; `shared` tells a follower it did not
+    make the call itself (e.g. to replay a result to a streaming handler)
+  - Leaders, coalesced followers and in-flight keys per group are in the
+    "coalescing" collector
+
+Usage:
+    flights = SingleFlight("llm")
+    result, shared = flights.do(key, lambda: call_upstream(...))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+from src.core.metrics import registry
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Per-key deduplication of concurrent calls, for threads and coroutines."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[Tuple[int, str], asyncio.Task] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.leaders = 0
+            self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Run `fn` unless a call with `key` is already in flight; then share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            shared = call is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+        if shared:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Async twin of `do` for coroutines on the running event loop."""
+        slot = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(slot)
+            shared = task is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                task = self._tasks[slot] = asyncio.ensure_future(fn())
+                self.leaders += 1
+                task.add_done_callback(lambda t: self._forget(slot, t))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, slot: Tuple[int, str], task: asyncio.Task) -> None:
+        with self._lock:
+            self._tasks.pop(slot, None)
+        if not task.cancelled():
+            task.exception()    # retrieved: every caller may have gone away
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0,
+                "in_flight": len(self._calls) + len(self._tasks),
+            }
+
+
+# ── Named groups ─────────────────────────────────────────────────────────────
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_flights(name: str) -> SingleFlight:
+    """The process-wide `SingleFlight` group `name` ("llm", "search"), created on first use."""
+    group = _groups.get(name)
+    if group is None:
+        with _groups_lock:
+            group = _groups.setdefault(name, SingleFlight(name))
+    return group
+
+
+registry.register_collector(
+    "coalescing", lambda: {name: group.to_dict() for name, group in sorted(_groups.items())}
+)
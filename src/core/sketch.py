@@ -0,0 +1,248 @@
+"""
+src/core/sketch.py
+─────────────────────────────────────────────────────────────────────────────
+Constant-memory quantile sketches for latency metrics.
+
+`DDSketch` (Masson et al., VLDB 2019) maps every positive value to a
+logarithmic bucket `ceil(log_γ(v))` with γ = (1 + α) / (1 − α). Any quantile
+read back from the buckets is within relative error α of the true value,
+whatever the distribution, and two sketches with the same α merge exactly by
+adding bucket counts — so per-worker sketches can be combined into one.
+
+Design decisions:
+  - Buckets live in a plain dict (index → count); with α = 1 % the range
+    1 µs … 1 h spans ~1,100 buckets, and `max_buckets` collapses the lowest
+    ones if a pathological stream ever exceeds that
+  - Values ≤ 0 go to a dedicated zero bucket (latencies are never negative)
+  - `WindowedSketch` keeps a ring of per-slot sketches so "last 1 min / 5 min
+    / 1 h" quantiles reflect current load; windows are slot-granular and use
+    wall-clock time so slots from different processes line up
+  - No locking here — callers (`_AgentMetrics`) already hold a lock
+
+Usage:
+    from src.core.sketch import DDSketch
+    sketch = DDSketch(relative_accuracy=0.01)
+    for ms in latencies:
+        sketch.add(ms)
+    sketch.quantile(0.95)
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+class DDSketch:
+    """
+    Relative-error quantile sketch.
+
+    Args:
+        relative_accuracy: α — every quantile is within ±α·value of the truth.
+        max_buckets:       Bound on stored buckets; the lowest are merged
+                           together once it is exceeded (upper quantiles,
+                           which is what latency SLOs read, stay exact to α).
+    """
+
+    __slots__ = (
+        "relative_accuracy", "max_buckets", "_gamma", "_inv_log_gamma",
+        "buckets", "zero_count", "count", "sum", "min", "max",
+    )
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._inv_log_gamma = 1.0 / math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    # ── Updates ────────────────────────────────────────────────────────────
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.count += count
+        self.sum += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zero_count += count
+            return
+        idx = math.ceil(math.log(value) * self._inv_log_gamma)
+        buckets = self.buckets
+        buckets[idx] = buckets.get(idx, 0) + count
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: "DDSketch") -> None:
+        """Fold `other` into this sketch (both must share `relative_accuracy`)."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different relative_accuracy")
+        if not other.count:
+            return
+        for idx, n in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.max_buckets
+        keep = keys[excess]
+        self.buckets[keep] += sum(self.buckets.pop(k) for k in keys[:excess])
+
+    # ── Queries ────────────────────────────────────────────────────────────
+
+    def quantile(self, q: float) -> float:
+        """
+        Value at quantile `q` (0–1); 0.0 for an empty sketch. Uses the same
+        nearest-rank rule as the old sorted-list percentile: rank int(n·q).
+        """
+        if not self.count:
+            return 0.0
+        rank = min(int(self.count * q), self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen > rank:
+                # Midpoint of [γ^(i-1), γ^i] in the relative-error sense
+                value = 2 * self._gamma ** idx / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ── Serialisation (for cross-process merging) ──────────────────────────
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_buckets: int = 2048) -> "DDSketch":
+        sketch = cls(data["relative_accuracy"], max_buckets)
+        sketch.buckets = {int(k): v for k, v in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+class WindowedSketch:
+    """
+    Ring of per-slot `DDSketch`es answering "quantiles over the last N seconds".
+
+    Args:
+        windows:           Window name → length in seconds.
+        slot_s:            Slot width; a window covers the slots that started
+                           within its length, so it may include up to
+                           `slot_s` of extra history.
+        relative_accuracy: Passed to each slot's sketch.
+        clock:             Wall-clock source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        windows: Dict[str, float],
+        slot_s: float = 10.0,
+        relative_accuracy: float = 0.01,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.windows = dict(windows)
+        self.slot_s = slot_s
+        self.relative_accuracy = relative_accuracy
+        self.clock = clock
+        self.n_slots = max(1, math.ceil(max(self.windows.values(), default=slot_s) / slot_s))
+        self._slots: Deque[Tuple[int, DDSketch]] = deque()
+        # Hot path: the newest slot's sketch and its time span
+        self._current: Optional[DDSketch] = None
+        self._span = (math.inf, -math.inf)
+
+    def add(self, value: float, now: Optional[float] = None) -> None:
+        if now is None:
+            now = self.clock()
+        start, end = self._span
+        if not start <= now < end:
+            self._current = self._slot_for(now)
+        self._current.add(value)
+
+    def _slot_for(self, now: float) -> DDSketch:
+        slot = int(now // self.slot_s)
+        if not self._slots or self._slots[-1][0] < slot:
+            self._slots.append((slot, DDSketch(self.relative_accuracy)))
+            self._expire(slot)
+            self._span = (slot * self.slot_s, (slot + 1) * self.slot_s)
+            return self._slots[-1][1]
+        # Clock went backwards — record into the matching slot, or the newest
+        for existing, sketch in reversed(self._slots):
+            if existing <= slot:
+                return sketch
+        return self._slots[0][1]
+
+    def _expire(self, current: int) -> None:
+        while self._slots and self._slots[0][0] <= current - self.n_slots:
+            self._slots.popleft()
+
+    def window(self, seconds: float, now: Optional[float] = None) -> DDSketch:
+        """Merged sketch of the slots that started within the last `seconds`."""
+        current = int((self.clock() if now is None else now) // self.slot_s)
+        oldest = current - max(1, math.ceil(seconds / self.slot_s)) + 1
+        merged = DDSketch(self.relative_accuracy)
+        for slot, sketch in self._slots:
+            if oldest <= slot <= current:
+                merged.merge(sketch)
+        return merged
+
+    def merge(self, other: "WindowedSketch") -> None:
+        """Fold another worker's ring into this one (slots are wall-clock aligned)."""
+        if other.slot_s != self.slot_s:
+            raise ValueError("cannot merge windowed sketches with different slot_s")
+        by_slot = dict(self._slots)
+        for slot, sketch in other._slots:
+            if slot not in by_slot:
+                by_slot[slot] = DDSketch(self.relative_accuracy)
+            by_slot[slot].merge(sketch)
+        self._slots = deque(sorted(by_slot.items()))
+        self._span = (math.inf, -math.inf)
+        if self._slots:
+            self._expire(self._slots[-1][0])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "windows": self.windows,
+            "slot_s": self.slot_s,
+            "relative_accuracy": self.relative_accuracy,
+            "slots": [[slot, sketch.to_dict()] for slot, sketch in self._slots],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WindowedSketch":
+        ring = cls(data["windows"], data["slot_s"], data["relative_accuracy"])
+        ring._slots = deque((slot, DDSketch.from_dict(sk)) for slot, sk in data["slots"])
+        return ring
@@ -0,0 +1,94 @@
+"""
+src/core/streaming.py
+─────────────────────────────────────────────────────────────────────────────
+Token streaming out of a LangGraph run.
+
+`_TogetherLLM` is a completion model, so LangGraph's `stream_mode="messages"`
+(which only forwards chat-model chunks) never sees its tokens. Instead a
+`TokenStreamHandler` is attached to the run config; every LLM call inside
+the graph then streams upstream and pushes its deltas onto an asyncio queue,
+tagged with the graph node that made the call.
+
+Usage:
+    handler = TokenStreamHandler(exclude_nodes={NODE_ROUTER})
+    config  = {"configurable": {"thread_id": tid}, "callbacks": [handler]}
+    task    = asyncio.create_task(graph.ainvoke(state, config))
+    async for event, data in handler.events(task):
+        ...   # ("token", {"node": "tutorials", "delta": "..."})
+    result = task.result()
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, TypeVar
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.tracers._streaming import _StreamingCallbackHandler
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class TokenStreamHandler(AsyncCallbackHandler, _StreamingCallbackHandler):
+    """
+    Collects LLM tokens from a graph run into an asyncio queue.
+
+    Args:
+        exclude_nodes: Graph nodes whose tokens are internal (e.g. the
+                       router's JSON decision) and must not reach the user.
+    """
+
+    def __init__(self, exclude_nodes: Iterable[str] = ()):
+        self.exclude_nodes = set(exclude_nodes)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._nodes: dict[UUID, Optional[str]] = {}
+
+    # ── Callback hooks ─────────────────────────────────────────────────────
+
+    async def on_llm_start(
+        self,
+        serialized: dict[str, Any],
+        prompts: list[str],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._nodes[run_id] = (metadata or {}).get("langgraph_node")
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        node = self._nodes.get(run_id)
+        if token and node not in self.exclude_nodes:
+            self.queue.put_nowait(("token", {"node": node, "delta": token}))
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._nodes.pop(run_id, None)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._nodes.pop(run_id, None)
+
+    # `_StreamingCallbackHandler` marks this handler as token-hungry, which
+    # is what flips `_TogetherLLM._call` onto its streaming path.
+    def tap_output_aiter(self, run_id: UUID, output: AsyncIterator[T]) -> AsyncIterator[T]:
+        return output
+
+    def tap_output_iter(self, run_id: UUID, output: Iterator[T]) -> Iterator[T]:
+        return output
+
+    # ── Consumer side ──────────────────────────────────────────────────────
+
+    def push(self, event: str, data: Any) -> None:
+        """Queue a non-token event (e.g. node progress) in stream order."""
+        self.queue.put_nowait((event, data))
+
+    async def events(self, task: asyncio.Future) -> AsyncIterator[tuple[str, Any]]:
+        """Yield queued `(event, data)` pairs until `task` finishes."""
+        task.add_done_callback(lambda _: self.queue.put_nowait(_DONE))
+        while True:
+            item = await self.queue.get()
+            if item is _DONE:
+                break
+            yield item
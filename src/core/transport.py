@@ -0,0 +1,260 @@
+"""
+src/core/transport.py
+─────────────────────────────────────────────────────────────────────────────
+Shared HTTP transport — one keep-alive connection pool for every outbound call.
+
+Design decisions:
+  - A single `requests.Session` per process, created lazily and shared by
+    every `get_llm(role)` instance (and anything else that imports it)
+  - Pools are sized per host (`HTTP_POOL["max_connections"]`) and block
+    when exhausted instead of opening unbounded extra sockets
+  - Sockets idle longer than `keepalive_expiry` are closed on checkout,
+    so we never write into a connection the server already dropped
+  - Pool stats (hits, new connections, waits, evictions) are exposed
+    through `registry` under the "http_pool" key
+  - Eviction and stats hook urllib3's `_get_conn` / `_put_conn`, which are
+    private: requirements.txt pins the urllib3 majors they are known for
+    (1.26, 2.x) and, should their signatures change anyway, plain pools are
+    used with a warning instead of failing requests
+  - Async callers get an `httpx.AsyncClient` with the same limits, one per
+    event loop (httpx connections are bound to the loop that opened them)
+
+Usage:
+    from src.core.transport import get_session, get_async_client
+    resp = get_session().post(url, json=payload, timeout=60)
+    resp = await get_async_client().post(url, json=payload, timeout=60)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src.core.logging import get_logger
+from src.core.metrics import registry
+
+_logger = get_logger("transport")
+
+
+# ── Pool statistics ──────────────────────────────────────────────────────────
+
+class _PoolStats:
+    """Thread-safe counters shared by every pool created by the adapter."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0          # connection checkouts
+            self.hits = 0              # checkouts that reused a live socket
+            self.new_connections = 0   # checkouts that had to connect
+            self.evictions = 0         # idle sockets closed on checkout
+            self.waits = 0             # checkouts that found the pool empty
+            self.total_wait_ms = 0.0
+
+    def checkout(self, reused: bool, evicted: bool, waited: bool, wait_ms: float):
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.hits += 1
+            else:
+                self.new_connections += 1
+            if evicted:
+                self.evictions += 1
+            if waited:
+                self.waits += 1
+                self.total_wait_ms += wait_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "new_connections": self.new_connections,
+                "evictions": self.evictions,
+                "waits": self.waits,
+                "hit_rate": round(self.hits / self.requests, 4) if self.requests else 0,
+                "avg_wait_ms": round(self.total_wait_ms / self.waits, 2) if self.waits else 0,
+            }
+
+
+stats = _PoolStats()
+
+
+# ── Instrumented urllib3 pools ───────────────────────────────────────────────
+
+class _InstrumentedPoolMixin:
+    """
+    Adds idle eviction and stats to urllib3's per-host connection pool.
+
+    urllib3 pre-fills the pool queue with `None` placeholders, so a checkout
+    returns either a previously used connection (socket may still be open)
+    or a fresh connection object whose socket is opened on first request.
+    """
+
+    keepalive_expiry: float = 60.0
+    pool_timeout: Optional[float] = None
+
+    def _get_conn(self, timeout: Optional[float] = None):
+        waited = self.pool is not None and self.pool.empty()
+        t0 = time.perf_counter()
+        conn = super()._get_conn(timeout=timeout if timeout is not None else self.pool_timeout)
+        wait_ms = (time.perf_counter() - t0) * 1000
+
+        evicted = False
+        last_used = getattr(conn, "_career_last_used", None)
+        if conn.sock is not None and last_used is not None:
+            if time.monotonic() - last_used > self.keepalive_expiry:
+                conn.close()
+                evicted = True
+
+        stats.checkout(
+            reused=conn.sock is not None,
+            evicted=evicted,
+            waited=waited,
+            wait_ms=wait_ms,
+        )
+        return conn
+
+    def _put_conn(self, conn) -> None:
+        if conn is not None:
+            conn._career_last_used = time.monotonic()
+        super()._put_conn(conn)
+
+
+def _hooks_supported() -> bool:
+    """True when urllib3's private checkout/return methods look as the mixin expects."""
+    try:
+        get_params = list(inspect.signature(HTTPConnectionPool._get_conn).parameters)
+        put_params = list(inspect.signature(HTTPConnectionPool._put_conn).parameters)
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return get_params[:2] == ["self", "timeout"] and put_params[:2] == ["self", "conn"]
+
+
+_HOOKS_SUPPORTED = _hooks_supported()
+
+
+class _HTTPPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _HTTPSPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose PoolManager builds instrumented, bounded pools."""
+
+    def __init__(self, keepalive_expiry: float, pool_timeout: float, **kwargs):
+        self._keepalive_expiry = keepalive_expiry
+        self._pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=True, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        if not _HOOKS_SUPPORTED:
+            _logger.warning("urllib3 pool internals changed — HTTP pool stats and idle eviction disabled",
+                            extra={"event": "http_pool_uninstrumented"})
+            return
+        attrs = {"keepalive_expiry": self._keepalive_expiry, "pool_timeout": self._pool_timeout}
+        self.poolmanager.pool_classes_by_scheme = {
+            "http":  type("HTTPPool", (_HTTPPool,), attrs),
+            "https": type("HTTPSPool", (_HTTPSPool,), attrs),
+        }
+
+
+# ── Public factory ───────────────────────────────────────────────────────────
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def build_session(
+    max_connections: int = 32,
+    max_hosts: int = 8,
+    keepalive_expiry: float = 60.0,
+    pool_timeout: float = 30.0,
+) -> requests.Session:
+    """Build a new pooled `requests.Session` (prefer `get_session()`)."""
+    adapter = _PooledAdapter(
+        keepalive_expiry=keepalive_expiry,
+        pool_timeout=pool_timeout,
+        pool_connections=max_hosts,
+        pool_maxsize=max_connections,
+        pool_block=True,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from src.config import HTTP_POOL
+                _session = build_session(**HTTP_POOL)
+    return _session
+
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Return the pooled `httpx.AsyncClient` for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+        from src.config import HTTP_POOL
+
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL["max_connections"],
+                max_keepalive_connections=HTTP_POOL["max_connections"],
+                keepalive_expiry=HTTP_POOL["keepalive_expiry"],
+            ),
+            timeout=httpx.Timeout(60.0, pool=HTTP_POOL["pool_timeout"]),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_clients():
+    """Close the running loop's `httpx.AsyncClient` (e.g. on app shutdown).
+
+    A client can only be closed on its own loop; clients of loops that have
+    already been closed are simply dropped.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.pop(loop, None)
+    for other in [l for l in _async_clients if l.is_closed()]:
+        _async_clients.pop(other, None)
+    if client is not None:
+        await client.aclose()
+
+
+def close_session():
+    """Close every pooled socket; the next `get_session()` starts fresh."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+registry.register_collector("http_pool", stats.to_dict, counters=("requests", "hits", "new_connections", "evictions", "waits"))
@@ -0,0 +1,203 @@
+"""
+src/core/usage.py
+─────────────────────────────────────────────────────────────────────────────
+LLM token accounting — what every completion actually cost.
+
+`_TogetherLLM` reports one `LLMUsage` per upstream response (prompt and
+completion tokens from the provider's `usage` field, client latency, and
+server-side timing when the response carries it). Reports go to:
+  1. the per-model `usage_stats` collector ("llm_usage" in /api/metrics),
+     which derives completion tokens/sec per model
+  2. the innermost open `track_usage()` scope of the current context —
+     `guarded_node` opens one per node and rolls the total into
+     `registry.record(..., tokens=...)`
+
+When the provider omits `usage` (some streamed responses), tokens are
+estimated locally with `estimate_tokens` and the report is flagged
+`estimated=True`.
+
+Design decisions:
+  - The scope is a ContextVar holding a mutable list: asyncio tasks and
+    executor threads started inside a node inherit the same list object
+  - Cache hits never report usage — they cost no tokens
+  - Zero coupling: nothing here knows about agents or prompts
+
+Usage:
+    from src.core.usage import track_usage
+    with track_usage() as reports:
+        chain.invoke(...)
+    tokens = sum(r.total_tokens for r in reports)
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+from src.core.metrics import registry
+
+
+@dataclass
+class LLMUsage:
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float                  # client-side, request sent → body read
+    server_ms: Optional[float] = None  # provider-reported processing time
+    estimated: bool = False            # True → counts came from estimate_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+# ── Local token estimate ──────────────────────────────────────────────────────
+
+# GPT/Llama-style pre-tokenisation: contractions, words, numbers, punctuation
+# runs and whitespace. BPE vocabularies cover common words (with their
+# leading space) in one token and split rare/long ones every ~7 letters.
+_PRETOKEN = re.compile(
+    r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+",
+    re.IGNORECASE,
+)
+_LETTERS_PER_TOKEN = 7
+_MESSAGE_OVERHEAD = 4      # role + delimiters of the chat template
+
+
+def _piece_tokens(piece: str) -> int:
+    core = piece.strip()
+    if not core or core.isdigit():
+        return 1
+    if core[0].isalpha():
+        return max(1, round(len(core) / _LETTERS_PER_TOKEN))
+    return math.ceil(len(core) / 2)      # punctuation runs merge in pairs at best
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count of `text` (typically within ±15 % for English)."""
+    return sum(_piece_tokens(piece) for piece in _PRETOKEN.findall(text))
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m.get("content", "")) + _MESSAGE_OVERHEAD for m in messages)
+
+
+# ── Response parsing ─────────────────────────────────────────────────────────
+
+def server_timing_ms(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Provider processing time from response headers: the OpenAI-compatible
+    `openai-processing-ms`, or the total `dur` of a W3C `Server-Timing`.
+    """
+    value = headers.get("openai-processing-ms")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    timing = headers.get("server-timing")
+    if timing:
+        durs = [float(d) for d in re.findall(r"dur=([\d.]+)", timing)]
+        if durs:
+            return sum(durs)
+    return None
+
+
+def usage_from_response(
+    model: str,
+    messages: List[Dict[str, str]],
+    completion: str,
+    usage: Optional[Mapping[str, Any]],
+    latency_ms: float,
+    server_ms: Optional[float] = None,
+) -> LLMUsage:
+    """Build an `LLMUsage` from the provider's `usage` dict, estimating if absent."""
+    if usage and "completion_tokens" in usage:
+        return LLMUsage(
+            model=model,
+            prompt_tokens=int(usage.get("prompt_tokens") or 0),
+            completion_tokens=int(usage["completion_tokens"] or 0),
+            latency_ms=latency_ms,
+            server_ms=server_ms,
+        )
+    return LLMUsage(
+        model=model,
+        prompt_tokens=estimate_prompt_tokens(messages),
+        completion_tokens=estimate_tokens(completion),
+        latency_ms=latency_ms,
+        server_ms=server_ms,
+        estimated=True,
+    )
+
+
+# ── Per-model stats ───────────────────────────────────────────────────────────
+
+class _UsageStats:
+    """Thread-safe per-model token counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # model → [calls, prompt, completion, estimated_calls, generation_ms]
+            self.models: Dict[str, List[float]] = {}
+
+    def add(self, usage: LLMUsage):
+        with self._lock:
+            entry = self.models.setdefault(usage.model, [0, 0, 0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += usage.prompt_tokens
+            entry[2] += usage.completion_tokens
+            entry[3] += usage.estimated
+            entry[4] += usage.server_ms or usage.latency_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                model: {
+                    "calls": int(calls),
+                    "prompt_tokens": int(prompt),
+                    "completion_tokens": int(completion),
+                    "total_tokens": int(prompt + completion),
+                    "estimated_calls": int(estimated),
+                    "tokens_per_s": round(completion / (gen_ms / 1000), 2) if gen_ms else 0,
+                }
+                for model, (calls, prompt, completion, estimated, gen_ms)
+                in sorted(self.models.items())
+            }
+
+
+usage_stats = _UsageStats()
+
+registry.register_collector("llm_usage", usage_stats.to_dict)
+
+
+# ── Trace-context scopes ──────────────────────────────────────────────────────
+
+_scope: ContextVar[Optional[List[LLMUsage]]] = ContextVar("llm_usage_scope", default=None)
+
+
+def report_usage(usage: LLMUsage) -> None:
+    """Count `usage` per model and attach it to the current `track_usage()` scope."""
+    usage_stats.add(usage)
+    reports = _scope.get()
+    if reports is not None:
+        reports.append(usage)
+
+
+@contextmanager
+def track_usage() -> Iterator[List[LLMUsage]]:
+    """Collect every `LLMUsage` reported while the block runs (nested scopes don't leak up)."""
+    reports: List[LLMUsage] = []
+    token = _scope.set(reports)
+    try:
+        yield reports
+    finally:
+        _scope.reset(token)
@@ -1,7 +1,7 @@
 """
 Graph package — exports the primary compile and visualisation helpers.
 """
-from src.graph.graph_builder import compile_graph, get_graph_mermaid, build_graph
+from src.graph.graph_builder import compile_graph, get_graph_mermaid, build_graph, GraphSet, preload_nodes
 from src.graph.checkpointer  import get_checkpointer
 
-__all__ = ["compile_graph", "get_graph_mermaid", "build_graph", "get_checkpointer"]
+__all__ = ["compile_graph", "get_graph_mermaid", "build_graph", "GraphSet", "preload_nodes", "get_checkpointer"]
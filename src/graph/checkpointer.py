@@ -1,30 +1,447 @@
 """
 SQLite checkpointer setup for LangGraph.
 
-Provides `get_checkpointer()` which returns a SqliteSaver instance
-connected to the local database file defined in config.
+Provides `get_checkpointer()` which returns a SqliteSaver-compatible
+checkpointer connected to the local database file defined in config.
+
+The returned saver also implements LangGraph's async checkpoint API
+(`aget_tuple`, `aput`, …) by running the sync methods on a worker thread,
+so the same checkpointer backs both `graph.invoke` and `graph.ainvoke`.
+
+`PooledSqliteSaver` is the production variant:
+  - WAL journal with tuned synchronous / cache / mmap pragmas, so readers
+    never block on the writer (or each other)
+  - One read-only connection per thread for `get_tuple` / `list`
+  - A single writer thread owning the write connection; `put`,
+    `put_writes` and `delete_thread` queue their statements and wait, and
+    everything queued while the previous commit ran is group-committed in
+    one transaction
+  - Write latency (queue + commit) is recorded as "checkpointer.write" in
+    the metrics registry; batch sizes are in the "checkpointer" collector
+  - With `compact=True` checkpoints are written by `CompactSerializer`
+    (src/graph/serde.py): large strings and messages stored once by hash,
+    payloads compressed
+  - `claim_turn` is a compare-and-set on a per-thread turn counter in the
+    same database, so several API processes can agree on who appends the
+    next turn of a session
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.serde.base import SerializerProtocol
 from langgraph.checkpoint.sqlite import SqliteSaver
 
-from src.config import DB_PATH
+from src.config import CHECKPOINTER, DB_PATH
+from src.core.logging import get_logger
+from src.core.metrics import registry
+from src.graph.serde import BLOBS_SCHEMA, CompactSerializer
+
+_logger = get_logger("checkpointer")
+
+SESSION_TURNS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_turns (
+    thread_id  TEXT PRIMARY KEY,
+    turn       INTEGER NOT NULL,
+    claimed_at REAL NOT NULL
+)
+"""
+
+
+class ThreadedSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver with an async API.
+
+    SQLite calls are short and already serialised by `SqliteSaver.lock`;
+    off-loading them to a thread keeps the event loop free without needing
+    a second (aiosqlite) connection to the same file.
+    """
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+# ── Stats ─────────────────────────────────────────────────────────────────────
+
+class _CheckpointStats:
+    """Thread-safe counters for the checkpoint writer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.writes = 0            # put / put_writes / delete_thread calls
+            self.batches = 0           # transactions committed
+            self.max_batch = 0
+            self.retried = 0           # writes replayed alone after a failed batch
+            self.errors = 0
+            self.queue_depth = 0
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def batch(self, size: int):
+        with self._lock:
+            self.writes += size
+            self.batches += 1
+            self.max_batch = max(self.max_batch, size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "writes": self.writes,
+                "batches": self.batches,
+                "avg_batch": round(self.writes / self.batches, 2) if self.batches else 0,
+                "max_batch": self.max_batch,
+                "retried": self.retried,
+                "errors": self.errors,
+                "queue_depth": self.queue_depth,
+            }
+
+
+stats = _CheckpointStats()
+
+registry.register_collector("checkpointer", stats.to_dict, counters=("writes", "batches", "retried", "errors"))
+
+
+# ── Pooled saver ──────────────────────────────────────────────────────────────
+
+class _DeferredCursor:
+    """Stands in for a write cursor: records statements for the writer thread."""
+
+    def __init__(self):
+        self.statements: List[tuple] = []
+
+    def execute(self, sql: str, params: Sequence = ()):
+        self.statements.append((sql, tuple(params), False))
+
+    def executemany(self, sql: str, rows):
+        self.statements.append((sql, list(rows), True))
+
+
+class PooledSqliteSaver(ThreadedSqliteSaver):
+    """
+    WAL-mode SqliteSaver with per-thread readers and a group-committing writer.
+
+    The inherited `put` / `put_writes` / `delete_thread` serialise on the
+    calling thread and write through `cursor()`; here that cursor only
+    records the statements, which are handed to the writer thread on exit.
+    Reads go through `conn`, which resolves to the calling thread's reader.
+
+    Args:
+        path:            SQLite file (":memory:" shares the writer connection
+                         with readers, for tests).
+        synchronous:     PRAGMA synchronous for the writer.
+        cache_mb:        Page cache per connection.
+        mmap_mb:         Memory-mapped I/O size per connection.
+        busy_timeout_ms: How long a connection waits on a lock before failing.
+        batch_max:       Most writes committed in one transaction.
+        batch_wait_ms:   How long the writer waits for a batch to fill.
+        compact:         Serialise with `CompactSerializer` (ignored if
+                         `serde` is given).
+        blob_min_bytes, compress_min_bytes, blob_cache_mb:
+                         `CompactSerializer` settings.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        synchronous: str = "NORMAL",
+        cache_mb: float = 16,
+        mmap_mb: float = 128,
+        busy_timeout_ms: int = 5000,
+        batch_max: int = 64,
+        batch_wait_ms: float = 0.0,
+        compact: bool = False,
+        blob_min_bytes: int = 1024,
+        compress_min_bytes: int = 512,
+        blob_cache_mb: float = 32,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.batch_max = max(1, batch_max)
+        self.batch_wait_s = batch_wait_ms / 1000
+        self._pragmas = [
+            f"PRAGMA cache_size=-{int(cache_mb * 1024)}",
+            f"PRAGMA mmap_size={int(mmap_mb * 1024 * 1024)}",
+            f"PRAGMA busy_timeout={int(busy_timeout_ms)}",
+            "PRAGMA temp_store=MEMORY",
+        ]
+        self._shared = path == ":memory:"
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        writer = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        writer.execute("PRAGMA auto_vacuum=INCREMENTAL")   # only takes effect on a new file
+        writer.execute("PRAGMA journal_mode=WAL")
+        writer.execute(f"PRAGMA synchronous={synchronous}")
+        for pragma in self._pragmas:
+            writer.execute(pragma)
+        SqliteSaver(writer).setup()                  # schema, on the writer
+        writer.execute(BLOBS_SCHEMA)
+        writer.execute(SESSION_TURNS_SCHEMA)
+        super().__init__(writer, serde=serde)        # → conn setter → self._writer
+        self.is_setup = True
+        # Re-entrant: in ":memory:" mode blob reads nest inside a read cursor
+        self.lock = threading.RLock()
+        if compact and serde is None:
+            self.serde = CompactSerializer(
+                self,
+                blob_min_bytes=blob_min_bytes,
+                compress_min_bytes=compress_min_bytes,
+                cache_mb=blob_cache_mb,
+            )
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    # ── Connections ────────────────────────────────────────────────────────
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection for reads on the calling thread."""
+        return self._writer if self._shared else self._reader()
+
+    @conn.setter
+    def conn(self, value: sqlite3.Connection):
+        self._writer = value
+
+    def _reader(self) -> sqlite3.Connection:
+        reader = getattr(self._local, "conn", None)
+        if reader is None:
+            reader = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            for pragma in self._pragmas:
+                reader.execute(pragma)
+            reader.execute("PRAGMA query_only=ON")
+            self._local.conn = reader
+            with self._readers_lock:
+                self._readers.append(reader)
+        return reader
+
+    def setup(self) -> None:
+        """Tables are created in `__init__`, before any reader exists."""
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[Any]:
+        if transaction:
+            deferred = _DeferredCursor()
+            yield deferred
+            if deferred.statements:
+                # Blobs referenced by these rows commit in the same transaction
+                take_pending = getattr(self.serde, "take_pending", None)
+                pending = take_pending() if take_pending else []
+                self._submit(pending + deferred.statements)
+            return
+        if self._shared:
+            with self.lock:
+                cur = self._writer.cursor()
+                try:
+                    yield cur
+                finally:
+                    cur.close()
+            return
+        cur = self._reader().cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+    # ── Writer ─────────────────────────────────────────────────────────────
+
+    def _submit(self, statements: List[tuple]) -> None:
+        if self._closed:
+            raise RuntimeError("Checkpointer is closed")
+        future: Future = Future()
+        t0 = time.perf_counter()
+        stats.add(queue_depth=1)
+        self._queue.put((statements, future))
+        try:
+            future.result()
+        finally:
+            registry.record("checkpointer.write", (time.perf_counter() - t0) * 1000,
+                            success=future.exception() is None)
+
+    def _write_loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            deadline = time.monotonic() + self.batch_wait_s
+            while len(batch) < self.batch_max:
+                try:
+                    timeout = deadline - time.monotonic()
+                    job = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._queue.put(None)            # finish this batch, then stop
+                    break
+                batch.append(job)
+            stats.add(queue_depth=-len(batch))
+            self._commit(batch)
+
+    def _commit(self, batch: List[tuple]) -> None:
+        try:
+            self._run([statements for statements, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                stats.add(errors=1)
+                batch[0][1].set_exception(exc)
+                return
+            # One bad write must not fail the others: replay each on its own
+            _logger.warning(f"Checkpoint batch of {len(batch)} failed, retrying singly: {exc}",
+                            extra={"event": "checkpoint_batch_error"})
+            stats.add(retried=len(batch))
+            for job in batch:
+                self._commit([job])
+            return
+        stats.batch(len(batch))
+        for _, future in batch:
+            future.set_result(None)
+
+    def _run(self, jobs: List[List[tuple]]) -> None:
+        with self.lock:
+            cur = self._writer.cursor()
+            try:
+                cur.execute("BEGIN IMMEDIATE")
+                try:
+                    for statements in jobs:
+                        for sql, params, many in statements:
+                            (cur.executemany if many else cur.execute)(sql, params)
+                    cur.execute("COMMIT")
+                except BaseException:
+                    cur.execute("ROLLBACK")
+                    raise
+            finally:
+                cur.close()
+
+    # ── Session turns ──────────────────────────────────────────────────────
+
+    def claim_turn(self, thread_id: str, turn: int, lease_s: float) -> bool:
+        """
+        Claim the right to append turn `turn` to `thread_id`'s session.
+
+        One statement, so atomic across processes sharing the file: it
+        succeeds only if no one holds a claim on this or a later turn, or
+        that claim is older than `lease_s` (its holder crashed).
+        """
+        now = time.time()
+        with self.lock:
+            cur = self._writer.execute(
+                "INSERT INTO session_turns (thread_id, turn, claimed_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET turn = excluded.turn, claimed_at = excluded.claimed_at "
+                "WHERE session_turns.turn < excluded.turn OR session_turns.claimed_at < ?",
+                (thread_id, turn, now, now - lease_s),
+            )
+            return cur.rowcount == 1
+
+    def release_turn(self, thread_id: str, turn: Optional[int] = None) -> None:
+        """Drop the claim on `turn` (a failed turn), or any claim (a restarted session)."""
+        with self.lock:
+            if turn is None:
+                self._writer.execute("DELETE FROM session_turns WHERE thread_id = ?", (thread_id,))
+            else:
+                self._writer.execute("DELETE FROM session_turns WHERE thread_id = ? AND turn = ?",
+                                     (thread_id, turn))
+
+    def vacuum(self, pages: Optional[int] = None) -> None:
+        """
+        Return free pages to the filesystem: up to `pages` of them with
+        incremental vacuum, or rebuild the whole file when `pages` is None
+        (the only option for databases created without incremental
+        auto-vacuum — it cannot be switched on in WAL mode).
+        """
+        with self.lock:
+            if pages is None:
+                self._writer.execute("VACUUM")
+            else:
+                self._writer.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+
+    def close(self) -> None:
+        """Flush queued writes, stop the writer and close every connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        with self._readers_lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
+        self._writer.close()
 
 
-def get_checkpointer() -> SqliteSaver:
+def get_checkpointer() -> PooledSqliteSaver:
     """
-    Return a SqliteSaver checkpointer, creating the database directory
-    if it does not exist.
+    Return the WAL-mode, group-committing checkpointer, creating the
+    database directory if it does not exist.
 
     Usage:
         checkpointer = get_checkpointer()
         graph = compile_graph(checkpointer)
         config = {"configurable": {"thread_id": session_id}}
-        result = graph.invoke(state, config)
+        result = graph.invoke(state, config)          # or: await graph.ainvoke(...)
     """
-    import sqlite3
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    return SqliteSaver(conn)
+    return PooledSqliteSaver(DB_PATH, **CHECKPOINTER)
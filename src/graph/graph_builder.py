@@ -4,12 +4,23 @@ src/graph/graph_builder.py
 Graph Builder — wires all agent nodes into a LangGraph StateGraph.
 
 Topology:
-    [START] → router → {resume, job_search, interview_prep, mock_interview,
-                        evaluation, tutorials, general_qa, clarifier,
-                        salary_negotiator} → [END]
+    [START] → memory → router → {resume, job_search, interview_prep,
+                                 mock_interview, evaluation, tutorials,
+                                 general_qa, clarifier, salary_negotiator} → [END]
 
-All node functions are imported from src/agents/<agent>/ packages.
-All node name constants come from src/config.py.
+All node functions live in src/agents/<agent>/ packages; the `memory`
+stage (history cap + rolling summary) in src/graph/memory.py. All node
+name constants come from src/config.py.
+
+Agent modules are imported on their node's first call, not when the graph
+is built: compiling the graph (and importing `api`) does not pay for every
+agent's prompts, classifier weights and search stack up front.
+`preload_nodes()` imports them all at once for callers that prefer a warm
+first turn.
+
+Every node is registered with both its sync and async implementation, so
+the same compiled graph serves `.invoke()` (threads) and `.ainvoke()`
+(event loop, no worker thread pinned during LLM calls).
 
 Usage:
     from src.graph.graph_builder import compile_graph
@@ -17,30 +28,47 @@ Usage:
 
     graph = compile_graph(get_checkpointer())
     result = graph.invoke(state, {"configurable": {"thread_id": "abc"}})
+
+One-shot callers that never read their thread back pick a persistence mode
+instead of paying for SQLite checkpoint writes:
+
+    graphs = GraphSet(get_checkpointer())
+    graph, config = graphs.resolve("none", thread_id)
 """
 
 from __future__ import annotations
 
-from typing import Literal
+import uuid
+from importlib import import_module
+from typing import Any, Dict, Literal, Tuple
 
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
 
 from src.state import AgentState
 from src.config import (
     NODE_ROUTER, NODE_RESUME, NODE_JOB_SEARCH,
     NODE_INTERVIEW_PREP, NODE_MOCK_INTERVIEW, NODE_EVALUATION,
-    NODE_TUTORIALS, NODE_GENERAL_QA, NODE_CLARIFIER, NODE_SALARY,
+    NODE_TUTORIALS, NODE_GENERAL_QA, NODE_CLARIFIER, NODE_SALARY, NODE_MEMORY,
 )
+from src.graph.memory import memory_node, amemory_node
 
-# ── Import from new agents/ package structure ─────────────────────────────────
-from src.agents.router      import router_node
-from src.agents.resume      import resume_builder_node
-from src.agents.job_search  import job_search_node
-from src.agents.interview   import interview_prep_node, mock_interview_node, evaluation_node
-from src.agents.tutorials   import tutorials_node
-from src.agents.salary      import salary_negotiator_node
-from src.agents.general     import general_qa_node, clarifier_node
+# ── Agent nodes from the agents/ package structure (imported on first call) ───
+# node name → (module, sync function, async function)
+_AGENT_NODES: Dict[str, Tuple[str, str, str]] = {
+    NODE_ROUTER:         ("src.agents.router.node",         "router_node",            "arouter_node"),
+    NODE_RESUME:         ("src.agents.resume.node",         "resume_builder_node",    "aresume_builder_node"),
+    NODE_JOB_SEARCH:     ("src.agents.job_search.node",     "job_search_node",        "ajob_search_node"),
+    NODE_INTERVIEW_PREP: ("src.agents.interview.prep_node", "interview_prep_node",    "ainterview_prep_node"),
+    NODE_MOCK_INTERVIEW: ("src.agents.interview.mock_node", "mock_interview_node",    "amock_interview_node"),
+    NODE_EVALUATION:     ("src.agents.interview.eval_node", "evaluation_node",        "aevaluation_node"),
+    NODE_TUTORIALS:      ("src.agents.tutorials.node",      "tutorials_node",         "atutorials_node"),
+    NODE_GENERAL_QA:     ("src.agents.general.node",        "general_qa_node",        "ageneral_qa_node"),
+    NODE_CLARIFIER:      ("src.agents.general.node",        "clarifier_node",         "aclarifier_node"),
+    NODE_SALARY:         ("src.agents.salary.node",         "salary_negotiator_node", "asalary_negotiator_node"),
+}
 
 
 # ─── Conditional edge: router → specialist ────────────────────────────────────
@@ -67,24 +95,41 @@ def _route_after_router(state: AgentState) -> Literal[
 
 # ─── Graph construction ───────────────────────────────────────────────────────
 
+def _node(func, afunc) -> RunnableLambda:
+    """Pair a node's sync and async implementations into one runnable."""
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
+
+
+def _lazy_node(module: str, func_name: str, afunc_name: str) -> RunnableLambda:
+    """Like `_node`, for an agent module imported on the node's first call."""
+
+    def func(state: AgentState) -> Dict[str, Any]:
+        return getattr(import_module(module), func_name)(state)
+
+    async def afunc(state: AgentState) -> Dict[str, Any]:
+        return await getattr(import_module(module), afunc_name)(state)
+
+    return RunnableLambda(func, afunc=afunc, name=func_name)
+
+
+def preload_nodes() -> None:
+    """Import every agent module now instead of on its node's first call."""
+    for module, _, _ in _AGENT_NODES.values():
+        import_module(module)
+
+
 def build_graph() -> StateGraph:
     """Construct the StateGraph (uncompiled). Safe to call without a checkpointer."""
     builder = StateGraph(AgentState)
 
     # Register nodes
-    builder.add_node(NODE_ROUTER,         router_node)
-    builder.add_node(NODE_RESUME,         resume_builder_node)
-    builder.add_node(NODE_JOB_SEARCH,     job_search_node)
-    builder.add_node(NODE_INTERVIEW_PREP, interview_prep_node)
-    builder.add_node(NODE_MOCK_INTERVIEW, mock_interview_node)
-    builder.add_node(NODE_EVALUATION,     evaluation_node)
-    builder.add_node(NODE_TUTORIALS,      tutorials_node)
-    builder.add_node(NODE_GENERAL_QA,     general_qa_node)
-    builder.add_node(NODE_CLARIFIER,      clarifier_node)
-    builder.add_node(NODE_SALARY,         salary_negotiator_node)
-
-    # Entry
-    builder.add_edge(START, NODE_ROUTER)
+    builder.add_node(NODE_MEMORY, _node(memory_node, amemory_node))
+    for name, (module, func_name, afunc_name) in _AGENT_NODES.items():
+        builder.add_node(name, _lazy_node(module, func_name, afunc_name))
+
+    # Entry — bound the history before anything reads it
+    builder.add_edge(START, NODE_MEMORY)
+    builder.add_edge(NODE_MEMORY, NODE_ROUTER)
 
     # Conditional routing
     builder.add_conditional_edges(
@@ -119,7 +164,7 @@ def compile_graph(checkpointer: BaseCheckpointSaver | None = None):
                       Pass None for an in-memory-only (no persistence) graph.
 
     Returns:
-        Compiled CompiledGraph ready for .invoke() / .stream()
+        Compiled CompiledGraph ready for .invoke() / .ainvoke() / .stream()
     """
     builder = build_graph()
     if checkpointer:
@@ -127,6 +172,53 @@ def compile_graph(checkpointer: BaseCheckpointSaver | None = None):
     return builder.compile()
 
 
+# ─── Persistence modes ────────────────────────────────────────────────────────
+
+PERSISTENCE_MODES = ("persistent", "memory", "none")
+
+
+class GraphSet:
+    """
+    The graph compiled once per persistence mode:
+
+      persistent  checkpoints go to `checkpointer` (conversations that are
+                  resumed by thread_id)
+      memory      checkpoints live in process memory for the duration of one
+                  run under a private thread id, then are dropped
+      none        no checkpointer at all (one-shot generation)
+    """
+
+    def __init__(self, checkpointer: BaseCheckpointSaver | None = None):
+        builder = build_graph()
+        self.memory = InMemorySaver()
+        self.graphs = {
+            "persistent": builder.compile(checkpointer=checkpointer) if checkpointer else builder.compile(),
+            "memory":     builder.compile(checkpointer=self.memory),
+            "none":       builder.compile(),
+        }
+
+    @property
+    def persistent(self):
+        return self.graphs["persistent"]
+
+    def resolve(self, persistence: str, thread_id: str) -> Tuple[Any, RunnableConfig]:
+        """(compiled graph, config) for one invocation in `persistence` mode."""
+        if persistence not in self.graphs:
+            raise ValueError(f"Unknown persistence mode {persistence!r}; expected one of {PERSISTENCE_MODES}")
+        if persistence == "memory":
+            # Concurrent one-shot calls often share a default thread id
+            thread_id = f"{thread_id}:{uuid.uuid4().hex}"
+        configurable = {"thread_id": thread_id}
+        if persistence != "persistent":
+            configurable["rolling_summary"] = False     # nothing reads the thread back
+        return self.graphs[persistence], {"configurable": configurable}
+
+    def release(self, persistence: str, config: RunnableConfig) -> None:
+        """Drop what a `memory` run left behind (no-op for the other modes)."""
+        if persistence == "memory":
+            self.memory.delete_thread(config["configurable"]["thread_id"])
+
+
 def get_graph_mermaid() -> str:
     """Return a Mermaid diagram string of the current graph topology."""
     try:
@@ -138,7 +230,8 @@ def get_graph_mermaid() -> str:
 # ─── Fallback diagram ─────────────────────────────────────────────────────────
 _FALLBACK_MERMAID = """
 graph TD
-    START([▶ START]) --> router
+    START([▶ START]) --> memory
+    memory --> router
     router -->|resume| resume_builder
     router -->|jobs| job_search
     router -->|prep| interview_prep
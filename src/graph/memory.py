@@ -0,0 +1,252 @@
+"""
+src/graph/memory.py
+─────────────────────────────────────────────────────────────────────────────
+Conversation memory — keeps every thread's stored history bounded.
+
+`AgentState.messages` is append-only (`add_messages`), so without a cap a
+long chat or mock interview stores, and re-sends, more history every turn.
+The graph's `memory` stage runs before the router on each turn and:
+  1. Folds a rolling summary that finished since the last turn into
+     `conversation_summary`
+  2. Once the thread's messages exceed MEMORY["max_tokens"], removes the
+     oldest (`RemoveMessage`) until `keep_tokens` remain and queues them
+     for the background summariser
+
+Nodes then build their prompts with `src.core.history.fit_prompt`, which
+fills the node's MEMORY["prompt_tokens"] budget with the summary and the
+newest turns that fit.
+
+Design decisions:
+  - Summarisation never runs on the request path: the turn that trims only
+    queues the removed messages, and the summary is picked up by a later
+    turn of the same thread. Jobs of one thread run one at a time, folding
+    each batch of removed turns into the previous summary in order
+  - Trimming keeps `keep_tokens` below the cap, so a thread is trimmed (and
+    summarised) once every few turns rather than on every turn
+  - Finished summaries wait in a bounded in-process map until their
+    thread's next turn. With several API workers, a summary finished by
+    another process is lost — the trimmed turns then survive only in the
+    older summary; the history itself stays bounded either way
+  - One-shot runs (GraphSet "memory" / "none") trim but never summarise,
+    since nothing reads their thread back
+  - `interview_history` is deliberately not trimmed: it is the mock
+    interview's authoritative transcript — its length is the session's
+    turn counter and ETag (api.py), GET /api/interview/mock/{id} returns
+    it, and the evaluation node scores the whole session. Only its prompt
+    is bounded (`fit_prompt` in the mock node). Its stored copies are
+    bounded by checkpoint retention (CHECKPOINT_RETENTION["max_per_thread"]
+    checkpoints per thread), so storage grows linearly with the interview
+    length rather than with its square
+
+Usage:
+    builder.add_node(NODE_MEMORY, RunnableLambda(memory_node, afunc=amemory_node))
+    builder.add_edge(START, NODE_MEMORY)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableConfig
+
+from src.core.history import ENTRY_OVERHEAD, clip_tokens, line_tokens, message_entries, stats
+from src.core.logging import get_logger
+from src.core.metrics import registry
+
+_logger = get_logger("memory")
+
+_MAX_READY = 4096            # finished summaries waiting for their thread's next turn
+
+SUMMARY_TEMPLATE = """\
+You maintain a running summary of a conversation between a user and an AI Career Assistant.
+
+Current summary:
+{summary}
+
+Older turns to fold into the summary:
+{turns}
+
+Write the updated summary in at most {max_words} words. Keep facts about the user
+(name, target role, experience, skills, preferences), decisions made, and open
+questions. Drop greetings and filler. Reply with the summary only.
+
+Updated summary:\
+"""
+
+_summary_prompt = PromptTemplate.from_template(SUMMARY_TEMPLATE)
+
+
+# ── Trimming ──────────────────────────────────────────────────────────────────
+
+def _message_tokens(message: BaseMessage) -> int:
+    return line_tokens(str(message.content)) + ENTRY_OVERHEAD
+
+
+def select_trim(messages: Sequence[BaseMessage], max_tokens: int, keep_tokens: int) -> List[BaseMessage]:
+    """
+    Oldest messages to remove so that at most `keep_tokens` remain, or []
+    while the total is within `max_tokens`. The latest user message and
+    everything after it are never removed.
+    """
+    costs = [_message_tokens(m) for m in messages]
+    total = sum(costs)
+    if total <= max_tokens:
+        return []
+
+    last_human = next(
+        (i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)),
+        len(messages) - 1,
+    )
+    removed = []
+    for i in range(last_human):
+        if total <= keep_tokens:
+            break
+        removed.append(messages[i])
+        total -= costs[i]
+    return removed
+
+
+# ── Background summariser ─────────────────────────────────────────────────────
+
+class RollingSummarizer:
+    """
+    Folds trimmed turns into each thread's summary on a small thread pool.
+
+    `submit` queues removed turns and returns at once; `take` hands a
+    finished summary to the thread's next turn.
+    """
+
+    def __init__(self, workers: int = 2, summary_tokens: int = 300):
+        self.workers = workers
+        self.summary_tokens = summary_tokens
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._jobs: Dict[str, List[Tuple[str, str]]] = {}
+        self._ready: "OrderedDict[str, str]" = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, thread_id: str, summary: str, entries: Sequence[Tuple[str, str]]) -> None:
+        with self._lock:
+            job = self._jobs.get(thread_id)
+            if job is not None:                  # the running job folds these in next
+                job.extend(entries)
+                return
+            self._jobs[thread_id] = list(entries)
+            stats.add(pending_summaries=1)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="summary")
+            executor = self._executor
+        executor.submit(self._run, thread_id, summary)
+
+    def take(self, thread_id: str) -> Optional[str]:
+        """The thread's finished summary, if one is waiting (removes it)."""
+        with self._lock:
+            return self._ready.pop(thread_id, None)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until no job is queued or running; False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._jobs, timeout)
+
+    def _run(self, thread_id: str, summary: str) -> None:
+        while True:
+            with self._lock:
+                entries = self._jobs[thread_id]
+                if not entries:
+                    del self._jobs[thread_id]
+                    self._ready[thread_id] = summary
+                    self._ready.move_to_end(thread_id)
+                    while len(self._ready) > _MAX_READY:
+                        self._ready.popitem(last=False)
+                    stats.add(pending_summaries=-1)
+                    self._idle.notify_all()
+                    return
+                self._jobs[thread_id] = []
+            summary = self._fold(thread_id, summary, entries)
+
+    def _fold(self, thread_id: str, summary: str, entries: List[Tuple[str, str]]) -> str:
+        from src.core.llm import get_chain
+
+        turns = "\n".join(
+            f"{speaker}: {clip_tokens(content, self.summary_tokens)}" for speaker, content in entries
+        )
+        t0 = time.perf_counter()
+        try:
+            result = get_chain("summarizer", _summary_prompt).invoke({
+                "summary": summary or "(none yet)",
+                "turns": turns,
+                "max_words": int(self.summary_tokens * 0.75),
+            })
+        except Exception as exc:
+            stats.add(summary_errors=1)
+            _logger.warning(f"Summarising {len(entries)} turns of {thread_id} failed: {exc}",
+                            extra={"event": "memory_summary_error"})
+            return summary
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        stats.add(summaries=1, summary_ms=elapsed_ms)
+        registry.record("memory.summary", elapsed_ms)
+        return clip_tokens(result.get("text", "").strip(), self.summary_tokens) or summary
+
+
+_summarizer: Optional[RollingSummarizer] = None
+_summarizer_lock = threading.Lock()
+
+
+def get_summarizer() -> RollingSummarizer:
+    """Process-wide summariser, created on first use."""
+    global _summarizer
+    if _summarizer is None:
+        from src.config import MEMORY
+        with _summarizer_lock:
+            if _summarizer is None:
+                _summarizer = RollingSummarizer(MEMORY["summary_workers"], MEMORY["summary_tokens"])
+    return _summarizer
+
+
+# ── Graph stage ───────────────────────────────────────────────────────────────
+
+def memory_node(state: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """
+    Reads:
+      messages, conversation_summary
+      config.configurable.{thread_id, rolling_summary}
+
+    Writes:
+      messages              — RemoveMessage for every trimmed message
+      conversation_summary  — a summary finished since the thread's last turn
+    """
+    from src.config import MEMORY
+
+    configurable = (config or {}).get("configurable", {}) or {}
+    thread_id = configurable.get("thread_id")
+    summarize = bool(MEMORY["summarize"] and thread_id and configurable.get("rolling_summary", True))
+
+    update: Dict[str, Any] = {}
+    summary = state.get("conversation_summary", "") or ""
+    if summarize:
+        ready = get_summarizer().take(thread_id)
+        if ready and ready != summary:
+            update["conversation_summary"] = summary = ready
+
+    removed = select_trim(state.get("messages", []), MEMORY["max_tokens"], MEMORY["keep_tokens"])
+    if removed:
+        update["messages"] = [RemoveMessage(id=m.id) for m in removed]
+        stats.add(
+            trims=1,
+            trimmed_messages=len(removed),
+            trimmed_tokens=sum(_message_tokens(m) for m in removed),
+        )
+        if summarize:
+            get_summarizer().submit(thread_id, summary, message_entries(removed))
+    return update
+
+
+async def amemory_node(state: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """Async variant of `memory_node` (no I/O — the summariser runs on its own threads)."""
+    return memory_node(state, config)
@@ -44,7 +44,7 @@ def job_search_node(state: AgentState) -> dict:
     search_results = ""
     try:
         tool = get_search_tool()
-        search_results = tool.func(search_query)
+        search_results = tool.text(search_query)
     except Exception as e:
         search_results = f"Search failed: {e}"
 
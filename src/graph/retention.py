@@ -0,0 +1,362 @@
+"""
+Checkpoint retention for the SQLite checkpointer.
+
+Every graph run writes full `AgentState` checkpoints and nothing ever
+deleted them, so `data/checkpoints.db` grew without bound (and with it the
+cost of every lookup). `CheckpointRetention` runs a periodic compaction
+pass over a `PooledSqliteSaver`:
+
+  - Keeps the newest `max_per_thread` checkpoints of each thread (and
+    namespace); older, superseded ones are deleted
+  - Deletes threads whose last checkpoint is older than `max_age_s` —
+    this also collects the one-off threads minted per request — together
+    with their mock-interview turn claims (`session_turns`); claims older
+    than `max_age_s` on threads that never checkpointed go too
+  - Drops pending writes whose checkpoint no longer exists, then blobs
+    (see src/graph/serde.py) no remaining row references
+  - Returns freed pages to the filesystem with incremental VACUUM
+
+Design decisions:
+  - Thread activity lives in a side table (`checkpoint_threads`) kept up to
+    date by an INSERT trigger on `checkpoints`, so the saver itself is
+    unchanged and expiry never has to deserialise a checkpoint
+  - Candidates are found on a reader connection; deletes go through the
+    saver's writer in chunks of `delete_batch`, so compaction never holds
+    the write lock for long and interleaves with live traffic
+  - Rows are deleted by primary key, never by rowid
+  - `report()` backs the admin endpoint: file size, free pages and the
+    threads holding the most checkpoints
+
+Usage:
+    from src.graph.retention import start_retention
+    retention = start_retention(checkpointer)      # None when disabled
+    retention.report(top=20)
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.core.logging import get_logger
+from src.core.metrics import registry
+from src.graph.checkpointer import PooledSqliteSaver
+from src.graph.serde import ORPHAN_BLOBS_SQL
+
+_logger = get_logger("checkpointer")
+
+_NOW_SQL = "((julianday('now') - 2440587.5) * 86400.0)"
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS checkpoint_threads (
+        thread_id  TEXT PRIMARY KEY,
+        updated_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS checkpoint_threads_age ON checkpoint_threads (updated_at)",
+    f"""CREATE TRIGGER IF NOT EXISTS checkpoint_threads_touch AFTER INSERT ON checkpoints
+    BEGIN
+        INSERT OR REPLACE INTO checkpoint_threads (thread_id, updated_at)
+        VALUES (NEW.thread_id, {_NOW_SQL});
+    END""",
+]
+
+
+# ── Stats ─────────────────────────────────────────────────────────────────────
+
+class _RetentionStats:
+    """Thread-safe counters for compaction passes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.passes = 0
+            self.errors = 0
+            self.expired_threads = 0
+            self.pruned_checkpoints = 0
+            self.pruned_writes = 0
+            self.pruned_blobs = 0
+            self.vacuumed_pages = 0
+            self.last_pass_ms = 0.0
+
+    def add(self, **counts: float):
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def finished(self, elapsed_ms: float, **counts: int):
+        with self._lock:
+            self.passes += 1
+            self.last_pass_ms = elapsed_ms
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "passes": self.passes,
+                "errors": self.errors,
+                "expired_threads": self.expired_threads,
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "pruned_writes": self.pruned_writes,
+                "pruned_blobs": self.pruned_blobs,
+                "vacuumed_pages": self.vacuumed_pages,
+                "last_pass_ms": round(self.last_pass_ms, 1),
+            }
+
+
+stats = _RetentionStats()
+
+registry.register_collector("checkpoint_retention", stats.to_dict, counters=(
+    "passes", "errors", "expired_threads", "pruned_checkpoints", "pruned_writes", "pruned_blobs", "vacuumed_pages",
+))
+
+
+# ── Retention ─────────────────────────────────────────────────────────────────
+
+class CheckpointRetention:
+    """
+    Periodic checkpoint compaction.
+
+    Args:
+        saver:          The checkpointer whose database is compacted.
+        max_per_thread: Checkpoints kept per (thread, namespace); 0 keeps all.
+        max_age_s:      Threads idle longer than this are deleted; 0 disables.
+        interval_s:     Seconds between background passes.
+        delete_batch:   Rows (or threads) deleted per write transaction.
+        vacuum_pages:   Most free pages released per pass.
+        full_vacuum:    Rebuild a database without incremental auto-vacuum
+                        once a quarter of it is free.
+    """
+
+    def __init__(
+        self,
+        saver: PooledSqliteSaver,
+        max_per_thread: int = 20,
+        max_age_s: float = 30 * 24 * 3600,
+        interval_s: float = 600.0,
+        delete_batch: int = 500,
+        vacuum_pages: int = 4096,
+        full_vacuum: bool = True,
+    ):
+        self.saver = saver
+        self.max_per_thread = max_per_thread
+        self.max_age_s = max_age_s
+        self.interval_s = interval_s
+        self.delete_batch = max(1, delete_batch)
+        self.vacuum_pages = vacuum_pages
+        self.full_vacuum = full_vacuum
+        self._pass_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        with saver.cursor() as cur:
+            for statement in _SCHEMA:
+                cur.execute(statement)
+            # Threads written before the trigger existed start their clock now
+            cur.execute(
+                f"INSERT OR IGNORE INTO checkpoint_threads (thread_id, updated_at) "
+                f"SELECT DISTINCT thread_id, {_NOW_SQL} FROM checkpoints"
+            )
+
+    # ── Compaction ─────────────────────────────────────────────────────────
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Run one retention pass and return what it removed."""
+        now = time.time() if now is None else now
+        with self._pass_lock:
+            t0 = time.perf_counter()
+            result = {
+                "expired_threads": self._expire(now),
+                "pruned_checkpoints": self._prune(),
+                "pruned_writes": self._drop_orphan_writes(),
+                "pruned_blobs": self._drop_orphan_blobs(),
+            }
+            result["vacuumed_pages"] = self._vacuum()
+            stats.finished((time.perf_counter() - t0) * 1000, **result)
+        if any(result.values()):
+            _logger.info(f"Checkpoint compaction: {result}", extra={"event": "checkpoint_compaction"})
+        return result
+
+    def _read(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        with self.saver.cursor(transaction=False) as cur:
+            return cur.execute(sql, params).fetchall()
+
+    def _delete(self, statements: Sequence[str], rows: List[tuple]) -> None:
+        for i in range(0, len(rows), self.delete_batch):
+            chunk = rows[i:i + self.delete_batch]
+            with self.saver.cursor() as cur:
+                for sql in statements:
+                    cur.executemany(sql, chunk)
+
+    def _expire(self, now: float) -> int:
+        if not self.max_age_s:
+            return 0
+        cutoff = now - self.max_age_s
+        threads = self._read("SELECT thread_id FROM checkpoint_threads WHERE updated_at < ?", (cutoff,))
+        # Re-checked at delete time: a thread written to since the read survives
+        idle = "EXISTS (SELECT 1 FROM checkpoint_threads t WHERE t.thread_id = ?1 AND t.updated_at < ?2)"
+        self._delete([
+            f"DELETE FROM checkpoints WHERE thread_id = ?1 AND {idle}",
+            f"DELETE FROM writes WHERE thread_id = ?1 AND {idle}",
+            f"DELETE FROM session_turns WHERE thread_id = ?1 AND {idle}",
+            "DELETE FROM checkpoint_threads WHERE thread_id = ?1 AND updated_at < ?2",
+        ], [(thread_id, cutoff) for thread_id, in threads])
+        # Claims long past their lease whose turn never produced a checkpoint
+        with self.saver.cursor() as cur:
+            cur.execute("DELETE FROM session_turns WHERE claimed_at < ?", (cutoff,))
+        return len(threads)
+
+    def _prune(self) -> int:
+        if not self.max_per_thread:
+            return 0
+        superseded = self._read(
+            """SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+                   SELECT thread_id, checkpoint_ns, checkpoint_id, ROW_NUMBER() OVER (
+                       PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                   ) AS rn FROM checkpoints
+               ) WHERE rn > ?""",
+            (self.max_per_thread,),
+        )
+        self._delete([
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+        ], superseded)
+        return len(superseded)
+
+    def _drop_orphan_writes(self) -> int:
+        orphans = self._read(
+            """SELECT w.thread_id, w.checkpoint_ns, w.checkpoint_id, COUNT(*)
+               FROM writes w LEFT JOIN checkpoints c
+                 ON c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns
+                AND c.checkpoint_id = w.checkpoint_id
+               WHERE c.checkpoint_id IS NULL
+               GROUP BY w.thread_id, w.checkpoint_ns, w.checkpoint_id"""
+        )
+        self._delete([
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+        ], [row[:3] for row in orphans])
+        return sum(row[3] for row in orphans)
+
+    def _drop_orphan_blobs(self) -> int:
+        (orphans,), = self._read("SELECT COUNT(*) " + ORPHAN_BLOBS_SQL)
+        if orphans:
+            # One statement in one write transaction: a concurrent checkpoint
+            # either commits first (its blobs are referenced) or re-inserts them
+            with self.saver.cursor() as cur:
+                cur.execute("DELETE " + ORPHAN_BLOBS_SQL)
+        return orphans
+
+    def _vacuum(self) -> int:
+        (auto_vacuum,), = self._read("PRAGMA auto_vacuum")
+        (free,), = self._read("PRAGMA freelist_count")
+        if auto_vacuum != 2:                      # 2 = INCREMENTAL
+            (total,), = self._read("PRAGMA page_count")
+            if not (self.full_vacuum and free and free * 4 >= total):
+                return 0
+            _logger.info(f"Rebuilding checkpoint database ({free}/{total} pages free)",
+                         extra={"event": "checkpoint_full_vacuum"})
+            self.saver.vacuum()
+            return free
+        released, budget = 0, self.vacuum_pages
+        while free and budget > 0:              # moving pages can free a few more
+            pages = min(free, budget)
+            self.saver.vacuum(pages)
+            released += pages
+            budget -= pages
+            (left,), = self._read("PRAGMA freelist_count")
+            if left >= free:
+                break
+            free = left
+        return released
+
+    # ── Reporting ──────────────────────────────────────────────────────────
+
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        """Database size, row totals and the `top` threads by checkpoint count."""
+        (page_count,), = self._read("PRAGMA page_count")
+        (page_size,), = self._read("PRAGMA page_size")
+        (free,), = self._read("PRAGMA freelist_count")
+        wal = f"{self.saver.path}-wal"
+        (checkpoints, threads), = self._read("SELECT COUNT(*), COUNT(DISTINCT thread_id) FROM checkpoints")
+        (writes,), = self._read("SELECT COUNT(*) FROM writes")
+        (blobs, blob_bytes), = self._read("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM checkpoint_blobs")
+        rows = self._read(
+            """SELECT c.thread_id, COUNT(*), SUM(LENGTH(c.checkpoint) + LENGTH(c.metadata)),
+                      MAX(t.updated_at),
+                      (SELECT COUNT(*) FROM writes w WHERE w.thread_id = c.thread_id)
+               FROM checkpoints c LEFT JOIN checkpoint_threads t ON t.thread_id = c.thread_id
+               GROUP BY c.thread_id ORDER BY COUNT(*) DESC, c.thread_id LIMIT ?""",
+            (top,),
+        )
+        return {
+            "path": self.saver.path,
+            "size_bytes": page_count * page_size,
+            "free_bytes": free * page_size,
+            "wal_bytes": os.path.getsize(wal) if os.path.exists(wal) else 0,
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "blobs": blobs,
+            "blob_bytes": blob_bytes,
+            "top_threads": [
+                {
+                    "thread_id": thread_id,
+                    "checkpoints": n,
+                    "writes": n_writes,
+                    "bytes": size or 0,
+                    "updated_at": updated_at,
+                }
+                for thread_id, n, size, updated_at, n_writes in rows
+            ],
+            "retention": {
+                "max_per_thread": self.max_per_thread,
+                "max_age_s": self.max_age_s,
+                "interval_s": self.interval_s,
+            },
+        }
+
+    # ── Background pass ────────────────────────────────────────────────────
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.compact()
+            except Exception as exc:
+                stats.add(errors=1)
+                _logger.warning(f"Checkpoint compaction failed: {exc}", extra={"event": "checkpoint_compaction_error"})
+
+    def start(self) -> "CheckpointRetention":
+        self._thread = threading.Thread(target=self._run, name="checkpoint-retention", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+# ── Process-wide retention ────────────────────────────────────────────────────
+
+_retention: Optional[CheckpointRetention] = None
+_retention_lock = threading.Lock()
+
+
+def start_retention(saver: PooledSqliteSaver) -> Optional[CheckpointRetention]:
+    """Start background compaction of `saver` unless disabled in config (idempotent)."""
+    global _retention
+    from src.config import CHECKPOINT_RETENTION
+
+    if not CHECKPOINT_RETENTION["enabled"]:
+        return None
+    with _retention_lock:
+        if _retention is None or _retention.saver is not saver:
+            if _retention is not None:
+                _retention.stop()
+            options = {k: v for k, v in CHECKPOINT_RETENTION.items() if k != "enabled"}
+            _retention = CheckpointRetention(saver, **options).start()
+    return _retention
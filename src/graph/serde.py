@@ -0,0 +1,275 @@
+"""
+Compact checkpoint serialisation for `PooledSqliteSaver`.
+
+A resume thread's checkpoint holds the same multi-kilobyte LaTeX up to four
+times (`user_profile.resume_content`, `task_input.generated_resume`,
+`task_input.previous_resume`, `agent_output`) and the whole message history,
+and every turn writes all of it again. `CompactSerializer` wraps LangGraph's
+`JsonPlusSerializer` and:
+
+  - Content-addresses large strings: every string of at least
+    `blob_min_bytes` is stored once in `checkpoint_blobs` (keyed by its
+    BLAKE2b hash) and replaced by a reference, within and across checkpoints
+  - Content-addresses each message of a message list, so a turn only adds
+    the new messages — a per-turn delta — while every checkpoint still
+    decodes on its own, without replaying its parents
+  - Compresses payloads and blobs of at least `compress_min_bytes` with
+    zstd (zlib when `zstandard` is not installed)
+
+Design decisions:
+  - Blob rows are inserted (INSERT OR IGNORE) in the same transaction as the
+    checkpoint or writes row that references them; the saver drains them
+    from `take_pending()` when its write cursor closes
+  - A row's references are listed in its `type` column
+    ("ckpt1:<codec>:<inner type>:[hashes]"), which SQLite reads without
+    touching the payload — orphaned blobs are found with one SQL statement
+    (`ORPHAN_BLOBS_SQL`, run by checkpoint retention) and, since the
+    delete runs in a write transaction, a concurrent write re-inserts any
+    blob it references
+  - Rows written with the plain serializer keep loading unchanged
+  - Decompressed blobs are kept in a small LRU, since every turn re-reads
+    the latest checkpoint of its thread
+
+Usage:
+    saver = PooledSqliteSaver(path, compact=True)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:                     # optional: fall back to zlib
+    zstandard = None
+
+_PREFIX = "ckpt1"
+_BLOB = "__ckpt_blob__"
+_MESSAGES = "__ckpt_messages__"
+
+BLOBS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+        hash  TEXT PRIMARY KEY,
+        kind  TEXT NOT NULL,
+        codec TEXT NOT NULL,
+        data  BLOB NOT NULL
+    )
+"""
+
+_REFS_SQL = (
+    "SELECT j.value FROM {table} r, json_each(substr(r.type, instr(r.type, '['))) j "
+    "WHERE r.type LIKE 'ckpt1:%'"
+)
+
+ORPHAN_BLOBS_SQL = (
+    "FROM checkpoint_blobs WHERE hash NOT IN ("
+    + _REFS_SQL.format(table="checkpoints") + " UNION " + _REFS_SQL.format(table="writes") + ")"
+)
+
+
+# ── Compression ───────────────────────────────────────────────────────────────
+
+def _default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    return data
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Checkpoint was written with zstd; install `zstandard` to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    return data
+
+
+# ── Serializer ────────────────────────────────────────────────────────────────
+
+class CompactSerializer:
+    """
+    Content-addressing, compressing serializer bound to one saver.
+
+    Args:
+        saver:              The PooledSqliteSaver whose `checkpoint_blobs`
+                            table holds the blobs (reads use its cursors).
+        blob_min_bytes:     Strings at least this long become blobs.
+        compress_min_bytes: Payloads / blobs at least this long are compressed.
+        cache_mb:           Budget of the decompressed-blob LRU.
+        codec:              "zstd", "zlib" or "none" (default: best available).
+    """
+
+    def __init__(
+        self,
+        saver: Any,
+        blob_min_bytes: int = 1024,
+        compress_min_bytes: int = 512,
+        cache_mb: float = 32,
+        codec: Optional[str] = None,
+    ):
+        self.saver = saver
+        self.inner = JsonPlusSerializer()
+        self.blob_min_bytes = blob_min_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self.codec = codec or _default_codec()
+        self._cache_bytes = int(cache_mb * 1024 * 1024)
+        self._cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._cached = 0
+        self._cache_lock = threading.Lock()
+        self._pending = threading.local()
+
+    # ── Untyped API (delegated) ────────────────────────────────────────────
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+    # ── Typed API ──────────────────────────────────────────────────────────
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        blobs: Dict[str, Tuple[str, bytes]] = {}
+        inner_type, payload = self.inner.dumps_typed(self._extract(obj, blobs))
+        if not blobs and len(payload) < self.compress_min_bytes:
+            return inner_type, payload
+        codec = self.codec if len(payload) >= self.compress_min_bytes else "none"
+        self._queue(blobs)
+        type_ = f"{_PREFIX}:{codec}:{inner_type}:{json.dumps(sorted(blobs), separators=(',', ':'))}"
+        return type_, compress(payload, codec)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if not type_.startswith(_PREFIX + ":"):
+            return self.inner.loads_typed(data)
+        _, codec, inner_type, refs = type_.split(":", 3)
+        obj = self.inner.loads_typed((inner_type, decompress(payload, codec)))
+        blobs = self._fetch(json.loads(refs))
+        return self._restore(obj, blobs)
+
+    # ── Pending blob inserts ───────────────────────────────────────────────
+
+    def take_pending(self) -> List[tuple]:
+        """Blob INSERT statements queued by this thread since the last call."""
+        rows = getattr(self._pending, "rows", None)
+        if not rows:
+            return []
+        self._pending.rows = {}
+        return [(
+            "INSERT OR IGNORE INTO checkpoint_blobs (hash, kind, codec, data) VALUES (?, ?, ?, ?)",
+            list(rows.values()),
+            True,
+        )]
+
+    def _queue(self, blobs: Dict[str, Tuple[str, bytes]]) -> None:
+        if not blobs:
+            return
+        rows = getattr(self._pending, "rows", None)
+        if rows is None:
+            rows = self._pending.rows = {}
+        for digest, (kind, raw) in blobs.items():
+            if digest not in rows:
+                codec = self.codec if len(raw) >= self.compress_min_bytes else "none"
+                rows[digest] = (digest, kind, codec, compress(raw, codec))
+
+    # ── Encoding ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _digest(kind: str, raw: bytes) -> str:
+        return hashlib.blake2b(kind.encode() + b"\0" + raw, digest_size=16).hexdigest()
+
+    def _add(self, blobs: Dict[str, Tuple[str, bytes]], kind: str, raw: bytes) -> str:
+        digest = self._digest(kind, raw)
+        blobs.setdefault(digest, (kind, raw))
+        return digest
+
+    def _extract(self, obj: Any, blobs: Dict[str, Tuple[str, bytes]]) -> Any:
+        """Copy of `obj` with large strings and messages replaced by references."""
+        if isinstance(obj, str):
+            raw = obj.encode("utf-8", "surrogatepass")
+            if len(raw) < self.blob_min_bytes:
+                return obj
+            return {_BLOB: self._add(blobs, "str", raw)}
+        if isinstance(obj, dict):
+            return {k: self._extract(v, blobs) for k, v in obj.items()}
+        if isinstance(obj, list):
+            if obj and all(isinstance(m, BaseMessage) for m in obj):
+                refs = []
+                for message in obj:
+                    inner_type, raw = self.inner.dumps_typed(message)
+                    refs.append(self._add(blobs, inner_type, raw))
+                return {_MESSAGES: refs}
+            return [self._extract(v, blobs) for v in obj]
+        if isinstance(obj, tuple):
+            return tuple(self._extract(v, blobs) for v in obj)
+        return obj
+
+    # ── Decoding ───────────────────────────────────────────────────────────
+
+    def _restore(self, obj: Any, blobs: Dict[str, Tuple[str, bytes]]) -> Any:
+        if isinstance(obj, dict):
+            if len(obj) == 1:
+                if _BLOB in obj:
+                    return blobs[obj[_BLOB]][1].decode("utf-8", "surrogatepass")
+                if _MESSAGES in obj:
+                    return [self.inner.loads_typed(blobs[d]) for d in obj[_MESSAGES]]
+            return {k: self._restore(v, blobs) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self._restore(v, blobs) for v in obj]
+        if isinstance(obj, tuple):
+            return tuple(self._restore(v, blobs) for v in obj)
+        return obj
+
+    def _fetch(self, digests: Iterable[str]) -> Dict[str, Tuple[str, bytes]]:
+        """(kind, raw bytes) of each digest, from the LRU or the database."""
+        found, missing = {}, []
+        with self._cache_lock:
+            for digest in digests:
+                hit = self._cache.get(digest)
+                if hit is None:
+                    missing.append(digest)
+                else:
+                    self._cache.move_to_end(digest)
+                    found[digest] = hit
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            with self.saver.cursor(transaction=False) as cur:
+                rows = cur.execute(
+                    f"SELECT hash, kind, codec, data FROM checkpoint_blobs WHERE hash IN ({marks})", chunk
+                ).fetchall()
+            for digest, kind, codec, data in rows:
+                found[digest] = (kind, decompress(data, codec))
+                self._remember(digest, found[digest])
+        lost = [d for d in missing if d not in found]
+        if lost:
+            raise KeyError(f"Checkpoint blobs missing: {lost[:3]}")
+        return found
+
+    def _remember(self, digest: str, value: Tuple[str, bytes]) -> None:
+        size = len(value[1])
+        if size > self._cache_bytes:
+            return
+        with self._cache_lock:
+            if digest in self._cache:
+                return
+            self._cache[digest] = value
+            self._cached += size
+            while self._cached > self._cache_bytes:
+                _, (_, old) = self._cache.popitem(last=False)
+                self._cached -= len(old)
@@ -12,7 +12,10 @@ Design principles:
 Input guardrails (run BEFORE the LLM):
   - Length limits (prevent abuse / runaway prompts)
   - Prompt injection detection (regex-based, fast)
+  - Domain boundary (in-scope vs off-topic keywords)
   - Encoding safety (strip null bytes, control chars)
+  Injection + domain rules are evaluated together in one pass over the
+  text (`scan_input`), which also reports which rule fired.
 
 Output guardrails (run AFTER the LLM):
   - LaTeX structure validation (for resume_builder)
@@ -36,11 +39,15 @@ from __future__ import annotations
 
 import re
 import functools
+import hashlib
+import inspect
 import time
+from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional
 
 from src.core.logging import get_logger, set_trace_id, get_trace_id
 from src.core.metrics import registry
+from src.core.usage import track_usage
 
 _logger = get_logger("guardrails")
 
@@ -53,16 +60,18 @@ _logger = get_logger("guardrails")
 MAX_INPUT_LENGTH = 15_000
 
 # Patterns that suggest prompt injection attempts
-_INJECTION_PATTERNS = [
-    re.compile(r"ignore\s+(all\s+)?previous\s+instructions", re.IGNORECASE),
-    re.compile(r"you\s+are\s+now\s+(a|an)\s+", re.IGNORECASE),
-    re.compile(r"system\s*:\s*", re.IGNORECASE),
-    re.compile(r"<\|im_start\|>", re.IGNORECASE),
-    re.compile(r"\[INST\]", re.IGNORECASE),
-    re.compile(r"do\s+not\s+follow\s+(your|the)\s+(original|previous)", re.IGNORECASE),
-    re.compile(r"forget\s+(everything|all|your)\s+(you|instructions|rules)", re.IGNORECASE),
-    re.compile(r"act\s+as\s+if\s+you\s+have\s+no\s+restrictions", re.IGNORECASE),
-]
+_INJECTION_RULES: Dict[str, str] = {
+    "ignore_previous":  r"ignore\s+(all\s+)?previous\s+instructions",
+    "role_override":    r"you\s+are\s+now\s+(a|an)\s+",
+    "system_prefix":    r"system\s*:\s*",
+    "chatml_token":     r"<\|im_start\|>",
+    "inst_token":       r"\[INST\]",
+    "dont_follow":      r"do\s+not\s+follow\s+(your|the)\s+(original|previous)",
+    "forget_rules":     r"forget\s+(everything|all|your)\s+(you|instructions|rules)",
+    "no_restrictions":  r"act\s+as\s+if\s+you\s+have\s+no\s+restrictions",
+}
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
 
 
 def sanitise_input(text: str) -> str:
@@ -81,7 +90,7 @@ def sanitise_input(text: str) -> str:
         raise ValueError("Empty input received")
 
     # Strip null bytes and non-printable control chars (keep newlines, tabs)
-    text = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]", "", text)
+    text = _CONTROL_CHARS.sub("", text)
 
     # Enforce length limit
     if len(text) > MAX_INPUT_LENGTH:
@@ -105,10 +114,11 @@ def detect_injection(text: str) -> List[str]:
     Returns:
         List of matched pattern descriptions. Empty list = safe.
     """
-    findings = []
-    for pattern in _INJECTION_PATTERNS:
-        if pattern.search(text):
-            findings.append(f"Matched: {pattern.pattern}")
+    return _injection_findings(scan_input(text))
+
+
+def _injection_findings(scan: "GuardrailScan") -> List[str]:
+    findings = [f"Matched: {_MATCHER.rules[name].regex.pattern}" for name in scan.injections]
 
     if findings:
         _logger.warning(
@@ -126,61 +136,64 @@ def detect_injection(text: str) -> List[str]:
 # Keywords that indicate the query IS within our career-assistance domain.
 # Compiled as word-boundary regex patterns to prevent substring false positives
 # (e.g. "hi" matching inside "this").
-_IN_SCOPE_PATTERNS = [
-    re.compile(
-        r"\b(" + "|".join(kws) + r")\b", re.IGNORECASE
-    )
-    for kws in [
-        # Resume
+_IN_SCOPE_RULES: Dict[str, List[str]] = {
+    "resume":
         ["resume", "cv", "cover letter", "portfolio", "latex"],
-        # Job search
+    "job_search":
         ["job", "jobs", "hiring", "internship", "apply",
          "opening", "vacancy", "career", "position", "recruit"],
-        # Interview
+    "interview":
         ["interview", "mock interview", "behavioral", "behavioural",
          "technical question", "coding round", "hr round", "aptitude"],
-        # Salary
+    "salary":
         ["salary", "compensation", "negotiate", "offer letter", "ctc",
          "package", "hike", "raise", "equity", "bonus"],
-        # Career guidance
+    "career_guidance":
         ["career", "switch career", "transition", "roadmap", "learning path",
          "upskill", "certification", "promotion", "appraisal"],
-        # Tech tutorials (career-relevant)
+    # Tech tutorials (career-relevant)
+    "tech_tutorials":
         ["tutorial", "learn", "teach me", "how to code", "how to build",
          "python", "java", "javascript", "sql", "aws",
          "docker", "kubernetes", "machine learning", "data science",
          "system design", "dsa", "algorithm", "data structure",
          "backend", "frontend", "fullstack", "devops", "mlops",
          "git", "linux", "cloud", "microservice"],
-        # General career
+    "general_career":
         ["linkedin", "github", "mentor", "freelance",
          "remote work", "work from home", "startup",
          "fresher", "entry level", "software engineer"],
-        # Greetings (always in scope)
+    # Greetings (always in scope)
+    "greeting":
         ["hello", "hey there", "thanks", "thank you", "help me",
          "what can you do", "features"],
-    ]
-]
+}
 
 # Keywords that strongly indicate OFF-TOPIC queries
-_OFF_TOPIC_PATTERNS = [
-    # Health / Beauty / Medical
-    re.compile(r"\b(cream|lotion|skin\s*care|acne|medicine|doctor|symptoms?|diseases?|weight\s*loss|diet|workout|gym|diabetes|blood\s*pressure)\b", re.IGNORECASE),
-    # Food / Cooking
-    re.compile(r"\b(recipe|cook|bake|ingredient|restaurant|food\s*delivery)\b", re.IGNORECASE),
-    # Entertainment
-    re.compile(r"\b(movie|song|music|game|play|watch|stream|netflix|spotify|anime|manga)\b", re.IGNORECASE),
-    # Shopping
-    re.compile(r"\b(buy|purchase|price|discount|coupon|amazon|flipkart|product\s*review)\b", re.IGNORECASE),
-    # Travel
-    re.compile(r"\b(flight|hotel|travel|vacation|tourism|visa\s*(?!interview))\b", re.IGNORECASE),
+_OFF_TOPIC_RULES: Dict[str, List[str]] = {
+    "health":
+        ["cream", "lotion", r"skin\s*care", "acne", "medicine", "doctor", r"symptoms?",
+         r"diseases?", r"weight\s*loss", "diet", "workout", "gym", "diabetes", r"blood\s*pressure"],
+    "food":
+        ["recipe", "cook", "bake", "ingredient", "restaurant", r"food\s*delivery"],
+    "entertainment":
+        ["movie", "song", "music", "game", "play", "watch", "stream",
+         "netflix", "spotify", "anime", "manga"],
+    "shopping":
+        ["buy", "purchase", "price", "discount", "coupon", "amazon", "flipkart", r"product\s*review"],
+    "travel":
+        ["flight", "hotel", "travel", "vacation", "tourism", r"visa\s*(?!interview)"],
     # Social media (non-professional)
-    re.compile(r"\b(instagram\s*reels?|tiktok|snapchat|dating|tinder)\b", re.IGNORECASE),
+    "social_media":
+        [r"instagram\s*reels?", "tiktok", "snapchat", "dating", "tinder"],
     # Homework / non-career code requests
-    re.compile(r"\b(fix\s+(this|my)\s+(bug|code|error)|debug\s+(this|my)|solve\s+this\s+(problem|equation)|homework|assignment\s+(?!interview))\b", re.IGNORECASE),
+    "homework":
+        [r"fix\s+(this|my)\s+(bug|code|error)", r"debug\s+(this|my)",
+         r"solve\s+this\s+(problem|equation)", "homework", r"assignment\s+(?!interview)"],
     # Generic app building (not learning)
-    re.compile(r"\b(build\s+(me\s+)?(a|an)\s+(app|website|game|bot)|create\s+(a|an)\s+(app|website|game))\b", re.IGNORECASE),
-]
+    "app_building":
+        [r"build\s+(me\s+)?(a|an)\s+(app|website|game|bot)", r"create\s+(a|an)\s+(app|website|game)"],
+}
 
 # Polite redirect message
 _OUT_OF_SCOPE_MESSAGE = (
@@ -206,32 +219,211 @@ def check_domain_boundary(text: str) -> dict:
       3. If nothing matches → ALLOW (let the router/LLM handle ambiguous cases)
 
     Returns:
-        {"in_scope": True/False, "reason": str, "redirect_message": str or None}
+        {"in_scope": True/False, "reason": str, "redirect_message": str or None,
+         "rule": name of the rule that decided it, or None}
     """
-    # Step 1: Check if any in-scope pattern matches (word-boundary safe)
-    for pattern in _IN_SCOPE_PATTERNS:
-        if pattern.search(text):
-            return {"in_scope": True, "reason": "in-scope keyword found", "redirect_message": None}
-
-    # Step 2: Check off-topic patterns (only if no in-scope match)
-    for pattern in _OFF_TOPIC_PATTERNS:
-        if pattern.search(text):
-            _logger.info(
-                "Out-of-scope query blocked",
-                extra={
-                    "event": "domain_boundary_block",
-                    "pattern": pattern.pattern,
-                    "input_preview": text[:80],
-                },
-            )
-            return {
-                "in_scope": False,
-                "reason": f"Off-topic pattern matched: {pattern.pattern}",
-                "redirect_message": _OUT_OF_SCOPE_MESSAGE,
-            }
+    return _domain_verdict(scan_input(text), text)
+
+
+def _domain_verdict(scan: "GuardrailScan", text: str) -> dict:
+    # Step 1: Any in-scope keyword wins
+    if scan.in_scope:
+        return {
+            "in_scope": True, "reason": "in-scope keyword found",
+            "redirect_message": None, "rule": scan.in_scope[0],
+        }
+
+    # Step 2: Off-topic patterns (only if no in-scope match)
+    if scan.off_topic:
+        rule = _MATCHER.rules[scan.off_topic[0]]
+        _logger.info(
+            "Out-of-scope query blocked",
+            extra={
+                "event": "domain_boundary_block",
+                "pattern": rule.regex.pattern,
+                "rule": rule.name,
+                "input_preview": text[:80],
+            },
+        )
+        return {
+            "in_scope": False,
+            "reason": f"Off-topic pattern matched: {rule.regex.pattern}",
+            "redirect_message": _OUT_OF_SCOPE_MESSAGE,
+            "rule": rule.name,
+        }
 
     # Step 3: Ambiguous — let it through (router will handle)
-    return {"in_scope": True, "reason": "no off-topic pattern matched", "redirect_message": None}
+    return {
+        "in_scope": True, "reason": "no off-topic pattern matched",
+        "redirect_message": None, "rule": None,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+#  SINGLE-PASS MATCHER — every input rule above, one scan of the text
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class _Rule:
+    kind: str                     # "injection" | "in_scope" | "off_topic"
+    name: str
+    regex: "re.Pattern[str]"
+    triggers: tuple               # literals every match of `regex` starts with
+
+
+@dataclass(frozen=True)
+class GuardrailScan:
+    """Rule names that fired, per kind, in rule-definition order."""
+    injections: tuple = ()
+    in_scope: tuple = ()
+    off_topic: tuple = ()
+
+    @property
+    def verdict(self) -> str:
+        """ "injection" > "in_scope" > "off_topic" > "unmatched" """
+        if self.injections:
+            return "injection"
+        if self.in_scope:
+            return "in_scope"
+        if self.off_topic:
+            return "off_topic"
+        return "unmatched"
+
+    @property
+    def rule(self) -> Optional[str]:
+        """The rule that decided `verdict` (None when nothing matched)."""
+        fired = {"injection": self.injections, "in_scope": self.in_scope, "off_topic": self.off_topic}
+        return (fired.get(self.verdict) or (None,))[0]
+
+
+def _literal_prefix(alternative: str) -> str:
+    """
+    Leading literal text of a regex alternative, lower-cased — every match
+    of the alternative must start with it. Stops at the first class, group,
+    escape sequence or quantifier (dropping the char a `?`/`*` makes optional).
+    """
+    out: List[str] = []
+    i = 0
+    while i < len(alternative):
+        ch = alternative[i]
+        if ch == "\\" and i + 1 < len(alternative) and not alternative[i + 1].isalnum():
+            out.append(alternative[i + 1])
+            i += 2
+            continue
+        if ch in "?*{":
+            if out:
+                out.pop()
+            break
+        if ch in "\\()[]|.^$+":
+            break
+        out.append(ch)
+        i += 1
+    if not out:
+        raise ValueError(f"Guardrail pattern needs a literal prefix: {alternative!r}")
+    return "".join(out).lower()
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """Regex alternation of `words` factored into a trie (shared prefixes)."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional → the longest trigger at a position is reported
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class _GuardrailMatcher:
+    """
+    Classifies injection, in-scope and off-topic rules in one pass.
+
+    The per-rule regexes are kept as verifiers. A single zero-width trie
+    scan over the lower-cased text finds every position where some rule's
+    leading literal occurs (overlaps included — nothing is consumed); only
+    rules whose trigger is a prefix of the literal found there are then
+    checked with an anchored `regex.match`. Same answers as searching each
+    regex separately, but the text is walked once instead of ~24 times.
+    """
+
+    def __init__(self, rules: List[_Rule]):
+        self.rules: Dict[str, _Rule] = {r.name: r for r in rules}
+        self._order = {r.name: i for i, r in enumerate(rules)}
+
+        by_trigger: Dict[str, List[_Rule]] = {}
+        for rule in rules:
+            for trigger in rule.triggers:
+                if rule not in by_trigger.setdefault(trigger, []):
+                    by_trigger[trigger].append(rule)
+
+        # A hit reports the longest trigger at that position; shorter
+        # triggers sharing the position are its prefixes.
+        self._candidates: Dict[str, List[_Rule]] = {
+            trigger: [
+                rule
+                for other, other_rules in by_trigger.items() if trigger.startswith(other)
+                for rule in other_rules
+            ]
+            for trigger in by_trigger
+        }
+        self._scanner = re.compile(f"(?=({_trie_pattern(list(by_trigger))}))")
+
+    def scan(self, text: str) -> GuardrailScan:
+        lowered = text.lower()
+        fired: Dict[str, set] = {"injection": set(), "in_scope": set(), "off_topic": set()}
+
+        for hit in self._scanner.finditer(lowered):
+            pos = hit.start()
+            for rule in self._candidates[hit.group(1)]:
+                if rule.name not in fired[rule.kind] and rule.regex.match(lowered, pos):
+                    fired[rule.kind].add(rule.name)
+
+        ordered = lambda names: tuple(sorted(names, key=self._order.__getitem__))
+        return GuardrailScan(
+            injections=ordered(fired["injection"]),
+            in_scope=ordered(fired["in_scope"]),
+            off_topic=ordered(fired["off_topic"]),
+        )
+
+
+def _keyword_rule(kind: str, name: str, alternatives: List[str]) -> _Rule:
+    return _Rule(
+        kind=kind,
+        name=name,
+        regex=re.compile(r"\b(" + "|".join(alternatives) + r")\b", re.IGNORECASE),
+        triggers=tuple(_literal_prefix(a) for a in alternatives),
+    )
+
+
+_MATCHER = _GuardrailMatcher(
+    [
+        _Rule("injection", name, re.compile(pattern, re.IGNORECASE), (_literal_prefix(pattern),))
+        for name, pattern in _INJECTION_RULES.items()
+    ]
+    + [_keyword_rule("in_scope", name, kws) for name, kws in _IN_SCOPE_RULES.items()]
+    + [_keyword_rule("off_topic", name, alts) for name, alts in _OFF_TOPIC_RULES.items()]
+)
+
+
+def scan_input(text: str) -> GuardrailScan:
+    """
+    Run every input rule over `text` in a single pass.
+
+    Usage:
+        scan = scan_input(message)
+        scan.verdict   # "injection" | "in_scope" | "off_topic" | "unmatched"
+        scan.rule      # e.g. "ignore_previous", "salary", "health"
+    """
+    return _MATCHER.scan(text)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -351,19 +543,202 @@ def validate_output(output: str, validator: str = "any") -> List[str]:
 #  NODE DECORATOR — inject logging, metrics, and guardrails into any node
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def _message_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _compute_verdict(user_msg: str, digest: str) -> Dict[str, Any]:
+    """
+    Sanitise + scan `user_msg` once. The result is plain JSON so it can be
+    memoised in `state["guardrail_verdict"]` and checkpointed with it — only
+    hashes, flags and the matched rule, never the (up to MAX_INPUT_LENGTH)
+    text itself; `_clean_message` re-derives that cheaply.
+    """
+    try:
+        clean_msg = sanitise_input(user_msg)
+    except ValueError as ve:
+        return {"hash": digest, "error": str(ve)}
+
+    scan = scan_input(clean_msg)
+    return {
+        "hash":           digest,
+        "clean_hash":     _message_hash(clean_msg),
+        "injection_rule": scan.rule if _injection_findings(scan) else None,
+        "domain":         _domain_verdict(scan, clean_msg),
+        "error":          None,
+    }
+
+
+def _lookup_verdict(state: Dict[str, Any], user_msg: str) -> Dict[str, Any]:
+    """
+    Reuse the verdict memoised by an upstream node when it was computed for
+    this message — either the raw text or the sanitised text the upstream
+    node passed on — otherwise compute a fresh one.
+    """
+    digest = _message_hash(user_msg)
+    memo = state.get("guardrail_verdict") or {}
+    if digest in (memo.get("hash"), memo.get("clean_hash")):
+        return memo
+    return _compute_verdict(user_msg, digest)
+
+
+def _clean_message(user_msg: str, verdict: Dict[str, Any]) -> str:
+    """The sanitised text `verdict` was computed for, given the message in hand."""
+    if _message_hash(user_msg) == verdict["clean_hash"]:
+        return user_msg                  # already sanitised upstream
+    return sanitise_input(user_msg)
+
+
+def _guard_input(agent_name: str, state: Dict[str, Any], logger) -> tuple:
+    """
+    Steps 1–2 of `guarded_node`: trace ID + input guardrails.
+
+    The first guarded node of a request computes the verdict; later nodes
+    find it in `state["guardrail_verdict"]` and skip the scan. The returned
+    state always carries `trace_id` (and the verdict, if any) so
+    `_propagate` can hand them on.
+
+    Returns:
+        (state, None)           — input accepted; state carries sanitised message
+        (state, early_result)   — input rejected; return `early_result` as-is
+    """
+    # ── 1. Trace ID (reuse the request's, if an upstream node set one) ────
+    trace_id = set_trace_id(state.get("trace_id") or None)
+    state = {**state, "trace_id": trace_id}
+    logger.info(
+        f"Node invoked",
+        extra={"node": agent_name, "event": "node_start", "trace_id": trace_id},
+    )
+
+    # ── 2. Input sanitisation ─────────────────────────────────────────────
+    task = state.get("task_input", {})
+    user_msg = task.get("user_message", "")
+    if not user_msg:
+        return state, None
+
+    verdict = _lookup_verdict(state, user_msg)
+    state["guardrail_verdict"] = verdict
+
+    if verdict["error"]:
+        return state, {
+            "agent_output": f"⚠️ Invalid input: {verdict['error']}",
+            "graph_trace": [agent_name],
+            "error": verdict["error"],
+        }
+
+    # 2a. Prompt injection check
+    if verdict["injection_rule"]:
+        logger.warning(
+            "Injection attempt blocked",
+            extra={"node": agent_name, "event": "injection_blocked", "rule": verdict["injection_rule"]},
+        )
+        return state, {
+            "agent_output": (
+                "⚠️ Your input was flagged by our safety system. "
+                "Please rephrase your request."
+            ),
+            "graph_trace": [agent_name],
+            "error": "Input flagged by guardrails",
+        }
+
+    # 2b. Domain boundary check (skip for router — it handles routing)
+    domain_check = verdict["domain"]
+    if agent_name != "router" and not domain_check["in_scope"]:
+        logger.info(
+            "Off-topic query redirected",
+            extra={"node": agent_name, "event": "domain_redirect", "rule": domain_check["rule"]},
+        )
+        return state, {
+            "agent_output": domain_check["redirect_message"],
+            "graph_trace": [agent_name],
+            "error": None,
+        }
+
+    # Update state with sanitised input
+    return {**state, "task_input": {**task, "user_message": _clean_message(user_msg, verdict)}}, None
+
+
+def _propagate(state: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Write the trace ID and guardrail verdict back so downstream nodes reuse them."""
+    carried = {"trace_id": state["trace_id"]}
+    if state.get("guardrail_verdict"):
+        carried["guardrail_verdict"] = state["guardrail_verdict"]
+    return {**result, **carried}
+
+
+def _record_failure(agent_name: str, t0: float, exc: Exception, logger, usage=()):
+    latency_ms = (time.perf_counter() - t0) * 1000
+    tokens = sum(u.total_tokens for u in usage)
+    registry.record(agent_name, latency_ms, tokens=tokens, success=False)
+    logger.error(
+        f"Node failed: {exc}",
+        extra={"node": agent_name, "event": "node_error", "latency_ms": round(latency_ms, 2)},
+        exc_info=True,
+    )
+
+
+def _record_success(
+    agent_name: str, validator: str, t0: float, result: Dict[str, Any], logger, usage=(),
+) -> Dict[str, Any]:
+    """Steps 4–5 of `guarded_node`: output validation + metrics."""
+    latency_ms = (time.perf_counter() - t0) * 1000
+    tokens = sum(u.total_tokens for u in usage)
+
+    # ── 4. Output validation ──────────────────────────────────────────────
+    output = result.get("agent_output", "")
+    issues = validate_output(output, validator)
+
+    if issues:
+        logger.warning(
+            f"Output validation issues: {issues}",
+            extra={
+                "node": agent_name,
+                "event": "output_validation_warning",
+                "issues": len(issues),
+            },
+        )
+
+    # ── 5. Record metrics ─────────────────────────────────────────────────
+    has_error = bool(result.get("error"))
+    registry.record(
+        agent_name,
+        latency_ms=latency_ms,
+        tokens=tokens,
+        success=not has_error,
+    )
+
+    logger.info(
+        f"Node completed",
+        extra={
+            "node": agent_name,
+            "event": "node_end",
+            "latency_ms": round(latency_ms, 2),
+            "tokens": tokens,
+            "output_len": len(output),
+            "validation_issues": len(issues),
+        },
+    )
+
+    return result
+
+
 def guarded_node(
     agent_name: str,
     output_validator: Optional[str] = None,
 ):
     """
     Decorator that wraps a LangGraph node function with:
-      1. Trace ID generation
-      2. Input sanitisation (on user_message in task_input)
-      3. Latency + metrics recording
+      1. Trace ID generation (once per request, then propagated via state)
+      2. Input sanitisation (on user_message in task_input; the verdict is
+         memoised in state so later nodes of the same request reuse it)
+      3. Latency + metrics recording (tokens = every LLM `usage` the node
+         reported, via `src.core.usage.track_usage`)
       4. Output validation + logging
       5. Error handling with structured logging
 
-    The decorated function's signature is unchanged: (state) -> dict
+    The decorated function's signature is unchanged: (state) -> dict.
+    Coroutine functions are supported too — the wrapper is then itself
+    `async def`, so async nodes can run under `graph.ainvoke`.
 
     Args:
         agent_name:       Name for metrics and logging (e.g. "resume_builder")
@@ -372,119 +747,44 @@ def guarded_node(
     validator = output_validator or AGENT_VALIDATOR_MAP.get(agent_name, "any")
 
     def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
+                logger = get_logger(agent_name)
+                state, early = _guard_input(agent_name, state, logger)
+                if early is not None:
+                    return _propagate(state, early)
+
+                # ── 3. Execute node with timing ───────────────────────────
+                t0 = time.perf_counter()
+                with track_usage() as usage:
+                    try:
+                        result = await func(state)
+                    except Exception as exc:
+                        _record_failure(agent_name, t0, exc, logger, usage)
+                        raise
+
+                return _propagate(state, _record_success(agent_name, validator, t0, result, logger, usage))
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(state: Dict[str, Any]) -> Dict[str, Any]:
-            # ── 1. Trace ID ───────────────────────────────────────────────
-            trace_id = set_trace_id()
             logger = get_logger(agent_name)
-            logger.info(
-                f"Node invoked",
-                extra={"node": agent_name, "event": "node_start", "trace_id": trace_id},
-            )
-
-            # ── 2. Input sanitisation ─────────────────────────────────────
-            task = state.get("task_input", {})
-            user_msg = task.get("user_message", "")
-            if user_msg:
-                try:
-                    clean_msg = sanitise_input(user_msg)
-
-                    # 2a. Prompt injection check
-                    injections = detect_injection(clean_msg)
-                    if injections:
-                        logger.warning(
-                            "Injection attempt blocked",
-                            extra={"node": agent_name, "event": "injection_blocked"},
-                        )
-                        return {
-                            "agent_output": (
-                                "⚠️ Your input was flagged by our safety system. "
-                                "Please rephrase your request."
-                            ),
-                            "graph_trace": [agent_name],
-                            "error": "Input flagged by guardrails",
-                        }
-
-                    # 2b. Domain boundary check (skip for router — it handles routing)
-                    if agent_name != "router":
-                        domain_check = check_domain_boundary(clean_msg)
-                        if not domain_check["in_scope"]:
-                            logger.info(
-                                "Off-topic query redirected",
-                                extra={"node": agent_name, "event": "domain_redirect"},
-                            )
-                            return {
-                                "agent_output": domain_check["redirect_message"],
-                                "graph_trace": [agent_name],
-                                "error": None,
-                            }
-
-                    # Update state with sanitised input
-                    state = {
-                        **state,
-                        "task_input": {**task, "user_message": clean_msg},
-                    }
-                except ValueError as ve:
-                    return {
-                        "agent_output": f"⚠️ Invalid input: {ve}",
-                        "graph_trace": [agent_name],
-                        "error": str(ve),
-                    }
+            state, early = _guard_input(agent_name, state, logger)
+            if early is not None:
+                return _propagate(state, early)
 
             # ── 3. Execute node with timing ───────────────────────────────
             t0 = time.perf_counter()
-            success = True
-            tokens = 0
-            try:
-                result = func(state)
-            except Exception as exc:
-                success = False
-                latency_ms = (time.perf_counter() - t0) * 1000
-                registry.record(agent_name, latency_ms, tokens=0, success=False)
-                logger.error(
-                    f"Node failed: {exc}",
-                    extra={"node": agent_name, "event": "node_error", "latency_ms": round(latency_ms, 2)},
-                    exc_info=True,
-                )
-                raise
-
-            latency_ms = (time.perf_counter() - t0) * 1000
-
-            # ── 4. Output validation ──────────────────────────────────────
-            output = result.get("agent_output", "")
-            issues = validate_output(output, validator)
-
-            if issues:
-                logger.warning(
-                    f"Output validation issues: {issues}",
-                    extra={
-                        "node": agent_name,
-                        "event": "output_validation_warning",
-                        "issues": len(issues),
-                    },
-                )
-
-            # ── 5. Record metrics ─────────────────────────────────────────
-            has_error = bool(result.get("error"))
-            registry.record(
-                agent_name,
-                latency_ms=latency_ms,
-                tokens=tokens,
-                success=not has_error,
-            )
-
-            logger.info(
-                f"Node completed",
-                extra={
-                    "node": agent_name,
-                    "event": "node_end",
-                    "latency_ms": round(latency_ms, 2),
-                    "output_len": len(output),
-                    "validation_issues": len(issues),
-                },
-            )
-
-            return result
+            with track_usage() as usage:
+                try:
+                    result = func(state)
+                except Exception as exc:
+                    _record_failure(agent_name, t0, exc, logger, usage)
+                    raise
+
+            return _propagate(state, _record_success(agent_name, validator, t0, result, logger, usage))
 
         return wrapper
     return decorator
@@ -15,6 +15,11 @@ from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
 
 
+def _keep_summary(current: str, update: str) -> str:
+    """Reducer: a request's empty initial value never erases the stored summary."""
+    return update or current
+
+
 class UserProfile(TypedDict, total=False):
     """Persistent user profile carried across the entire session."""
     name: str
@@ -30,8 +35,9 @@ class AgentState(TypedDict):
 
     ─── Message History ───────────────────────────────────────────────────
     `messages` uses the `add_messages` reducer, which automatically
-    appends new messages rather than replacing the list. This gives
-    every node full conversation history.
+    appends new messages rather than replacing the list. The `memory`
+    stage (src/graph/memory.py) caps it by token budget: the oldest
+    messages are removed and folded into `conversation_summary`.
 
     ─── Routing ───────────────────────────────────────────────────────────
     `current_agent` is set by the router and read by the supervisor
@@ -49,6 +55,12 @@ class AgentState(TypedDict):
     `graph_trace` is a list of node names visited in order.
     Used by the UI to highlight the active node in the graph visualization.
     Uses `add_graph_trace` reducer to append instead of replace.
+
+    ─── Per-request Guardrails ────────────────────────────────────────────
+    `trace_id` and `guardrail_verdict` are set by the first `guarded_node`
+    of a request and reused by every node after it, so one request logs
+    under one trace ID and its input is sanitised + scanned only once.
+    Both are reset by `make_initial_state()` at the start of each request.
     """
 
     # ── Conversation messages (auto-appended by reducer) ──────────────────
@@ -85,6 +97,15 @@ class AgentState(TypedDict):
     # Values: "prep" | "mock" | "evaluate"
     interview_mode: str
 
+    # ── Correlation ID shared by every node of one request ────────────────
+    trace_id: str
+
+    # ── Memoised input-guardrail result, keyed by message content hash ────
+    guardrail_verdict: Dict[str, Any]
+
+    # ── Rolling summary of messages trimmed by the memory stage ───────────
+    conversation_summary: Annotated[str, _keep_summary]
+
 
 def make_initial_state() -> AgentState:
     """
@@ -103,4 +124,7 @@ def make_initial_state() -> AgentState:
         graph_trace=[],
         interview_history=[],
         interview_mode="prep",
+        trace_id="",
+        guardrail_verdict={},
+        conversation_summary="",
     )
@@ -0,0 +1,199 @@
+"""
+tests/benchmarks/_stub_server.py
+─────────────────────────────────────────────────────────────────────────────
+Local stand-in for the Together AI /v1/chat/completions endpoint.
+
+Speaks HTTP/1.1 with keep-alive so pooled and un-pooled clients can be
+compared fairly. Requests with `"stream": true` get the reply back as
+OpenAI-style SSE deltas over a chunked response; with `usage` set, replies
+carry it (in the body, or in a final SSE chunk) together with an
+`openai-processing-ms` header. With `rate_limit_rps` (a server-side token
+bucket) or `error_rate` set it answers some requests with HTTP 429 plus
+`Retry-After` / `x-ratelimit-*` headers, like the real provider under load.
+Used by the benchmark scripts in this directory and by the
+transport/streaming/rate-limit tests.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128         # the default of 5 resets bursts of new connections
+
+
+class StubCompletionServer:
+    """
+    Context manager that serves canned chat completions on 127.0.0.1.
+
+    Args:
+        latency_ms: Artificial server-side processing time per request.
+        reply:      Assistant message content returned for every call.
+        chunk_size: Characters per SSE delta when the client asks to stream.
+        token_delay_ms: Pause between streamed deltas.
+        usage:      Provider `usage` dict to report (None → omitted).
+        rate_limit_rps: Requests/s the stub accepts (bucket of `rate_limit_burst`);
+                    the rest get 429 (None → unlimited).
+        error_rate: Fraction of requests rejected with 429 at random.
+        retry_after_s: `Retry-After` sent with each 429 (None → omitted).
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        reply: str = "stub reply",
+        chunk_size: int = 4,
+        token_delay_ms: float = 0.0,
+        usage: dict | None = None,
+        rate_limit_rps: float | None = None,
+        rate_limit_burst: int = 1,
+        error_rate: float = 0.0,
+        retry_after_s: float | None = None,
+    ):
+        self.latency_ms = latency_ms
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.token_delay_ms = token_delay_ms
+        self.usage = usage
+        self.rate_limit_rps = rate_limit_rps
+        self.rate_limit_burst = rate_limit_burst
+        self.error_rate = error_rate
+        self.retry_after_s = retry_after_s
+        self.connections = 0
+        self.requests = 0
+        self.rejected = 0
+        self._tokens = float(rate_limit_burst)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def _admit(self) -> tuple[bool, float]:
+        """(accepted, tokens left) for one request; caller holds `_lock`."""
+        if self.error_rate and random.random() < self.error_rate:
+            return False, self._tokens
+        if self.rate_limit_rps is None:
+            return True, self._tokens
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit_burst,
+                           self._tokens + (now - self._refilled) * self.rate_limit_rps)
+        self._refilled = now
+        if self._tokens < 1:
+            return False, self._tokens
+        self._tokens -= 1
+        return True, self._tokens
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without this the
+                # kernel's delayed-ACK interaction adds ~40 ms per keep-alive call.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                    accepted, tokens = stub._admit()
+                    if not accepted:
+                        stub.rejected += 1
+                self._tokens = tokens
+                if not accepted:
+                    self._reject()
+                    return
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000)
+                if request.get("stream"):
+                    self._stream_reply()
+                    return
+                reply = {"choices": [{"message": {"role": "assistant", "content": stub.reply}}]}
+                if stub.usage is not None:
+                    reply["usage"] = stub.usage
+                body = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self._send_timing()
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_timing(self):
+                if stub.usage is not None:
+                    self.send_header("openai-processing-ms", str(stub.latency_ms))
+                if stub.rate_limit_rps is not None:
+                    self.send_header("x-ratelimit-limit", str(stub.rate_limit_rps))
+                    self.send_header("x-ratelimit-remaining", str(int(self._tokens)))
+                    if self._tokens < 1:
+                        self.send_header("x-ratelimit-reset",
+                                         f"{(1 - self._tokens) / stub.rate_limit_rps:.3f}")
+
+            def _reject(self):
+                body = json.dumps({"error": {"message": "rate limit exceeded",
+                                             "type": "rate_limit"}}).encode()
+                self.send_response(429)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if stub.retry_after_s is not None:
+                    self.send_header("Retry-After", str(stub.retry_after_s))
+                self._send_timing()
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream_reply(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self._send_timing()
+                self.end_headers()
+                text = stub.reply
+                try:
+                    for i in range(0, len(text), stub.chunk_size):
+                        delta = {"choices": [{"delta": {"content": text[i:i + stub.chunk_size]}}]}
+                        self._write_chunk(f"data: {json.dumps(delta)}\n\n".encode())
+                        if stub.token_delay_ms:
+                            time.sleep(stub.token_delay_ms / 1000)
+                    if stub.usage is not None:
+                        final = {"choices": [], "usage": stub.usage}
+                        self._write_chunk(f"data: {json.dumps(final)}\n\n".encode())
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client hung up early (e.g. it hit a stop sequence)
+                    self.close_connection = True
+
+        return Handler
+
+    def __enter__(self) -> "StubCompletionServer":
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
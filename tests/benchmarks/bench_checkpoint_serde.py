@@ -0,0 +1,118 @@
+"""
+tests/benchmarks/bench_checkpoint_serde.py
+─────────────────────────────────────────────────────────────────────────────
+Checkpoint size and read/write latency of resume threads, plain vs compact serialisation.
+
+Each thread is a resume conversation run through the real graph with the
+LLM stubbed: one generation turn, then refinement turns that each return a
+slightly edited LaTeX document (the previous resume is sent back in, as the
+UI does). "plain" is LangGraph's JsonPlusSerializer; "compact" is
+`CompactSerializer` (content-addressed strings and messages, compressed).
+
+Bytes per checkpoint counts everything the thread costs on disk: checkpoint
+rows, pending writes and (compact) the blobs they reference.
+
+Run with:
+    python -m tests.benchmarks.bench_checkpoint_serde [--threads 20] [--turns 8] [--resume-kb 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from src.core.llm import _TogetherLLM
+from src.core.metrics import registry
+from src.graph.checkpointer import PooledSqliteSaver
+from src.graph.graph_builder import GraphSet
+from src.state import make_initial_state
+
+
+def _latex(kb: int, turn: int) -> str:
+    bullets = "".join(f"\\item Delivered project {i} for turn-{turn // 3}.\n" for i in range(kb * 28))
+    return f"\\documentclass{{article}}\n\\begin{{document}}\n{bullets}\\end{{document}}"
+
+
+def _turn(graph, thread_id: str, turn: int, previous: str):
+    state = make_initial_state()
+    text = "Generate my resume" if turn == 0 else f"Tighten section {turn}"
+    state["messages"] = [HumanMessage(content=text)]
+    state["task_input"] = {
+        "user_message": text,
+        "user_request": text,
+        "job_description": "Senior data engineer, Spark, Airflow, AWS. " * 20,
+        "user_details": "Eight years building pipelines. " * 20,
+        "previous_resume": previous,
+        "force_agent": "resume_builder",
+    }
+    result = graph.invoke(state, {"configurable": {"thread_id": thread_id}})
+    return result["task_input"]["generated_resume"]
+
+
+def _measure(saver: PooledSqliteSaver, threads: int, turns: int, kb: int) -> dict:
+    graph, _ = GraphSet(saver).resolve("persistent", "unused")
+    turn_box = [0]
+    reply = lambda self, messages, stop, retry=0: _latex(kb, turn_box[0])
+
+    registry.reset()
+    with patch.object(_TogetherLLM, "_call_api", reply), contextlib.redirect_stdout(io.StringIO()):
+        for t in range(threads):
+            previous = ""
+            for turn in range(turns):
+                turn_box[0] = turn
+                previous = _turn(graph, f"resume-{t}", turn, previous)
+
+    write = registry.snapshot()["checkpointer.write"]
+    conn = saver.conn
+    (checkpoints, row_bytes), = conn.execute(
+        "SELECT COUNT(*), SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints").fetchall()
+    (write_bytes,), = conn.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes").fetchall()
+    (blob_bytes,), = conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM checkpoint_blobs").fetchall()
+
+    reads = []
+    for _ in range(3):
+        for t in range(threads):
+            t0 = time.perf_counter()
+            saver.get_tuple({"configurable": {"thread_id": f"resume-{t}"}})
+            reads.append((time.perf_counter() - t0) * 1000)
+    return {
+        "checkpoints": checkpoints,
+        "bytes": (row_bytes + write_bytes + blob_bytes) / checkpoints,
+        "write_p50": write["p50_latency_ms"],
+        "write_p95": write["p95_latency_ms"],
+        "read_p50": statistics.median(reads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--resume-kb", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch("src.core.fanout._default_search", lambda q: []):
+        for label, compact in (("plain", False), ("compact", True)):
+            saver = PooledSqliteSaver(os.path.join(tmp, f"{label}.db"), compact=compact)
+            r = _measure(saver, args.threads, args.turns, args.resume_kb)
+            print(
+                f"{label:<8} checkpoints={r['checkpoints']:<5} "
+                f"bytes/checkpoint={r['bytes'] / 1024:7.1f} KiB  "
+                f"write p50={r['write_p50']:6.2f}ms p95={r['write_p95']:6.2f}ms  "
+                f"get_tuple p50={r['read_p50']:6.3f}ms"
+            )
+            saver.close()
+
+
+if __name__ == "__main__":
+    main()
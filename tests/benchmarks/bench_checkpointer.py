@@ -0,0 +1,94 @@
+"""
+tests/benchmarks/bench_checkpointer.py
+─────────────────────────────────────────────────────────────────────────────
+Checkpoint throughput with many concurrent conversations, before and after pooling.
+
+Every simulated conversation (one thread_id per worker thread) runs graph-
+shaped turns: read the latest checkpoint, write a new one, then two rounds
+of pending writes. "single" is the previous setup — one shared connection,
+one lock, a synchronous=FULL commit per write; "pooled" is
+`PooledSqliteSaver` with per-thread readers and group commit.
+
+Run with:
+    python -m tests.benchmarks.bench_checkpointer [--threads 200] [--turns 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.graph.checkpointer import PooledSqliteSaver, ThreadedSqliteSaver, stats
+
+_MESSAGE = "Tell me about data engineering interviews. " * 20
+
+
+def _conversation(saver, thread_id: str, turns: int, write_ms: list, start: threading.Event):
+    start.wait()
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for step in range(turns):
+        saver.get_tuple({"configurable": {"thread_id": thread_id}})
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": [_MESSAGE] * (step + 1)}
+        t0 = time.perf_counter()
+        config = saver.put(config, checkpoint, {"step": step}, {})
+        saver.put_writes(config, [("messages", _MESSAGE)], task_id=f"router-{step}")
+        saver.put_writes(config, [("agent_output", _MESSAGE)], task_id=f"agent-{step}")
+        write_ms.append((time.perf_counter() - t0) * 1000 / 3)
+
+
+def _run(saver, threads: int, turns: int) -> tuple[float, list]:
+    write_ms, start = [], threading.Event()
+    workers = [
+        threading.Thread(target=_conversation, args=(saver, f"user-{i}", turns, write_ms, start))
+        for i in range(threads)
+    ]
+    for w in workers:
+        w.start()
+    t0 = time.perf_counter()
+    start.set()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - t0, write_ms
+
+
+def _report(label: str, elapsed: float, write_ms: list, turns: int):
+    write_ms.sort()
+    p95 = write_ms[int(len(write_ms) * 0.95) - 1]
+    print(
+        f"{label:<8} turns={turns:<6} {turns / elapsed:8.1f} turns/s  "
+        f"write p50={statistics.median(write_ms):7.2f}ms p95={p95:7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--threads", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    total = args.threads * args.turns
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "single.db"), check_same_thread=False)
+        single = ThreadedSqliteSaver(conn)
+        elapsed, write_ms = _run(single, args.threads, args.turns)
+        _report("single", elapsed, write_ms, total)
+        conn.close()
+
+        stats.reset()
+        pooled = PooledSqliteSaver(os.path.join(tmp, "pooled.db"))
+        elapsed, write_ms = _run(pooled, args.threads, args.turns)
+        _report("pooled", elapsed, write_ms, total)
+        print(f"writer stats: {stats.to_dict()}")
+        pooled.close()
+
+
+if __name__ == "__main__":
+    main()
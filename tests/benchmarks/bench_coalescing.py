@@ -0,0 +1,78 @@
+"""
+tests/benchmarks/bench_coalescing.py
+─────────────────────────────────────────────────────────────────────────────
+Upstream load saved by coalescing identical in-flight LLM calls.
+
+`--users` threads each ask one of `--topics` distinct prompts at the same
+moment, `--rounds` times, through `_TogetherLLM` against the local stub
+(`--latency-ms` per completion, response cache off). Reports upstream
+requests, coalesced calls and latency with COALESCE["llm"] off and on.
+
+Run with:
+    python -m tests.benchmarks.bench_coalescing [--users 32] [--topics 4] [--rounds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from src.core.llm import _TogetherLLM
+from src.core.ratelimit import reset_limiters
+from src.core.singleflight import get_flights
+from tests.benchmarks._stub_server import StubCompletionServer
+
+
+def _run(args, enabled: bool) -> dict:
+    latencies = []
+    with StubCompletionServer(latency_ms=args.latency_ms, reply="Start with the basics.") as server, \
+         patch("src.core.llm.TOGETHER_CHAT_URL", server.url), \
+         patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch.dict("src.config.COALESCE", {"llm": enabled}), \
+         patch.dict("src.config.RATE_LIMIT", {"enabled": False}):
+        reset_limiters()
+        llm = _TogetherLLM(model="bench-coalesce", together_api_key="bench", max_tokens=64)
+        flights = get_flights("llm")
+        flights.reset_stats()
+        for _ in range(args.rounds):
+            start = threading.Barrier(args.users)
+
+            def ask(i: int):
+                start.wait()
+                t0 = time.perf_counter()
+                llm.invoke(f"Write a tutorial on topic #{i % args.topics}")
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+            with ThreadPoolExecutor(args.users) as pool:
+                list(pool.map(ask, range(args.users)))
+        latencies.sort()
+        return {
+            "upstream": server.requests,
+            "coalesced": flights.to_dict()["coalesced"],
+            "p50": statistics.median(latencies),
+            "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--topics", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    calls = args.users * args.rounds
+    print(f"users={args.users} topics={args.topics} rounds={args.rounds} latency={args.latency_ms}ms")
+    for label, enabled in (("off", False), ("on", True)):
+        r = _run(args, enabled)
+        print(f"coalescing {label:<3}  calls={calls:<5} upstream={r['upstream']:<5} "
+              f"coalesced={r['coalesced']:<5} latency p50={r['p50']:7.1f}ms p95={r['p95']:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
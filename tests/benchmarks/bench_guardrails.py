@@ -0,0 +1,134 @@
+"""
+tests/benchmarks/bench_guardrails.py
+─────────────────────────────────────────────────────────────────────────────
+Input-guardrail throughput: per-pattern scans vs the single-pass matcher.
+
+Builds realistic resumes and job descriptions padded to MAX_INPUT_LENGTH
+(15,000 chars) and times, per document, the legacy strategy (one search per
+injection rule, then in-scope rules until one hits, then off-topic rules)
+against `scan_input`. Both must return the same verdict and rule for every
+document; the script aborts if they ever disagree.
+
+Run with:
+    python -m tests.benchmarks.bench_guardrails [--docs 40] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from src.middleware.guardrails import MAX_INPUT_LENGTH, _MATCHER, GuardrailScan, scan_input
+
+_RESUME_BLOCKS = [
+    "Senior Software Engineer, Acme Corp (2019 – Present)\n"
+    "- Led a team of 6 engineers building event-driven microservices in Go and Python.\n"
+    "- Cut p95 checkout latency from 900 ms to 210 ms by introducing Redis read-through caching.\n"
+    "- Owned the Kubernetes migration of 40 services; on-call rotation lead.\n",
+    "Data Analyst, Northwind Traders (2016 – 2019)\n"
+    "- Built weekly revenue dashboards in Tableau used by 120 stakeholders.\n"
+    "- Automated ETL from 14 sources with Airflow, saving ~30 analyst hours per month.\n",
+    "EDUCATION\nB.Tech in Computer Science, National Institute of Technology, 2016. GPA 8.7/10.\n"
+    "Relevant coursework: Operating Systems, Databases, Distributed Systems, Statistics.\n",
+    "SKILLS\nLanguages: Python, Go, TypeScript, SQL. Frameworks: FastAPI, React, Spark.\n"
+    "Infrastructure: AWS (ECS, Lambda, RDS), Terraform, Docker, GitHub Actions, Prometheus.\n",
+    "PROJECTS\nOpen-source contributor to a popular async HTTP client; implemented HTTP/2 "
+    "connection pooling and wrote the retry middleware. Built a personal finance tracker "
+    "with 2k monthly users.\n",
+    "CERTIFICATIONS\nAWS Certified Solutions Architect – Associate (2022). CKA (2021).\n",
+]
+
+_JD_BLOCKS = [
+    "About the role\nWe are looking for a Backend Engineer to design and operate the services "
+    "behind our payments platform. You will work closely with product and data teams.\n",
+    "Responsibilities\n- Design, build and maintain high-throughput APIs.\n"
+    "- Participate in architecture reviews and mentor junior engineers.\n"
+    "- Improve observability, reliability and cost efficiency of our systems.\n",
+    "Requirements\n- 4+ years of professional experience with Java, Kotlin or Go.\n"
+    "- Solid understanding of relational databases and distributed systems.\n"
+    "- Experience with cloud providers and infrastructure as code.\n",
+    "Nice to have\n- Exposure to event sourcing, Kafka or Pulsar.\n"
+    "- Prior work in a regulated industry such as banking or insurance.\n",
+    "Benefits\nCompetitive compensation and equity, flexible hours, hybrid work from our "
+    "Bangalore office, learning budget, and comprehensive health cover for your family.\n",
+]
+
+_NEUTRAL = (
+    "Collaborated across time zones to deliver features on schedule and documented "
+    "decisions in design notes reviewed by the wider organisation. "
+)
+
+
+def make_documents(n: int, seed: int = 7) -> list[str]:
+    """`n` resumes / job descriptions, each exactly MAX_INPUT_LENGTH chars."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        blocks = _RESUME_BLOCKS if i % 2 == 0 else _JD_BLOCKS
+        parts = []
+        while sum(map(len, parts)) < MAX_INPUT_LENGTH:
+            parts.append(rng.choice(blocks) if rng.random() < 0.6 else _NEUTRAL)
+        docs.append("".join(parts)[:MAX_INPUT_LENGTH])
+    return docs
+
+
+def legacy_scan(text: str) -> GuardrailScan:
+    """The pre-matcher strategy: one `search` per rule, in-scope short-circuits."""
+    rules = list(_MATCHER.rules.values())
+    injections = tuple(r.name for r in rules if r.kind == "injection" and r.regex.search(text))
+    in_scope: tuple = ()
+    for r in rules:
+        if r.kind == "in_scope" and r.regex.search(text):
+            in_scope = (r.name,)
+            break
+    off_topic: tuple = ()
+    if not in_scope:
+        for r in rules:
+            if r.kind == "off_topic" and r.regex.search(text):
+                off_topic = (r.name,)
+                break
+    return GuardrailScan(injections=injections, in_scope=in_scope, off_topic=off_topic)
+
+
+def _time(fn, docs: list[str], repeat: int) -> list[float]:
+    per_doc = []
+    for _ in range(repeat):
+        for doc in docs:
+            t0 = time.perf_counter()
+            fn(doc)
+            per_doc.append((time.perf_counter() - t0) * 1000)
+    return per_doc
+
+
+def _report(label: str, per_doc: list[float], chars: int):
+    per_doc.sort()
+    mb_s = chars / 1e6 / (statistics.mean(per_doc) / 1000)
+    print(
+        f"{label:<8} p50={statistics.median(per_doc):6.3f}ms "
+        f"p95={per_doc[int(len(per_doc) * 0.95) - 1]:6.3f}ms  throughput={mb_s:6.2f} MB/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    docs = make_documents(args.docs)
+    for doc in docs:
+        old, new = legacy_scan(doc), scan_input(doc)
+        assert (old.verdict, old.rule) == (new.verdict, new.rule), (old, new)
+
+    print(f"{len(docs)} documents × {MAX_INPUT_LENGTH} chars, {args.repeat} passes")
+    old = _time(legacy_scan, docs, args.repeat)
+    new = _time(scan_input, docs, args.repeat)
+    _report("legacy", old, MAX_INPUT_LENGTH)
+    _report("matcher", new, MAX_INPUT_LENGTH)
+    print(f"speed-up (mean): {statistics.mean(old) / statistics.mean(new):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
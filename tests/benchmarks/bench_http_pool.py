@@ -0,0 +1,73 @@
+"""
+tests/benchmarks/bench_http_pool.py
+─────────────────────────────────────────────────────────────────────────────
+Per-call latency of the LLM transport with and without connection pooling.
+
+Runs against a local stub server, so the numbers isolate connection setup
+cost (TCP handshake, socket churn). Against api.together.xyz the pooled
+path additionally skips a TLS handshake per call.
+
+Run with:
+    python -m tests.benchmarks.bench_http_pool [--calls 500] [--threads 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from src.core.transport import build_session, stats
+from tests.benchmarks._stub_server import StubCompletionServer
+
+_PAYLOAD = {"model": "stub", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def _run(post, url: str, calls: int, threads: int) -> list[float]:
+    def one(_):
+        t0 = time.perf_counter()
+        resp = post(url, json=_PAYLOAD, timeout=10)
+        resp.raise_for_status()
+        resp.json()
+        return (time.perf_counter() - t0) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(one, range(calls)))
+
+
+def _report(label: str, latencies: list[float], connections: int):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<12} calls={len(latencies):<5} "
+        f"mean={statistics.mean(latencies):7.3f}ms "
+        f"p50={statistics.median(latencies):7.3f}ms "
+        f"p95={p95:7.3f}ms  server_connections={connections}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with StubCompletionServer() as server:
+        _run(requests.post, server.url, 20, 1)            # warm-up
+        before = server.connections
+        unpooled = _run(requests.post, server.url, args.calls, args.threads)
+        _report("unpooled", unpooled, server.connections - before)
+
+    with StubCompletionServer() as server:
+        session = build_session(max_connections=args.threads)
+        stats.reset()
+        pooled = _run(session.post, server.url, args.calls, args.threads)
+        _report("pooled", pooled, server.connections)
+        print(f"pool stats: {stats.to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
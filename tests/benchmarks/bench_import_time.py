@@ -0,0 +1,97 @@
+"""
+tests/benchmarks/bench_import_time.py
+─────────────────────────────────────────────────────────────────────────────
+Cold-start digest of `import api`: wall time and `-X importtime` breakdown.
+
+Imports `api` in fresh interpreters (checkpoints in a temporary directory),
+reports the best / median wall time against STARTUP["import_budget_s"], then
+one `python -X importtime` run summarised two ways: self time summed per
+top-level package (where the time goes) and the slowest modules by
+cumulative time (what to defer). `--preload` measures the cost of
+STARTUP["preload_agents"]; `--check` exits non-zero when the best run is
+over budget (for a CI job on known hardware, not the unit suite).
+
+Run with:
+    python -m tests.benchmarks.bench_import_time [--runs 5] [--top 15] [--preload] [--check]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+from src.config import STARTUP
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TIMED = "import time; t0 = time.perf_counter(); import api; print(time.perf_counter() - t0)"
+
+
+def _env(tmp: str, preload: bool) -> dict:
+    env = {
+        **os.environ,
+        "CHECKPOINT_DB_PATH": os.path.join(tmp, "checkpoints.db"),
+        "CHECKPOINT_RETENTION_ENABLED": "0",
+        "STARTUP_PRELOAD_AGENTS": "1" if preload else "0",
+    }
+    env.pop("METRICS_MULTIPROC_DIR", None)
+    return env
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every line of `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--preload", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 when over STARTUP['import_budget_s']")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(tmp, args.preload)
+        times = [
+            float(subprocess.run([sys.executable, "-c", _TIMED], cwd=ROOT, env=env,
+                                 capture_output=True, text=True, check=True).stdout.split()[-1])
+            for _ in range(args.runs)
+        ]
+        profile = subprocess.run([sys.executable, "-X", "importtime", "-c", "import api"], cwd=ROOT,
+                                 env=env, capture_output=True, text=True, check=True)
+
+    budget = STARTUP["import_budget_s"]
+    print(f"import api  runs={args.runs}  best={min(times):.3f}s  median={statistics.median(times):.3f}s  "
+          f"budget={budget:.1f}s  preload_agents={args.preload}")
+
+    rows = _parse_importtime(profile.stderr)
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    total = sum(by_package.values())
+    print(f"\n{'package':<28} {'self ms':>9} {'share':>7}")
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{package:<28} {us / 1000:9.1f} {us / total:7.1%}")
+
+    print(f"\n{'module':<48} {'cumulative ms':>14}")
+    for name, _, cumulative_us in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{name:<48} {cumulative_us / 1000:14.1f}")
+
+    if args.check and min(times) > budget:
+        sys.exit(f"\nimport api took {min(times):.2f}s, over the {budget:.1f}s budget")
+
+
+if __name__ == "__main__":
+    main()
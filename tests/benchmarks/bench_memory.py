@@ -0,0 +1,93 @@
+"""
+tests/benchmarks/bench_memory.py
+─────────────────────────────────────────────────────────────────────────────
+Mock-interview prompt tokens and stored history by turn, bounded vs unbounded memory.
+
+Runs one mock interview through the graph (PooledSqliteSaver in a temporary
+directory, LLM stubbed out) the way the chat UI does: every turn sends the
+full interview history. "unbounded" lifts the memory budgets, which is what
+the graph did before the `memory` stage.
+
+Run with:
+    python -m tests.benchmarks.bench_memory [--turns 40] [--answer-words 120]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from src.core.llm import _TogetherLLM
+from src.core.usage import estimate_tokens
+from src.graph.checkpointer import PooledSqliteSaver
+from src.graph.graph_builder import GraphSet
+from src.graph.memory import get_summarizer
+from src.state import make_initial_state
+
+_QUESTION = "Thanks. Tell me about a time you scaled a data pipeline under a deadline?"
+_UNBOUNDED = {
+    "max_tokens": 10**9,
+    "keep_tokens": 10**9,
+    "prompt_tokens": {"router": 10**9, "general_qa": 10**9, "mock_interview": 10**9},
+}
+
+
+def _interview(saver: PooledSqliteSaver, turns: int, answer_words: int) -> list[tuple[int, int, int]]:
+    graph, config = GraphSet(saver).resolve("persistent", "mock")
+    prompts: list[str] = []
+
+    def reply(self, messages, stop, retry=0):
+        prompt = "\n".join(m["content"] for m in messages)
+        if "running summary" in prompt:
+            return "Candidate has strong Spark and Airflow experience; answers are structured."
+        prompts.append(prompt)
+        return _QUESTION
+
+    rows, history = [], []
+    with patch.object(_TogetherLLM, "_call_api", reply), contextlib.redirect_stdout(io.StringIO()):
+        for turn in range(1, turns + 1):
+            answer = f"Answer {turn}: " + "I partitioned the jobs and added backpressure " * (answer_words // 7)
+            state = make_initial_state()
+            state["messages"] = [HumanMessage(content=answer)]
+            state["task_input"] = {"user_message": answer, "job_title": "Data Engineer",
+                                   "force_agent": "mock_interview"}
+            state["interview_history"] = history
+            state["interview_mode"] = "mock"
+            result = graph.invoke(state, config)
+            history = result["interview_history"]
+            stored = sum(estimate_tokens(str(m.content)) for m in result["messages"])
+            rows.append((turn, estimate_tokens(prompts[-1]), stored))
+            get_summarizer().wait(timeout=10)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--answer-words", type=int, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch("src.core.fanout._default_search", lambda q: []):
+        results = {}
+        for label, limits in (("unbounded", _UNBOUNDED), ("bounded", {})):
+            with patch.dict("src.config.MEMORY", limits):
+                saver = PooledSqliteSaver(os.path.join(tmp, f"{label}.db"))
+                results[label] = _interview(saver, args.turns, args.answer_words)
+                saver.close()
+
+        print(f"{'turn':>5}  {'unbounded prompt':>16} {'stored':>8}   {'bounded prompt':>14} {'stored':>8}")
+        for (turn, up, us), (_, bp, bs) in zip(results["unbounded"], results["bounded"]):
+            if turn in (1, 5) or turn % 10 == 0:
+                print(f"{turn:>5}  {up:>16} {us:>8}   {bp:>14} {bs:>8}")
+
+
+if __name__ == "__main__":
+    main()
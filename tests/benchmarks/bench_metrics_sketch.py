@@ -0,0 +1,95 @@
+"""
+tests/benchmarks/bench_metrics_sketch.py
+─────────────────────────────────────────────────────────────────────────────
+Per-agent latency recording: sorted list + bisect.insort vs DDSketch.
+
+Records `--samples` log-normally distributed latencies through
+`_AgentMetrics.record` (all-time sketch + 1m/5m/1h sliding windows) and
+reports insert cost, retained memory and p50/p95/p99 error against the exact
+percentiles. The legacy sorted list is O(n) per insert, so it is only run for
+`--legacy-samples` and its memory is extrapolated linearly.
+
+Run with:
+    python -m tests.benchmarks.bench_metrics_sketch [--samples 10000000] [--legacy-samples 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import random
+import sys
+import time
+
+from src.core.metrics import _AgentMetrics
+
+# A Python float in a list costs the 8-byte slot plus the 24-byte object
+_FLOAT_BYTES = 8 + sys.getsizeof(1.0)
+
+
+def make_pool(n: int, seed: int = 11) -> list[float]:
+    """Reusable pool of latencies (ms) — cycled so generation is not timed."""
+    rng = random.Random(seed)
+    return [rng.lognormvariate(6.5, 0.9) for _ in range(n)]
+
+
+def _sketch_bytes(metrics: _AgentMetrics) -> int:
+    sketches = [metrics.latencies] + [sk for _, sk in metrics.windows._slots]
+    return sum(sys.getsizeof(sk.buckets) + len(sk.buckets) * 2 * 28 for sk in sketches)
+
+
+def bench_sketch(pool: list[float], samples: int) -> tuple[float, int, _AgentMetrics]:
+    metrics = _AgentMetrics()
+    record = metrics.record
+    size = len(pool)
+    t0 = time.perf_counter()
+    for i in range(samples):
+        record(pool[i % size])
+    elapsed = time.perf_counter() - t0
+    return elapsed / samples * 1e9, _sketch_bytes(metrics), metrics
+
+
+def bench_legacy(pool: list[float], samples: int) -> float:
+    latencies: list[float] = []
+    size = len(pool)
+    t0 = time.perf_counter()
+    for i in range(samples):
+        bisect.insort(latencies, pool[i % size])
+    return (time.perf_counter() - t0) / samples * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--samples", type=int, default=10_000_000)
+    parser.add_argument("--legacy-samples", type=int, default=100_000)
+    parser.add_argument("--pool", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    pool = make_pool(min(args.pool, args.samples))
+
+    legacy_ns = bench_legacy(pool, args.legacy_samples)
+    print(
+        f"legacy  {args.legacy_samples:>11,} samples  {legacy_ns:8.0f} ns/insert  "
+        f"memory {args.legacy_samples * _FLOAT_BYTES / 2**20:8.1f} MiB "
+        f"(→ {args.samples * _FLOAT_BYTES / 2**20:,.0f} MiB at {args.samples:,})"
+    )
+
+    sketch_ns, sketch_bytes, metrics = bench_sketch(pool, args.samples)
+    print(
+        f"sketch  {args.samples:>11,} samples  {sketch_ns:8.0f} ns/insert  "
+        f"memory {sketch_bytes / 2**10:8.1f} KiB "
+        f"({len(metrics.latencies.buckets)} buckets all-time)"
+    )
+
+    # Every pool value was recorded samples/len(pool) times (± one), so the
+    # pool's own exact percentiles are the reference
+    exact = sorted(pool)
+    for q in (0.50, 0.95, 0.99):
+        truth = exact[int(len(exact) * q)]
+        est = metrics.latencies.quantile(q)
+        print(f"  p{int(q * 100):<3} exact={truth:9.2f}ms  sketch={est:9.2f}ms  "
+              f"error={abs(est - truth) / truth:6.3%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+tests/benchmarks/bench_mock_session.py
+─────────────────────────────────────────────────────────────────────────────
+Bytes on the wire and per-turn latency of a mock interview, full-history vs server-held session.
+
+Drives `/api/interview/mock/start` + `/answer` through FastAPI's TestClient
+(checkpoints in a temporary directory, LLM stubbed out). "history" is the
+legacy protocol — every answer carries, and every reply returns, the whole
+transcript; "session" sends only the answer and the turn counter.
+
+Run with:
+    python -m tests.benchmarks.bench_mock_session [--turns 30] [--answer-words 120]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib
+import io
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from src.core.llm import _TogetherLLM
+
+_QUESTION = (
+    "Thanks, that is a solid answer. Let's go deeper: how would you make that "
+    "pipeline idempotent when upstream files arrive late or twice?"
+)
+
+
+def _interview(client, thread_id: str, turns: int, answer_words: int, session: bool):
+    task = {"job_title": "Data Engineer", "user_experience": "8 years", "thread_id": thread_id}
+    res = client.post("/api/interview/mock/start", json=task)
+    history, turn = res.json()["history"], res.json()["turn"]
+
+    rows = []
+    for i in range(turns):
+        answer = f"Answer {i}: " + "I partitioned the jobs by date and made writes idempotent " * (answer_words // 10)
+        body = {**task, "answer": answer}
+        if session:
+            body["turn"] = turn
+        else:
+            history = history + [{"role": "user", "content": answer}]
+            body["history"] = history
+
+        request = client.build_request("POST", "/api/interview/mock/answer", json=body)
+        t0 = time.perf_counter()
+        res = client.send(request)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        data = res.json()
+        if session:
+            turn = data["turn"]
+        else:
+            history = data["history"]
+        rows.append((len(request.content), len(res.content), elapsed_ms))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--answer-words", type=int, default=120)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)          # one access-log line per request
+
+    async def reply(self, messages, stop, retry=0):
+        return _QUESTION
+
+    def summary(self, messages, stop, retry=0):        # background rolling summary
+        return "Candidate has strong Spark and Airflow experience."
+
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("src.graph.checkpointer.DB_PATH", f"{tmp}/checkpoints.db"), \
+         patch.dict("src.config.CHECKPOINT_RETENTION", {"enabled": False}), \
+         patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch.object(_TogetherLLM, "_acall_api", reply), \
+         patch.object(_TogetherLLM, "_call_api", summary), \
+         contextlib.redirect_stdout(io.StringIO()):
+        from fastapi.testclient import TestClient
+        sys.modules.pop("api", None)
+        api = importlib.import_module("api")
+        client = TestClient(api.app)
+        _interview(client, "warm-up", 2, args.answer_words, session=True)
+        results = {
+            mode: _interview(client, f"bench-{mode}", args.turns, args.answer_words, session=(mode == "session"))
+            for mode in ("history", "session")
+        }
+        api.checkpointer.close()
+
+    for mode, rows in results.items():
+        sent = sum(r[0] for r in rows)
+        received = sum(r[1] for r in rows)
+        latencies = [r[2] for r in rows]
+        print(
+            f"{mode:<8} turns={args.turns:<3} sent={sent / 1024:8.1f} KiB  received={received / 1024:8.1f} KiB  "
+            f"last turn={rows[-1][0] + rows[-1][1]:>7} B  "
+            f"latency p50={statistics.median(latencies):6.2f}ms  last={latencies[-1]:6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
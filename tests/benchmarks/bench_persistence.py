@@ -0,0 +1,101 @@
+"""
+tests/benchmarks/bench_persistence.py
+─────────────────────────────────────────────────────────────────────────────
+Checkpoint disk I/O per one-shot request in each graph persistence mode.
+
+Runs resume-builder turns (the heaviest state: a full LaTeX document) with
+the LLM stubbed out, against a `PooledSqliteSaver` in a temporary directory.
+Disk I/O is the process's write-syscall byte count (`wchar` in
+/proc/self/io) plus checkpoint writes committed; "persistent" is what the
+stateless endpoints used to do.
+
+Run with:
+    python -m tests.benchmarks.bench_persistence [--requests 50] [--resume-kb 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from src.core.llm import _TogetherLLM
+from src.graph.checkpointer import PooledSqliteSaver, stats
+from src.graph.graph_builder import PERSISTENCE_MODES, GraphSet
+from src.state import make_initial_state
+
+
+def _written_bytes() -> int:
+    try:
+        with open("/proc/self/io") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("wchar:"))
+    except (OSError, StopIteration):
+        return 0
+
+
+def _state(i: int) -> dict:
+    state = make_initial_state()
+    text = f"Generate a LaTeX resume for request {i}"
+    state["messages"] = [HumanMessage(content=text)]
+    state["task_input"] = {
+        "user_message": text,
+        "job_description": "Senior data engineer, Spark, Airflow, AWS. " * 20,
+        "user_details": "Eight years building pipelines. " * 20,
+        "previous_resume": "",
+        "force_agent": "resume_builder",
+    }
+    return state
+
+
+def _run(graphs: GraphSet, persistence: str, requests: int) -> tuple[int, int, float]:
+    stats.reset()
+    before, t0 = _written_bytes(), time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):     # node logs are not checkpoint I/O
+        for i in range(requests):
+            graph, config = graphs.resolve(persistence, f"resume-{i}")
+            try:
+                graph.invoke(_state(i), config)
+            finally:
+                graphs.release(persistence, config)
+    elapsed = time.perf_counter() - t0
+    return _written_bytes() - before, stats.to_dict()["writes"], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--resume-kb", type=int, default=8)
+    args = parser.parse_args()
+
+    reply = (
+        "\\documentclass{article}\n\\begin{document}\n"
+        + "\\item Built pipelines. " * (args.resume_kb * 45)
+        + "\n\\end{document}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch.object(_TogetherLLM, "_call_api", lambda self, messages, stop, retry=0: reply), \
+         patch("src.core.fanout._default_search", lambda q: []):
+        saver = PooledSqliteSaver(os.path.join(tmp, "checkpoints.db"))
+        graphs = GraphSet(saver)
+        _run(graphs, "none", 3)                                   # warm-up
+        for persistence in PERSISTENCE_MODES:
+            written, writes, elapsed = _run(graphs, persistence, args.requests)
+            print(
+                f"{persistence:<11} requests={args.requests:<4} "
+                f"disk_written/request={written / args.requests / 1024:8.1f} KiB  "
+                f"checkpoint_writes/request={writes / args.requests:5.1f}  "
+                f"{elapsed / args.requests * 1000:6.2f} ms/request"
+            )
+        saver.close()
+
+
+if __name__ == "__main__":
+    main()
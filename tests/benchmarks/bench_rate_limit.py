@@ -0,0 +1,127 @@
+"""
+tests/benchmarks/bench_rate_limit.py
+─────────────────────────────────────────────────────────────────────────────
+Load test of 429 handling: per-thread recursive retry vs the shared adaptive limiter.
+
+`--workers` threads make `--calls` completions against a local stub that
+accepts `--server-rps` (bucket of `--server-burst`) and answers the rest,
+plus a random `--error-rate` fraction, with HTTP 429. "independent" is the
+old `_call_api` policy, reproduced inline: every thread sleeps
+`base * 4**retry` on its own and retries, so workers that were rejected
+together wake and collide together. "shared" is `_TogetherLLM` going
+through its model's `ModelLimiter`, started at twice the server's rate so
+the AIMD adaptation is part of the run. Reports completions, 429s provoked,
+wall time, per-call latency and (shared) queue depth / wait.
+
+Run with:
+    python -m tests.benchmarks.bench_rate_limit [--workers 16] [--calls 96] [--server-rps 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from src.core.llm import RATE_LIMITED, _TogetherLLM
+from src.core.ratelimit import get_limiter, reset_limiters
+from src.core.transport import get_session
+from tests.benchmarks._stub_server import StubCompletionServer
+
+_MODEL = "bench-rate-limit"
+
+
+def _independent(url: str, base_s: float, max_retries: int):
+    """The pre-limiter retry policy: recursion with an unjittered per-thread sleep."""
+
+    def call(prompt: str, retry: int = 0) -> str:
+        resp = get_session().post(url, json={"model": _MODEL, "messages": [
+            {"role": "user", "content": prompt}]}, timeout=60)
+        if resp.status_code == 429:
+            if retry < max_retries:
+                time.sleep(base_s * (4 ** retry))
+                return call(prompt, retry + 1)
+            return RATE_LIMITED
+        return resp.json()["choices"][0]["message"]["content"]
+
+    return call
+
+
+def _run(label: str, call, args) -> dict:
+    latencies = []
+
+    def timed(i: int) -> str:
+        t0 = time.perf_counter()
+        reply = call(f"question {i}")
+        latencies.append((time.perf_counter() - t0) * 1000)
+        return reply
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.workers) as pool:
+        replies = list(pool.map(timed, range(args.calls)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "label": label,
+        "ok": sum(r != RATE_LIMITED for r in replies),
+        "wall_s": wall,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=96)
+    parser.add_argument("--server-rps", type=float, default=20.0)
+    parser.add_argument("--server-burst", type=int, default=5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--base-delay", type=float, default=0.25,
+                        help="retry base in seconds (the client default of 1.0, scaled down)")
+    parser.add_argument("--max-retries", type=int, default=3)
+    args = parser.parse_args()
+
+    def server():
+        return StubCompletionServer(latency_ms=args.latency_ms, reply="ok",
+                                    rate_limit_rps=args.server_rps, rate_limit_burst=args.server_burst,
+                                    error_rate=args.error_rate, retry_after_s=args.retry_after)
+
+    results = []
+    with server() as stub:
+        results.append(_run("independent", _independent(stub.url, args.base_delay, args.max_retries), args))
+        results[-1]["rejected"], results[-1]["requests"] = stub.rejected, stub.requests
+
+    limits = {"rps": 2 * args.server_rps, "burst": args.server_burst, "backoff_base_s": args.base_delay}
+    with server() as stub, \
+         patch("src.core.llm.TOGETHER_CHAT_URL", stub.url), \
+         patch.dict("src.config.RATE_LIMIT", limits), \
+         patch("builtins.print"):
+        reset_limiters()
+        llm = _TogetherLLM(model=_MODEL, together_api_key="bench", max_tokens=16,
+                           max_retries=args.max_retries, initial_retry_delay=args.base_delay)
+        results.append(_run("shared", llm.invoke, args))
+        results[-1]["rejected"], results[-1]["requests"] = stub.rejected, stub.requests
+        limiter = get_limiter(_MODEL).to_dict()
+
+    print(f"workers={args.workers} calls={args.calls} server_rps={args.server_rps} "
+          f"burst={args.server_burst} error_rate={args.error_rate} retry_after={args.retry_after}")
+    for r in results:
+        print(
+            f"{r['label']:<12} ok={r['ok']:>4}/{args.calls:<4} 429s={r['rejected']:<5} "
+            f"requests={r['requests']:<5} wall={r['wall_s']:6.2f}s  "
+            f"latency p50={r['p50']:8.1f}ms p95={r['p95']:8.1f}ms"
+        )
+    print(
+        f"shared limiter: final rate={limiter['rate_rps']} req/s  "
+        f"max queue depth={limiter['max_queue_depth']}  avg wait={limiter['avg_wait_ms']}ms  "
+        f"max wait={limiter['max_wait_ms']}ms  header pauses={limiter['header_pauses']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
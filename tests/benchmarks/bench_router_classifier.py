@@ -0,0 +1,94 @@
+"""
+tests/benchmarks/bench_router_classifier.py
+─────────────────────────────────────────────────────────────────────────────
+Offline accuracy and latency of the router's zero-LLM fast path.
+
+Scores every message in tests/fixtures/router_intents.jsonl (held out from
+the training data) and reports, per confidence threshold, how many turns
+skip the LLM and how often those fast-path decisions are correct. Rows
+labelled "unclear" should never be fast-pathed.
+
+Run with:
+    python -m tests.benchmarks.bench_router_classifier [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from src.agents.router.classifier import classify, get_classifier, keyword_route
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "fixtures", "router_intents.jsonl")
+
+
+def load_fixture(path: str = FIXTURE) -> list[tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [(row["text"], row["label"]) for row in map(json.loads, f) if row]
+
+
+def evaluate(rows: list[tuple[str, str]], threshold: float) -> dict:
+    """Fast-path coverage / precision on `rows` at `threshold`."""
+    fast = correct = unclear_fast = top1 = 0
+    labelled = [(t, l) for t, l in rows if l != "unclear"]
+    for text, label in rows:
+        d = classify(text, threshold=threshold)
+        if label == "unclear":
+            unclear_fast += d.fast_path
+            continue
+        top1 += d.route == label
+        if d.fast_path:
+            fast += 1
+            correct += d.route == label
+    return {
+        "threshold": threshold,
+        "coverage": fast / len(labelled),
+        "precision": correct / fast if fast else 0.0,
+        "top1_accuracy": top1 / len(labelled),
+        "unclear_fast_pathed": unclear_fast,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--repeat", type=int, default=200, help="timing passes over the fixture")
+    args = parser.parse_args()
+
+    rows = load_fixture()
+    get_classifier()                                  # load weights outside the timer
+
+    kw_hits = [(keyword_route(t), l) for t, l in rows if l != "unclear"]
+    kw_fired = [(k, l) for k, l in kw_hits if k]
+    print(f"fixture: {len(rows)} messages ({sum(l == 'unclear' for _, l in rows)} unclear)")
+    print(
+        f"keywords only: fired on {len(kw_fired)}/{len(kw_hits)}, "
+        f"precision {sum(k == l for k, l in kw_fired) / len(kw_fired):.3f}"
+    )
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.9):
+        r = evaluate(rows, threshold)
+        print(
+            f"threshold={threshold:.1f}  coverage={r['coverage']:.3f}  "
+            f"precision={r['precision']:.3f}  top1={r['top1_accuracy']:.3f}  "
+            f"unclear_fast_pathed={r['unclear_fast_pathed']}"
+        )
+
+    latencies = []
+    for _ in range(args.repeat):
+        for text, _ in rows:
+            t0 = time.perf_counter()
+            classify(text)
+            latencies.append((time.perf_counter() - t0) * 1e6)
+    latencies.sort()
+    print(
+        f"latency over {len(latencies)} calls: "
+        f"p50={statistics.median(latencies):.1f}µs "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:.1f}µs "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1]:.1f}µs"
+    )
+
+
+if __name__ == "__main__":
+    main()
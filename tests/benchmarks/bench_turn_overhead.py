@@ -0,0 +1,91 @@
+"""
+tests/benchmarks/bench_turn_overhead.py
+─────────────────────────────────────────────────────────────────────────────
+Per-turn Python overhead of a chat turn, shared LLM registry vs building clients per call.
+
+Runs general-QA turns on one thread through the graph (PooledSqliteSaver in
+a temporary directory) with an upstream stub that sleeps `--network-ms` and
+reports that as network time, and reads each turn's split from a
+`profile_turn` hook. "per-call" drops the registry before every turn, so
+each node call builds its `_TogetherLLM` and `LLMChain` again — what every
+node did before the registry.
+
+Run with:
+    python -m tests.benchmarks.bench_turn_overhead [--turns 40] [--network-ms 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from src.core.llm import _TogetherLLM, llms
+from src.core.profiling import add_turn_hook, profile_turn, remove_turn_hook
+from src.graph.checkpointer import PooledSqliteSaver
+from src.graph.graph_builder import GraphSet
+from src.state import make_initial_state
+
+
+def _turns(saver: PooledSqliteSaver, label: str, turns: int, per_call: bool):
+    graph, config = GraphSet(saver).resolve("persistent", f"bench-{label}")
+    profiles = []
+    add_turn_hook(profiles.append)
+    try:
+        for i in range(turns):
+            if per_call:
+                llms.reload(force=True)
+            text = f"Question {i}: how should I prepare for a data engineering interview?"
+            state = make_initial_state()
+            state["messages"] = [HumanMessage(content=text)]
+            state["task_input"] = {"user_message": text, "force_agent": "general_qa"}
+            with profile_turn(label):
+                graph.invoke(state, config)
+    finally:
+        remove_turn_hook(profiles.append)
+    return profiles[2:]                      # first turns pay one-off imports and warm-up
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--network-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    def reply(self, messages, stop, retry=0):
+        t0 = time.perf_counter()
+        time.sleep(args.network_ms / 1000)
+        answer = "Start with SQL, then data modelling. " * 20
+        self._report_usage(messages, answer, None, t0, {})
+        return answer
+
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch.dict("src.config.MEMORY", {"summarize": False}), \
+         patch.object(_TogetherLLM, "_call_api", reply), \
+         contextlib.redirect_stdout(io.StringIO()):
+        results = {}
+        for label, per_call in (("per-call", True), ("registry", False)):
+            saver = PooledSqliteSaver(os.path.join(tmp, f"{label}.db"))
+            results[label] = _turns(saver, label, args.turns, per_call)
+            saver.close()
+
+    for label, profiles in results.items():
+        overhead = [p.overhead_ms for p in profiles]
+        print(
+            f"{label:<9} turns={len(profiles):<3} "
+            f"wall p50={statistics.median(p.wall_ms for p in profiles):7.2f}ms  "
+            f"network p50={statistics.median(p.network_ms for p in profiles):7.2f}ms  "
+            f"overhead p50={statistics.median(overhead):6.2f}ms  max={max(overhead):6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+tests/test_cache.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for the persistent response cache:
+  - src/core/cache.py  (SqliteCache TTL + LRU eviction)
+  - src/core/llm.py    (response caching in _TogetherLLM / get_llm)
+
+Run with:
+    python -m pytest tests/test_cache.py -v
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.core.cache import CacheStats, SqliteCache
+from src.core.llm import _TogetherLLM, cache_stats, get_llm
+from src.core.metrics import registry
+from tests.benchmarks._stub_server import StubCompletionServer
+
+
+class TestSqliteCache:
+    """TTL expiry, LRU size eviction and persistence."""
+
+    def test_set_get(self):
+        cache = SqliteCache(":memory:")
+        cache.set("k", "value")
+        assert cache.get("k") == "value"
+        assert cache.get("missing") is None
+        snap = cache.stats.to_dict()
+        assert snap["hits"] == 1
+        assert snap["misses"] == 1
+        assert snap["bytes_saved"] == len("value")
+
+    def test_ttl_expiry(self):
+        cache = SqliteCache(":memory:", ttl_s=0.05)
+        cache.set("k", "value")
+        time.sleep(0.1)
+        assert cache.get("k") is None
+        assert cache.stats.expired == 1
+        assert cache.size_bytes == 0
+
+    def test_lru_eviction(self):
+        cache = SqliteCache(":memory:", max_bytes=100)
+        for i in range(4):
+            cache.set(f"k{i}", "x" * 20)
+            time.sleep(0.002)
+        cache.get("k0")                    # k0 becomes most recently used
+        cache.set("k4", "x" * 40)          # 120 bytes > 100 → evict down to ≤ 90
+
+        assert cache.size_bytes <= 90
+        assert cache.get("k0") is not None
+        assert cache.get("k4") is not None
+        assert cache.get("k1") is None
+        assert cache.stats.evictions >= 2
+
+    def test_overwrite_tracks_size(self):
+        cache = SqliteCache(":memory:")
+        cache.set("k", "x" * 10)
+        cache.set("k", "x" * 4)
+        assert cache.size_bytes == 4
+        assert len(cache) == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "sub" / "cache.db")
+        cache = SqliteCache(path)
+        cache.set("k", "value")
+        cache.close()
+        reopened = SqliteCache(path)
+        assert reopened.get("k") == "value"
+        assert reopened.size_bytes == len("value")
+
+
+class TestLLMResponseCache:
+    """Exact repeats are served without touching the API."""
+
+    @pytest.fixture
+    def cache(self):
+        cache_stats.reset()
+        cache = SqliteCache(":memory:", stats=cache_stats)
+        with patch("src.core.llm.get_llm_cache", lambda: cache):
+            yield cache
+
+    @staticmethod
+    def _llm(**kwargs) -> _TogetherLLM:
+        return _TogetherLLM(model="stub", together_api_key="test", max_retries=0, **kwargs)
+
+    def test_repeat_served_from_cache(self, cache):
+        with StubCompletionServer(reply="cached answer") as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            llm = self._llm(use_cache=True)
+            assert llm.invoke("same prompt") == "cached answer"
+            assert llm.invoke("same prompt") == "cached answer"
+            assert server.requests == 1
+
+        snap = cache_stats.to_dict()
+        assert snap["hits"] == 1
+        assert snap["misses"] == 1
+        assert snap["bytes_saved"] == len("cached answer")
+
+    def test_async_repeat_served_from_cache(self, cache):
+        with StubCompletionServer(reply="cached answer") as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            llm = self._llm(use_cache=True)
+
+            async def run():
+                return [await llm.ainvoke("same prompt") for _ in range(3)]
+
+            assert asyncio.run(run()) == ["cached answer"] * 3
+            assert server.requests == 1
+
+    def test_key_includes_params(self, cache):
+        with StubCompletionServer(reply="answer") as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            self._llm(use_cache=True).invoke("prompt")
+            self._llm(use_cache=True, temperature=0.1).invoke("prompt")
+            self._llm(use_cache=True, max_tokens=10).invoke("prompt")
+            self._llm(use_cache=True).invoke("prompt", stop=["\n"])
+            assert server.requests == 4
+
+    def test_disabled_role_bypasses_cache(self, cache):
+        with StubCompletionServer(reply="answer") as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            llm = self._llm(use_cache=False)
+            llm.invoke("prompt")
+            llm.invoke("prompt")
+            assert server.requests == 2
+        assert len(cache) == 0
+
+    def test_api_errors_not_cached(self, cache):
+        with patch.object(_TogetherLLM, "_call_api", lambda self, m, s, retry=0: "⚠️ Rate limit exceeded."):
+            self._llm(use_cache=True).invoke("prompt")
+        assert len(cache) == 0
+
+    def test_role_defaults(self):
+        assert get_llm("router").use_cache is True            # temperature 0.0
+        assert get_llm("evaluation").use_cache is True        # opted in
+        assert get_llm("mock_interview").use_cache is False   # sampling, not opted in
+
+    def test_stats_in_registry_snapshot(self, cache):
+        cache_stats.hit(10)
+        assert registry.snapshot()["llm_cache"]["bytes_saved"] == 10
@@ -0,0 +1,311 @@
+"""
+tests/test_checkpointer.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for the checkpoint store:
+  - src/graph/checkpointer.py  (PooledSqliteSaver: WAL, per-thread readers,
+                                group-committed writes, write metrics)
+  - src/graph/retention.py     (per-thread cap, age expiry, vacuum, report)
+  - src/graph/serde.py         (content-addressed, compressed checkpoints)
+
+Run with:
+    python -m pytest tests/test_checkpointer.py -v
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.core.metrics import registry
+from src.graph.checkpointer import PooledSqliteSaver, stats
+
+
+def _put(saver, thread_id: str, step: int = 1) -> dict:
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, empty_checkpoint(), {"step": step}, {})
+
+
+@pytest.fixture
+def saver(tmp_path):
+    stats.reset()
+    s = PooledSqliteSaver(str(tmp_path / "checkpoints.db"))
+    yield s
+    s.close()
+
+
+class TestPooledSaver:
+
+    def test_round_trip(self, saver):
+        saved = _put(saver, "t1")
+        saver.put_writes(saved, [("messages", "hello")], task_id="task")
+        got = saver.get_tuple({"configurable": {"thread_id": "t1"}})
+        assert got.config["configurable"]["checkpoint_id"] == saved["configurable"]["checkpoint_id"]
+        assert got.metadata["step"] == 1
+        assert got.pending_writes == [("task", "messages", "hello")]
+        assert len(list(saver.list({"configurable": {"thread_id": "t1"}}))) == 1
+
+    def test_wal_and_read_only_readers(self, saver):
+        assert saver._writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert saver._writer.execute("PRAGMA synchronous").fetchone()[0] == 1     # NORMAL
+        with pytest.raises(sqlite3.OperationalError):
+            saver.conn.execute("DELETE FROM checkpoints")
+
+    def test_each_thread_gets_its_own_reader(self, saver):
+        seen = []
+        def read():
+            saver.get_tuple({"configurable": {"thread_id": "none"}})
+            seen.append(id(saver.conn))
+        threads = [threading.Thread(target=read) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(seen)) == 3
+
+    def test_concurrent_writes_are_group_committed(self, tmp_path):
+        stats.reset()
+        saver = PooledSqliteSaver(str(tmp_path / "c.db"), batch_wait_ms=20)
+        try:
+            threads = [threading.Thread(target=_put, args=(saver, f"t{i}")) for i in range(20)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert len(list(saver.list(None))) == 20
+            snap = stats.to_dict()
+            assert snap["writes"] == 20
+            assert snap["batches"] < 20
+            assert snap["queue_depth"] == 0
+        finally:
+            saver.close()
+
+    def test_failing_write_does_not_fail_its_batch(self, tmp_path):
+        saver = PooledSqliteSaver(str(tmp_path / "c.db"), batch_wait_ms=50)
+        errors = []
+
+        def bad():
+            try:
+                with saver.cursor() as cur:
+                    cur.execute("INSERT INTO missing_table VALUES (1)")
+            except sqlite3.OperationalError as exc:
+                errors.append(exc)
+
+        try:
+            threads = [threading.Thread(target=bad)] + [
+                threading.Thread(target=_put, args=(saver, f"t{i}")) for i in range(5)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert len(errors) == 1
+            assert len(list(saver.list(None))) == 5
+        finally:
+            saver.close()
+
+    def test_delete_thread(self, saver):
+        _put(saver, "a")
+        _put(saver, "b")
+        saver.delete_thread("a")
+        assert saver.get_tuple({"configurable": {"thread_id": "a"}}) is None
+        assert saver.get_tuple({"configurable": {"thread_id": "b"}}) is not None
+
+    def test_write_latency_recorded(self, saver):
+        registry.reset()
+        _put(saver, "t1")
+        assert registry.snapshot()["checkpointer.write"]["calls"] == 1
+
+    def test_async_api(self, saver):
+        async def run():
+            config = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+            await saver.aput(config, empty_checkpoint(), {"step": 2}, {})
+            return await saver.aget_tuple({"configurable": {"thread_id": "t1"}})
+        assert asyncio.run(run()).metadata["step"] == 2
+
+    def test_in_memory_database(self):
+        saver = PooledSqliteSaver(":memory:")
+        try:
+            _put(saver, "t1")
+            assert saver.get_tuple({"configurable": {"thread_id": "t1"}}) is not None
+        finally:
+            saver.close()
+
+    def test_closed_saver_rejects_writes(self, saver):
+        saver.close()
+        with pytest.raises(RuntimeError):
+            _put(saver, "t1")
+
+    def test_turn_claims_are_shared_between_processes(self, saver):
+        other = PooledSqliteSaver(saver.path)        # a second API worker on the same file
+        try:
+            assert saver.claim_turn("mock:s", 3, lease_s=300)
+            assert not other.claim_turn("mock:s", 3, lease_s=300)     # same turn: lost the race
+            assert not other.claim_turn("mock:s", 1, lease_s=300)     # stale turn
+            assert other.claim_turn("mock:s", 5, lease_s=300)         # the next turn
+            assert saver.claim_turn("mock:s", 5, lease_s=0)           # holder's lease expired
+            other.release_turn("mock:s", 5)
+            assert saver.claim_turn("mock:s", 5, lease_s=300)
+            saver.release_turn("mock:s")
+            assert other.claim_turn("mock:s", 1, lease_s=300)         # restarted session
+        finally:
+            other.close()
+
+
+class TestRetention:
+
+    @pytest.fixture
+    def retention(self, saver):
+        from src.graph.retention import CheckpointRetention, stats as retention_stats
+        retention_stats.reset()
+        return CheckpointRetention(saver, max_per_thread=3, max_age_s=3600, delete_batch=2)
+
+    def _history(self, saver, thread_id: str, steps: int):
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        for step in range(steps):
+            config = saver.put(config, empty_checkpoint(), {"step": step}, {})
+            saver.put_writes(config, [("messages", f"m{step}")], task_id="task")
+        return config
+
+    def test_keeps_newest_checkpoints_per_thread(self, saver, retention):
+        latest = self._history(saver, "long", 8)
+        self._history(saver, "short", 2)
+        result = retention.compact()
+        assert result["pruned_checkpoints"] == 5
+        assert result["pruned_writes"] == 5
+        kept = list(saver.list({"configurable": {"thread_id": "long"}}))
+        assert [c.metadata["step"] for c in kept] == [7, 6, 5]
+        assert saver.get_tuple({"configurable": {"thread_id": "long"}}).config == latest
+        assert len(list(saver.list({"configurable": {"thread_id": "short"}}))) == 2
+
+    def test_expires_idle_threads(self, saver, retention):
+        self._history(saver, "old", 2)
+        assert retention.compact()["expired_threads"] == 0
+        result = retention.compact(now=time.time() + 7200)
+        assert result["expired_threads"] == 1
+        assert saver.get_tuple({"configurable": {"thread_id": "old"}}) is None
+        assert retention.report()["writes"] == 0
+
+    def test_expiry_drops_turn_claims(self, saver, retention):
+        self._history(saver, "mock:old", 2)
+        assert saver.claim_turn("mock:old", 2, lease_s=300)
+        assert saver.claim_turn("mock:never-checkpointed", 1, lease_s=300)
+        count = "SELECT COUNT(*) FROM session_turns"
+        retention.compact()
+        assert saver.conn.execute(count).fetchone()[0] == 2
+        retention.compact(now=time.time() + 7200)
+        assert saver.conn.execute(count).fetchone()[0] == 0
+
+    def test_frees_pages_incrementally(self, saver, retention):
+        for i in range(20):
+            self._history(saver, f"t{i}", 1)
+        retention.compact(now=time.time() + 7200)
+        (free,), = saver.conn.execute("PRAGMA freelist_count").fetchall()
+        assert saver.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert free == 0
+
+    def test_report(self, saver, retention):
+        self._history(saver, "a", 3)
+        self._history(saver, "b", 1)
+        report = retention.report(top=1)
+        assert report["threads"] == 2 and report["checkpoints"] == 4 and report["writes"] == 4
+        assert report["size_bytes"] > 0
+        top = report["top_threads"]
+        assert [t["thread_id"] for t in top] == ["a"]
+        assert top[0]["checkpoints"] == 3 and top[0]["writes"] == 3 and top[0]["bytes"] > 0
+        assert top[0]["updated_at"] <= time.time()
+
+
+class TestCompactSerializer:
+
+    _LATEX = "\\documentclass{article}\n" + "\\item Built Spark pipelines on AWS. " * 200
+
+    def _checkpoint(self, turns: int) -> dict:
+        from langchain_core.messages import AIMessage, HumanMessage
+        checkpoint = empty_checkpoint()
+        messages = []
+        for i in range(turns):
+            messages += [HumanMessage(content=f"refine {i}"), AIMessage(content=f"done {i}")]
+        checkpoint["channel_values"] = {
+            "messages": messages,
+            "agent_output": f"```latex\n{self._LATEX}\n```",
+            "user_profile": {"resume_content": self._LATEX},
+            "task_input": {"generated_resume": self._LATEX, "previous_resume": self._LATEX},
+        }
+        return checkpoint
+
+    @pytest.fixture
+    def compact(self, tmp_path):
+        s = PooledSqliteSaver(str(tmp_path / "compact.db"), compact=True)
+        yield s
+        s.close()
+
+    def _put(self, saver, thread_id: str, turns: int) -> dict:
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        return saver.put(config, self._checkpoint(turns), {"step": turns}, {})
+
+    def _blobs(self, saver) -> int:
+        return saver.conn.execute("SELECT COUNT(*) FROM checkpoint_blobs").fetchone()[0]
+
+    def test_round_trip(self, compact):
+        self._put(compact, "t1", 3)
+        values = compact.get_tuple({"configurable": {"thread_id": "t1"}}).checkpoint["channel_values"]
+        expected = self._checkpoint(3)["channel_values"]
+        assert values["user_profile"] == expected["user_profile"]
+        assert values["task_input"] == expected["task_input"]
+        assert values["agent_output"] == expected["agent_output"]
+        assert [m.content for m in values["messages"]] == [m.content for m in expected["messages"]]
+        assert type(values["messages"][1]).__name__ == "AIMessage"
+
+    def test_large_strings_and_messages_stored_once(self, compact):
+        self._put(compact, "t1", 3)
+        assert self._blobs(compact) == 1 + 1 + 6          # LaTeX, fenced output, messages
+        self._put(compact, "t1", 4)
+        assert self._blobs(compact) == 1 + 1 + 8          # only the new turn's messages
+
+    def test_checkpoint_rows_shrink(self, compact, saver):
+        self._put(compact, "t1", 10)
+        self._put(saver, "t1", 10)
+        size = "SELECT LENGTH(checkpoint) FROM checkpoints"
+        assert compact.conn.execute(size).fetchone()[0] * 10 < saver.conn.execute(size).fetchone()[0]
+
+    def test_plain_rows_still_load(self, tmp_path):
+        path = str(tmp_path / "mixed.db")
+        plain = PooledSqliteSaver(path)
+        self._put(plain, "old", 2)
+        plain.close()
+        compact = PooledSqliteSaver(path, compact=True)
+        try:
+            got = compact.get_tuple({"configurable": {"thread_id": "old"}})
+            assert got.checkpoint["channel_values"]["user_profile"]["resume_content"] == self._LATEX
+        finally:
+            compact.close()
+
+    def test_retention_drops_orphaned_blobs(self, compact):
+        from src.graph.retention import CheckpointRetention
+        self._put(compact, "keep", 1)
+        self._put(compact, "drop", 2)
+        compact.delete_thread("drop")
+        result = CheckpointRetention(compact, max_age_s=0).compact()
+        assert result["pruned_blobs"] == 2                 # "drop"'s second turn
+        assert self._blobs(compact) == 1 + 1 + 2
+        assert compact.get_tuple({"configurable": {"thread_id": "keep"}}) is not None
+
+    def test_in_memory_database(self):
+        saver = PooledSqliteSaver(":memory:", compact=True)
+        try:
+            self._put(saver, "t1", 1)
+            got = saver.get_tuple({"configurable": {"thread_id": "t1"}})
+            assert got.checkpoint["channel_values"]["agent_output"].startswith("```latex")
+        finally:
+            saver.close()
+
+    @pytest.mark.parametrize("codec", ["zlib", "zstd", "none"])
+    def test_codecs_round_trip(self, codec):
+        from src.graph.serde import compress, decompress, zstandard
+        if codec == "zstd" and zstandard is None:
+            pytest.skip("zstandard not installed")
+        data = self._LATEX.encode()
+        assert decompress(compress(data, codec), codec) == data
@@ -0,0 +1,191 @@
+"""
+tests/test_fanout.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for parallel search fan-out:
+  - src/core/fanout.py        (deadline, quality threshold, merge + dedupe)
+  - search-backed agent nodes (variants, separate search / LLM latency)
+
+Run with:
+    python -m pytest tests/test_fanout.py -v
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.core.fanout import afan_out, fan_out, merge_results, stats
+from src.core.metrics import registry
+from src.core.search_results import SearchHit
+
+
+def _hits(*urls: str) -> list:
+    return [SearchHit(title="Result", url=u, snippet=f"snippet for {u}", source="stub") for u in urls]
+
+
+def _backend(delays: dict, results: dict):
+    """query → result after `delays[query]` seconds."""
+    def search(query):
+        time.sleep(delays.get(query, 0))
+        return results[query]
+    return search
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    stats.reset()
+    yield
+    stats.reset()
+
+
+class TestMerge:
+
+    def test_dedupe_by_url_keeps_query_order(self):
+        results = {
+            "q2": _hits("https://www.b.example/x/", "https://c"),
+            "q1": _hits("https://a", "https://b.example/x"),
+        }
+        hits, dropped = merge_results(["q1", "q2"], results)
+        assert [h.url for h in hits] == ["https://a", "https://b.example/x", "https://c"]
+        assert dropped == 1
+
+    def test_dedupe_hits_without_url(self):
+        a = SearchHit(title="Python", url="", snippet="is great.", source="x")
+        b = SearchHit(title="python", url="", snippet="is GREAT", source="y")
+        hits, dropped = merge_results(["a", "b"], {"a": [a], "b": [b]})
+        assert len(hits) == 1 and dropped == 1
+
+
+class TestFanOut:
+
+    def test_all_queries_run_concurrently(self):
+        queries = ["q1", "q2", "q3"]
+        search = _backend({q: 0.2 for q in queries}, {q: _hits(f"https://{q}") for q in queries})
+        t0 = time.perf_counter()
+        result = fan_out(queries, search=search, deadline_s=2, min_hits=99)
+        assert time.perf_counter() - t0 < 0.5
+        assert result.reason == "all_done"
+        assert len(result.hits) == 3
+
+    def test_deadline_abandons_slow_variant(self):
+        search = _backend(
+            {"fast": 0.0, "slow": 1.0},
+            {"fast": _hits("https://a"), "slow": _hits("https://b")},
+        )
+        t0 = time.perf_counter()
+        result = fan_out(["fast", "slow"], search=search, deadline_s=0.1, min_hits=99)
+        assert time.perf_counter() - t0 < 0.5
+        assert result.reason == "deadline"
+        assert (result.completed, result.pending) == (1, 1)
+        assert [h.url for h in result.hits] == ["https://a"]
+
+    def test_quality_threshold_starts_llm_early(self):
+        search = _backend(
+            {"primary": 0.0, "variant": 1.0},
+            {"primary": _hits("https://a", "https://b", "https://c"), "variant": _hits("https://d")},
+        )
+        result = fan_out(["primary", "variant"], search=search, deadline_s=5, min_hits=3)
+        assert result.reason == "threshold"
+        assert result.latency_ms < 500
+        assert stats.to_dict()["early_start_threshold"] == 1
+
+    def test_failing_query_counts_as_empty(self):
+        def search(query):
+            if query == "bad":
+                raise RuntimeError("quota")
+            return _hits("https://a")
+        result = fan_out(["bad", "good"], search=search, deadline_s=1, min_hits=99)
+        assert [h.url for h in result.hits] == ["https://a"]
+        assert result.completed == 2
+
+    def test_duplicate_and_excess_variants_dropped(self):
+        seen = []
+        def search(query):
+            seen.append(query)
+            return _hits(f"https://{len(seen)}")
+        fan_out(["Python  jobs", "python jobs", "b", "c", "d"], search=search, max_variants=3, min_hits=99)
+        assert sorted(seen) == ["Python jobs", "b", "c"]
+
+    def test_concurrency_is_bounded_by_shared_pool(self):
+        from src.core.fanout import get_executor
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def search(query):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return _hits(f"https://{query}")
+
+        queries = [f"q{i}" for i in range(get_executor()._max_workers * 2)]
+        fan_out(queries, search=search, max_variants=len(queries), min_hits=999, deadline_s=5)
+        assert peak[0] <= get_executor()._max_workers
+
+    def test_async_matches_sync(self):
+        search = _backend(
+            {"fast": 0.0, "slow": 1.0},
+            {"fast": _hits("https://a"), "slow": _hits("https://b")},
+        )
+        result = asyncio.run(afan_out(["fast", "slow"], search=search, deadline_s=0.1, min_hits=99))
+        assert result.reason == "deadline"
+        assert [h.url for h in result.hits] == ["https://a"]
+
+
+class TestNodeStages:
+    """Search fan-out and LLM time are reported as separate metrics entries."""
+
+    def test_search_and_llm_recorded_separately(self):
+        from src.agents.salary import node
+
+        registry.reset()
+        queries_seen = []
+
+        def search(query):
+            queries_seen.append(query)
+            return _hits(f"https://{len(queries_seen)}")
+
+        class _LLM:
+            def invoke(self, prompt):
+                time.sleep(0.05)
+                return "## Playbook\n\nAsk for more."
+
+        state = {
+            "task_input": {"job_title": "Data Engineer", "location": "Pune", "experience": "4"},
+            "user_profile": {},
+            "messages": [],
+        }
+        with patch("src.core.fanout._default_search", search), \
+             patch.object(node, "get_llm", lambda name: _LLM()):
+            result = node.salary_negotiator_node(state)
+
+        assert result["error"] is None
+        assert len(queries_seen) == 3
+        snap = registry.snapshot()
+        assert snap["salary_negotiator.search"]["calls"] == 1
+        assert snap["salary_negotiator.llm"]["calls"] == 1
+        assert snap["salary_negotiator.llm"]["min_latency_ms"] >= 50
+        assert snap["salary_negotiator"]["calls"] == 1
+
+    @pytest.mark.parametrize("module, node_fn", [
+        ("src.agents.salary.node", "salary_negotiator_node"),
+        ("src.agents.salary.node", "asalary_negotiator_node"),
+        ("src.agents.job_search.node", "job_search_node"),
+        ("src.agents.job_search.node", "ajob_search_node"),
+    ])
+    def test_search_stage_failure_is_the_nodes_error(self, module, node_fn):
+        import importlib
+        node = importlib.import_module(module)
+        state = {
+            "task_input": {"job_title": "Data Engineer", "location": "Pune", "experience": "4"},
+            "user_profile": {},
+            "messages": [],
+        }
+        with patch.object(node, "_queries", side_effect=RuntimeError("search pool down")):
+            result = getattr(node, node_fn)(state)
+            if asyncio.iscoroutine(result):
+                result = asyncio.run(result)
+        assert "search pool down" in result["error"]
@@ -0,0 +1,117 @@
+"""
+tests/test_llm_registry.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for shared LLM clients and per-turn profiling:
+  - src/core/llm.py        (LLMRegistry: get_llm / get_chain / reload_llms)
+  - src/core/profiling.py  (profile_turn, network time, turn hooks)
+
+Run with:
+    python -m pytest tests/test_llm_registry.py -v
+"""
+
+import os
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+from langchain.prompts import PromptTemplate
+from langchain_core.messages import HumanMessage
+from pydantic import ValidationError
+
+from src.core import profiling
+from src.core.fanout import fan_out
+from src.core.llm import LLMRegistry, _TogetherLLM, get_chain, get_llm
+from src.core.profiling import add_network_time, add_turn_hook, profile_turn, remove_turn_hook
+from src.graph.checkpointer import ThreadedSqliteSaver
+from src.graph.graph_builder import compile_graph
+from src.state import make_initial_state
+
+_PROMPT = PromptTemplate.from_template("Say {word}")
+
+
+class TestLLMRegistry:
+
+    def test_clients_are_shared_and_frozen(self):
+        assert get_llm("router") is get_llm("router")
+        assert get_llm("router") is not get_llm("router", streaming=True)
+        with pytest.raises(ValidationError):
+            get_llm("router").temperature = 1.0
+
+    def test_chains_are_shared_per_prompt(self):
+        chain = get_chain("general_qa", _PROMPT)
+        assert get_chain("general_qa", _PROMPT) is chain
+        assert chain.llm is get_llm("general_qa")
+        assert get_chain("general_qa", PromptTemplate.from_template("Say {word}")) is not chain
+
+    def test_reload_only_on_a_new_key(self):
+        with patch.dict(os.environ, {"TOGETHER_API_KEY": "old"}):
+            llms = LLMRegistry()
+            before = llms.llm("router")
+            assert llms.reload() is False and llms.llm("router") is before
+            os.environ["TOGETHER_API_KEY"] = "new"
+            assert llms.reload() is True
+            after = llms.llm("router")
+        assert after is not before and after.together_api_key == "new"
+        assert llms.to_dict()["reloads"] == 1
+
+    def test_warm_builds_every_role(self):
+        from src.config import LLM_MODELS
+        llms = LLMRegistry()
+        llms.warm()
+        assert llms.to_dict()["clients"] == len(LLM_MODELS)
+
+
+@pytest.fixture
+def slow_llm():
+    """Upstream stub that takes 30 ms and reports it like a real response."""
+
+    def fake_call_api(self, messages, stop, retry=0):
+        t0 = time.perf_counter()
+        time.sleep(0.03)
+        self._report_usage(messages, "Happy to help.", None, t0, {})
+        return "Happy to help."
+
+    with patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch.object(_TogetherLLM, "_call_api", fake_call_api):
+        yield
+
+
+class TestTurnProfile:
+
+    def test_network_time_is_split_from_overhead(self, slow_llm):
+        graph = compile_graph(ThreadedSqliteSaver(sqlite3.connect(":memory:", check_same_thread=False)))
+        state = make_initial_state()
+        state["messages"] = [HumanMessage(content="hello")]
+        state["task_input"] = {"user_message": "hello", "force_agent": "general_qa"}
+        seen = []
+        add_turn_hook(seen.append)
+        try:
+            with profile_turn("test") as turn:
+                graph.invoke(state, {"configurable": {"thread_id": "profiled"}})
+        finally:
+            remove_turn_hook(seen.append)
+        assert seen == [turn]
+        assert turn.network["llm"] >= 30
+        assert turn.wall_ms >= turn.network_ms
+        assert turn.overhead_ms == pytest.approx(turn.wall_ms - turn.network_ms)
+
+    def test_search_fanout_counts_as_network(self):
+        with profile_turn() as turn:
+            fan_out(["python jobs"], search=lambda q: time.sleep(0.02) or [])
+        assert turn.network["search"] >= 20
+
+    def test_outside_a_turn_nothing_is_recorded(self):
+        profiling.stats.reset()
+        add_network_time(100.0)
+        assert profiling.stats.to_dict()["turns"] == 0
+
+    def test_failing_hook_does_not_break_the_turn(self):
+        def broken(turn):
+            raise RuntimeError("boom")
+        add_turn_hook(broken)
+        try:
+            with profile_turn():
+                pass
+        finally:
+            remove_turn_hook(broken)
@@ -0,0 +1,217 @@
+"""
+tests/test_memory.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for bounded conversation memory:
+  - src/core/history.py   (history rendering + prompt fitting under a budget)
+  - src/graph/memory.py   (message cap, background rolling summary)
+  - router / general_qa / mock_interview prompt budgets
+
+Run with:
+    python -m pytest tests/test_memory.py -v
+"""
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.core.history import fit_prompt, render_history, stats
+from src.core.llm import _TogetherLLM
+from src.core.usage import estimate_tokens
+from src.graph.checkpointer import ThreadedSqliteSaver
+from src.graph.graph_builder import GraphSet, compile_graph
+from src.graph.memory import RollingSummarizer, get_summarizer, select_trim
+from src.state import make_initial_state
+
+_TEMPLATE = "Profile: {profile}\n\nConversation so far:\n{history}\n\nUser: {question}\nAssistant:"
+
+
+def _entries(turns: int, words: int = 40):
+    out = []
+    for i in range(turns):
+        out.append(("User", f"question {i} " + "about careers " * words))
+        out.append(("Assistant", f"answer {i} " + "with some advice " * words))
+    return out
+
+
+class TestFitPrompt:
+
+    def test_long_history_stays_within_budget(self):
+        inputs = fit_prompt(_TEMPLATE, {"profile": "data engineer", "question": "and now?"},
+                            budget=500, history_key="history", entries=_entries(200))
+        assert estimate_tokens(_TEMPLATE.format(**inputs)) <= 500
+        assert "answer 199" in inputs["history"]          # newest turns win
+        assert "question 0 " not in inputs["history"]
+
+    def test_short_history_is_kept_whole(self):
+        entries = _entries(2, words=2)
+        inputs = fit_prompt(_TEMPLATE, {"profile": "", "question": "hi"},
+                            budget=1000, history_key="history", entries=entries)
+        assert inputs["history"] == "\n".join(f"{s}: {c}" for s, c in entries)
+
+    def test_summary_leads_the_history(self):
+        text = render_history(_entries(50), 400, summary="User is a data engineer in Berlin.")
+        assert text.startswith("Earlier in this conversation (summary): User is a data engineer")
+        assert estimate_tokens(text) <= 400
+
+    def test_oversized_inputs_are_clipped(self):
+        stats.reset()
+        inputs = fit_prompt(_TEMPLATE, {"profile": "skill " * 5000, "question": "and now?"},
+                            budget=300, history_key="history", entries=_entries(3))
+        assert estimate_tokens(_TEMPLATE.format(**inputs)) <= 300
+        assert inputs["question"] == "and now?"
+        assert stats.to_dict()["prompts_fitted"] == 1
+
+    def test_newest_turn_is_clipped_not_dropped(self):
+        text = render_history([("Candidate", "word " * 2000)], 100)
+        assert text.startswith("Candidate: word") and text.endswith("…")
+        assert estimate_tokens(text) <= 100
+
+
+class TestTrim:
+
+    def _messages(self, turns: int):
+        out = []
+        for i in range(turns):
+            out += [HumanMessage(content=f"q{i} " + "x " * 50, id=f"h{i}"),
+                    AIMessage(content=f"a{i} " + "y " * 50, id=f"a{i}")]
+        return out
+
+    def test_within_cap_keeps_everything(self):
+        assert select_trim(self._messages(3), max_tokens=10_000, keep_tokens=5_000) == []
+
+    def test_trims_oldest_down_to_keep(self):
+        messages = self._messages(20)
+        removed = select_trim(messages, max_tokens=1000, keep_tokens=600)
+        assert removed == messages[:len(removed)]
+        kept = messages[len(removed):]
+        assert sum(estimate_tokens(m.content) + 4 for m in kept) <= 600
+
+    def test_latest_user_message_is_never_removed(self):
+        messages = [HumanMessage(content="word " * 3000, id="big")]
+        assert select_trim(messages, max_tokens=100, keep_tokens=50) == []
+
+
+@pytest.fixture
+def stub_llm():
+    prompts = []
+
+    def fake_call_api(self, messages, stop, retry=0):
+        prompt = "\n".join(m["content"] for m in messages)
+        prompts.append(prompt)
+        if "running summary" in prompt:
+            return "User is preparing for data engineering interviews."
+        return "Sure — " + "here is some advice. " * 40
+
+    with patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch.object(_TogetherLLM, "_call_api", fake_call_api), \
+         patch("src.core.fanout._default_search", lambda q: []):
+        yield prompts
+
+
+@pytest.fixture
+def small_memory():
+    limits = {"max_tokens": 800, "keep_tokens": 500, "summarize": True}
+    with patch.dict("src.config.MEMORY", limits):
+        yield
+
+
+def _turn(graph, thread_id: str, text: str, agent: str = "general_qa", **state_fields):
+    state = make_initial_state()
+    state["messages"] = [HumanMessage(content=text)]
+    state["task_input"] = {"user_message": text, "force_agent": agent, **state_fields.pop("task", {})}
+    state.update(state_fields)
+    return graph.invoke(state, {"configurable": {"thread_id": thread_id}})
+
+
+class TestMemoryStage:
+
+    @pytest.fixture
+    def graph(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        return compile_graph(ThreadedSqliteSaver(conn))
+
+    def test_stored_history_is_capped(self, graph, stub_llm, small_memory):
+        stats.reset()
+        for i in range(15):
+            result = _turn(graph, "long", f"Question {i}: " + "tell me more " * 20)
+        stored = sum(estimate_tokens(m.content) + 4 for m in result["messages"])
+        assert stored <= 800 + 400                         # cap + one turn
+        assert stats.to_dict()["trimmed_messages"] > 0
+
+    def test_interview_transcript_is_kept_whole(self, graph, stub_llm, small_memory):
+        history = []
+        for i in range(10):
+            history += [{"role": "assistant", "content": f"Question {i}: " + "describe a system " * 15},
+                        {"role": "user", "content": f"Answer {i}: " + "I built pipelines " * 30}]
+        result = _turn(graph, "mock-whole", "My final answer.", agent="mock_interview",
+                       interview_history=history, task={"job_title": "Data Engineer"})
+        assert result["interview_history"][:20] == history       # turn counter, ETag, evaluation
+        assert len(result["interview_history"]) == 22
+
+    def test_summary_reaches_a_later_turn(self, graph, stub_llm, small_memory):
+        for i in range(8):
+            _turn(graph, "sum", f"Question {i}: " + "tell me more " * 20)
+        assert get_summarizer().wait(timeout=5)
+        result = _turn(graph, "sum", "And finally?")
+        assert result["conversation_summary"] == "User is preparing for data engineering interviews."
+        qa_prompt = stub_llm[-1]
+        assert "Earlier in this conversation (summary): User is preparing" in qa_prompt
+
+    def test_empty_initial_state_keeps_the_summary(self, graph, stub_llm, small_memory):
+        for i in range(8):
+            _turn(graph, "keep", f"Question {i}: " + "tell me more " * 20)
+        get_summarizer().wait(timeout=5)
+        _turn(graph, "keep", "next")
+        assert _turn(graph, "keep", "and next")["conversation_summary"]
+
+    def test_one_shot_runs_do_not_summarise(self, stub_llm, small_memory):
+        stats.reset()
+        graphs = GraphSet()
+        summarizer = get_summarizer()
+        with patch.object(summarizer, "submit") as submit:
+            graph, config = graphs.resolve("none", "oneshot")
+            state = make_initial_state()
+            state["messages"] = [HumanMessage(content="old " * 600), AIMessage(content="reply " * 600),
+                                 HumanMessage(content="new question")]
+            state["task_input"] = {"user_message": "new question", "force_agent": "general_qa"}
+            graph.invoke(state, config)
+        submit.assert_not_called()
+        assert stats.to_dict()["trims"] == 1
+
+    def test_summariser_folds_jobs_of_a_thread_in_order(self, stub_llm):
+        summarizer = RollingSummarizer(workers=2)
+        summarizer.submit("t", "", [("User", "one")])
+        summarizer.submit("t", "", [("User", "two")])
+        assert summarizer.wait(timeout=5)
+        assert summarizer.take("t") == "User is preparing for data engineering interviews."
+        assert summarizer.take("t") is None
+
+
+class TestPromptBudgets:
+
+    def test_mock_interview_prompt_is_flat(self, stub_llm):
+        from src.config import MEMORY
+        graph = compile_graph()
+        history = []
+        for i in range(60):
+            history += [{"role": "assistant", "content": f"Question {i}: " + "describe a system " * 15},
+                        {"role": "user", "content": f"Answer {i}: " + "I built pipelines " * 30}]
+        _turn(graph, "mock", "My final answer.", agent="mock_interview",
+              interview_history=history, task={"job_title": "Data Engineer"})
+        prompt = stub_llm[-1]
+        assert estimate_tokens(prompt) <= MEMORY["prompt_tokens"]["mock_interview"]
+        assert "Candidate: My final answer." in prompt
+
+    def test_router_prompt_ignores_resume_and_is_bounded(self, stub_llm):
+        from src.config import MEMORY
+        from src.agents.router.node import _prepare
+        state = make_initial_state()
+        state["user_profile"] = {"name": "Ada", "resume_content": "\\item LaTeX " * 3000}
+        state["messages"] = [AIMessage(content="word " * 3000), HumanMessage(content="the second one")]
+        result, inputs, message = _prepare(state)
+        assert result is None and message == "the second one"
+        assert "LaTeX" not in inputs["user_profile"]
+        from src.agents.router.prompts import ROUTING_TEMPLATE
+        assert estimate_tokens(ROUTING_TEMPLATE.format(**inputs)) <= MEMORY["prompt_tokens"]["router"]
@@ -0,0 +1,171 @@
+"""
+tests/test_mock_session.py
+─────────────────────────────────────────────────────────────────────────────
+API tests for server-authoritative mock interview sessions (api.py):
+  - start → answer with only the new answer → transcript held server-side
+  - turn counter / If-Match divergence detection (409)
+  - legacy clients that still send the full history
+  - turn claims in the checkpoint database (several API workers) and
+    sessions left on the bare thread id by earlier versions
+  - app shutdown closing the pooled upstream clients
+
+The checkpoint database lives in a temporary directory and the LLM is stubbed.
+
+Run with:
+    python -m pytest tests/test_mock_session.py -v
+"""
+
+import importlib
+import sys
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.llm import _TogetherLLM
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    db = str(tmp_path_factory.mktemp("mock") / "checkpoints.db")
+    questions = iter(range(1, 10_000))
+
+    def fake_call_api(self, messages, stop, retry=0):
+        return f"Question {next(questions)}: how would you design it?"
+
+    async def fake_acall_api(self, messages, stop, retry=0):
+        return fake_call_api(self, messages, stop)
+
+    with patch("src.graph.checkpointer.DB_PATH", db), \
+         patch.dict("src.config.CHECKPOINT_RETENTION", {"enabled": False}), \
+         patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch.object(_TogetherLLM, "_call_api", fake_call_api), \
+         patch.object(_TogetherLLM, "_acall_api", fake_acall_api):
+        sys.modules.pop("api", None)
+        api = importlib.import_module("api")
+        yield TestClient(api.app)
+        api.checkpointer.close()
+        sys.modules.pop("api", None)
+
+
+def _start(client, thread_id: str) -> dict:
+    res = client.post("/api/interview/mock/start", json={"job_title": "Data Engineer", "thread_id": thread_id})
+    assert res.status_code == 200
+    return res
+
+
+def _answer(client, thread_id: str, answer: str, **extra):
+    headers = extra.pop("headers", {})
+    body = {"answer": answer, "job_title": "Data Engineer", "thread_id": thread_id, **extra}
+    return client.post("/api/interview/mock/answer", json=body, headers=headers)
+
+
+class TestMockSession:
+
+    def test_answers_only_and_server_keeps_the_transcript(self, client):
+        start = _start(client, "s1").json()
+        assert start["turn"] == 1
+        turn = start["turn"]
+        for i in range(3):
+            res = _answer(client, "s1", f"answer {i}", turn=turn)
+            assert res.status_code == 200
+            body = res.json()
+            assert set(body) == {"follow_up", "turn"}
+            assert body["turn"] == turn + 2
+            turn = body["turn"]
+
+        session = client.get("/api/interview/mock/s1")
+        history = session.json()["history"]
+        assert session.json()["turn"] == len(history) == 7
+        assert [m["content"] for m in history if m["role"] == "user"] == ["answer 0", "answer 1", "answer 2"]
+        assert session.headers["ETag"] == res.headers["ETag"]
+
+    def test_stale_turn_is_rejected(self, client):
+        _start(client, "s2")
+        assert _answer(client, "s2", "first", turn=1).status_code == 200
+        stale = _answer(client, "s2", "retried first", turn=1)
+        assert stale.status_code == 409
+        assert stale.json()["detail"]["turn"] == 3
+        assert client.get("/api/interview/mock/s2").json()["turn"] == 3
+
+    def test_if_match_etag(self, client):
+        etag = _start(client, "s3").headers["ETag"]
+        ok = _answer(client, "s3", "first", headers={"If-Match": etag})
+        assert ok.status_code == 200
+        assert _answer(client, "s3", "again", headers={"If-Match": etag}).status_code == 409
+        assert _answer(client, "s3", "second", headers={"If-Match": ok.headers["ETag"]}).status_code == 200
+
+    def test_answer_without_session_is_404(self, client):
+        assert _answer(client, "never-started", "hello").status_code == 404
+
+    def test_restart_resets_the_session(self, client):
+        _start(client, "s4")
+        _answer(client, "s4", "first")
+        assert _start(client, "s4").json()["turn"] == 1
+
+    def test_chat_on_the_same_thread_leaves_the_session_alone(self, client):
+        _start(client, "s5")
+        client.post("/api/chat", json={"message": "hi", "thread_id": "s5", "interview_history": []})
+        assert client.get("/api/interview/mock/s5").json()["turn"] == 1
+
+    def test_legacy_full_history_still_works(self, client):
+        history = _start(client, "s6").json()["history"]
+        res = _answer(client, "s6", "legacy answer", history=history)
+        assert res.status_code == 200
+        assert len(res.json()["history"]) == 3 and res.json()["turn"] == 3
+
+    def test_evaluate_reads_the_session(self, client):
+        _start(client, "s7")
+        _answer(client, "s7", "my answer")
+        res = client.post("/api/interview/mock/evaluate", json={"job_title": "Data Engineer", "thread_id": "s7"})
+        assert res.status_code == 200 and res.json()["evaluation"]
+
+
+class TestMockSessionAcrossWorkers:
+
+    def test_turn_claimed_by_another_worker_is_rejected(self, client):
+        _start(client, "w1")
+        api = sys.modules["api"]
+        # Another worker read the same transcript and claimed turn 1 first
+        assert api.checkpointer.claim_turn("mock:w1", 1, lease_s=300)
+        res = _answer(client, "w1", "racing answer", turn=1)
+        assert res.status_code == 409
+        assert client.get("/api/interview/mock/w1").json()["turn"] == 1
+
+    def test_failed_turn_releases_its_claim(self, client):
+        _start(client, "w2")
+        api = sys.modules["api"]
+        with patch.object(api, "arun_agent_graph", side_effect=RuntimeError("upstream down")):
+            assert _answer(client, "w2", "first", turn=1).status_code == 500
+        assert _answer(client, "w2", "first", turn=1).status_code == 200
+
+    def test_session_on_the_bare_thread_is_carried_over(self, client):
+        import asyncio
+        api = sys.modules["api"]
+        # How sessions were stored before the "mock:" namespace
+        asyncio.run(api.arun_agent_graph(
+            user_text="Start the mock interview",
+            extra_task={"job_title": "Data Engineer", "force_agent": "mock_interview"},
+            thread_id="old-session",
+            interview_mode="mock",
+        ))
+        assert client.get("/api/interview/mock/old-session").json()["turn"] == 1
+        res = _answer(client, "old-session", "my answer", turn=1)
+        assert res.status_code == 200 and res.json()["turn"] == 3
+        history = client.get("/api/interview/mock/old-session").json()["history"]
+        assert [m["content"] for m in history if m["role"] == "user"] == ["my answer"]
+
+
+class TestAppShutdown:
+
+    def test_lifespan_closes_pooled_async_client(self, client):
+        import asyncio
+        from src.core.transport import get_async_client
+
+        async def main():
+            pooled = get_async_client()
+            async with client.app.router.lifespan_context(client.app):
+                pass
+            return pooled
+
+        assert asyncio.run(main()).is_closed
@@ -0,0 +1,156 @@
+"""
+tests/test_openmetrics.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for metrics export:
+  - src/core/openmetrics.py  (OpenMetrics text exposition)
+  - src/core/multiproc.py    (file-backed per-worker segments + merging)
+
+Run with:
+    python -m pytest tests/test_openmetrics.py -v
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from src.core.metrics import MetricsRegistry
+from src.core.multiproc import SegmentWriter, aggregate, read_segments
+from src.core.openmetrics import render
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _samples(text: str) -> dict:
+    """`name{labels}` → value for every sample line."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            out[key] = float(value)
+    return out
+
+
+class TestOpenMetricsRender:
+
+    def setup_method(self):
+        self.reg = MetricsRegistry(buckets_ms=(10, 100, 1000))
+
+    def test_histogram_buckets_cumulative(self):
+        for ms in (5, 50, 50, 500, 5000):
+            self.reg.record("router", latency_ms=ms)
+        s = _samples(render(self.reg))
+        assert s['career_node_latency_seconds_bucket{node="router",le="0.01"}'] == 1
+        assert s['career_node_latency_seconds_bucket{node="router",le="0.1"}'] == 3
+        assert s['career_node_latency_seconds_bucket{node="router",le="1.0"}'] == 4
+        assert s['career_node_latency_seconds_bucket{node="router",le="+Inf"}'] == 5
+        assert s['career_node_latency_seconds_count{node="router"}'] == 5
+        assert s['career_node_latency_seconds_sum{node="router"}'] == pytest.approx(5.605)
+
+    def test_bucket_bound_is_inclusive(self):
+        self.reg.record("router", latency_ms=10)
+        s = _samples(render(self.reg))
+        assert s['career_node_latency_seconds_bucket{node="router",le="0.01"}'] == 1
+
+    def test_counters(self):
+        self.reg.record("tutorials", latency_ms=10, tokens=120)
+        self.reg.record("tutorials", latency_ms=10, tokens=30, success=False)
+        text = render(self.reg)
+        s = _samples(text)
+        assert "# TYPE career_node_calls counter" in text
+        assert s['career_node_calls_total{node="tutorials"}'] == 2
+        assert s['career_node_errors_total{node="tutorials"}'] == 1
+        assert s['career_node_tokens_total{node="tutorials"}'] == 150
+
+    def test_collectors_exported_as_gauges(self):
+        self.reg.register_collector("llm_cache", lambda: {
+            "hits": 4, "hit_rate": 0.8, "enabled": True, "routes": {"a": 1},
+        })
+        s = _samples(render(self.reg))
+        assert s["career_llm_cache_hits"] == 4
+        assert s["career_llm_cache_hit_rate"] == 0.8
+        assert not any("enabled" in k or "routes" in k for k in s)
+
+    def test_collector_counter_fields_exported_as_counters(self):
+        self.reg.register_collector("llm_cache", lambda: {"hits": 4, "hit_rate": 0.8}, counters=("hits",))
+        text = render(self.reg)
+        s = _samples(text)
+        assert "# TYPE career_llm_cache_hits counter" in text
+        assert s["career_llm_cache_hits_total"] == 4
+        assert "# TYPE career_llm_cache_hit_rate gauge" in text
+        assert s["career_llm_cache_hit_rate"] == 0.8
+
+    def test_collectors_labelled_by_worker_when_merged(self):
+        self.reg.register_collector("llm_cache", lambda: {"hits": 4, "hit_rate": 0.8}, counters=("hits",))
+        s = _samples(render(self.reg, worker="123"))
+        assert s['career_llm_cache_hits_total{worker="123"}'] == 4
+        assert s['career_llm_cache_hit_rate{worker="123"}'] == 0.8
+
+    def test_registered_counter_fields_exist(self):
+        """Every declared counter names a numeric field its collector reports."""
+        import importlib
+        from src.core.metrics import registry
+        for module in ("src.agents.router.classifier", "src.core.fanout", "src.core.history", "src.core.llm",
+                       "src.core.profiling", "src.core.search_cache", "src.core.search_results",
+                       "src.core.transport", "src.graph.checkpointer", "src.graph.retention"):
+            importlib.import_module(module)
+        collected = registry.collect()
+        for collector, fields in registry.collector_counters().items():
+            for field in fields:
+                assert isinstance(collected[collector].get(field), (int, float)), (collector, field)
+
+    def test_ends_with_eof_and_escapes_labels(self):
+        self.reg.record('we"ird\\node', latency_ms=1)
+        text = render(self.reg)
+        assert text.endswith("# EOF\n")
+        assert 'node="we\\"ird\\\\node"' in text
+
+
+class TestMultiProcessSegments:
+
+    def test_flush_roundtrip(self, tmp_path):
+        reg = MetricsRegistry()
+        reg.record("router", latency_ms=12, tokens=3)
+        writer = SegmentWriter(reg, str(tmp_path))
+        assert writer.flush() is True
+        assert writer.flush() is False            # nothing new recorded
+        (segment,) = read_segments(str(tmp_path))
+        assert segment["pid"] == os.getpid()
+        assert segment["agents"]["router"]["calls"] == 1
+
+    def test_corrupt_segment_skipped(self, tmp_path):
+        (tmp_path / "metrics-1.json").write_text("{not json")
+        assert read_segments(str(tmp_path)) == []
+
+    def test_workers_merge_into_one_scrape(self, tmp_path):
+        """Two real worker processes, one aggregated view."""
+        script = textwrap.dedent(f"""
+            from src.core.metrics import MetricsRegistry
+            from src.core.multiproc import SegmentWriter
+            import sys
+            reg = MetricsRegistry()
+            base = float(sys.argv[1])
+            for i in range(100):
+                reg.record("tutorials", latency_ms=base + i, tokens=2, success=i % 10 != 0)
+            SegmentWriter(reg, {str(tmp_path)!r}).flush()
+        """)
+        for base in ("0", "1000"):
+            subprocess.run([sys.executable, "-c", script, base], cwd=_ROOT, check=True)
+
+        local = MetricsRegistry()
+        merged = aggregate(str(tmp_path), local)
+        snap = merged.snapshot()["tutorials"]
+        assert len(read_segments(str(tmp_path))) == 2
+        assert snap["calls"] == 200
+        assert snap["errors"] == 20
+        assert snap["total_tokens"] == 400
+        assert snap["max_latency_ms"] == 1099.0
+        assert snap["p50_latency_ms"] == pytest.approx(1000.0, rel=0.01)
+
+        s = _samples(render(merged, collectors={}))
+        assert s['career_node_calls_total{node="tutorials"}'] == 200
+        assert s['career_node_latency_seconds_bucket{node="tutorials",le="+Inf"}'] == 200
+        json.dumps(snap)
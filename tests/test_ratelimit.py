@@ -0,0 +1,178 @@
+"""
+tests/test_ratelimit.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for the shared adaptive rate limiter:
+  - src/core/ratelimit.py  (ModelLimiter reservations, AIMD, header hints)
+  - src/core/llm.py        (_TogetherLLM retrying 429s through the limiter)
+
+The LLM tests run against the local stub in tests/benchmarks/_stub_server.py.
+Load test: python -m tests.benchmarks.bench_rate_limit
+
+Run with:
+    python -m pytest tests/test_ratelimit.py -v
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from src.core.llm import RATE_LIMITED, _TogetherLLM
+from src.core.metrics import registry
+from src.core.ratelimit import ModelLimiter, get_limiter, reset_limiters
+from tests.benchmarks._stub_server import StubCompletionServer
+
+
+class TestModelLimiter:
+
+    def test_burst_then_spaced_at_rate(self):
+        limiter = ModelLimiter("m", rps=50, burst=3, jitter=0)
+        t0 = time.monotonic()
+        for _ in range(3):
+            assert limiter.acquire()
+        assert time.monotonic() - t0 < 0.015
+        for _ in range(3):
+            assert limiter.acquire()
+        assert time.monotonic() - t0 >= 0.055
+        stats = limiter.to_dict()
+        assert stats["acquired"] == 6 and stats["waited"] == 3
+
+    def test_callers_are_served_in_arrival_order(self):
+        limiter = ModelLimiter("m", rps=50, burst=1)
+        order, lock = [], threading.Lock()
+
+        def worker(i):
+            time.sleep(i * 0.01)
+            limiter.acquire()
+            with lock:
+                order.append(i)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert order == sorted(order)
+        assert limiter.to_dict()["max_queue_depth"] >= 2
+
+    def test_429_halves_rate_once_per_cooldown_and_pauses_everyone(self):
+        limiter = ModelLimiter("m", rps=20, burst=5, decrease=0.5, decrease_cooldown_s=10, jitter=0)
+        assert limiter.on_rate_limited({"retry-after": "0.05"}) == pytest.approx(0.05)
+        limiter.on_rate_limited({"retry-after": "0.05"})
+        assert limiter.rate == 10
+        t0 = time.monotonic()
+        limiter.acquire()
+        assert time.monotonic() - t0 >= 0.045
+        assert limiter.to_dict()["rate_limited"] == 2
+
+    def test_success_increases_rate_up_to_max(self):
+        limiter = ModelLimiter("m", rps=1, max_rps=1.5, increase=0.4)
+        limiter.on_response({})
+        assert limiter.rate == pytest.approx(1.4)
+        limiter.on_response({})
+        assert limiter.rate == 1.5
+
+    def test_exhausted_quota_header_pauses_before_a_429(self):
+        limiter = ModelLimiter("m", rps=100, burst=5)
+        limiter.on_response({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "0.05"})
+        t0 = time.monotonic()
+        limiter.acquire()
+        assert time.monotonic() - t0 >= 0.045
+        assert limiter.to_dict()["header_pauses"] == 1
+
+    def test_rejects_callers_past_max_wait(self):
+        limiter = ModelLimiter("m", rps=10, burst=1, max_wait_s=0.01)
+        limiter.on_rate_limited({"retry-after": "5"})
+        assert limiter.acquire() is False
+        assert limiter.to_dict()["rejected"] == 1
+
+    def test_async_acquire_waits_without_blocking_the_loop(self):
+        limiter = ModelLimiter("m", rps=20, burst=1)
+
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            task = asyncio.create_task(ticker())
+            await asyncio.gather(*(limiter.aacquire() for _ in range(3)))
+            task.cancel()
+            return ticks
+
+        assert asyncio.run(main()) >= 5
+
+
+@pytest.fixture
+def fast_limits():
+    """Fresh limiters with short backoffs, so retry tests run in milliseconds."""
+    settings = {"rps": 50, "burst": 2, "backoff_base_s": 0.02, "backoff_cap_s": 0.1, "jitter": 0.1}
+    with patch.dict("src.config.RATE_LIMIT", settings):
+        reset_limiters()
+        yield
+    reset_limiters()
+
+
+def _llm(**kwargs):
+    return _TogetherLLM(model="stub-limited", together_api_key="test",
+                        initial_retry_delay=0.01, **kwargs)
+
+
+class TestLLMRateLimiting:
+
+    def test_retries_429_until_accepted(self, fast_limits):
+        with StubCompletionServer(reply="ok", rate_limit_rps=20, rate_limit_burst=1,
+                                  retry_after_s=0.03) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            llm = _llm(max_retries=5)
+            assert [llm.invoke("hi") for _ in range(3)] == ["ok"] * 3
+        assert server.requests == 3 + server.rejected
+        stats = get_limiter("stub-limited").to_dict()
+        assert stats["rate_limited"] == server.rejected
+
+    def test_gives_up_with_rate_limit_message(self, fast_limits):
+        with StubCompletionServer(error_rate=1.0) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            assert _llm(max_retries=2).invoke("hi") == RATE_LIMITED
+            assert list(_llm(max_retries=1).stream("hi")) == [RATE_LIMITED]
+        assert server.requests == 3 + 2
+
+    def test_async_and_streaming_paths_retry(self, fast_limits):
+        with StubCompletionServer(reply="streamed ok", rate_limit_rps=20, rate_limit_burst=1,
+                                  retry_after_s=0.03) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            llm = _llm(max_retries=5)
+
+            async def main():
+                return await asyncio.gather(llm.ainvoke("a"), llm.ainvoke("b"))
+
+            assert asyncio.run(main()) == ["streamed ok"] * 2
+            assert "".join(llm.stream("c")) == "streamed ok"
+
+    def test_concurrent_burst_all_succeed_and_is_reported(self, fast_limits):
+        with StubCompletionServer(reply="ok", rate_limit_rps=40, rate_limit_burst=2,
+                                  retry_after_s=0.05) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            llm = _llm(max_retries=6)
+            with ThreadPoolExecutor(8) as pool:
+                replies = list(pool.map(llm.invoke, [f"q{i}" for i in range(16)]))
+        assert replies == ["ok"] * 16
+        snapshot = registry.snapshot()
+        assert snapshot["llm_rate_limit"]["stub-limited"]["acquired"] >= 16
+        assert snapshot["llm.rate_wait"]["calls"] >= 16
+
+    def test_disabled_limiter_still_retries(self):
+        with patch.dict("src.config.RATE_LIMIT", {"enabled": False, "backoff_cap_s": 0.05}), \
+             StubCompletionServer(reply="ok", rate_limit_rps=20, rate_limit_burst=1,
+                                  retry_after_s=0.03) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            reset_limiters()
+            assert get_limiter("stub-limited") is None
+            llm = _llm(max_retries=6)
+            assert [llm.invoke("hi") for _ in range(2)] == ["ok"] * 2
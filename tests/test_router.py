@@ -0,0 +1,100 @@
+"""
+tests/test_router.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for the router's zero-LLM fast path:
+  - src/agents/router/classifier.py  (keyword automaton + n-gram model)
+  - src/agents/router/node.py        (fast path vs LLM fallback)
+
+Run with:
+    python -m pytest tests/test_router.py -v
+"""
+
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from src.agents.router import classifier
+from src.agents.router.classifier import classify, keyword_route, stats
+from src.agents.router.node import router_node
+from src.config import ROUTER_FAST_PATH
+from src.core.metrics import registry
+from src.state import make_initial_state
+from tests.benchmarks.bench_router_classifier import evaluate, load_fixture
+
+
+def _state(message: str) -> dict:
+    state = make_initial_state()
+    state["messages"] = [HumanMessage(content=message)]
+    state["task_input"] = {"user_message": message}
+    return state
+
+
+class TestKeywordAutomaton:
+
+    def test_single_route(self):
+        assert keyword_route("please update my CV") == "resume_builder"
+        assert keyword_route("start a mock interview") == "mock_interview"
+
+    def test_majority_wins(self):
+        assert keyword_route("how do I negotiate my salary") == "salary_negotiator"
+
+    def test_no_match(self):
+        assert keyword_route("the second one") is None
+
+
+class TestFastPathClassifier:
+
+    def setup_method(self):
+        stats.reset()
+
+    def test_confident_message_fast_pathed(self):
+        d = classify("Can you build my resume for a data analyst role")
+        assert d.route == "resume_builder"
+        assert d.fast_path
+        assert d.confidence >= ROUTER_FAST_PATH["threshold"]
+
+    def test_ambiguous_message_falls_back(self):
+        d = classify("yes")
+        assert not d.fast_path
+
+    def test_fixture_precision(self):
+        """Held-out fixture: fast-path decisions must be (nearly) always right."""
+        r = evaluate(load_fixture(), ROUTER_FAST_PATH["threshold"])
+        assert r["precision"] >= 0.95
+        assert r["coverage"] >= 0.5
+        assert r["unclear_fast_pathed"] == 0
+
+    def test_disabled(self):
+        with patch.dict(ROUTER_FAST_PATH, {"enabled": False}):
+            assert classify("update my resume") is None
+
+    def test_stats_in_registry(self):
+        classify("update my resume")
+        classify("yes")
+        snap = registry.snapshot()["router_fast_path"]
+        assert snap["decisions"] == 2
+        assert snap["fast_path_hits"] == 1
+        assert snap["hit_rate"] == 0.5
+        assert snap["routes"]["resume_builder"]["fast_path"] == 1
+
+
+class TestRouterNode:
+
+    def test_fast_path_skips_llm(self):
+        with patch("src.agents.router.node.get_chain", side_effect=AssertionError("LLM called")):
+            result = router_node(_state("find me software engineer jobs in Berlin"))
+        assert result["current_agent"] == "job_search"
+
+    def test_low_confidence_uses_llm(self):
+        with patch("src.agents.router.node.get_chain") as get_chain:
+            get_chain.return_value.invoke.return_value = {"text": "tutorials"}
+            result = router_node(_state("yes"))
+        assert get_chain.call_args.args[0] == "router"
+        assert get_chain.return_value.invoke.called
+        assert result["current_agent"] == "tutorials"
+
+    def test_missing_weights_falls_back(self):
+        missing = OSError("classifier_weights.npz not found")
+        with patch.object(classifier, "_model", None), \
+             patch.object(classifier.HashedNgramClassifier, "load", side_effect=missing):
+            assert classify("update my resume") is None
@@ -0,0 +1,498 @@
+"""
+tests/test_search.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for the search layer:
+  - src/core/search_results.py (typed hits, relevance, token-budget rendering)
+  - src/core/search_cache.py  (normalisation, freshness, stale-while-revalidate)
+  - src/core/search.py        (backend registry, circuit breaker, hot reload)
+
+Run with:
+    python -m pytest tests/test_search.py -v
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.core.cache import SqliteCache
+from src.core.search import (
+    CircuitBreaker,
+    HedgePolicy,
+    DuckDuckGoSearchBackend,
+    SearchBackend,
+    SearchBackends,
+)
+from src.core.search_cache import (
+    SearchCache,
+    SearchCacheStats,
+    normalize_query,
+    query_kind,
+)
+from src.core.search_results import (
+    NO_RESULTS,
+    SearchHit,
+    key_terms,
+    relevance,
+    render_hits,
+    select_hits,
+)
+from src.core.usage import estimate_tokens
+
+def _hit(url="https://acme.example/jobs/1", title="Data Scientist — Acme", snippet="Apply now", source="stub"):
+    return SearchHit(title=title, url=url, snippet=snippet, source=source)
+
+
+class _Backend:
+    """Counts calls (each call returns a distinct hit); optional latency."""
+
+    def __init__(self, empty=False, delay_s=0.0):
+        self.empty = empty
+        self.delay_s = delay_s
+        self.calls = 0
+
+    def __call__(self, query):
+        self.calls += 1
+        time.sleep(self.delay_s)
+        return [] if self.empty else [_hit(snippet=f"Apply now #{self.calls}")]
+
+
+def _cache(fresh_s=60.0, stale_s=0.0, backend_ttl_s=None) -> SearchCache:
+    return SearchCache(
+        SqliteCache(":memory:"),
+        freshness_s={"jobs": fresh_s, "salary": fresh_s * 10, "default": fresh_s},
+        backend_ttl_s=backend_ttl_s,
+        stale_s=stale_s,
+        stats=SearchCacheStats(),
+    )
+
+
+class TestQueryNormalisation:
+
+    def test_case_whitespace_and_order_folded(self):
+        a = normalize_query("Data Scientist  jobs Bangalore Full-time 2026")
+        b = normalize_query("bangalore data scientist jobs full-time 2026,")
+        assert a == b
+
+    def test_operators_keep_order(self):
+        assert normalize_query('"data scientist" site:naukri.com') == '"data scientist" site:naukri.com'
+        assert normalize_query("senior OR junior python") != normalize_query("python OR junior senior")
+
+    def test_language_names_survive(self):
+        assert normalize_query("C++ jobs") != normalize_query("C jobs")
+        assert normalize_query("C# jobs") != normalize_query("C jobs")
+
+    def test_query_kind(self):
+        assert query_kind("Data Engineer salary range Pune levels.fyi") == "salary"
+        assert query_kind("Data Engineer jobs Pune") == "jobs"
+        assert query_kind("Python tutorial guide") == "default"
+
+
+class TestSearchCache:
+
+    def test_repeat_served_from_cache(self):
+        cache, backend = _cache(), _Backend(delay_s=0.02)
+        first = cache.get("google_search", "Data Scientist jobs Bangalore", backend)
+        again = cache.get("google_search", "bangalore  DATA scientist jobs", backend)
+        assert first == again
+        assert backend.calls == 1
+        snap = cache.stats.to_dict()
+        assert (snap["hits"], snap["misses"], snap["hit_rate"]) == (1, 1, 0.5)
+        assert snap["saved_ms"] >= 20
+
+    def test_backends_cached_separately(self):
+        cache, backend = _cache(), _Backend()
+        cache.get("google_search", "python jobs", backend)
+        cache.get("duckduckgo_search", "python jobs", backend)
+        assert backend.calls == 2
+
+    def test_empty_results_not_cached(self):
+        cache, backend = _cache(), _Backend(empty=True)
+        cache.get("duckduckgo_search", "python jobs", backend)
+        cache.get("duckduckgo_search", "python jobs", backend)
+        assert backend.calls == 2
+
+    def test_freshness_by_kind_and_backend(self):
+        cache = _cache(fresh_s=60.0, backend_ttl_s={"duckduckgo_search": 30.0})
+        assert cache.fresh_for("google_search", "python jobs") == 60.0
+        assert cache.fresh_for("google_search", "python salary") == 600.0
+        assert cache.fresh_for("duckduckgo_search", "python salary") == 30.0
+
+    def test_expired_past_stale_window_refetches(self):
+        cache, backend = _cache(fresh_s=0.05), _Backend()
+        cache.get("google_search", "python jobs", backend)
+        time.sleep(0.1)
+        cache.get("google_search", "python jobs", backend)
+        assert backend.calls == 2
+
+    def test_stale_while_revalidate(self):
+        cache, backend = _cache(fresh_s=0.05, stale_s=60.0), _Backend(delay_s=0.05)
+        first = cache.get("google_search", "python jobs", backend)
+        time.sleep(0.1)
+
+        t0 = time.perf_counter()
+        stale = cache.get("google_search", "python jobs", backend)
+        assert time.perf_counter() - t0 < 0.04          # did not wait for the backend
+        assert stale == first
+
+        deadline = time.time() + 2
+        while cache.stats.to_dict()["refreshes"] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert backend.calls == 2
+        assert cache.get("google_search", "python jobs", backend) != first
+        assert cache.stats.to_dict()["stale_hits"] == 1
+
+    def test_single_refresh_in_flight(self):
+        cache, backend = _cache(fresh_s=0.02, stale_s=60.0), _Backend(delay_s=0.1)
+        cache.get("google_search", "python jobs", backend)
+        time.sleep(0.05)
+        for _ in range(5):
+            cache.get("google_search", "python jobs", backend)
+        time.sleep(0.2)
+        assert backend.calls == 2
+
+
+class _Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class _Session:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+class _StubBackend(SearchBackend):
+    name = "duckduckgo_search"
+
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+
+    def search(self, query):
+        self.queries.append(query)
+        return [_hit(url="https://ddg.example", source=self.name)]
+
+
+_QUOTA = _Response(403, {"error": {"errors": [{"reason": "dailyLimitExceeded"}]}})
+_ITEMS = _Response(200, {"items": [
+    {"title": f"T{i}", "snippet": "S", "link": f"https://g.example/{i}"} for i in range(3)
+]})
+
+
+@pytest.fixture
+def backends():
+    """A fresh registry with Google keyed, a stub DuckDuckGo and no cache."""
+    fallback = _StubBackend()
+    with patch.dict("os.environ", {"GOOGLE_API_KEY": "k", "GOOGLE_CSE_ID": "c"}), \
+         patch("src.core.search.get_search_cache", lambda: None):
+        reg = SearchBackends(fallback=fallback)
+        reg.reload()
+        yield reg, fallback
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_recovers(self):
+        now = [0.0]
+        cb = CircuitBreaker(failure_threshold=2, cooldown_s=10, clock=lambda: now[0])
+        cb.record_failure()
+        assert cb.allow()
+        cb.record_failure()
+        assert not cb.allow()
+        now[0] = 11
+        assert cb.allow()                      # half-open probe
+        cb.record_failure()
+        assert not cb.allow()                  # probe failed → open again
+        now[0] = 22
+        cb.record_success()
+        assert cb.allow() and cb.to_dict()["state"] == "closed"
+
+    def test_half_open_lets_one_probe_through(self):
+        now = [0.0]
+        cb = CircuitBreaker(failure_threshold=1, cooldown_s=10, clock=lambda: now[0])
+        cb.record_failure()
+        now[0] = 11
+        assert cb.available()
+        assert [cb.allow() for _ in range(3)] == [True, False, False]
+        assert not cb.available()
+        assert cb.to_dict()["state"] == "half_open"
+        cb.record_success()
+        assert [cb.allow() for _ in range(3)] == [True] * 3
+
+    def test_lost_probe_is_replaced_after_cooldown(self):
+        now = [0.0]
+        cb = CircuitBreaker(failure_threshold=1, cooldown_s=10, clock=lambda: now[0])
+        cb.record_failure()
+        now[0] = 11
+        assert cb.allow()                      # probe never reports back
+        now[0] = 15
+        assert not cb.allow()
+        now[0] = 22
+        assert cb.allow()
+
+    def test_quota_error_opens_immediately_for_longer(self):
+        now = [0.0]
+        cb = CircuitBreaker(failure_threshold=5, cooldown_s=10, quota_cooldown_s=300, clock=lambda: now[0])
+        cb.record_failure(quota=True)
+        now[0] = 200
+        assert not cb.allow()
+        assert cb.to_dict()["skipped"] == 1
+
+
+class TestSearchBackends:
+
+    def test_google_preferred_via_pooled_session(self, backends):
+        reg, ddg = backends
+        session = _Session(_ITEMS)
+        with patch("src.core.search.get_session", lambda: session):
+            hit, *_ = reg.tool.func("python jobs")
+        assert reg.tool.name == "google_search"
+        assert (hit.url, hit.title, hit.snippet, hit.source) == ("https://g.example/0", "T0", "S", "google_search")
+        assert ddg.queries == []
+
+    def test_quota_error_skips_google_until_cooldown(self, backends):
+        reg, ddg = backends
+        session = _Session(_QUOTA, _ITEMS)
+        with patch("src.core.search.get_session", lambda: session):
+            first = reg.search("python jobs")
+            second = reg.search("java jobs")
+        assert first[0].url == second[0].url == "https://ddg.example"
+        assert session.calls == 1                      # Google not retried while open
+        assert reg.to_dict()["google_search"]["state"] == "open"
+        assert ddg.queries == ["python jobs", "java jobs"]
+
+    def test_all_backends_failing_returns_message(self, backends):
+        reg, ddg = backends
+        ddg.health.record_failure(quota=True)
+        with patch("src.core.search.get_session", lambda: _Session(_Response(500, {}))):
+            assert reg.search("q") == []
+
+    def test_tool_is_long_lived_and_hot_reloads(self, backends):
+        reg, ddg = backends
+        tool = reg.tool
+        assert reg.reload() is False and reg.tool is tool
+        with patch.dict("os.environ", {"GOOGLE_API_KEY": ""}):
+            assert reg.reload() is True
+        assert reg.tool.name == "duckduckgo_search"
+        assert reg.backends == [ddg]
+
+    def test_duckduckgo_client_built_once(self):
+        built = []
+
+        class _Wrapper:
+            def __init__(self):
+                built.append(self)
+
+            def results(self, query, max_results):
+                return [{"title": query, "link": f"https://ddg.example/{query}", "snippet": "s"}]
+
+        backend = DuckDuckGoSearchBackend()
+        with patch("langchain_community.utilities.DuckDuckGoSearchAPIWrapper", _Wrapper):
+            backend.run("a")
+            (hit,) = backend.run("b")
+        assert len(built) == 1
+        assert (hit.url, hit.source) == ("https://ddg.example/b", "duckduckgo_search")
+
+    def test_results_go_through_cache(self, backends):
+        reg, ddg = backends
+        cache = _cache()
+        with patch("src.core.search.get_search_cache", lambda: cache), \
+             patch.dict("os.environ", {"GOOGLE_API_KEY": ""}):
+            reg.reload()
+            reg.search("python jobs")
+            reg.search("Python  Jobs")
+        assert ddg.queries == ["python jobs"]
+
+
+class TestSearchResults:
+
+    def test_hits_roundtrip_through_cache(self):
+        cache, backend = _cache(), _Backend()
+        first = cache.get("google_search", "python jobs", backend)
+        (again,) = cache.get("google_search", "python jobs", backend)
+        assert again == first[0]
+        assert again.fetched_at == first[0].fetched_at      # age of the original fetch
+
+    def test_select_drops_duplicates_and_irrelevant(self):
+        hits = [
+            _hit("https://a.example/1", "Senior Data Engineer — Acme", "Spark, Airflow"),
+            _hit("https://www.a.example/1/", "Data Engineer at Acme", "duplicate listing"),
+            _hit("https://b.example/2", "Top 10 cooking recipes", "pasta"),
+            _hit("https://c.example/3", "Engineer, platform", "data pipelines on GCP"),
+        ]
+        selected = select_hits(hits, terms="Data Engineer", min_relevance=0.5)
+        assert [h.url for h in selected] == ["https://a.example/1", "https://c.example/3"]
+
+    def test_dedupe_keeps_postings_told_apart_by_query(self):
+        hits = [
+            _hit("https://in.indeed.com/viewjob?jk=abc123", "Data Engineer — Acme"),
+            _hit("https://in.indeed.com/viewjob?jk=def456", "Data Engineer — Beta"),
+            _hit("https://www.linkedin.com/jobs/view/?currentJobId=111&trk=public_jobs", "Data Engineer"),
+            _hit("https://www.linkedin.com/jobs/view/?currentJobId=222", "Data Engineer"),
+            _hit("https://in.indeed.com/viewjob?utm_source=google&jk=abc123&gclid=x", "Data Engineer — Acme"),
+        ]
+        selected = select_hits(hits, terms="Data Engineer")
+        assert [h.url for h in selected] == [h.url for h in hits[:4]]
+        assert SearchHit("t", "HTTPS://In.Indeed.com/ViewJob?jk=ABC", "", "s").key == "in.indeed.com/ViewJob?jk=ABC"
+
+    def test_relevance_ranks_best_first(self):
+        hits = [_hit("https://x", "Engineer", "generic"), _hit("https://y", "Data Engineer", "role")]
+        assert [h.url for h in select_hits(hits, terms="Data Engineer", min_relevance=0.5)] == [
+            "https://y", "https://x",
+        ]
+        assert key_terms("Data Engineer jobs Remote 2026") == ["data", "engineer"]
+        assert relevance(hits[0], []) == 1.0
+
+    def test_chat_sentence_never_selects_to_empty(self):
+        hits = [
+            _hit("https://naukri.example/1", "Backend Developer — Pune", "Django, REST APIs"),
+            _hit("https://b.example/2", "Python Backend Engineer", "Pune, hybrid"),
+        ]
+        terms = "I'm looking for backend developer roles in Pune with Django experience"
+        assert [h.url for h in select_hits(hits, terms=terms, min_relevance=0.5)] == [
+            "https://naukri.example/1", "https://b.example/2",
+        ]
+
+    @pytest.mark.parametrize("module, message", [
+        ("src.agents.job_search.node", "Can you find me backend developer openings in Pune?"),
+        ("src.agents.salary.node", "What should a backend developer in Pune with 3 years earn?"),
+    ])
+    def test_chat_routed_nodes_keep_live_results(self, module, message):
+        import importlib
+        node = importlib.import_module(module)
+        _, fields = node._prepare({"task_input": {"user_message": message}})
+        text = node._format(fields, [_hit("https://naukri.example/1", "Backend Developer — Pune", "Naukri")])
+        assert "https://naukri.example/1" in text
+        assert "No live search results available" not in text
+
+    def test_render_respects_token_budget(self):
+        hits = [_hit(f"https://e.example/{i}", f"Role {i}", "word " * 40) for i in range(10)]
+        text = render_hits(hits, max_tokens=120)
+        assert estimate_tokens(text) <= 120
+        assert "https://e.example/0" in text and "https://e.example/9" not in text
+
+    def test_render_clips_single_oversized_hit(self):
+        text = render_hits([_hit(snippet="word " * 500)], max_tokens=50)
+        assert estimate_tokens(text) <= 55
+        assert text.endswith("…")
+
+    def test_render_empty(self):
+        assert render_hits([]) == NO_RESULTS
+
+
+class _TimedBackend(SearchBackend):
+    def __init__(self, name, delay_s=0.0, n_hits=3, fail=False):
+        super().__init__()
+        self.name = name
+        self.delay_s = delay_s
+        self.n_hits = n_hits
+        self.fail = fail
+        self.queries = []
+
+    def search(self, query):
+        self.queries.append(query)
+        time.sleep(self.delay_s)
+        if self.fail:
+            raise RuntimeError("boom")
+        return [_hit(f"https://{self.name}.example/{i}", source=self.name) for i in range(self.n_hits)]
+
+
+@pytest.fixture
+def hedged():
+    """Build a hedged registry over the given backends (no cache)."""
+    def build(*backends, **policy):
+        reg = SearchBackends(fallback=backends[-1], hedge=HedgePolicy(**{"min_samples": 1, **policy}))
+        reg.backends = list(backends)
+        return reg
+    with patch("src.core.search.get_search_cache", lambda: None):
+        yield build
+
+
+class TestHedgedSearch:
+
+    def test_fast_primary_never_starts_secondary(self, hedged):
+        google, ddg = _TimedBackend("google", 0.01), _TimedBackend("ddg")
+        reg = hedged(google, ddg, delay_ms=300)
+        hits = reg.search("q")
+        assert {h.source for h in hits} == {"google"}
+        assert ddg.queries == []
+        assert reg.to_dict()["hedge"]["avoided"] == 1
+
+    def test_unlaunched_half_open_secondary_keeps_its_probe(self, hedged):
+        now = [0.0]
+        google, ddg = _TimedBackend("google", 0.01), _TimedBackend("ddg")
+        ddg.health = CircuitBreaker(failure_threshold=1, cooldown_s=10, clock=lambda: now[0])
+        ddg.health.record_failure()
+        now[0] = 11                                      # half-open
+        reg = hedged(google, ddg, delay_ms=300)
+        for _ in range(3):
+            assert {h.source for h in reg.search("q")} == {"google"}
+        assert ddg.queries == []
+        assert ddg.health.available()
+
+        google.delay_s = 0.5                             # now the probe is actually needed
+        reg = hedged(google, ddg, delay_ms=20)
+        assert {h.source for h in reg.search("q")} == {"ddg"}
+        assert ddg.health.to_dict()["state"] == "closed"
+
+    def test_slow_primary_is_hedged_and_abandoned(self, hedged):
+        google, ddg = _TimedBackend("google", 0.5), _TimedBackend("ddg", 0.01)
+        reg = hedged(google, ddg, delay_ms=50)
+        t0 = time.perf_counter()
+        hits = reg.search("q")
+        assert time.perf_counter() - t0 < 0.3
+        assert {h.source for h in hits} == {"ddg"}
+        assert (google.wins, ddg.wins) == (0, 1)
+        assert reg.to_dict()["hedge"]["hedged"] == 1
+
+    def test_zero_delay_races_all(self, hedged):
+        google, ddg = _TimedBackend("google", 0.05), _TimedBackend("ddg", 0.0)
+        reg = hedged(google, ddg, delay_ms=0, min_delay_ms=0)
+        assert {h.source for h in reg.search("q")} == {"ddg"}
+        assert google.queries == ["q"]
+
+    def test_failed_primary_hedges_immediately(self, hedged):
+        google, ddg = _TimedBackend("google", fail=True), _TimedBackend("ddg")
+        reg = hedged(google, ddg, delay_ms=2000)
+        t0 = time.perf_counter()
+        assert {h.source for h in reg.search("q")} == {"ddg"}
+        assert time.perf_counter() - t0 < 0.5
+
+    def test_below_quality_returns_best_effort(self, hedged):
+        google, ddg = _TimedBackend("google", n_hits=1), _TimedBackend("ddg", n_hits=2)
+        reg = hedged(google, ddg, delay_ms=0, min_delay_ms=0)
+        assert len(reg.search("q")) == 2
+        assert reg.to_dict()["hedge"]["below_quality"] == 1
+
+    def test_merge_window_combines_close_finishers(self, hedged):
+        google, ddg = _TimedBackend("google", 0.0), _TimedBackend("ddg", 0.03)
+        reg = hedged(google, ddg, delay_ms=0, min_delay_ms=0, merge_window_ms=300)
+        hits = reg.search("q")
+        assert [h.source for h in hits] == ["google"] * 3 + ["ddg"] * 3
+        assert reg.to_dict()["hedge"]["merged"] == 1
+
+    def test_hedge_delay_adapts_to_observed_latency(self):
+        backend = _TimedBackend("google")
+        policy = HedgePolicy(delay_ms=800, min_samples=5, min_delay_ms=50, max_delay_ms=3000)
+        assert policy.delay_for(backend) == 0.8                  # no history yet
+        for ms in (100, 110, 120, 130, 400):
+            backend._latency.add(ms)
+        assert policy.delay_for(backend) == pytest.approx(0.4, rel=0.02)
+        for _ in range(50):
+            backend._latency.add(5000)
+        assert policy.delay_for(backend) == 3.0                  # clamped
+        assert backend.to_dict()["p50_ms"] == pytest.approx(5000, rel=0.02)
@@ -0,0 +1,174 @@
+"""
+tests/test_singleflight.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for request coalescing:
+  - src/core/singleflight.py  (SingleFlight.do / ado)
+  - src/core/llm.py           (identical in-flight completions share one call)
+  - src/core/search.py        (identical in-flight queries share one lookup)
+
+Run with:
+    python -m pytest tests/test_singleflight.py -v
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from src.core.llm import _TogetherLLM
+from src.core.metrics import registry
+from src.core.search import SearchBackend, SearchBackends
+from src.core.search_results import SearchHit
+from src.core.singleflight import SingleFlight, get_flights
+
+
+def _together(fn, n=6):
+    """Run `fn(i)` on `n` threads released at the same moment."""
+    start = threading.Barrier(n)
+
+    def run(i):
+        start.wait()
+        return fn(i)
+
+    with ThreadPoolExecutor(n) as pool:
+        return list(pool.map(run, range(n)))
+
+
+class TestSingleFlight:
+
+    def test_concurrent_callers_share_one_execution(self):
+        flights, calls = SingleFlight("t"), []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.05)
+            return "result"
+
+        results = _together(lambda i: flights.do("k", work))
+        assert len(calls) == 1
+        assert [r for r, _ in results] == ["result"] * 6
+        assert sorted(shared for _, shared in results) == [False] + [True] * 5
+        assert flights.to_dict() == {"leaders": 1, "coalesced": 5, "coalesced_ratio": 0.8333, "in_flight": 0}
+
+    def test_errors_are_shared_and_keys_forgotten(self):
+        flights = SingleFlight("t")
+
+        def boom():
+            time.sleep(0.05)
+            raise ValueError("upstream down")
+
+        def call(i):
+            with pytest.raises(ValueError, match="upstream down"):
+                flights.do("k", boom)
+
+        _together(call, n=3)
+        assert flights.do("k", lambda: "fresh") == ("fresh", False)
+
+    def test_different_keys_run_separately(self):
+        flights = SingleFlight("t")
+        results = _together(lambda i: flights.do(f"k{i % 2}", lambda: time.sleep(0.03) or i % 2), n=4)
+        assert sorted(r for r, _ in results) == [0, 0, 1, 1]
+        assert flights.to_dict()["leaders"] == 2
+
+    def test_async_followers_survive_a_cancelled_leader(self):
+        flights, calls = SingleFlight("t"), []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def main():
+            leader = asyncio.create_task(flights.ado("k", work))
+            await asyncio.sleep(0)
+            followers = [asyncio.create_task(flights.ado("k", work)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await asyncio.gather(*followers)
+
+        assert asyncio.run(main()) == [("result", True)] * 3
+        assert len(calls) == 1 and flights.to_dict()["in_flight"] == 0
+
+
+@pytest.fixture
+def upstream():
+    """Stub `_call_api` / `_acall_api` that take 50 ms and count calls."""
+    calls = []
+
+    def fake_call_api(self, messages, stop, retry=0):
+        calls.append(messages[-1]["content"])
+        time.sleep(0.05)
+        return f"answer to {messages[-1]['content']}"
+
+    async def fake_acall_api(self, messages, stop, retry=0):
+        calls.append(messages[-1]["content"])
+        await asyncio.sleep(0.05)
+        return f"answer to {messages[-1]['content']}"
+
+    with patch("src.core.llm.get_llm_cache", lambda: None), \
+         patch.object(_TogetherLLM, "_call_api", fake_call_api), \
+         patch.object(_TogetherLLM, "_acall_api", fake_acall_api):
+        yield calls
+
+
+def _llm(**kwargs):
+    return _TogetherLLM(model="stub-coalesce", together_api_key="test", **kwargs)
+
+
+class TestLLMCoalescing:
+
+    def test_identical_calls_share_one_upstream_request(self, upstream):
+        before = get_flights("llm").to_dict()["coalesced"]
+        llm = _llm()
+        assert _together(lambda i: llm.invoke("python tutorial")) == ["answer to python tutorial"] * 6
+        assert upstream == ["python tutorial"]
+        assert registry.snapshot()["coalescing"]["llm"]["coalesced"] - before == 5
+
+    def test_different_params_are_not_coalesced(self, upstream):
+        cold, warm = _llm(temperature=0.0), _llm(temperature=0.9)
+        _together(lambda i: (cold if i % 2 else warm).invoke("same prompt"), n=4)
+        assert len(upstream) == 2
+
+    def test_async_calls_are_coalesced(self, upstream):
+        llm = _llm()
+
+        async def main():
+            return await asyncio.gather(*(llm.ainvoke("router: hello") for _ in range(5)))
+
+        assert asyncio.run(main()) == ["answer to router: hello"] * 5
+        assert upstream == ["router: hello"]
+
+    def test_disabled_by_config(self, upstream):
+        llm = _llm()
+        with patch.dict("src.config.COALESCE", {"llm": False}):
+            _together(lambda i: llm.invoke("python tutorial"), n=3)
+        assert len(upstream) == 3
+
+
+class _SlowBackend(SearchBackend):
+    name = "duckduckgo_search"
+
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+
+    def search(self, query):
+        self.queries.append(query)
+        time.sleep(0.05)
+        return [SearchHit(title="Data Scientist", url="https://ddg.example/1", snippet="", source=self.name)]
+
+
+class TestSearchCoalescing:
+
+    def test_same_normalised_query_is_looked_up_once(self):
+        backend = _SlowBackend()
+        queries = ["Data Scientist jobs Bangalore", "data scientist jobs  bangalore", "Bangalore data scientist jobs"]
+        with patch("src.core.search.get_search_cache", lambda: None):
+            tool = SearchBackends(fallback=backend).tool
+            results = _together(lambda i: tool.func(queries[i % 3]))
+        assert len(backend.queries) == 1
+        assert all(r == results[0] for r in results)
+        assert len({id(r) for r in results}) == len(results)    # followers get their own list
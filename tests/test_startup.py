@@ -0,0 +1,66 @@
+"""
+tests/test_startup.py
+─────────────────────────────────────────────────────────────────────────────
+Startup regression tests for `import api`:
+  - agent modules and `langchain.chains` are not imported until used
+  - .env is loaded once, by src/config.py
+
+Each check runs `import api` in a fresh interpreter (checkpoints in a
+temporary directory). Wall time depends on the machine, so the
+STARTUP["import_budget_s"] check lives with the breakdown in
+    python -m tests.benchmarks.bench_import_time --check
+
+Run with:
+    python -m pytest tests/test_startup.py -v
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys
+import dotenv
+calls = []
+_load = dotenv.load_dotenv
+dotenv.load_dotenv = lambda *a, **k: calls.append(1) or _load(*a, **k)
+import api
+api.checkpointer.close()
+print(json.dumps({"dotenv_loads": len(calls), "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_api(tmp_path) -> dict:
+    env = {
+        **os.environ,
+        "CHECKPOINT_DB_PATH": str(tmp_path / "checkpoints.db"),
+        "CHECKPOINT_RETENTION_ENABLED": "0",
+        "STARTUP_PRELOAD_AGENTS": "0",
+    }
+    env.pop("METRICS_MULTIPROC_DIR", None)
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=120, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def probe(tmp_path_factory):
+    return _import_api(tmp_path_factory.mktemp("startup"))
+
+
+class TestStartup:
+
+    def test_agents_are_imported_on_first_use(self, probe):
+        modules = probe["modules"]
+        assert not [m for m in modules if m.startswith("src.agents.")]
+        assert "langchain.chains" not in modules
+
+    def test_dotenv_is_loaded_once(self, probe):
+        assert probe["dotenv_loads"] == 1
@@ -0,0 +1,98 @@
+"""
+tests/test_streaming.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for token streaming:
+  - src/core/llm.py        (_stream / _astream, incremental stop enforcement)
+  - src/core/streaming.py  (TokenStreamHandler)
+
+Run with:
+    python -m pytest tests/test_streaming.py -v
+"""
+
+import asyncio
+from unittest.mock import patch
+
+from src.core.llm import _StopSequenceFilter, _TogetherLLM
+from src.core.streaming import TokenStreamHandler
+from tests.benchmarks._stub_server import StubCompletionServer
+
+
+def _llm(**kwargs) -> _TogetherLLM:
+    return _TogetherLLM(model="stub", together_api_key="test", max_retries=0, **kwargs)
+
+
+def _feed_all(stop, deltas) -> str:
+    f = _StopSequenceFilter(stop)
+    out = "".join(f.feed(d) for d in deltas)
+    return out + f.flush()
+
+
+class TestStopSequenceFilter:
+    """Incremental stop enforcement must match the post-hoc `_enforce_stop`."""
+
+    def test_no_stop_passes_everything(self):
+        assert _feed_all(None, ["Hel", "lo ", "world"]) == "Hello world"
+
+    def test_stop_in_single_delta(self):
+        assert _feed_all(["\nObservation:"], ["Answer\nObservation: x"]) == "Answer"
+
+    def test_stop_split_across_deltas(self):
+        deltas = ["Answer", "\nObs", "erv", "ation: leaked"]
+        f = _StopSequenceFilter(["\nObservation:"])
+        released = [f.feed(d) for d in deltas]
+        assert "".join(released) == "Answer"
+        assert f.stopped
+        assert "Obs" not in "".join(released)
+
+    def test_leading_whitespace_dropped(self):
+        assert _feed_all(None, ["\n\n", "  Hi"]) == "Hi"
+
+    def test_matches_enforce_stop(self):
+        text = "Thought: x\nAction: search\nObservation: y"
+        stop = ["\nObservation:", "\nAction:"]
+        deltas = [text[i:i + 3] for i in range(0, len(text), 3)]
+        assert _feed_all(stop, deltas) == _TogetherLLM._enforce_stop(text, stop)
+
+
+class TestLLMStreaming:
+    """End-to-end against the local stub completion server."""
+
+    def test_sync_stream_yields_deltas(self):
+        reply = "# Heading\n\n" + "token " * 20
+        with StubCompletionServer(reply=reply, chunk_size=5) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            chunks = list(_llm().stream("hi"))
+        assert len(chunks) > 1
+        assert "".join(chunks) == reply
+
+    def test_stream_stops_early(self):
+        reply = "Final answer\nObservation: should never be shown"
+        with StubCompletionServer(reply=reply, chunk_size=3) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            text = "".join(_llm().stream("hi", stop=["\nObservation:"]))
+        assert text == "Final answer"
+
+    def test_invoke_streams_when_flag_set(self):
+        with StubCompletionServer(reply="  streamed reply  ") as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            assert _llm(streaming=True).invoke("hi") == "streamed reply"
+
+    def test_async_invoke_feeds_token_handler(self):
+        reply = "one two three four five six"
+
+        async def run():
+            handler = TokenStreamHandler()
+            text = await _llm().ainvoke("hi", config={"callbacks": [handler]})
+            tokens = []
+            while not handler.queue.empty():
+                tokens.append(handler.queue.get_nowait())
+            return text, tokens
+
+        with StubCompletionServer(reply=reply, chunk_size=4) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url):
+            text, tokens = asyncio.run(run())
+
+        assert text == reply
+        assert len(tokens) > 1
+        assert all(event == "token" for event, _ in tokens)
+        assert "".join(data["delta"] for _, data in tokens) == reply
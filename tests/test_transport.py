@@ -0,0 +1,73 @@
+"""
+tests/test_transport.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for the pooled HTTP transport (src/core/transport.py).
+
+Run with:
+    python -m pytest tests/test_transport.py -v
+"""
+
+import asyncio
+import time
+
+from urllib3.connectionpool import HTTPConnectionPool
+
+from src.core import transport
+from src.core.metrics import registry
+from src.core.transport import build_session, close_async_clients, get_async_client, get_session, stats
+from tests.benchmarks._stub_server import StubCompletionServer
+
+
+class TestPooledTransport:
+    """Connection reuse, idle eviction and stats reporting."""
+
+    def setup_method(self):
+        stats.reset()
+
+    def test_reuses_connection(self):
+        with StubCompletionServer() as server:
+            session = build_session(max_connections=2)
+            for _ in range(5):
+                session.post(server.url, json={}, timeout=5).raise_for_status()
+            assert server.connections == 1
+
+        snap = stats.to_dict()
+        assert snap["requests"] == 5
+        assert snap["new_connections"] == 1
+        assert snap["hits"] == 4
+
+    def test_idle_connection_evicted(self):
+        with StubCompletionServer() as server:
+            session = build_session(max_connections=1, keepalive_expiry=0.05)
+            session.post(server.url, json={}, timeout=5)
+            time.sleep(0.1)
+            session.post(server.url, json={}, timeout=5)
+            assert server.connections == 2
+
+        assert stats.to_dict()["evictions"] == 1
+
+    def test_get_session_is_shared(self):
+        assert get_session() is get_session()
+
+    def test_stats_in_registry_snapshot(self):
+        assert "http_pool" in registry.snapshot()
+
+    def test_pool_hooks_match_installed_urllib3(self):
+        assert transport._hooks_supported()
+
+    def test_falls_back_to_plain_pools_when_hooks_change(self, monkeypatch):
+        monkeypatch.setattr(transport, "_HOOKS_SUPPORTED", False)
+        with StubCompletionServer() as server:
+            session = build_session(max_connections=2)
+            session.post(server.url, json={}, timeout=5).raise_for_status()
+            pool = session.get_adapter(server.url).poolmanager.connection_from_url(server.url)
+            assert type(pool) is HTTPConnectionPool
+
+    def test_close_async_clients(self):
+        async def main():
+            client = get_async_client()
+            await close_async_clients()
+            return client, get_async_client()
+
+        closed, fresh = asyncio.run(main())
+        assert closed.is_closed and fresh is not closed
@@ -0,0 +1,165 @@
+"""
+tests/test_usage.py
+─────────────────────────────────────────────────────────────────────────────
+Unit tests for LLM token accounting:
+  - src/core/usage.py            (parsing, local estimate, per-model stats)
+  - src/core/llm.py              (usage reported by every response path)
+  - src/middleware/guardrails.py (guarded_node rolls tokens into metrics)
+
+Run with:
+    python -m pytest tests/test_usage.py -v
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.core.llm import _TogetherLLM
+from src.core.metrics import registry
+from src.core.usage import (
+    LLMUsage,
+    estimate_tokens,
+    report_usage,
+    server_timing_ms,
+    track_usage,
+    usage_from_response,
+    usage_stats,
+)
+from src.middleware.guardrails import guarded_node
+from tests.benchmarks._stub_server import StubCompletionServer
+
+_USAGE = {"prompt_tokens": 42, "completion_tokens": 7, "total_tokens": 49}
+
+
+def _llm(**kwargs) -> _TogetherLLM:
+    return _TogetherLLM(model="stub-model", together_api_key="test", max_retries=0, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    usage_stats.reset()
+    yield
+    usage_stats.reset()
+
+
+class TestTokenEstimate:
+
+    def test_common_words_are_one_token(self):
+        # Hello | ␣world | , | ␣how | ␣are | ␣you | ?
+        assert estimate_tokens("Hello world, how are you?") == 7
+
+    def test_long_words_split(self):
+        assert estimate_tokens("internationalisation") > 1
+
+    def test_paragraph_in_plausible_range(self):
+        text = (
+            "Senior backend engineer with eight years of experience designing "
+            "high-throughput payment APIs in Go and Python, mentoring juniors "
+            "and leading a Kubernetes migration of forty services."
+        )
+        words = len(text.split())
+        assert words <= estimate_tokens(text) <= 2 * words
+
+    def test_empty(self):
+        assert estimate_tokens("") == 0
+
+
+class TestUsageParsing:
+
+    def test_provider_usage_preferred(self):
+        u = usage_from_response("m", [{"role": "user", "content": "hi"}], "hello", _USAGE, 12.0)
+        assert (u.prompt_tokens, u.completion_tokens, u.estimated) == (42, 7, False)
+
+    def test_missing_usage_estimated(self):
+        u = usage_from_response("m", [{"role": "user", "content": "hi there"}], "hello world", None, 12.0)
+        assert u.estimated is True
+        assert u.completion_tokens == 2
+        assert u.prompt_tokens == 2 + 4
+
+    def test_server_timing_headers(self):
+        assert server_timing_ms({"openai-processing-ms": "350"}) == 350.0
+        assert server_timing_ms({"server-timing": "queue;dur=12.5, infer;dur=300"}) == 312.5
+        assert server_timing_ms({}) is None
+
+    def test_tokens_per_second_per_model(self):
+        report_usage(LLMUsage("a", 10, 100, latency_ms=2000, server_ms=1000))
+        report_usage(LLMUsage("a", 10, 100, latency_ms=1000))
+        report_usage(LLMUsage("b", 5, 5, latency_ms=500, estimated=True))
+        stats = usage_stats.to_dict()
+        assert stats["a"]["tokens_per_s"] == 100.0          # 200 tokens / 2 s
+        assert stats["a"]["total_tokens"] == 220
+        assert stats["b"]["estimated_calls"] == 1
+
+    def test_scopes_nest_without_leaking(self):
+        with track_usage() as outer:
+            report_usage(LLMUsage("a", 1, 1, 1.0))
+            with track_usage() as inner:
+                report_usage(LLMUsage("a", 2, 2, 1.0))
+        assert [u.prompt_tokens for u in outer] == [1]
+        assert [u.prompt_tokens for u in inner] == [2]
+
+
+class TestLLMReportsUsage:
+    """Every HTTP path of `_TogetherLLM` reports exactly one usage per response."""
+
+    def _run(self, usage, call):
+        with StubCompletionServer(latency_ms=5, reply="Hello from the stub", usage=usage) as server, \
+             patch("src.core.llm.TOGETHER_CHAT_URL", server.url), \
+             track_usage() as reports:
+            call()
+        assert len(reports) == 1
+        return reports[0]
+
+    def test_sync_call(self):
+        u = self._run(_USAGE, lambda: _llm().invoke("hi"))
+        assert (u.prompt_tokens, u.completion_tokens) == (42, 7)
+        assert u.server_ms == 5.0
+        assert usage_stats.to_dict()["stub-model"]["calls"] == 1
+
+    def test_async_call(self):
+        u = self._run(_USAGE, lambda: asyncio.run(_llm().ainvoke("hi")))
+        assert u.completion_tokens == 7
+
+    def test_stream_usage_from_final_chunk(self):
+        u = self._run(_USAGE, lambda: list(_llm().stream("hi")))
+        assert (u.completion_tokens, u.estimated) == (7, False)
+
+    def test_async_stream_without_usage_is_estimated(self):
+        async def consume():
+            return [c async for c in _llm().astream("hi")]
+        u = self._run(None, lambda: asyncio.run(consume()))
+        assert u.estimated is True
+        assert u.completion_tokens == estimate_tokens("Hello from the stub")
+
+    def test_stream_closed_on_stop_still_reported(self):
+        u = self._run(None, lambda: list(_llm().stream("hi", stop=["from"])))
+        assert u.estimated is True
+        assert u.completion_tokens >= estimate_tokens("Hello")
+
+
+class TestGuardedNodeTokens:
+
+    def test_node_tokens_recorded(self):
+        registry.reset()
+
+        @guarded_node("usage_agent")
+        def my_node(state):
+            report_usage(LLMUsage("m", 30, 12, 1.0))
+            report_usage(LLMUsage("m", 8, 4, 1.0))
+            return {"agent_output": "Done", "graph_trace": [], "error": None}
+
+        my_node({"task_input": {"user_message": "Teach me Python"}, "messages": []})
+        assert registry.snapshot()["usage_agent"]["total_tokens"] == 54
+
+    def test_async_node_tokens_recorded(self):
+        registry.reset()
+
+        @guarded_node("ausage_agent")
+        async def my_node(state):
+            await asyncio.sleep(0)
+            report_usage(LLMUsage("m", 10, 5, 1.0))
+            return {"agent_output": "Done", "graph_trace": [], "error": None}
+
+        asyncio.run(my_node({"task_input": {"user_message": "Teach me Python"}, "messages": []}))
+        assert registry.snapshot()["ausage_agent"]["total_tokens"] == 15